@@ -0,0 +1,37 @@
+"""Add health records full-text search index
+
+Revision ID: a3c9e1f47b20
+Revises: 8d15f0713a70
+Create Date: 2025-06-02 10:14:05.318422
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.fts import CREATE_STATEMENTS, DROP_STATEMENTS, REBUILD_STATEMENT
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f47b20'
+down_revision: Union[str, None] = '8d15f0713a70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for statement in CREATE_STATEMENTS:
+        op.execute(sa.text(statement))
+    op.execute(sa.text(REBUILD_STATEMENT))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for statement in DROP_STATEMENTS:
+        op.execute(sa.text(statement))
@@ -0,0 +1,31 @@
+"""Add medication dose rules
+
+Revision ID: b4e1c7d95a02
+Revises: d2f7a9c4e813
+Create Date: 2025-06-25 09:41:17.220864
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.dose_rules import sync_dose_rules
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e1c7d95a02'
+down_revision: Union[str, None] = 'd2f7a9c4e813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('medications', sa.Column('dose_rule', sa.String(length=20), nullable=True))
+    sync_dose_rules(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('medications', 'dose_rule')
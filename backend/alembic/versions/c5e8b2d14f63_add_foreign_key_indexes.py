@@ -0,0 +1,38 @@
+"""Add foreign key and access pattern indexes
+
+Revision ID: c5e8b2d14f63
+Revises: a3c9e1f47b20
+Create Date: 2025-06-09 16:32:48.705913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8b2d14f63'
+down_revision: Union[str, None] = 'a3c9e1f47b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_family_members_user_id_created_at', 'family_members', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_health_records_family_member_id_date_recorded', 'health_records', ['family_member_id', 'date_recorded'], unique=False)
+    op.create_index('ix_medications_family_member_id_created_at', 'medications', ['family_member_id', 'created_at'], unique=False)
+    op.create_index('ix_medications_family_member_id_is_active', 'medications', ['family_member_id', 'is_active'], unique=False)
+    op.create_index('ix_appointments_family_member_id_created_at', 'appointments', ['family_member_id', 'created_at'], unique=False)
+    op.create_index('ix_appointments_family_member_id_appointment_date', 'appointments', ['family_member_id', 'appointment_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointments_family_member_id_appointment_date', table_name='appointments')
+    op.drop_index('ix_appointments_family_member_id_created_at', table_name='appointments')
+    op.drop_index('ix_medications_family_member_id_is_active', table_name='medications')
+    op.drop_index('ix_medications_family_member_id_created_at', table_name='medications')
+    op.drop_index('ix_health_records_family_member_id_date_recorded', table_name='health_records')
+    op.drop_index('ix_family_members_user_id_created_at', table_name='family_members')
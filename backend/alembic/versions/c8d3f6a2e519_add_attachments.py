@@ -0,0 +1,66 @@
+"""Add health record attachments
+
+Revision ID: c8d3f6a2e519
+Revises: b4e1c7d95a02
+Create Date: 2025-06-27 10:15:42.301877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d3f6a2e519'
+down_revision: Union[str, None] = 'b4e1c7d95a02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_index('ix_blobs_unreferenced', 'blobs', ['sha256'], unique=False,
+                    sqlite_where=sa.text('ref_count = 0'), postgresql_where=sa.text('ref_count = 0'))
+    op.create_table('attachments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('health_record_id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['health_record_id'], ['health_records.id'], ),
+    sa.ForeignKeyConstraint(['sha256'], ['blobs.sha256'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_attachments_id'), 'attachments', ['id'], unique=False)
+    op.create_index('ix_attachments_health_record_id_created_at', 'attachments',
+                    ['health_record_id', 'created_at'], unique=False)
+    op.create_index('ix_attachments_sha256', 'attachments', ['sha256'], unique=False)
+    op.create_table('storage_usage',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('attachment_count', sa.Integer(), nullable=False),
+    sa.Column('attachment_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('storage_usage')
+    op.drop_index('ix_attachments_sha256', table_name='attachments')
+    op.drop_index('ix_attachments_health_record_id_created_at', table_name='attachments')
+    op.drop_index(op.f('ix_attachments_id'), table_name='attachments')
+    op.drop_table('attachments')
+    op.drop_index('ix_blobs_unreferenced', table_name='blobs')
+    op.drop_table('blobs')
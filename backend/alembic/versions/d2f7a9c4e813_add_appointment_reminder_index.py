@@ -0,0 +1,28 @@
+"""Add appointment reminder index
+
+Revision ID: d2f7a9c4e813
+Revises: a8c6e4f20b51
+Create Date: 2025-06-23 10:12:41.508316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7a9c4e813'
+down_revision: Union[str, None] = 'a8c6e4f20b51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_appointments_status_appointment_date', 'appointments', ['status', 'appointment_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointments_status_appointment_date', table_name='appointments')
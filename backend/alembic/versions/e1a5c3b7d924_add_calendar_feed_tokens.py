@@ -0,0 +1,30 @@
+"""Add calendar feed tokens
+
+Revision ID: e1a5c3b7d924
+Revises: c8d3f6a2e519
+Create Date: 2025-07-02 09:41:18.552103
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a5c3b7d924'
+down_revision: Union[str, None] = 'c8d3f6a2e519'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('calendar_token_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_users_calendar_token_hash'), 'users', ['calendar_token_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_calendar_token_hash'), table_name='users')
+    op.drop_column('users', 'calendar_token_hash')
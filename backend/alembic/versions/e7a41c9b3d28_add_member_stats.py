@@ -0,0 +1,47 @@
+"""Add member statistics rollup
+
+Revision ID: e7a41c9b3d28
+Revises: c5e8b2d14f63
+Create Date: 2025-06-16 11:08:27.514630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.member_stats import populate_member_stats
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a41c9b3d28'
+down_revision: Union[str, None] = 'c5e8b2d14f63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('member_stats',
+    sa.Column('family_member_id', sa.Integer(), nullable=False),
+    sa.Column('record_counts', sa.JSON(), nullable=False),
+    sa.Column('total_records', sa.Integer(), nullable=False),
+    sa.Column('latest_record_date', sa.DateTime(), nullable=True),
+    sa.Column('medication_count', sa.Integer(), nullable=False),
+    sa.Column('active_medications', sa.Integer(), nullable=False),
+    sa.Column('appointment_counts', sa.JSON(), nullable=False),
+    sa.Column('next_appointment_id', sa.Integer(), nullable=True),
+    sa.Column('next_appointment_date', sa.DateTime(), nullable=True),
+    sa.Column('records_updated_at', sa.DateTime(), nullable=True),
+    sa.Column('medications_updated_at', sa.DateTime(), nullable=True),
+    sa.Column('appointments_updated_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['family_member_id'], ['family_members.id'], ),
+    sa.PrimaryKeyConstraint('family_member_id')
+    )
+    populate_member_stats(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('member_stats')
@@ -0,0 +1,45 @@
+"""Add health record embeddings
+
+Revision ID: f3b9d2a61c47
+Revises: e7a41c9b3d28
+Create Date: 2025-06-18 09:42:15.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.embeddings import sync_record_embeddings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d2a61c47'
+down_revision: Union[str, None] = 'e7a41c9b3d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('record_embeddings',
+    sa.Column('record_id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=True),
+    sa.Column('vector', sa.LargeBinary(), nullable=True),
+    sa.Column('embedded_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['record_id'], ['health_records.id'], ),
+    sa.PrimaryKeyConstraint('record_id')
+    )
+    op.create_index('ix_record_embeddings_content_hash', 'record_embeddings', ['content_hash'], unique=False)
+    op.create_index('ix_record_embeddings_pending', 'record_embeddings', ['record_id'], unique=False,
+                    sqlite_where=sa.text('vector IS NULL'), postgresql_where=sa.text('vector IS NULL'))
+    # Queue existing records; the embedding worker fills in their vectors
+    sync_record_embeddings(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_record_embeddings_pending', table_name='record_embeddings')
+    op.drop_index('ix_record_embeddings_content_hash', table_name='record_embeddings')
+    op.drop_table('record_embeddings')
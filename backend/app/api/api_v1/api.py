@@ -2,7 +2,16 @@
 
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import auth, users, family_members, health_records
+from app.core.config import settings
+
+if settings.DATABASE_ASYNC:
+    from app.api.api_v1.async_endpoints import (
+        attachments, auth, users, family_members, health_records, appointments, jobs
+    )
+else:
+    from app.api.api_v1.endpoints import (
+        attachments, auth, users, family_members, health_records, appointments, jobs
+    )
 
 api_router = APIRouter()
 
@@ -10,3 +19,6 @@ api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(family_members.router, prefix="/family-members", tags=["family-members"])
 api_router.include_router(health_records.router, prefix="/health-records", tags=["health-records"])
+api_router.include_router(attachments.router, prefix="/health-records", tags=["attachments"])
+api_router.include_router(appointments.router, prefix="/appointments", tags=["appointments"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
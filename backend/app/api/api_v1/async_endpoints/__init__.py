@@ -0,0 +1 @@
+"""API v1 endpoints on the async database path (settings.DATABASE_ASYNC)."""
@@ -0,0 +1,127 @@
+"""Household appointment API endpoints (async database path)."""
+
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.conditional import not_modified
+from app.api.deps import get_async_db, get_current_active_user_async
+from app.core.calendar_cache import calendar_cache
+from app.core.principal_cache import Principal
+from app.db.session import AsyncSessionLocal
+from app.schemas.schemas import AppointmentResponse, CalendarFeedResponse, CursorPage
+from app.schemas.serialization import appointment_rows
+from app.services.async_health_record_service import AsyncAppointmentService
+from app.services.calendar_service import CALENDAR_MEDIA_TYPE, CalendarService, feed_start
+from app.services.freshness_service import FreshnessService, household_appointments_state
+
+router = APIRouter()
+
+
+@router.get("/", response_model=CursorPage[AppointmentResponse])
+async def read_appointments(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+    start: datetime = Query(..., alias="from", description="Earliest appointment date, inclusive"),
+    end: datetime = Query(..., alias="to", description="Latest appointment date, exclusive"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """Get the appointments of the whole family in a date range, earliest first."""
+    state = await FreshnessService.get_state_async(db, household_appointments_state(current_user.id))
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+
+    try:
+        rows, next_cursor = await AsyncAppointmentService.get_household_appointments(
+            db, current_user.id, start, end, cursor=cursor, limit=limit,
+            columns=appointment_rows.columns
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return appointment_rows.page_response(rows, next_cursor, headers=response.headers)
+
+
+async def _calendar_body(user_id: int, since: datetime, state: tuple) -> AsyncIterator[str]:
+    # The feed owns its session: the body keeps streaming after the
+    # request's dependencies have been torn down
+    chunks = []
+    async with AsyncSessionLocal() as db:
+        async for chunk in CalendarService.stream_calendar_async(db, user_id, since):
+            chunks.append(chunk)
+            yield chunk
+    calendar_cache.put(user_id, state, "".join(chunks).encode())
+
+
+async def _calendar_response(
+    db: AsyncSession, user_id: int, request: Request, response: Response
+) -> Response:
+    since = feed_start()
+    state = await FreshnessService.get_state_async(
+        db, household_appointments_state(user_id)
+    ) + (since,)
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+
+    body = calendar_cache.get(user_id, state)
+    if body is not None:
+        return Response(body, media_type=CALENDAR_MEDIA_TYPE, headers=response.headers)
+    return StreamingResponse(
+        _calendar_body(user_id, since, state),
+        media_type=CALENDAR_MEDIA_TYPE,
+        headers=response.headers,
+    )
+
+
+@router.get("/calendar.ics", response_class=StreamingResponse)
+async def read_calendar(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Stream the family's appointments as an iCalendar feed."""
+    return await _calendar_response(db, current_user.id, request, response)
+
+
+@router.post("/calendar/token", response_model=CalendarFeedResponse)
+async def create_calendar_token(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Issue the URL calendar clients subscribe to, revoking any previous one."""
+    token = await CalendarService.issue_feed_token_async(db, current_user.id)
+    return CalendarFeedResponse(url=str(request.url_for("read_calendar_feed", token=token)))
+
+
+@router.delete("/calendar/token")
+async def delete_calendar_token(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Revoke the calendar feed URL."""
+    await CalendarService.revoke_feed_token_async(db, current_user.id)
+    return {"message": "Calendar feed revoked successfully"}
+
+
+@router.get("/calendar/{token}.ics", response_class=StreamingResponse)
+async def read_calendar_feed(
+    token: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """Stream the family's appointments to a calendar client, authenticated by the feed token."""
+    user_id = await CalendarService.get_feed_user_async(db, token)
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="Calendar feed not found")
+    return await _calendar_response(db, user_id, request, response)
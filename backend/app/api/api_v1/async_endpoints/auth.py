@@ -0,0 +1,100 @@
+"""Authentication API endpoints (async database path)."""
+
+from datetime import timedelta
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_async_db, get_current_active_user_async
+from app.core.config import settings
+from app.core.principal_cache import Principal
+from app.schemas.schemas import UserCreate, UserResponse, Token, UserLogin
+from app.services.async_user_service import AsyncUserService
+from app.services.user_service import UserService
+
+router = APIRouter()
+
+
+@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def register(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    user_in: UserCreate,
+) -> Any:
+    """Register new user."""
+    user = await AsyncUserService.get_user_by_email(db, email=user_in.email)
+    if user:
+        raise HTTPException(
+            status_code=400,
+            detail="The user with this email already exists in the system.",
+        )
+    
+    try:
+        user = await AsyncUserService.create_user(db, user=user_in)
+        return user
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/login", response_model=Token)
+async def login_for_access_token(
+    db: AsyncSession = Depends(get_async_db), 
+    form_data: OAuth2PasswordRequestForm = Depends()
+) -> Any:
+    """OAuth2 compatible token login, get an access token for future requests."""
+    user = await AsyncUserService.authenticate_user(
+        db, email=form_data.username, password=form_data.password
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    elif not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    
+    access_token = UserService.create_access_token_for_user(user)
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+    }
+
+
+@router.post("/login/json", response_model=Token)
+async def login_json(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    user_credentials: UserLogin,
+) -> Any:
+    """JSON login endpoint."""
+    user = await AsyncUserService.authenticate_user(
+        db, email=user_credentials.email, password=user_credentials.password
+    )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+        )
+    elif not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    
+    access_token = UserService.create_access_token_for_user(user)
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+    }
+
+
+@router.post("/test-token", response_model=UserResponse)
+async def test_token(current_user: Principal = Depends(get_current_active_user_async)) -> Any:
+    """Test access token."""
+    return current_user
+
+
+@router.get("/me", response_model=UserResponse)
+async def read_users_me(current_user: Principal = Depends(get_current_active_user_async)) -> Any:
+    """Get current user."""
+    return current_user
@@ -0,0 +1,162 @@
+"""Family member management API endpoints (async database path)."""
+
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.conditional import not_modified
+from app.api.deps import get_async_db, get_current_active_user_async
+from app.core.principal_cache import Principal
+from app.schemas.schemas import (
+    CursorPage,
+    FamilyMemberCreate, 
+    FamilyMemberUpdate, 
+    FamilyMemberResponse,
+    FamilyMemberDetailResponse,
+    FamilyMemberSummary,
+    HouseholdSummary
+)
+from app.services.async_family_member_service import AsyncFamilyMemberService
+from app.services.freshness_service import (
+    FreshnessService,
+    family_member_state,
+    family_members_state
+)
+from app.services.summary_service import SummaryService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=CursorPage[FamilyMemberResponse])
+async def read_family_members(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+    search: Optional[str] = Query(None, description="Search by name or relationship"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """Retrieve family members for current user, oldest first."""
+    state = await FreshnessService.get_state_async(
+        db, family_members_state(current_user.id)
+    )
+    cached = not_modified(request, response, (current_user.id,) + state)
+    if cached:
+        return cached
+    
+    try:
+        family_members, next_cursor = await AsyncFamilyMemberService.search_family_members(
+            db, user_id=current_user.id, search_term=search or "", cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"items": family_members, "next_cursor": next_cursor}
+
+
+@router.post("/", response_model=FamilyMemberResponse, status_code=status.HTTP_201_CREATED)
+async def create_family_member(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    family_member_in: FamilyMemberCreate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Create new family member."""
+    try:
+        family_member = await AsyncFamilyMemberService.create_family_member(
+            db, member=family_member_in, user_id=current_user.id
+        )
+        return family_member
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/summary", response_model=HouseholdSummary)
+async def read_household_summary(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Get record, medication and appointment summaries of every family member."""
+    return await SummaryService.get_household_summary_async(db, user_id=current_user.id)
+
+
+@router.get("/{member_id}/summary", response_model=FamilyMemberSummary)
+async def read_family_member_summary(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Get a family member's record counts, active medications and next appointment."""
+    summary = await SummaryService.get_member_summary_async(
+        db, member_id=member_id, user_id=current_user.id
+    )
+    if not summary:
+        raise HTTPException(status_code=404, detail="Family member not found")
+    
+    return summary
+
+
+@router.get("/{member_id}", response_model=FamilyMemberDetailResponse)
+async def read_family_member(
+    *,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Get family member by ID with health records."""
+    state = await FreshnessService.get_state_async(
+        db, family_member_state(member_id, current_user.id)
+    )
+    if state is None:
+        raise HTTPException(status_code=404, detail="Family member not found")
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+    
+    family_member = await AsyncFamilyMemberService.get_family_member_with_records(
+        db, member_id=member_id, user_id=current_user.id
+    )
+    if not family_member:
+        raise HTTPException(status_code=404, detail="Family member not found")
+    
+    return family_member
+
+
+@router.put("/{member_id}", response_model=FamilyMemberResponse)
+async def update_family_member(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    family_member_in: FamilyMemberUpdate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Update family member."""
+    family_member = await AsyncFamilyMemberService.update_family_member(
+        db, member_id=member_id, member_update=family_member_in, user_id=current_user.id
+    )
+    if not family_member:
+        raise HTTPException(status_code=404, detail="Family member not found")
+    
+    return family_member
+
+
+@router.delete("/{member_id}")
+async def delete_family_member(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Delete family member."""
+    success = await AsyncFamilyMemberService.delete_family_member(
+        db, member_id=member_id, user_id=current_user.id
+    )
+    if not success:
+        raise HTTPException(status_code=404, detail="Family member not found")
+    
+    return {"message": "Family member deleted successfully"}
@@ -0,0 +1,463 @@
+"""Health record management API endpoints (async database path)."""
+
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.conditional import not_modified
+from app.api.deps import get_async_db, get_current_active_user_async
+from app.db.loading import LoadingProfile
+from app.core.principal_cache import Principal
+from app.schemas.schemas import (
+    BulkCreateResponse,
+    CursorPage,
+    DoseSchedule,
+    HealthRecordCreate,
+    HealthRecordUpdate, 
+    HealthRecordResponse,
+    HealthRecordSearchResult,
+    SemanticSearchResult,
+    MedicationBulkCreateResponse,
+    MedicationCreate,
+    MedicationUpdate,
+    MedicationResponse,
+    MedicationWriteResponse,
+    AppointmentCreate,
+    AppointmentUpdate,
+    AppointmentResponse
+)
+from app.schemas.serialization import appointment_rows, health_record_rows, medication_rows
+from app.services.async_health_record_service import (
+    AsyncHealthRecordService,
+    AsyncMedicationService,
+    AsyncAppointmentService
+)
+from app.services.dose_schedule_service import DoseScheduleService, schedule_range
+from app.services.freshness_service import (
+    FreshnessService,
+    health_record_state,
+    household_medications_state,
+    household_records_state,
+    member_appointments_state,
+    member_medications_state,
+    member_records_state
+)
+from app.services.semantic_search_service import SemanticSearchService
+
+router = APIRouter()
+
+
+# Health Records endpoints
+@router.get("/", response_model=CursorPage[HealthRecordSearchResult])
+async def read_health_records(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+    search: Optional[str] = Query(
+        None,
+        description='Full-text search on title, description and doctor; words match as '
+                    'prefixes, "quoted text" as a phrase',
+    ),
+    record_type: Optional[str] = Query(None, description="Filter by record type"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """
+    Retrieve health records for current user's family.
+
+    Newest first, or ranked by relevance when searching.
+    """
+    state = await FreshnessService.get_state_async(
+        db, household_records_state(current_user.id)
+    )
+    cached = not_modified(request, response, (current_user.id,) + state)
+    if cached:
+        return cached
+    
+    try:
+        hits, next_cursor = await AsyncHealthRecordService.search_health_records(
+            db,
+            user_id=current_user.id,
+            search_term=search or "",
+            record_type=record_type,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    items = [
+        HealthRecordSearchResult.model_validate(record).model_copy(
+            update={"snippet": snippet, "rank": rank}
+        )
+        for record, snippet, rank in hits
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/semantic-search", response_model=List[SemanticSearchResult])
+async def semantic_search_health_records(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+    q: str = Query(..., min_length=1, max_length=500, description="Text to match by meaning"),
+    record_type: Optional[str] = Query(None, description="Filter by record type"),
+    limit: int = Query(10, ge=1, le=100),
+) -> Any:
+    """
+    Retrieve the current user's health records most similar in meaning to a query.
+
+    Best match first; records saved moments ago appear once they are embedded.
+    """
+    hits = await SemanticSearchService.search_async(
+        db, user_id=current_user.id, query=q, limit=limit, record_type=record_type
+    )
+    return [
+        SemanticSearchResult(**HealthRecordResponse.model_validate(record).model_dump(), score=score)
+        for record, score in hits
+    ]
+
+
+@router.post("/family-members/{member_id}/records", response_model=HealthRecordResponse, status_code=status.HTTP_201_CREATED)
+async def create_health_record(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    health_record_in: HealthRecordCreate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Create new health record for family member."""
+    try:
+        health_record = await AsyncHealthRecordService.create_health_record(
+            db, record=health_record_in, member_id=member_id, user_id=current_user.id
+        )
+        return health_record
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/family-members/{member_id}/records/bulk", response_model=BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_health_records(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    health_records_in: List[HealthRecordCreate],
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Create many health records for a family member in one transaction."""
+    try:
+        ids = await AsyncHealthRecordService.create_health_records(
+            db, records=health_records_in, member_id=member_id, user_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return BulkCreateResponse.from_ids(ids)
+
+
+@router.get("/family-members/{member_id}/records", response_model=CursorPage[HealthRecordResponse])
+async def read_health_records_by_member(
+    *,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """Get health records for a family member, newest first."""
+    state = await FreshnessService.get_state_async(
+        db, member_records_state(member_id, current_user.id)
+    )
+    if state is None:
+        raise HTTPException(status_code=404, detail="Family member not found")
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+    
+    try:
+        rows, next_cursor = await AsyncHealthRecordService.get_health_records_by_member(
+            db, member_id=member_id, cursor=cursor, limit=limit, columns=health_record_rows.columns
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return health_record_rows.page_response(rows, next_cursor, headers=response.headers)
+
+
+@router.get("/{record_id}", response_model=HealthRecordResponse)
+async def read_health_record(
+    *,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    record_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Get health record by ID."""
+    state = await FreshnessService.get_state_async(
+        db, health_record_state(record_id, current_user.id)
+    )
+    if state is not None:
+        cached = not_modified(request, response, state, last_modified=state[1])
+        if cached:
+            return cached
+    
+    health_record = await AsyncHealthRecordService.get_health_record(
+        db, record_id=record_id, profile=LoadingProfile.MEMBER_SUMMARY
+    )
+    if not health_record:
+        raise HTTPException(status_code=404, detail="Health record not found")
+    
+    # Verify the record belongs to user's family member
+    if health_record.family_member.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return health_record
+
+
+@router.put("/{record_id}", response_model=HealthRecordResponse)
+async def update_health_record(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    record_id: int,
+    health_record_in: HealthRecordUpdate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Update health record."""
+    health_record = await AsyncHealthRecordService.update_health_record(
+        db, record_id=record_id, record_update=health_record_in, user_id=current_user.id
+    )
+    if not health_record:
+        raise HTTPException(status_code=404, detail="Health record not found")
+    
+    return health_record
+
+
+@router.delete("/{record_id}")
+async def delete_health_record(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    record_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Delete health record."""
+    success = await AsyncHealthRecordService.delete_health_record(
+        db, record_id=record_id, user_id=current_user.id
+    )
+    if not success:
+        raise HTTPException(status_code=404, detail="Health record not found")
+    
+    return {"message": "Health record deleted successfully"}
+
+
+# Medication endpoints
+@router.post("/family-members/{member_id}/medications", response_model=MedicationWriteResponse, status_code=status.HTTP_201_CREATED)
+async def create_medication(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    medication_in: MedicationCreate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Create new medication record for family member, with warnings about its
+    interactions with the member's active medications and their allergies.
+    """
+    try:
+        medication, conflicts = await AsyncMedicationService.create_medication(
+            db, medication=medication_in, member_id=member_id, user_id=current_user.id
+        )
+        return MedicationWriteResponse.from_medication(medication, conflicts)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/family-members/{member_id}/medications/bulk", response_model=MedicationBulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_medications(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    medications_in: List[MedicationCreate],
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Create many medications for a family member in one transaction, with
+    warnings about each one's interactions with the member's active
+    medications, the earlier ones in the request and their allergies.
+    """
+    try:
+        ids, conflicts = await AsyncMedicationService.create_medications(
+            db, medications=medications_in, member_id=member_id, user_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return MedicationBulkCreateResponse.from_conflicts(ids, conflicts)
+
+
+@router.get("/family-members/{member_id}/medications", response_model=CursorPage[MedicationResponse])
+async def read_medications_by_member(
+    *,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """Get medications for a family member, newest first."""
+    state = await FreshnessService.get_state_async(
+        db, member_medications_state(member_id, current_user.id)
+    )
+    if state is None:
+        raise HTTPException(status_code=404, detail="Family member not found")
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+    
+    try:
+        rows, next_cursor = await AsyncMedicationService.get_medications_by_member(
+            db, member_id=member_id, cursor=cursor, limit=limit, columns=medication_rows.columns
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return medication_rows.page_response(rows, next_cursor, headers=response.headers)
+
+
+@router.put("/medications/{medication_id}", response_model=MedicationWriteResponse)
+async def update_medication(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    medication_id: int,
+    medication_in: MedicationUpdate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """
+    Update a medication, with warnings about its interactions with the
+    member's other active medications and their allergies.
+    """
+    updated = await AsyncMedicationService.update_medication(
+        db, medication_id=medication_id, medication_update=medication_in, user_id=current_user.id
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Medication not found")
+    return MedicationWriteResponse.from_medication(*updated)
+
+
+@router.get("/medications/doses", response_model=DoseSchedule)
+async def read_household_doses(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async),
+    start: datetime = Query(..., alias="from", description="Start of the range, inclusive"),
+    end: datetime = Query(..., alias="to", description="End of the range, exclusive"),
+) -> Any:
+    """Get the doses of the whole family's active medications in a date range, earliest first."""
+    try:
+        start, end = schedule_range(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    state = await FreshnessService.get_state_async(db, household_medications_state(current_user.id))
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+
+    doses, unscheduled = await DoseScheduleService.get_household_schedule_async(
+        db, current_user.id, start, end, state=state
+    )
+
+    return {"doses": [dose._asdict() for dose in doses], "unscheduled": unscheduled}
+
+
+# Appointment endpoints
+@router.post("/family-members/{member_id}/appointments", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
+async def create_appointment(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    appointment_in: AppointmentCreate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Create new appointment for family member."""
+    try:
+        appointment = await AsyncAppointmentService.create_appointment(
+            db, appointment=appointment_in, member_id=member_id, user_id=current_user.id
+        )
+        return appointment
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/family-members/{member_id}/appointments/bulk", response_model=BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_appointments(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    appointments_in: List[AppointmentCreate],
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Create many appointments for a family member in one transaction."""
+    try:
+        ids = await AsyncAppointmentService.create_appointments(
+            db, appointments=appointments_in, member_id=member_id, user_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return BulkCreateResponse.from_ids(ids)
+
+
+@router.get("/family-members/{member_id}/appointments", response_model=CursorPage[AppointmentResponse])
+async def read_appointments_by_member(
+    *,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    member_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """Get appointments for a family member, newest first."""
+    state = await FreshnessService.get_state_async(
+        db, member_appointments_state(member_id, current_user.id)
+    )
+    if state is None:
+        raise HTTPException(status_code=404, detail="Family member not found")
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+    
+    try:
+        rows, next_cursor = await AsyncAppointmentService.get_appointments_by_member(
+            db, member_id=member_id, cursor=cursor, limit=limit, columns=appointment_rows.columns
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return appointment_rows.page_response(rows, next_cursor, headers=response.headers)
+
+
+@router.put("/appointments/{appointment_id}", response_model=AppointmentResponse)
+async def update_appointment(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    appointment_id: int,
+    appointment_in: AppointmentUpdate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Update an appointment; set its status to "cancelled" to cancel it."""
+    appointment = await AsyncAppointmentService.update_appointment(
+        db, appointment_id=appointment_id, appointment_update=appointment_in, user_id=current_user.id
+    )
+    if not appointment:
+        raise HTTPException(status_code=404, detail="Appointment not found")
+    return appointment
@@ -0,0 +1,33 @@
+"""Background job status API endpoints (async database path)."""
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_async_db, get_current_active_user_async
+from app.core.config import settings
+from app.core.principal_cache import Principal
+from app.db.jobs import QUEUED, RUNNING
+from app.schemas.schemas import JobResponse
+from app.services.job_service import JobService
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def read_job(
+    *,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    job_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Get the status of one of the current user's background jobs."""
+    job = await JobService.get_job_async(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status in (QUEUED, RUNNING):
+        # When polling clients should ask again
+        response.headers["Retry-After"] = str(max(1, round(settings.JOB_POLL_SECONDS)))
+    return job
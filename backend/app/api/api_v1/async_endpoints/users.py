@@ -0,0 +1,114 @@
+"""User management API endpoints (async database path)."""
+
+from typing import Any, AsyncIterator, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_async_db, get_current_active_user_async
+from app.core.principal_cache import Principal
+from app.db.session import AsyncSessionLocal
+from app.schemas.schemas import UserResponse, UserUpdate
+from app.services.async_user_service import AsyncUserService
+from app.services.export_service import EXPORT_MEDIA_TYPES, ExportFormat, ExportService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[UserResponse])
+async def read_users(
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Retrieve users."""
+    users = await AsyncUserService.get_all_users(db, skip=skip, limit=limit)
+    return users
+
+
+async def _export_body(user_id: int, export_format: ExportFormat) -> AsyncIterator[str]:
+    # The export owns its session: the body keeps streaming after the
+    # request's dependencies have been torn down
+    async with AsyncSessionLocal() as db:
+        async for chunk in ExportService.stream_export_async(db, user_id, export_format):
+            yield chunk
+
+
+@router.get("/me/export", response_class=StreamingResponse)
+async def export_my_data(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Stream the current user's family members, health records, medications and appointments."""
+    return StreamingResponse(
+        _export_body(current_user.id, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="phrm-export.{export_format.value}"'
+        },
+    )
+
+
+@router.get("/{user_id}", response_model=UserResponse)
+async def read_user(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Get user by ID."""
+    user = await AsyncUserService.get_user(db, user_id=user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Users can only access their own data (for now)
+    if user.id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return user
+
+
+@router.put("/{user_id}", response_model=UserResponse)
+async def update_user(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int,
+    user_in: UserUpdate,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Update user."""
+    user = await AsyncUserService.get_user(db, user_id=user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Users can only update their own data
+    if user.id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    user = await AsyncUserService.update_user(db, user_id=user_id, user_update=user_in)
+    return user
+
+
+@router.delete("/{user_id}")
+async def delete_user(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+) -> Any:
+    """Delete user."""
+    user = await AsyncUserService.get_user(db, user_id=user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Users can only delete their own account
+    if user.id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    success = await AsyncUserService.delete_user(db, user_id=user_id)
+    if not success:
+        raise HTTPException(status_code=400, detail="Could not delete user")
+    
+    return {"message": "User deleted successfully"}
@@ -0,0 +1,102 @@
+"""Health record attachment API endpoints."""
+
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_db, get_current_active_user
+from app.api.files import attachment_response, receive_upload
+from app.core.blob_store import blob_store
+from app.core.config import settings
+from app.core.principal_cache import Principal
+from app.schemas.schemas import AttachmentResponse, StorageUsageResponse
+from app.services.attachment_service import AttachmentService, QuotaExceededError
+
+router = APIRouter()
+
+
+@router.get("/attachments/usage", response_model=StorageUsageResponse)
+def read_storage_usage(
+    *,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """Get the current user's attachment storage usage and quota."""
+    count, size = AttachmentService.get_usage(db, current_user.id)
+    return StorageUsageResponse(
+        attachment_count=count, attachment_bytes=size, quota_bytes=settings.ATTACHMENT_QUOTA_BYTES
+    )
+
+
+@router.post("/{record_id}/attachments", response_model=AttachmentResponse, status_code=status.HTTP_201_CREATED)
+async def upload_attachment(
+    *,
+    request: Request,
+    db: Session = Depends(get_db),
+    record_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Attach a file to a health record, sent as the "file" field of a
+    multipart/form-data body. Content already stored is kept once.
+    """
+    upload = await receive_upload(request, settings.ATTACHMENT_MAX_BYTES)
+    try:
+        return await run_in_threadpool(
+            AttachmentService.create_attachment,
+            db, record_id, current_user.id, upload.filename, upload.content_type, upload.staged
+        )
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        blob_store.discard(upload.staged)
+
+
+@router.get("/{record_id}/attachments", response_model=List[AttachmentResponse])
+def read_attachments(
+    *,
+    db: Session = Depends(get_db),
+    record_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """Get the attachments of a health record."""
+    attachments = AttachmentService.get_attachments(db, record_id, current_user.id)
+    if attachments is None:
+        raise HTTPException(status_code=404, detail="Health record not found")
+    return attachments
+
+
+@router.get("/{record_id}/attachments/{attachment_id}")
+def download_attachment(
+    *,
+    request: Request,
+    db: Session = Depends(get_db),
+    record_id: int,
+    attachment_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """Download an attachment; supports Range, If-Range and If-None-Match."""
+    attachment = AttachmentService.get_attachment(db, record_id, attachment_id, current_user.id)
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return attachment_response(request, attachment)
+
+
+@router.delete("/{record_id}/attachments/{attachment_id}")
+def delete_attachment(
+    *,
+    db: Session = Depends(get_db),
+    record_id: int,
+    attachment_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """Delete an attachment."""
+    success = AttachmentService.delete_attachment(db, record_id, attachment_id, current_user.id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+
+    return {"message": "Attachment deleted successfully"}
@@ -6,10 +6,11 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_db, get_current_active_user
 from app.core.config import settings
-from app.models.models import User
+from app.core.principal_cache import Principal
 from app.schemas.schemas import UserCreate, UserResponse, Token, UserLogin
 from app.services.user_service import UserService
 
@@ -17,13 +18,13 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(
+async def register(
     *,
     db: Session = Depends(get_db),
     user_in: UserCreate,
 ) -> Any:
     """Register new user."""
-    user = UserService.get_user_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(UserService.get_user_by_email, db, user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
@@ -31,19 +32,19 @@ def register(
         )
     
     try:
-        user = UserService.create_user(db, user=user_in)
+        user = await UserService.create_user(db, user=user_in)
         return user
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     db: Session = Depends(get_db), 
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """OAuth2 compatible token login, get an access token for future requests."""
-    user = UserService.authenticate_user(
+    user = await UserService.authenticate_user(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
@@ -63,13 +64,13 @@ def login_for_access_token(
 
 
 @router.post("/login/json", response_model=Token)
-def login_json(
+async def login_json(
     *,
     db: Session = Depends(get_db),
     user_credentials: UserLogin,
 ) -> Any:
     """JSON login endpoint."""
-    user = UserService.authenticate_user(
+    user = await UserService.authenticate_user(
         db, email=user_credentials.email, password=user_credentials.password
     )
     if not user:
@@ -88,12 +89,12 @@ def login_json(
 
 
 @router.post("/test-token", response_model=UserResponse)
-def test_token(current_user: User = Depends(get_current_active_user)) -> Any:
+def test_token(current_user: Principal = Depends(get_current_active_user)) -> Any:
     """Test access token."""
     return current_user
 
 
 @router.get("/me", response_model=UserResponse)
-def read_users_me(current_user: User = Depends(get_current_active_user)) -> Any:
+def read_users_me(current_user: Principal = Depends(get_current_active_user)) -> Any:
     """Get current user."""
     return current_user
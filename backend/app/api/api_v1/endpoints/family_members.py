@@ -1,44 +1,59 @@
 """Family member management API endpoints."""
 
-from typing import Any, List, Optional
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
+from app.api.conditional import not_modified
 from app.api.deps import get_db, get_current_active_user
-from app.models.models import User
+from app.core.principal_cache import Principal
 from app.schemas.schemas import (
+    CursorPage,
     FamilyMemberCreate, 
     FamilyMemberUpdate, 
     FamilyMemberResponse,
-    FamilyMemberDetailResponse
+    FamilyMemberDetailResponse,
+    FamilyMemberSummary,
+    HouseholdSummary
 )
 from app.services.family_member_service import FamilyMemberService
+from app.services.freshness_service import (
+    FreshnessService,
+    family_member_state,
+    family_members_state
+)
+from app.services.summary_service import SummaryService
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[FamilyMemberResponse])
+@router.get("/", response_model=CursorPage[FamilyMemberResponse])
 def read_family_members(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     search: Optional[str] = Query(None, description="Search by name or relationship"),
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
 ) -> Any:
-    """Retrieve family members for current user."""
-    if search:
-        family_members = FamilyMemberService.search_family_members(
-            db, user_id=current_user.id, search_term=search, skip=skip, limit=limit
-        )
-    else:
-        family_members = FamilyMemberService.get_family_members_by_user(
-            db, user_id=current_user.id
+    """Retrieve family members for current user, oldest first."""
+    state = FreshnessService.get_state(
+        db, family_members_state(current_user.id)
+    )
+    cached = not_modified(request, response, (current_user.id,) + state)
+    if cached:
+        return cached
+    
+    try:
+        family_members, next_cursor = FamilyMemberService.search_family_members(
+            db, user_id=current_user.id, search_term=search or "", cursor=cursor, limit=limit
         )
-        # Apply pagination
-        family_members = family_members[skip:skip+limit]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return family_members
+    return {"items": family_members, "next_cursor": next_cursor}
 
 
 @router.post("/", response_model=FamilyMemberResponse, status_code=status.HTTP_201_CREATED)
@@ -46,7 +61,7 @@ def create_family_member(
     *,
     db: Session = Depends(get_db),
     family_member_in: FamilyMemberCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Create new family member."""
     try:
@@ -58,14 +73,51 @@ def create_family_member(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/summary", response_model=HouseholdSummary)
+def read_household_summary(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """Get record, medication and appointment summaries of every family member."""
+    return SummaryService.get_household_summary(db, user_id=current_user.id)
+
+
+@router.get("/{member_id}/summary", response_model=FamilyMemberSummary)
+def read_family_member_summary(
+    *,
+    db: Session = Depends(get_db),
+    member_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """Get a family member's record counts, active medications and next appointment."""
+    summary = SummaryService.get_member_summary(
+        db, member_id=member_id, user_id=current_user.id
+    )
+    if not summary:
+        raise HTTPException(status_code=404, detail="Family member not found")
+    
+    return summary
+
+
 @router.get("/{member_id}", response_model=FamilyMemberDetailResponse)
 def read_family_member(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     member_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Get family member by ID with health records."""
+    state = FreshnessService.get_state(
+        db, family_member_state(member_id, current_user.id)
+    )
+    if state is None:
+        raise HTTPException(status_code=404, detail="Family member not found")
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+    
     family_member = FamilyMemberService.get_family_member_with_records(
         db, member_id=member_id, user_id=current_user.id
     )
@@ -81,7 +133,7 @@ def update_family_member(
     db: Session = Depends(get_db),
     member_id: int,
     family_member_in: FamilyMemberUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Update family member."""
     family_member = FamilyMemberService.update_family_member(
@@ -98,7 +150,7 @@ def delete_family_member(
     *,
     db: Session = Depends(get_db),
     member_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Delete family member."""
     success = FamilyMemberService.delete_family_member(
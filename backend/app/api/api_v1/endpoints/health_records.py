@@ -1,61 +1,123 @@
 """Health record management API endpoints."""
 
+from datetime import datetime
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
+from app.api.conditional import not_modified
 from app.api.deps import get_db, get_current_active_user
-from app.models.models import User
+from app.db.loading import LoadingProfile
+from app.core.principal_cache import Principal
 from app.schemas.schemas import (
+    BulkCreateResponse,
+    CursorPage,
+    DoseSchedule,
     HealthRecordCreate,
     HealthRecordUpdate, 
     HealthRecordResponse,
+    HealthRecordSearchResult,
+    SemanticSearchResult,
+    MedicationBulkCreateResponse,
     MedicationCreate,
+    MedicationUpdate,
     MedicationResponse,
+    MedicationWriteResponse,
     AppointmentCreate,
+    AppointmentUpdate,
     AppointmentResponse
 )
+from app.schemas.serialization import appointment_rows, health_record_rows, medication_rows
+from app.services.dose_schedule_service import DoseScheduleService, schedule_range
+from app.services.freshness_service import (
+    FreshnessService,
+    health_record_state,
+    household_medications_state,
+    household_records_state,
+    member_appointments_state,
+    member_medications_state,
+    member_records_state
+)
 from app.services.health_record_service import (
     HealthRecordService,
     MedicationService,
     AppointmentService
 )
+from app.services.semantic_search_service import SemanticSearchService
 
 router = APIRouter()
 
 
 # Health Records endpoints
-@router.get("/", response_model=List[HealthRecordResponse])
+@router.get("/", response_model=CursorPage[HealthRecordSearchResult])
 def read_health_records(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-    search: Optional[str] = Query(None, description="Search records by title, description, or doctor"),
+    current_user: Principal = Depends(get_current_active_user),
+    search: Optional[str] = Query(
+        None,
+        description='Full-text search on title, description and doctor; words match as '
+                    'prefixes, "quoted text" as a phrase',
+    ),
     record_type: Optional[str] = Query(None, description="Filter by record type"),
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
 ) -> Any:
-    """Retrieve health records for current user's family."""
-    if search or record_type:
-        health_records = HealthRecordService.search_health_records(
-            db, 
+    """
+    Retrieve health records for current user's family.
+
+    Newest first, or ranked by relevance when searching.
+    """
+    state = FreshnessService.get_state(
+        db, household_records_state(current_user.id)
+    )
+    cached = not_modified(request, response, (current_user.id,) + state)
+    if cached:
+        return cached
+    
+    try:
+        hits, next_cursor = HealthRecordService.search_health_records(
+            db,
             user_id=current_user.id,
             search_term=search or "",
             record_type=record_type,
-            skip=skip,
-            limit=limit
-        )
-    else:
-        # Get all records for user's family members
-        health_records = HealthRecordService.search_health_records(
-            db,
-            user_id=current_user.id,
-            search_term="",
-            skip=skip,
+            cursor=cursor,
             limit=limit
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return health_records
+    items = [
+        HealthRecordSearchResult.model_validate(record).model_copy(
+            update={"snippet": snippet, "rank": rank}
+        )
+        for record, snippet, rank in hits
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/semantic-search", response_model=List[SemanticSearchResult])
+def semantic_search_health_records(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+    q: str = Query(..., min_length=1, max_length=500, description="Text to match by meaning"),
+    record_type: Optional[str] = Query(None, description="Filter by record type"),
+    limit: int = Query(10, ge=1, le=100),
+) -> Any:
+    """
+    Retrieve the current user's health records most similar in meaning to a query.
+
+    Best match first; records saved moments ago appear once they are embedded.
+    """
+    hits = SemanticSearchService.search(
+        db, user_id=current_user.id, query=q, limit=limit, record_type=record_type
+    )
+    return [
+        SemanticSearchResult(**HealthRecordResponse.model_validate(record).model_dump(), score=score)
+        for record, score in hits
+    ]
 
 
 @router.post("/family-members/{member_id}/records", response_model=HealthRecordResponse, status_code=status.HTTP_201_CREATED)
@@ -64,7 +126,7 @@ def create_health_record(
     db: Session = Depends(get_db),
     member_id: int,
     health_record_in: HealthRecordCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Create new health record for family member."""
     try:
@@ -76,33 +138,77 @@ def create_health_record(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/family-members/{member_id}/records", response_model=List[HealthRecordResponse])
+@router.post("/family-members/{member_id}/records/bulk", response_model=BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+def create_health_records(
+    *,
+    db: Session = Depends(get_db),
+    member_id: int,
+    health_records_in: List[HealthRecordCreate],
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """Create many health records for a family member in one transaction."""
+    try:
+        ids = HealthRecordService.create_health_records(
+            db, records=health_records_in, member_id=member_id, user_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return BulkCreateResponse.from_ids(ids)
+
+
+@router.get("/family-members/{member_id}/records", response_model=CursorPage[HealthRecordResponse])
 def read_health_records_by_member(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     member_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
 ) -> Any:
-    """Get all health records for a family member."""
-    # Verify the family member belongs to the user
-    from app.services.family_member_service import FamilyMemberService
-    family_member = FamilyMemberService.get_family_member(db, member_id)
-    if not family_member or family_member.user_id != current_user.id:
+    """Get health records for a family member, newest first."""
+    state = FreshnessService.get_state(
+        db, member_records_state(member_id, current_user.id)
+    )
+    if state is None:
         raise HTTPException(status_code=404, detail="Family member not found")
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+    
+    try:
+        rows, next_cursor = HealthRecordService.get_health_records_by_member(
+            db, member_id=member_id, cursor=cursor, limit=limit, columns=health_record_rows.columns
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    health_records = HealthRecordService.get_health_records_by_member(db, member_id=member_id)
-    return health_records
+    return health_record_rows.page_response(rows, next_cursor, headers=response.headers)
 
 
 @router.get("/{record_id}", response_model=HealthRecordResponse)
 def read_health_record(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     record_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Get health record by ID."""
-    health_record = HealthRecordService.get_health_record(db, record_id=record_id)
+    state = FreshnessService.get_state(
+        db, health_record_state(record_id, current_user.id)
+    )
+    if state is not None:
+        cached = not_modified(request, response, state, last_modified=state[1])
+        if cached:
+            return cached
+    
+    health_record = HealthRecordService.get_health_record(
+        db, record_id=record_id, profile=LoadingProfile.MEMBER_SUMMARY
+    )
     if not health_record:
         raise HTTPException(status_code=404, detail="Health record not found")
     
@@ -119,7 +225,7 @@ def update_health_record(
     db: Session = Depends(get_db),
     record_id: int,
     health_record_in: HealthRecordUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Update health record."""
     health_record = HealthRecordService.update_health_record(
@@ -136,7 +242,7 @@ def delete_health_record(
     *,
     db: Session = Depends(get_db),
     record_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Delete health record."""
     success = HealthRecordService.delete_health_record(
@@ -149,40 +255,126 @@ def delete_health_record(
 
 
 # Medication endpoints
-@router.post("/family-members/{member_id}/medications", response_model=MedicationResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/family-members/{member_id}/medications", response_model=MedicationWriteResponse, status_code=status.HTTP_201_CREATED)
 def create_medication(
     *,
     db: Session = Depends(get_db),
     member_id: int,
     medication_in: MedicationCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
-    """Create new medication record for family member."""
+    """
+    Create new medication record for family member, with warnings about its
+    interactions with the member's active medications and their allergies.
+    """
     try:
-        medication = MedicationService.create_medication(
+        medication, conflicts = MedicationService.create_medication(
             db, medication=medication_in, member_id=member_id, user_id=current_user.id
         )
-        return medication
+        return MedicationWriteResponse.from_medication(medication, conflicts)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/family-members/{member_id}/medications", response_model=List[MedicationResponse])
+@router.post("/family-members/{member_id}/medications/bulk", response_model=MedicationBulkCreateResponse, status_code=status.HTTP_201_CREATED)
+def create_medications(
+    *,
+    db: Session = Depends(get_db),
+    member_id: int,
+    medications_in: List[MedicationCreate],
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Create many medications for a family member in one transaction, with
+    warnings about each one's interactions with the member's active
+    medications, the earlier ones in the request and their allergies.
+    """
+    try:
+        ids, conflicts = MedicationService.create_medications(
+            db, medications=medications_in, member_id=member_id, user_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return MedicationBulkCreateResponse.from_conflicts(ids, conflicts)
+
+
+@router.get("/family-members/{member_id}/medications", response_model=CursorPage[MedicationResponse])
 def read_medications_by_member(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     member_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
 ) -> Any:
-    """Get all medications for a family member."""
-    # Verify the family member belongs to the user
-    from app.services.family_member_service import FamilyMemberService
-    family_member = FamilyMemberService.get_family_member(db, member_id)
-    if not family_member or family_member.user_id != current_user.id:
+    """Get medications for a family member, newest first."""
+    state = FreshnessService.get_state(
+        db, member_medications_state(member_id, current_user.id)
+    )
+    if state is None:
         raise HTTPException(status_code=404, detail="Family member not found")
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+    
+    try:
+        rows, next_cursor = MedicationService.get_medications_by_member(
+            db, member_id=member_id, cursor=cursor, limit=limit, columns=medication_rows.columns
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    medications = MedicationService.get_medications_by_member(db, member_id=member_id)
-    return medications
+    return medication_rows.page_response(rows, next_cursor, headers=response.headers)
+
+
+@router.put("/medications/{medication_id}", response_model=MedicationWriteResponse)
+def update_medication(
+    *,
+    db: Session = Depends(get_db),
+    medication_id: int,
+    medication_in: MedicationUpdate,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Update a medication, with warnings about its interactions with the
+    member's other active medications and their allergies.
+    """
+    updated = MedicationService.update_medication(
+        db, medication_id=medication_id, medication_update=medication_in, user_id=current_user.id
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Medication not found")
+    return MedicationWriteResponse.from_medication(*updated)
+
+
+@router.get("/medications/doses", response_model=DoseSchedule)
+def read_household_doses(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+    start: datetime = Query(..., alias="from", description="Start of the range, inclusive"),
+    end: datetime = Query(..., alias="to", description="End of the range, exclusive"),
+) -> Any:
+    """Get the doses of the whole family's active medications in a date range, earliest first."""
+    try:
+        start, end = schedule_range(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    state = FreshnessService.get_state(db, household_medications_state(current_user.id))
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+
+    doses, unscheduled = DoseScheduleService.get_household_schedule(
+        db, current_user.id, start, end, state=state
+    )
+
+    return {"doses": [dose._asdict() for dose in doses], "unscheduled": unscheduled}
 
 
 # Appointment endpoints
@@ -192,7 +384,7 @@ def create_appointment(
     db: Session = Depends(get_db),
     member_id: int,
     appointment_in: AppointmentCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Create new appointment for family member."""
     try:
@@ -204,19 +396,68 @@ def create_appointment(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/family-members/{member_id}/appointments", response_model=List[AppointmentResponse])
+@router.post("/family-members/{member_id}/appointments/bulk", response_model=BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+def create_appointments(
+    *,
+    db: Session = Depends(get_db),
+    member_id: int,
+    appointments_in: List[AppointmentCreate],
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """Create many appointments for a family member in one transaction."""
+    try:
+        ids = AppointmentService.create_appointments(
+            db, appointments=appointments_in, member_id=member_id, user_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return BulkCreateResponse.from_ids(ids)
+
+
+@router.get("/family-members/{member_id}/appointments", response_model=CursorPage[AppointmentResponse])
 def read_appointments_by_member(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     member_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
 ) -> Any:
-    """Get all appointments for a family member."""
-    # Verify the family member belongs to the user
-    from app.services.family_member_service import FamilyMemberService
-    family_member = FamilyMemberService.get_family_member(db, member_id)
-    if not family_member or family_member.user_id != current_user.id:
+    """Get appointments for a family member, newest first."""
+    state = FreshnessService.get_state(
+        db, member_appointments_state(member_id, current_user.id)
+    )
+    if state is None:
         raise HTTPException(status_code=404, detail="Family member not found")
+    cached = not_modified(request, response, state)
+    if cached:
+        return cached
+    
+    try:
+        rows, next_cursor = AppointmentService.get_appointments_by_member(
+            db, member_id=member_id, cursor=cursor, limit=limit, columns=appointment_rows.columns
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    appointments = AppointmentService.get_appointments_by_member(db, member_id=member_id)
-    return appointments
+    return appointment_rows.page_response(rows, next_cursor, headers=response.headers)
+
+
+@router.put("/appointments/{appointment_id}", response_model=AppointmentResponse)
+def update_appointment(
+    *,
+    db: Session = Depends(get_db),
+    appointment_id: int,
+    appointment_in: AppointmentUpdate,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """Update an appointment; set its status to "cancelled" to cancel it."""
+    appointment = AppointmentService.update_appointment(
+        db, appointment_id=appointment_id, appointment_update=appointment_in, user_id=current_user.id
+    )
+    if not appointment:
+        raise HTTPException(status_code=404, detail="Appointment not found")
+    return appointment
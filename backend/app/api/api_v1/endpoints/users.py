@@ -1,13 +1,17 @@
 """User management API endpoints."""
 
-from typing import Any, List
+from typing import Any, Iterator, List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_db, get_current_active_user
-from app.models.models import User
+from app.core.principal_cache import Principal
+from app.db.session import SessionLocal
 from app.schemas.schemas import UserResponse, UserUpdate
+from app.services.export_service import EXPORT_MEDIA_TYPES, ExportFormat, ExportService
 from app.services.user_service import UserService
 
 router = APIRouter()
@@ -18,19 +22,41 @@ def read_users(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Retrieve users."""
     users = UserService.get_all_users(db, skip=skip, limit=limit)
     return users
 
 
+def _export_body(user_id: int, export_format: ExportFormat) -> Iterator[str]:
+    # The export owns its session: the body keeps streaming after the
+    # request's dependencies have been torn down
+    with SessionLocal() as db:
+        yield from ExportService.stream_export(db, user_id, export_format)
+
+
+@router.get("/me/export", response_class=StreamingResponse)
+def export_my_data(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """Stream the current user's family members, health records, medications and appointments."""
+    return StreamingResponse(
+        _export_body(current_user.id, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="phrm-export.{export_format.value}"'
+        },
+    )
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 def read_user(
     *,
     db: Session = Depends(get_db),
     user_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Get user by ID."""
     user = UserService.get_user(db, user_id=user_id)
@@ -45,15 +71,15 @@ def read_user(
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     *,
     db: Session = Depends(get_db),
     user_id: int,
     user_in: UserUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Update user."""
-    user = UserService.get_user(db, user_id=user_id)
+    user = await run_in_threadpool(UserService.get_user, db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -61,7 +87,7 @@ def update_user(
     if user.id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    user = UserService.update_user(db, user_id=user_id, user_update=user_in)
+    user = await UserService.update_user(db, user_id=user_id, user_update=user_in)
     return user
 
 
@@ -70,7 +96,7 @@ def delete_user(
     *,
     db: Session = Depends(get_db),
     user_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """Delete user."""
     user = UserService.get_user(db, user_id=user_id)
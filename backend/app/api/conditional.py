@@ -0,0 +1,89 @@
+"""
+Conditional GET support.
+
+Read endpoints describe the state of what they are about to return with a
+few cheap values, such as ``(id, updated_at)`` or a collection's latest
+``updated_at`` and row count. ``not_modified`` turns those values into an
+``ETag``, plus ``Last-Modified`` where that is exact, and answers
+``If-None-Match`` / ``If-Modified-Since`` with a 304 before anything is
+loaded or serialized.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+
+def make_etag(*state: Any) -> str:
+    """Weak entity tag identifying ``state``."""
+    digest = hashlib.sha1(repr((settings.VERSION,) + state).encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/ prefixes are ignored
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == opaque
+        for candidate in (c.strip() for c in header.split(","))
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match covers ``etag``."""
+    if_none_match = request.headers.get("if-none-match")
+    return if_none_match is not None and _etag_matches(if_none_match, etag)
+
+
+def _modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) > since
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    state: tuple,
+    last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """
+    Set ``ETag`` (and ``Last-Modified`` if given) on ``response`` and return
+    a 304 response if the client's copy is still current.
+
+    Only pass ``last_modified`` when it changes with every change to the
+    representation; a collection's latest ``updated_at`` does not move when
+    a row is deleted, so collections are validated by ETag alone. Naive
+    datetimes are taken to be UTC, as stored by the models.
+    """
+    etag = make_etag(*state)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = (
+            if_modified_since is not None
+            and last_modified is not None
+            and not _modified_since(if_modified_since, last_modified)
+        )
+    return Response(status_code=304, headers=headers) if fresh else None
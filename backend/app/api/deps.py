@@ -1,15 +1,17 @@
 """API dependencies for authentication and database session management."""
 
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.principal_cache import Principal, principal_cache
 from app.core.security import ALGORITHM
-from app.db.session import SessionLocal
-from app.models.models import User
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.services.async_user_service import AsyncUserService
 from app.services.user_service import UserService
 
 security = HTTPBearer()
@@ -24,56 +26,109 @@ def get_db() -> Generator:
         db.close()
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
-    """Dependency to get current authenticated user."""
-    credentials_exception = HTTPException(
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency to get async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _decode_token(token: str) -> Optional[Tuple[int, Optional[float]]]:
+    """Return the user ID and expiry time in an access token, or None if it is invalid."""
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    
-    user = UserService.get_user(db, user_id=int(user_id))
+        return None
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        return None
+    return int(user_id), payload.get("exp")
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    """Dependency to get current authenticated user."""
+    token = credentials.credentials
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    claims = _decode_token(token)
+    if claims is None:
+        raise _credentials_exception()
+    user_id, expires_at = claims
+
+    # Read first, so a change committed while the user loads is not cached
+    generation = principal_cache.generation(user_id)
+    user = UserService.get_user(db, user_id=user_id)
     if user is None:
-        raise credentials_exception
-    
-    return user
+        raise _credentials_exception()
+
+    principal = Principal.from_user(user)
+    principal_cache.put(token, principal, generation, expires_at)
+    return principal
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Dependency to get current active user."""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    """Dependency to get current authenticated user on the async database path."""
+    token = credentials.credentials
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    claims = _decode_token(token)
+    if claims is None:
+        raise _credentials_exception()
+    user_id, expires_at = claims
+
+    # Read first, so a change committed while the user loads is not cached
+    generation = principal_cache.generation(user_id)
+    user = await AsyncUserService.get_user(db, user_id=user_id)
+    if user is None:
+        raise _credentials_exception()
+
+    principal = Principal.from_user(user)
+    principal_cache.put(token, principal, generation, expires_at)
+    return principal
+
+
+async def get_current_active_user_async(
+    current_user: Principal = Depends(get_current_user_async)
+) -> Principal:
+    """Dependency to get current active user on the async database path."""
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+
 def get_optional_user(
     db: Session = Depends(get_db),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
-) -> Optional[User]:
+) -> Optional[Principal]:
     """Dependency to get optional user (for endpoints that work with or without auth)."""
     if not credentials:
         return None
-    
+
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-        
-        user = UserService.get_user(db, user_id=int(user_id))
-        return user
-    except JWTError:
+        return get_current_user(db, credentials)
+    except HTTPException:
         return None
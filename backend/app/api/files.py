@@ -0,0 +1,202 @@
+"""
+Streaming attachment uploads and downloads.
+
+An ``UploadFile`` parameter has Starlette spool the whole request body to a
+temporary file before the endpoint runs, and the file is then read again to
+be hashed and stored. ``receive_upload`` instead parses the multipart body
+with python-multipart as it arrives and hands the file's bytes to a
+``BlobWriter``, which hashes them and writes them to the blob store's
+staging area. Memory use is bounded by ``WRITE_BUFFER_BYTES`` whatever the
+size of the upload, and a file over the limit is rejected as soon as it
+crosses it.
+
+``attachment_response`` serves stored content through Starlette's
+``FileResponse``: single and multiple byte ranges, ``If-Range``, and the
+``http.response.pathsend`` extension, with which servers that support it
+send the file themselves (by ``sendfile``) instead of it being read into
+the application. The strong ``ETag`` is the content's SHA-256.
+"""
+import os
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import anyio
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.api.conditional import etag_matches
+from app.core.blob_store import BlobStore, BlobTooLargeError, StagedBlob, blob_store
+from app.models.models import Attachment
+
+# Form field carrying the file
+FILE_FIELD = "file"
+
+# File bytes gathered before each write to the staging file
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+# Allowance for the multipart framing around the file in Content-Length
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+DEFAULT_FILENAME = "attachment"
+
+_CONTENT_TYPE = re.compile(r"[a-z0-9][a-z0-9.+-]*/[a-z0-9][a-z0-9.+-]*")
+_CONTROL = re.compile(r"[\x00-\x1f\x7f]")
+
+
+class Upload(NamedTuple):
+    """A file received from a form, staged in the blob store."""
+    filename: str
+    content_type: str
+    staged: StagedBlob
+
+
+def clean_filename(raw: bytes) -> str:
+    """The client's file name without directories or control characters."""
+    name = raw.decode("utf-8", errors="replace").replace("\\", "/").rsplit("/", 1)[-1]
+    name = _CONTROL.sub("", name).strip()[:255]
+    return name or DEFAULT_FILENAME
+
+
+def clean_content_type(raw: Optional[bytes]) -> str:
+    """The declared media type without parameters, if well-formed."""
+    media_type = (raw or b"").split(b";", 1)[0].strip().lower().decode("latin-1")
+    if len(media_type) <= 100 and _CONTENT_TYPE.fullmatch(media_type):
+        return media_type
+    return DEFAULT_CONTENT_TYPE
+
+
+class _FilePart:
+    """python-multipart callbacks keeping the bytes of the first file in ``FILE_FIELD``."""
+
+    def __init__(self) -> None:
+        self.filename: Optional[str] = None
+        self.content_type = DEFAULT_CONTENT_TYPE
+        self.complete = False
+        self.buffered = 0
+        self._chunks: List[bytes] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+        self._in_file = False
+
+    def callbacks(self) -> Dict[str, Callable]:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field,
+            "on_header_value": self._header_value,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def take(self) -> bytes:
+        """The file bytes received since the last call."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.buffered = 0
+        return data
+
+    def _part_begin(self) -> None:
+        self._headers = {}
+
+    def _header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def _header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _header_end(self) -> None:
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def _headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._in_file = (
+            self.filename is None
+            and options.get(b"name") == FILE_FIELD.encode()
+            and b"filename" in options
+        )
+        if self._in_file:
+            self.filename = clean_filename(options[b"filename"])
+            self.content_type = clean_content_type(self._headers.get(b"content-type"))
+
+    def _part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._chunks.append(data[start:end])
+            self.buffered += end - start
+
+    def _part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self.complete = True
+
+
+async def receive_upload(request: Request, max_bytes: int, store: BlobStore = blob_store) -> Upload:
+    """
+    Stage the file in the ``file`` field of a multipart/form-data body.
+    Raises 400 for a malformed body or one without a file and 413 for a file
+    over ``max_bytes``; the caller places or discards the staged file.
+    """
+    media_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if media_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_bytes + FORM_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Attachments are limited to {max_bytes} bytes")
+
+    part = _FilePart()
+    parser = MultipartParser(boundary, part.callbacks())
+    writer = await anyio.to_thread.run_sync(store.writer, max_bytes)
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if part.buffered >= WRITE_BUFFER_BYTES:
+                await anyio.to_thread.run_sync(writer.write, part.take())
+        parser.finalize()
+        if not part.complete:
+            raise HTTPException(status_code=400, detail=f'Expected a file in the "{FILE_FIELD}" field')
+        await anyio.to_thread.run_sync(writer.write, part.take())
+        staged = await anyio.to_thread.run_sync(writer.finish)
+    except BlobTooLargeError as e:
+        writer.discard()
+        raise HTTPException(status_code=413, detail=str(e))
+    except MultipartParseError:
+        writer.discard()
+        raise HTTPException(status_code=400, detail="Malformed multipart/form-data body")
+    except BaseException:
+        writer.discard()
+        raise
+    return Upload(part.filename, part.content_type, staged)
+
+
+def attachment_response(request: Request, attachment: Attachment, store: BlobStore = blob_store) -> Response:
+    """
+    The attachment's content as a download, or 304 if the client's copy is
+    current. Stats the file, so async endpoints call it in a thread.
+    """
+    etag = f'"{attachment.sha256}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+        "X-Content-Type-Options": "nosniff",
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    path = store.path(attachment.sha256)
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Attachment content not found")
+    return FileResponse(
+        path,
+        headers=headers,
+        media_type=attachment.content_type,
+        filename=attachment.filename,
+        stat_result=stat_result
+    )
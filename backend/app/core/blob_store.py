@@ -0,0 +1,127 @@
+"""
+Content-addressed store of attachment content.
+
+Every distinct content is stored once, in a file named by its SHA-256 under
+``ATTACHMENT_STORAGE_DIR``::
+
+    blobs/3f/a9/3fa9...   stored content
+    tmp/                  uploads being received
+
+An upload is streamed to ``tmp`` by a ``BlobWriter``, which hashes it as it
+is written, and then renamed into place; content that is already stored is
+not written again. The ``blobs`` table counts the attachments referring to
+each file. ``AttachmentService`` changes the counts and places files in the
+transactions that add and remove attachments, and the ``attachments.collect``
+job deletes files no attachment refers to any more (see
+``app.db.attachments``).
+"""
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import NamedTuple, Union
+
+from app.core.config import settings
+from app.core.jobs import job_handler
+from app.db.attachments import collect_blobs
+from app.db.session import SessionLocal
+
+COLLECT_JOB = "attachments.collect"
+
+_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+class BlobTooLargeError(ValueError):
+    """Raised when an upload grows past its size limit."""
+
+
+class StagedBlob(NamedTuple):
+    """An upload written to the staging area, not yet placed in the store."""
+    path: str
+    sha256: str
+    size: int
+
+
+class BlobWriter:
+    """Writes an upload to a staging file, hashing it as it goes."""
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        fd, self.path = tempfile.mkstemp(dir=directory, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data: bytes) -> None:
+        """Append a chunk of the upload."""
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise BlobTooLargeError(f"Attachments are limited to {self.max_bytes} bytes")
+        self._hash.update(data)
+        self._file.write(data)
+
+    def finish(self) -> StagedBlob:
+        """Flush the upload to disk and return its hash and size."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        return StagedBlob(self.path, self._hash.hexdigest(), self.size)
+
+    def discard(self) -> None:
+        """Drop a partial upload."""
+        self._file.close()
+        Path(self.path).unlink(missing_ok=True)
+
+
+class BlobStore:
+    """Files of the store, named by the SHA-256 of their content."""
+
+    def __init__(self, root: Union[str, os.PathLike]) -> None:
+        self.root = Path(root)
+        self.written = 0
+        self.deduplicated = 0
+
+    def path(self, sha256: str) -> Path:
+        """Where the content with this hash is stored."""
+        if not _SHA256.fullmatch(sha256):
+            raise ValueError(f"Not a SHA-256 hex digest: {sha256!r}")
+        return self.root / "blobs" / sha256[:2] / sha256[2:4] / sha256
+
+    def writer(self, max_bytes: int) -> BlobWriter:
+        """A writer staging an upload of at most ``max_bytes``."""
+        directory = self.root / "tmp"
+        directory.mkdir(parents=True, exist_ok=True)
+        return BlobWriter(directory, max_bytes)
+
+    def place(self, staged: StagedBlob) -> bool:
+        """
+        Move a staged upload into the store; returns False, dropping the staged
+        file, when the content is already stored.
+        """
+        target = self.path(staged.sha256)
+        if target.exists():
+            Path(staged.path).unlink(missing_ok=True)
+            self.deduplicated += 1
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged.path, target)
+        self.written += 1
+        return True
+
+    def discard(self, staged: StagedBlob) -> None:
+        """Drop a staged upload that was not placed."""
+        Path(staged.path).unlink(missing_ok=True)
+
+    def remove(self, sha256: str) -> None:
+        """Delete stored content, if present."""
+        self.path(sha256).unlink(missing_ok=True)
+
+
+blob_store = BlobStore(settings.ATTACHMENT_STORAGE_DIR)
+
+
+@job_handler(COLLECT_JOB)
+def _collect_blobs(payload: dict) -> dict:
+    with SessionLocal() as db:
+        return {"blobs": collect_blobs(db, blob_store)}
@@ -0,0 +1,72 @@
+"""
+Rendered calendar feeds.
+
+Calendar clients poll a feed every few minutes while it rarely changes. The
+feed endpoint reads the household's appointment state first (one indexed
+aggregate) and answers a matching ``If-None-Match`` with a 304; clients that
+do not revalidate get the body cached here for that state, so a feed is only
+rendered again after an appointment or family member write changes the
+state. Keying by state rather than invalidating on commit also covers writes
+made by other processes.
+
+One feed is kept per user, and the least recently used ones are evicted
+beyond ``CALENDAR_CACHE_MAX_BYTES``.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class CalendarCache:
+    """Size-bounded LRU cache of feed bodies keyed by user and state."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, Tuple[tuple, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, state: tuple) -> Optional[bytes]:
+        """The user's feed rendered for ``state``, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != state:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: int, state: tuple, body: bytes) -> None:
+        """Cache the user's feed rendered for ``state``, replacing any older one."""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(user_id)
+            self._entries[user_id] = (state, body)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Evict everything and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters, feeds held and their total size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "bytes": self._size}
+
+    def _remove(self, user_id: int) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+
+calendar_cache = CalendarCache(max_bytes=settings.CALENDAR_CACHE_MAX_BYTES)
@@ -19,9 +19,101 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
     ALGORITHM: str = "HS256"
+    # Authenticated-principal cache; a size of 0 disables it
+    PRINCIPAL_CACHE_MAXSIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    # bcrypt cost factor for new hashes
+    BCRYPT_ROUNDS: int = 12
+    # Dedicated password hashing pool: "thread" or "process" workers, plus how
+    # many jobs may wait for them before requests are rejected with 503
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
     
     # Database
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///./phrm.db"
+    # Serve the API through AsyncSession instead of sync sessions in the threadpool
+    DATABASE_ASYNC: bool = False
+    # Async driver URL; derived from SQLALCHEMY_DATABASE_URI when unset
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+    # SQLite pragmas applied to every new connection; None keeps SQLite's default
+    SQLITE_JOURNAL_MODE: Optional[str] = "WAL"
+    SQLITE_SYNCHRONOUS: Optional[str] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: Optional[int] = 5000
+    SQLITE_CACHE_SIZE: Optional[int] = -65536  # negative values are KiB: 64 MiB
+    SQLITE_MMAP_SIZE: Optional[int] = 268435456  # 256 MiB
+    SQLITE_TEMP_STORE: Optional[str] = "MEMORY"
+    SQLITE_FOREIGN_KEYS: Optional[bool] = True
+    # Per-request query count and DB time in a Server-Timing header, with a
+    # warning when one statement repeats this often in a request (0: no warning)
+    SQL_TIMING_ENABLED: bool = True
+    SQL_REPEAT_WARNING_THRESHOLD: int = 10
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = True
+    # Semantic search over health records. Embeddings come from "hashing"
+    # (offline and deterministic, lexical only) or "sentence-transformers"
+    # (EMBEDDING_MODEL), computed in batches by a background worker. Vectors
+    # are scored in SQL per household ("sql") or searched in Chroma ("chroma")
+    EMBEDDING_BACKEND: str = "hashing"
+    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_DIMENSIONS: int = 256  # hashing backend only
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_WORKER_ENABLED: bool = True
+    EMBEDDING_POLL_SECONDS: float = 5.0
+    VECTOR_INDEX: str = "sql"
+    CHROMA_PATH: str = "./chroma"
+    # Background jobs (app.core.jobs): JOB_WORKERS run in the API process,
+    # claiming due jobs from the jobs table. A running job whose lease expires
+    # (its process died) is retried, so the lease must outlast the longest job
+    JOBS_ENABLED: bool = True
+    JOB_WORKERS: int = 2
+    JOB_POLL_SECONDS: float = 2.0
+    JOB_LEASE_SECONDS: int = 900
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 10.0  # doubled after each failed attempt
+    JOB_RETRY_MAX_SECONDS: float = 3600.0
+    JOB_SHUTDOWN_SECONDS: float = 10.0  # wait for running jobs on shutdown
+    # Appointment reminders, sent this many minutes before each scheduled
+    # appointment. The scheduler holds the next REMINDER_WINDOW_MINUTES of
+    # reminders in memory and, on startup, sends those missed in the last
+    # REMINDER_CATCH_UP_MINUTES. Sinks: "log", or "jobs" to queue a job per
+    # reminder, deduplicated across processes and restarts
+    REMINDERS_ENABLED: bool = True
+    REMINDER_OFFSETS_MINUTES: List[int] = [1440, 60]
+    REMINDER_WINDOW_MINUTES: int = 60
+    REMINDER_CATCH_UP_MINUTES: int = 15
+    REMINDER_SINK: str = "log"
+    # iCalendar feed: appointments from this many days ago onwards, and the
+    # memory held by rendered feeds
+    CALENDAR_FEED_PAST_DAYS: int = 365
+    CALENDAR_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Dose schedules: longest range expanded at once, and how many expanded
+    # ranges are cached
+    DOSE_SCHEDULE_MAX_DAYS: int = 92
+    DOSE_SCHEDULE_CACHE_MAXSIZE: int = 1000
+    # Drug interaction and allergy dataset checked on medication writes; None
+    # uses the one bundled in app/core/drug_interactions.json
+    DRUG_INTERACTIONS_PATH: Optional[str] = None
+    # Health record attachments, stored once per distinct content under
+    # ATTACHMENT_STORAGE_DIR. The quota counts every attachment a user
+    # uploads at its full size, shared content included
+    ATTACHMENT_STORAGE_DIR: str = "./attachments"
+    ATTACHMENT_MAX_BYTES: int = 50 * 1024 * 1024
+    ATTACHMENT_QUOTA_BYTES: int = 1024 * 1024 * 1024
+
+    @property
+    def async_database_uri(self) -> str:
+        """Async driver URL for the configured database."""
+        if self.SQLALCHEMY_ASYNC_DATABASE_URI:
+            return self.SQLALCHEMY_ASYNC_DATABASE_URI
+        uri = self.SQLALCHEMY_DATABASE_URI
+        for prefix, async_prefix in (
+            ("sqlite://", "sqlite+aiosqlite://"),
+            ("postgresql://", "postgresql+asyncpg://"),
+        ):
+            if uri.startswith(prefix):
+                return async_prefix + uri[len(prefix):]
+        return uri
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -0,0 +1,168 @@
+"""
+Medication dose rules.
+
+``Medication.frequency`` is free text. ``parse_frequency`` normalises it into
+a compact rule stored in ``Medication.dose_rule``:
+
+* ``"<doses>/<hours>h"``: ``doses`` doses every ``hours`` hours, e.g.
+  ``"2/24h"`` for "twice daily", ``"1/8h"`` for "every 8 hours" and
+  ``"1/168h"`` for "weekly";
+* ``"prn"``: taken as needed, with no schedule;
+* no rule (None) for text that is not understood.
+
+Course lengths ("for 1 week", "x 10 days") and timings relative to meals
+("1 hour before breakfast") are dropped before matching, so their periods
+are never read as the dosing interval.
+
+``expand`` turns a rule into the dose times falling in a date range. Periods
+count from midnight of the start date; several doses a day are spread over
+the waking day, and other rules take their first dose at ``FIRST_DOSE``.
+"""
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+
+AS_NEEDED = "prn"
+
+FIRST_DOSE = timedelta(hours=8)
+LAST_DOSE = timedelta(hours=20)
+
+# More doses a day than this are spaced around the clock instead
+MAX_WAKING_DOSES = 4
+
+_RULE = re.compile(r"^(\d+)/(\d+)h$")
+
+_NUMBERS = {
+    "once": 1, "one": 1, "twice": 2, "two": 2, "thrice": 3, "three": 3, "four": 4,
+    "five": 5, "six": 6, "seven": 7, "eight": 8, "twelve": 12,
+}
+_NUMBER = r"(\d+|" + "|".join(_NUMBERS) + ")"
+_PERIOD_HOURS = {"hour": 1, "day": 24, "week": 168, "fortnight": 336, "month": 720}
+_ADVERB_HOURS = {
+    "hourly": 1, "daily": 24, "nightly": 24, "weekly": 168, "fortnightly": 336, "monthly": 720,
+}
+_PERIOD = r"(hour|day|week|fortnight|month|hourly|daily|nightly|weekly|fortnightly|monthly)"
+_ABBREVIATIONS: Dict[str, Tuple[int, int]] = {
+    "qd": (1, 24), "od": (1, 24), "qhs": (1, 24), "hs": (1, 24), "qam": (1, 24), "qpm": (1, 24),
+    "bid": (2, 24), "bd": (2, 24), "tid": (3, 24), "tds": (3, 24), "qid": (4, 24), "qds": (4, 24),
+    "qod": (1, 48), "qw": (1, 168), "qwk": (1, 168),
+}
+
+_DURATION = re.compile(
+    r"\b(?:for\s+(?:a|an|" + _NUMBER[1:-1] + r")?|x\s*" + _NUMBER + r")\s*(?:more\s+)?"
+    r"(?:hour|day|week|fortnight|month)s?\b"
+)
+_TIMING = re.compile(
+    r"\b(?:half an|an|a|" + _NUMBER[1:-1] + r")\s*(?:hours?|hrs?|minutes?|mins?)\s+"
+    r"(?:before|after|prior to)\b"
+)
+_AS_NEEDED = re.compile(r"\b(prn|as needed|when needed|if needed|as required|when required)\b")
+_EVERY_HOURS = re.compile(r"\bq\s*(\d+)\s*h(?:ours?|rs?)?\b")
+_EVERY = re.compile(r"\bevery\s+(?:(other|" + _NUMBER[1:-1] + r")\s+)?(hour|day|week|fortnight|month)s?\b")
+_TIMES_PER = re.compile(
+    r"\b" + _NUMBER + r"\s*(?:times?|x)?\s*(?:a|an|per|each|every|/|in\s+a)?\s*" + _PERIOD + r"\b"
+)
+_DAILY_PHRASE = re.compile(
+    r"\b(at bedtime|at night|in the (?:morning|evening)|every (?:morning|evening|night))\b"
+)
+_TWICE_DAILY_PHRASE = re.compile(r"\b(morning and (?:evening|night)|am and pm)\b")
+_ADVERB = re.compile(r"\b" + _PERIOD + r"\b")
+_ABBREVIATION = re.compile(r"\b(" + "|".join(_ABBREVIATIONS) + r")\b")
+
+
+def _number(word: str) -> int:
+    return int(word) if word.isdigit() else _NUMBERS[word]
+
+
+def _period_hours(word: str) -> int:
+    return _ADVERB_HOURS.get(word) or _PERIOD_HOURS[word]
+
+
+def format_rule(doses: int, hours: int) -> Optional[str]:
+    """The rule of ``doses`` doses every ``hours`` hours, or None if it makes no sense."""
+    if doses < 1 or hours < 1 or hours < doses:
+        return None
+    return f"{doses}/{hours}h"
+
+
+def parse_frequency(frequency: str) -> Optional[str]:
+    """Normalise a free-text frequency into a dose rule; None if not understood."""
+    text = " ".join(frequency.lower().replace(".", "").split())
+    text = _TIMING.sub(" ", _DURATION.sub(" ", text))
+    if _AS_NEEDED.search(text):
+        return AS_NEEDED
+    match = _EVERY_HOURS.search(text)
+    if match:
+        return format_rule(1, int(match.group(1)))
+    match = _EVERY.search(text)
+    if match:
+        count, period = match.groups()
+        multiple = 2 if count == "other" else _number(count) if count else 1
+        return format_rule(1, multiple * _PERIOD_HOURS[period])
+    match = _TIMES_PER.search(text)
+    if match:
+        return format_rule(_number(match.group(1)), _period_hours(match.group(2)))
+    match = _ABBREVIATION.search(text)
+    if match:
+        return format_rule(*_ABBREVIATIONS[match.group(1)])
+    if _TWICE_DAILY_PHRASE.search(text):
+        return format_rule(2, 24)
+    if _DAILY_PHRASE.search(text):
+        return format_rule(1, 24)
+    match = _ADVERB.search(text)
+    if match:
+        return format_rule(1, _period_hours(match.group(1)))
+    return None
+
+
+def rule_parts(rule: Optional[str]) -> Optional[Tuple[int, int]]:
+    """``(doses, hours)`` of a scheduled rule; None for as-needed or missing rules."""
+    match = _RULE.match(rule or "")
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def dose_offsets(doses: int, hours: int) -> List[timedelta]:
+    """When each dose of a period is taken, from the start of the period."""
+    if hours == 24 and 1 < doses <= MAX_WAKING_DOSES:
+        step = (LAST_DOSE - FIRST_DOSE) / (doses - 1)
+    else:
+        step = timedelta(hours=hours) / doses
+    return [FIRST_DOSE + i * step for i in range(doses)]
+
+
+def _midnight(day: Union[date, datetime]) -> datetime:
+    return datetime.combine(day if not isinstance(day, datetime) else day.date(), time())
+
+
+def expand(
+    rule: Tuple[int, int],
+    start_date: Union[date, datetime],
+    end_date: Optional[Union[date, datetime]],
+    window_start: datetime,
+    window_end: datetime,
+) -> List[datetime]:
+    """
+    Dose times of a rule from ``window_start`` to before ``window_end``, for
+    a course from ``start_date`` to the end of ``end_date`` (open if None).
+
+    The first dose of each offset in the window is found arithmetically, so
+    the cost is the number of doses returned, not the length of the course.
+    """
+    doses, hours = rule
+    period = timedelta(hours=hours)
+    anchor = _midnight(start_date)
+    stop = window_end
+    if end_date is not None:
+        stop = min(stop, _midnight(end_date) + timedelta(days=1))
+
+    times: List[datetime] = []
+    for offset in dose_offsets(doses, hours):
+        first = anchor + offset
+        if first < window_start:
+            # Round up to the first period inside the window
+            first += -((first - window_start) // period) * period
+        if first < stop:
+            count = -((first - stop) // period)
+            times.extend(first + i * period for i in range(count))
+    times.sort()
+    return times
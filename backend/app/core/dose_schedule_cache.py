@@ -0,0 +1,64 @@
+"""
+Expanded dose schedules.
+
+A household's dose schedule for a date range is cached together with the
+state of its medications (latest ``updated_at`` and count), which any
+medication write changes; a lookup whose state no longer matches is a miss,
+so a write invalidates every cached range of that household, in every
+process. The least recently used ranges are evicted beyond
+``DOSE_SCHEDULE_CACHE_MAXSIZE``.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# (user ID, range start, range end)
+Key = Tuple[int, datetime, datetime]
+
+
+class DoseScheduleCache:
+    """LRU cache of expanded schedules keyed by household and range."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Key, Tuple[tuple, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Key, state: tuple) -> Optional[Any]:
+        """The schedule expanded for ``state``, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != state:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Key, state: tuple, schedule: Any) -> None:
+        """Cache a schedule expanded for ``state``."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (state, schedule)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Evict everything and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters and current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+dose_schedule_cache = DoseScheduleCache(maxsize=settings.DOSE_SCHEDULE_CACHE_MAXSIZE)
@@ -0,0 +1,170 @@
+"""
+Drug interaction and allergy index.
+
+The dataset (``drug_interactions.json`` next to this module, or
+``DRUG_INTERACTIONS_PATH``) lists drugs with their aliases and classes, and
+interactions between drugs or classes. It is loaded once into hash indexes:
+
+* normalised names and aliases to drugs, matched in medication names
+  longest first, so "Amoxicillin/Clavulanate 875mg" names amoxicillin and
+  "Isosorbide mononitrate" is not read as something shorter;
+* each drug to the concepts it stands for (itself and its classes);
+* each unordered pair of concepts to its interaction.
+
+Checking a medication against another is then a handful of dictionary
+lookups, whatever the size of the dataset. Allergies match a drug itself or
+a class marked ``cross_reactive`` (an allergy to ibuprofen also covers
+naproxen, one to Bactrim any sulfonamide).
+"""
+import json
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+BUNDLED_DATASET = Path(__file__).with_name("drug_interactions.json")
+
+# Distinct medication names whose matched drugs are remembered
+NAME_CACHE_SIZE = 4096
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+Name = Tuple[str, ...]
+
+
+def normalize(text: str) -> Name:
+    """Lower-case alphanumeric tokens of a name, ignoring apostrophes."""
+    return tuple(_TOKEN.findall(text.lower().replace("'", "")))
+
+
+class Interaction(NamedTuple):
+    """An interaction between two drugs or classes."""
+    severity: str
+    description: str
+
+
+class InteractionIndex:
+    """Hash indexes over an interaction dataset."""
+
+    def __init__(self, dataset: dict) -> None:
+        self.severities: Tuple[str, ...] = tuple(dataset["severities"])
+        self._rank = {severity: rank for rank, severity in enumerate(self.severities)}
+        classes = dataset["classes"]
+        drugs = dataset["drugs"]
+
+        # Normalised names and aliases to the drug (or, for allergies, class) named
+        self._drug_names: Dict[Name, str] = {}
+        self._allergen_names: Dict[Name, str] = {}
+        for drug, entry in drugs.items():
+            for name in (drug, *entry["aliases"]):
+                self._add_name(self._drug_names, name, drug)
+                self._add_name(self._allergen_names, name, drug)
+        for cls, entry in classes.items():
+            for name in (cls, *entry["aliases"]):
+                self._add_name(self._allergen_names, name, cls)
+        self._longest = max(len(name) for name in self._allergen_names)
+
+        self._concepts: Dict[str, FrozenSet[str]] = {}
+        self._cross_reactive: Dict[str, FrozenSet[str]] = {}
+        for drug, entry in drugs.items():
+            for cls in entry["classes"]:
+                if cls not in classes:
+                    raise ValueError(f"Unknown class {cls!r} of drug {drug!r}")
+            self._concepts[drug] = frozenset((drug, *entry["classes"]))
+            self._cross_reactive[drug] = frozenset(
+                (drug, *(cls for cls in entry["classes"] if classes[cls]["cross_reactive"]))
+            )
+
+        self._pairs: Dict[Tuple[str, str], Interaction] = {}
+        for entry in dataset["interactions"]:
+            a, b = entry["between"]
+            for concept in (a, b):
+                if concept not in drugs and concept not in classes:
+                    raise ValueError(f"Unknown drug or class {concept!r} in an interaction")
+            if entry["severity"] not in self._rank:
+                raise ValueError(f"Unknown severity {entry['severity']!r}")
+            self._pairs[min(a, b), max(a, b)] = Interaction(entry["severity"], entry["description"])
+
+        self.drugs_in = lru_cache(maxsize=NAME_CACHE_SIZE)(self._drugs_in)
+
+    @classmethod
+    def load(cls, path: Path) -> "InteractionIndex":
+        """Build the index of the dataset at ``path``."""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _add_name(names: Dict[Name, str], name: str, concept: str) -> None:
+        key = normalize(name)
+        if names.get(key, concept) != concept:
+            raise ValueError(f"{name!r} names both {names[key]!r} and {concept!r}")
+        names[key] = concept
+
+    def _match(self, names: Dict[Name, str], text: str) -> List[str]:
+        tokens = normalize(text)
+        found = []
+        i = 0
+        while i < len(tokens):
+            for length in range(min(self._longest, len(tokens) - i), 0, -1):
+                concept = names.get(tokens[i:i + length])
+                if concept is not None:
+                    found.append(concept)
+                    i += length
+                    break
+            else:
+                i += 1
+        return found
+
+    def _drugs_in(self, name: str) -> FrozenSet[str]:
+        """The drugs named in a medication name (cached; see ``drugs_in``)."""
+        return frozenset(self._match(self._drug_names, name))
+
+    def allergens_in(self, text: str) -> FrozenSet[str]:
+        """The drugs and classes an allergy record covers, cross-reactive classes included."""
+        allergens = set()
+        for concept in self._match(self._allergen_names, text):
+            allergens.update(self._cross_reactive.get(concept, (concept,)))
+        return frozenset(allergens)
+
+    def interaction(
+        self, drugs: FrozenSet[str], others: FrozenSet[str]
+    ) -> Optional[Interaction]:
+        """The most severe interaction between two sets of drugs, if any."""
+        worst = None
+        # Sorted, so that of equally severe interactions the same one is found every run
+        for drug in sorted(drugs):
+            for other in sorted(others):
+                for a in sorted(self._concepts[drug]):
+                    for b in sorted(self._concepts[other]):
+                        found = self._pairs.get((min(a, b), max(a, b)))
+                        if found is not None and (
+                            worst is None or self._rank[found.severity] < self._rank[worst.severity]
+                        ):
+                            worst = found
+        return worst
+
+    def allergy(self, drugs: FrozenSet[str], allergens: FrozenSet[str]) -> Optional[Tuple[str, str]]:
+        """``(drug, allergen)`` of a drug covered by an allergy, preferring a direct match."""
+        for drug in sorted(drugs):
+            if drug in allergens:
+                return drug, drug
+        for drug in sorted(drugs):
+            for concept in sorted(self._cross_reactive[drug] & allergens):
+                return drug, concept
+        return None
+
+
+_index: Optional[InteractionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_interaction_index() -> InteractionIndex:
+    """The configured dataset's index, loaded on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = InteractionIndex.load(Path(settings.DRUG_INTERACTIONS_PATH or BUNDLED_DATASET))
+        return _index
@@ -0,0 +1,104 @@
+"""
+Background worker computing health record embeddings.
+
+Runs as a task in the application lifespan. Each pass takes up to
+``EMBEDDING_BATCH_SIZE`` pending records, copies vectors already computed for
+the same text, embeds the remaining distinct texts in one backend call on a
+worker thread and stores the results. When nothing is pending it sleeps until
+a transaction that queued records commits, or for ``EMBEDDING_POLL_SECONDS``
+to pick up records queued by other processes.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+import anyio
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.embeddings import get_embedding_backend
+from app.db.embeddings import (
+    QUEUED_INFO_KEY,
+    embed_batch,
+    get_vector_index,
+    outdated_model_statement,
+)
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingWorker:
+    """Embeds pending health records in batches."""
+
+    def __init__(self, batch_size: int, poll_seconds: float) -> None:
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.records_processed = 0
+        self.texts_embedded = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        """Wake the worker; safe to call from any thread."""
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    def reset_outdated(self) -> int:
+        """Queue records embedded by a backend other than the configured one."""
+        with SessionLocal() as db:
+            result = db.execute(outdated_model_statement(get_embedding_backend().name))
+            db.commit()
+        return result.rowcount
+
+    def process_batch(self) -> int:
+        """Embed one batch of pending records; returns how many were processed."""
+        with SessionLocal() as db:
+            items, embedded = embed_batch(db, get_embedding_backend(), self.batch_size)
+            if not items:
+                return 0
+            db.commit()
+
+        index = get_vector_index()
+        if index is not None:
+            index.add(items)
+        self.records_processed += len(items)
+        self.texts_embedded += embedded
+        return len(items)
+
+    async def run(self) -> None:
+        """Process pending records until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        try:
+            await anyio.to_thread.run_sync(self.reset_outdated)
+        except Exception:
+            logger.exception("Could not queue records embedded by another backend")
+
+        while True:
+            self._wake.clear()
+            try:
+                processed = await anyio.to_thread.run_sync(self.process_batch)
+            except Exception:
+                logger.exception("Embedding batch failed")
+                processed = 0
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+embedding_worker = EmbeddingWorker(
+    batch_size=settings.EMBEDDING_BATCH_SIZE,
+    poll_seconds=settings.EMBEDDING_POLL_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_after_commit(session: Session) -> None:
+    if session.info.pop(QUEUED_INFO_KEY, False):
+        embedding_worker.notify()
@@ -0,0 +1,110 @@
+"""
+Text embedding backends for semantic search.
+
+A backend turns texts into unit-length vectors, so a dot product is their
+cosine similarity. ``EMBEDDING_BACKEND`` selects one:
+
+``hashing``
+    Feature hashing of words, word pairs and character trigrams. Needs no
+    model or network and always gives the same vector for the same text, so
+    it suits tests and offline installs, but it only captures lexical overlap.
+``sentence-transformers``
+    The ``EMBEDDING_MODEL`` sentence-transformers model, loaded on first use.
+
+Vectors are stored with the backend's ``name``; changing backend or model
+re-embeds every record.
+"""
+import hashlib
+import math
+import re
+import threading
+from typing import List, Optional, Protocol, Sequence
+
+from app.core.config import settings
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class EmbeddingBackend(Protocol):
+    """Computes unit-length embeddings for batches of texts."""
+
+    name: str
+    dimensions: int
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed each text, in order."""
+        ...
+
+
+class HashingEmbedding:
+    """Deterministic feature-hashing embeddings."""
+
+    def __init__(self, dimensions: int = 256) -> None:
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed each text, in order."""
+        return [self._embed(text) for text in texts]
+
+    def _embed(self, text: str) -> List[float]:
+        words = _WORD_RE.findall(text.lower())
+        features = [(word, 1.0) for word in words]
+        features.extend((f"{a} {b}", 1.0) for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"<{word}>"
+            features.extend((padded[i:i + 3], 0.5) for i in range(len(padded) - 2))
+
+        vector = [0.0] * self.dimensions
+        for feature, weight in features:
+            value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+            # The top bit picks the sign, so collisions cancel out on average
+            vector[value % self.dimensions] += weight if value >> 63 else -weight
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm else vector
+
+
+class SentenceTransformerEmbedding:
+    """Embeddings from a sentence-transformers model."""
+
+    def __init__(self, model_name: str) -> None:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "EMBEDDING_BACKEND=sentence-transformers needs the sentence-transformers package"
+            ) from e
+        self._model = SentenceTransformer(model_name)
+        self.name = f"sentence-transformers/{model_name}"
+        self.dimensions = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed each text, in order."""
+        if not texts:
+            return []
+        vectors = self._model.encode(
+            list(texts), batch_size=len(texts), normalize_embeddings=True, convert_to_numpy=True
+        )
+        return vectors.tolist()
+
+
+def create_embedding_backend(kind: str) -> EmbeddingBackend:
+    """Create the backend called ``kind``."""
+    if kind == "hashing":
+        return HashingEmbedding(settings.EMBEDDING_DIMENSIONS)
+    if kind == "sentence-transformers":
+        return SentenceTransformerEmbedding(settings.EMBEDDING_MODEL)
+    raise ValueError(f"Unknown embedding backend: {kind}")
+
+
+_backend: Optional[EmbeddingBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_embedding_backend() -> EmbeddingBackend:
+    """The configured backend, created on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_embedding_backend(settings.EMBEDDING_BACKEND)
+        return _backend
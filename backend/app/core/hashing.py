@@ -0,0 +1,79 @@
+"""
+Bounded executor for password hashing.
+
+bcrypt is deliberately slow, so hashing and verification run in a dedicated,
+size-capped pool instead of the threadpool that serves sync endpoints. A login
+storm then queues behind ``PASSWORD_HASH_WORKERS`` workers while every other
+request keeps its threads. Once ``PASSWORD_HASH_QUEUE_SIZE`` jobs are waiting
+on top of the busy workers, new jobs fail fast with ``PasswordHasherBusy``,
+which the API turns into a 503.
+"""
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing pool has no room for another job."""
+
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded thread or process pool."""
+
+    def __init__(self, kind: str, workers: int, queue_size: int) -> None:
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = workers + queue_size
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    async def hash(self, password: str) -> str:
+        """Hash a password."""
+        return await self._submit(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a plain password against its hash."""
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Stop the workers; the pool is recreated on next use."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy("Password hashing queue is full")
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="password-hash"
+                    )
+            future = self._executor.submit(fn, *args)
+            self.pending += 1
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+    def _release(self, _future: Any) -> None:
+        with self._lock:
+            self.pending -= 1
+
+
+password_hasher = PasswordHasher(
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
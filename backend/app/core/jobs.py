@@ -0,0 +1,260 @@
+"""
+In-process background jobs.
+
+Work is queued as rows of the ``jobs`` table through ``JobService.enqueue``,
+in the same transaction as the write that asks for it, and run by
+``JOB_WORKERS`` tasks started in the application lifespan, so no broker is
+needed. Handlers are registered per kind::
+
+    @job_handler("reports.build")
+    def build_report(payload: dict) -> Optional[dict]:
+        ...
+
+A handler gets the job's JSON payload and returns a JSON result or None.
+Plain functions run on a worker thread and coroutine functions on the event
+loop; either opens its own sessions. A handler that raises is retried with
+jittered exponential backoff until ``max_attempts``, and a job can be run
+again after a crash, so handlers must be idempotent.
+
+On shutdown the pool stops claiming, gives running jobs
+``JOB_SHUTDOWN_SECONDS`` to finish and requeues the rest.
+"""
+import asyncio
+import inspect
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import anyio
+from sqlalchemy import Row, event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.embeddings import sync_embeddings
+from app.db.fts import rebuild_search_index
+from app.db.jobs import (
+    QUEUED_INFO_KEY,
+    claim_statement,
+    expired_statement,
+    fail_statement,
+    finish_statement,
+    release_statement,
+    retry_delay,
+    retry_statement,
+)
+from app.db.member_stats import rebuild_member_stats
+from app.db.session import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Any]
+
+_handlers: Dict[str, Handler] = {}
+
+
+def job_handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register the function that runs jobs of ``kind``."""
+    def register(handler: Handler) -> Handler:
+        if kind in _handlers:
+            raise ValueError(f"Duplicate job handler: {kind}")
+        _handlers[kind] = handler
+        return handler
+    return register
+
+
+def get_job_handler(kind: str) -> Optional[Handler]:
+    """The handler of ``kind``, or None if there is none."""
+    return _handlers.get(kind)
+
+
+class JobWorkerPool:
+    """Worker tasks claiming and running jobs from the jobs table."""
+
+    def __init__(
+        self,
+        workers: int,
+        poll_seconds: float,
+        lease_seconds: float,
+        shutdown_seconds: float,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+    ) -> None:
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.shutdown_seconds = shutdown_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        # Unique per process start, so a restarted process never owns old leases
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.running = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self._recovered_at = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        """Wake idle workers; safe to call from any thread."""
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    def recover(self) -> int:
+        """Requeue jobs whose worker died; returns how many."""
+        with SessionLocal() as db:
+            recovered = db.execute(expired_statement(datetime.utcnow())).rowcount
+            db.commit()
+        self._recovered_at = time.monotonic()
+        if recovered:
+            logger.warning("Requeued %d jobs whose lease expired", recovered)
+        return recovered
+
+    def claim(self) -> Optional[Row]:
+        """Take the next due job, if any."""
+        if time.monotonic() - self._recovered_at > self.lease_seconds / 2:
+            self.recover()
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            job = db.execute(
+                claim_statement(self.worker_id, now, now + timedelta(seconds=self.lease_seconds))
+            ).first()
+            db.commit()
+        return job
+
+    def complete(self, job: Row, result: Any) -> None:
+        """Record a job's result."""
+        with SessionLocal() as db:
+            db.execute(finish_statement(job.id, self.worker_id, datetime.utcnow(), result))
+            db.commit()
+        self.succeeded += 1
+
+    def fail(self, job: Row, error: str, retry: bool = True) -> None:
+        """Retry a failed job later, or give up once it has used its attempts."""
+        now = datetime.utcnow()
+        if retry and job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts, self.retry_base_seconds, self.retry_max_seconds)
+            stmt = retry_statement(job.id, self.worker_id, now + timedelta(seconds=delay), error)
+            self.retried += 1
+        else:
+            stmt = fail_statement(job.id, self.worker_id, now, error)
+            self.failed += 1
+        with SessionLocal() as db:
+            db.execute(stmt)
+            db.commit()
+
+    def release(self) -> int:
+        """Requeue the jobs this process still runs."""
+        with SessionLocal() as db:
+            released = db.execute(release_statement(self.worker_id)).rowcount
+            db.commit()
+        return released
+
+    async def _execute(self, job: Row) -> None:
+        handler = _handlers.get(job.kind)
+        if handler is None:
+            logger.error("No handler for job %s of kind %r", job.id, job.kind)
+            await anyio.to_thread.run_sync(self.fail, job, f"Unknown job kind: {job.kind}", False)
+            return
+        try:
+            if inspect.iscoroutinefunction(handler):
+                result = await handler(job.payload)
+            else:
+                # Abandoned on shutdown; the job is then requeued
+                result = await anyio.to_thread.run_sync(handler, job.payload, abandon_on_cancel=True)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed on attempt %d", job.id, job.kind, job.attempts)
+            await anyio.to_thread.run_sync(self.fail, job, f"{type(e).__name__}: {e}")
+        else:
+            await anyio.to_thread.run_sync(self.complete, job, result)
+
+    async def _work(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                job = await anyio.to_thread.run_sync(self.claim)
+            except Exception:
+                logger.exception("Could not claim a job")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.running += 1
+            try:
+                await self._execute(job)
+            except Exception:
+                logger.exception("Could not record the outcome of job %s", job.id)
+            finally:
+                self.running -= 1
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        try:
+            await anyio.to_thread.run_sync(self.recover)
+        except Exception:
+            logger.exception("Could not requeue jobs whose lease expired")
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop claiming, let running jobs finish for a while and requeue the rest."""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wake.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=self.shutdown_seconds)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        released = await anyio.to_thread.run_sync(self.release)
+        if released:
+            logger.warning("Requeued %d jobs still running at shutdown", released)
+
+
+job_pool = JobWorkerPool(
+    workers=settings.JOB_WORKERS,
+    poll_seconds=settings.JOB_POLL_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    shutdown_seconds=settings.JOB_SHUTDOWN_SECONDS,
+    retry_base_seconds=settings.JOB_RETRY_BASE_SECONDS,
+    retry_max_seconds=settings.JOB_RETRY_MAX_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_after_commit(session: Session) -> None:
+    if session.info.pop(QUEUED_INFO_KEY, False):
+        job_pool.notify()
+
+
+# Maintenance jobs, for rebuilds that should not hold up a deploy or a request
+
+@job_handler("member_stats.rebuild")
+def _rebuild_member_stats(payload: dict) -> dict:
+    return {"members": rebuild_member_stats(engine)}
+
+
+@job_handler("search_index.rebuild")
+def _rebuild_search_index(payload: dict) -> None:
+    if engine.dialect.name != "sqlite":
+        raise RuntimeError("The full-text search index needs SQLite")
+    rebuild_search_index(engine)
+
+
+@job_handler("embeddings.sync")
+def _sync_embeddings(payload: dict) -> dict:
+    queued, exported = sync_embeddings(engine)
+    return {"queued": queued, "exported": exported}
@@ -0,0 +1,329 @@
+"""
+Prometheus metrics in the text exposition format.
+
+Recording is lock-free: every thread increments its own dict of samples, and
+``render`` sums the per-thread dicts when ``/metrics`` is scraped. Copying a
+dict is atomic under the GIL, so a scrape never blocks a request.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, DefaultDict, Dict, Iterable, List, Tuple
+
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Connection checkout wait buckets, in seconds; an idle pooled connection is
+# handed out in microseconds, so the low end is finer
+CHECKOUT_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, Labels]
+
+_HELP = {
+    "http_request_duration_seconds": ("histogram", "Request latency by route template."),
+    "http_requests_in_flight": ("gauge", "Requests being served, by method."),
+    "db_pool_checkouts_total": ("counter", "Connections checked out of the pool."),
+    "db_pool_checkout_wait_seconds": ("histogram", "Time to get a connection from the pool, opening it if needed."),
+    "db_pool_checked_out": ("gauge", "Connections checked out of the pool."),
+    "db_pool_idle": ("gauge", "Connections idle in the pool."),
+    "db_pool_overflow": ("gauge", "Connections open beyond the pool size."),
+    "db_pool_size": ("gauge", "Connections the pool keeps open, excluding overflow."),
+    "db_errors_total": ("counter", "Database errors by exception type."),
+    "db_locked_total": ("counter", "Statements that failed with 'database is locked' after the busy timeout."),
+    "threadpool_threads": ("gauge", "Worker threads of the sync endpoint threadpool by state."),
+    "threadpool_waiting_tasks": ("gauge", "Tasks waiting for a threadpool worker."),
+    "password_hasher_pending": ("gauge", "Password hashing jobs running or queued."),
+    "password_hasher_rejected_total": ("counter", "Password hashing jobs rejected with 503."),
+    "principal_cache_hits_total": ("counter", "Principal cache hits."),
+    "principal_cache_misses_total": ("counter", "Principal cache misses."),
+    "principal_cache_size": ("gauge", "Principals cached."),
+    "embedding_records_total": ("counter", "Health records given a vector by the embedding worker."),
+    "embedding_texts_total": ("counter", "Distinct texts sent to the embedding backend."),
+    "jobs_running": ("gauge", "Background jobs being run by this process."),
+    "jobs_finished_total": ("counter", "Background job attempts finished, by outcome."),
+    "reminders_scheduled": ("gauge", "Appointment reminders held by the scheduler."),
+    "reminders_sent_total": ("counter", "Appointment reminders handed to the sink."),
+    "reminder_windows_loaded_total": ("counter", "Reminder windows loaded from the database."),
+    "calendar_cache_hits_total": ("counter", "Calendar feeds served from the cache."),
+    "calendar_cache_misses_total": ("counter", "Calendar feeds rendered."),
+    "calendar_cache_bytes": ("gauge", "Size of the cached calendar feeds."),
+    "dose_schedule_cache_hits_total": ("counter", "Dose schedules served from the cache."),
+    "dose_schedule_cache_misses_total": ("counter", "Dose schedules expanded."),
+    "dose_schedule_cache_size": ("gauge", "Dose schedules cached."),
+    "attachment_blobs_written_total": ("counter", "Attachment uploads stored as new content."),
+    "attachment_blobs_deduplicated_total": ("counter", "Attachment uploads whose content was already stored."),
+}
+
+
+class _PerThreadSamples:
+    """Monotonic samples kept per thread and summed on demand."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all: List[DefaultDict[Key, float]] = []
+
+    def _samples(self) -> DefaultDict[Key, float]:
+        try:
+            return self._local.samples
+        except AttributeError:
+            samples = self._local.samples = defaultdict(float)
+            with self._lock:
+                self._all.append(samples)
+            return samples
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        self._samples()[(name, labels)] += value
+
+    def observe(self, name: str, labels: Labels, value: float, buckets: Tuple[float, ...]) -> None:
+        samples = self._samples()
+        # Buckets are stored non-cumulative and accumulated when rendering
+        i = bisect.bisect_left(buckets, value)
+        le = str(buckets[i]) if i < len(buckets) else "+Inf"
+        samples[(name + "_bucket", labels + (("le", le),))] += 1
+        samples[(name + "_sum", labels)] += value
+        samples[(name + "_count", labels)] += 1
+
+    def totals(self) -> Dict[Key, float]:
+        with self._lock:
+            per_thread = list(self._all)
+        totals: Dict[Key, float] = defaultdict(float)
+        for samples in per_thread:
+            for key, value in dict(samples).items():
+                totals[key] += value
+        return totals
+
+
+samples = _PerThreadSamples()
+
+# In-flight requests per method; only touched from the event loop thread.
+# The route template is not known until routing has run.
+_in_flight: DefaultDict[str, int] = defaultdict(int)
+
+# Engines whose pools are reported, by label
+_engines: Dict[str, Engine] = {}
+
+
+def _on_checkout(labels: Labels) -> Callable[..., None]:
+    def on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        samples.inc("db_pool_checkouts_total", labels)
+    return on_checkout
+
+
+def _time_checkouts(engine: Engine, labels: Labels) -> None:
+    """Observe how long each ``pool.connect()`` of the engine's current pool takes."""
+    connect = engine.pool.connect
+
+    def timed_connect() -> Any:
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            samples.observe(
+                "db_pool_checkout_wait_seconds", labels, time.perf_counter() - started, CHECKOUT_WAIT_BUCKETS
+            )
+
+    engine.pool.connect = timed_connect  # type: ignore[method-assign]
+
+
+def _on_error(labels: Labels) -> Callable[[Any], None]:
+    def on_error(context: Any) -> None:
+        exc = context.original_exception
+        if "database is locked" in str(exc):
+            samples.inc("db_locked_total", labels)
+        samples.inc("db_errors_total", labels + (("type", type(exc).__name__),))
+    return on_error
+
+
+def track_engine(engine: Engine, name: str) -> None:
+    """Report pool usage, checkout waits and errors of ``engine`` (or an async engine's ``sync_engine``)."""
+    if name in _engines:
+        return
+    labels = (("engine", name),)
+    _engines[name] = engine
+    event.listen(engine, "checkout", _on_checkout(labels))
+    event.listen(engine, "handle_error", _on_error(labels))
+    _time_checkouts(engine, labels)
+    # dispose() replaces the pool
+    event.listen(engine, "engine_disposed", lambda disposed: _time_checkouts(disposed, labels))
+
+
+def _route_labels(scope: Scope) -> Labels:
+    # Routes of included routers only know their path relative to the router;
+    # FastAPI records the full template in its effective route context
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get("route")
+    return (("method", scope["method"]), ("route", getattr(route, "path", "unmatched")))
+
+
+class MetricsMiddleware:
+    """Record latency per route template and requests in flight."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = ["500"]
+
+        async def send_tracking(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        method = scope["method"]
+        _in_flight[method] += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_tracking)
+        finally:
+            _in_flight[method] -= 1
+            samples.observe(
+                "http_request_duration_seconds",
+                _route_labels(scope) + (("status", status[0]),),
+                time.perf_counter() - started,
+                LATENCY_BUCKETS,
+            )
+
+
+def _gauges() -> Iterable[Tuple[str, Labels, float]]:
+    """Point-in-time values read at scrape time."""
+    import anyio.to_thread
+
+    from app.core.blob_store import blob_store
+    from app.core.calendar_cache import calendar_cache
+    from app.core.dose_schedule_cache import dose_schedule_cache
+    from app.core.embedding_worker import embedding_worker
+    from app.core.hashing import password_hasher
+    from app.core.jobs import job_pool
+    from app.core.principal_cache import principal_cache
+    from app.core.reminders import reminder_scheduler
+
+    for method, n in list(_in_flight.items()):
+        yield "http_requests_in_flight", (("method", method),), n
+
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    yield "threadpool_threads", (("state", "busy"),), limiter.borrowed_tokens
+    yield "threadpool_threads", (("state", "max"),), limiter.total_tokens
+    yield "threadpool_waiting_tasks", (), limiter.statistics().tasks_waiting
+
+    for name, engine in _engines.items():
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            yield "db_pool_checked_out", (("engine", name),), pool.checkedout()
+            yield "db_pool_idle", (("engine", name),), pool.checkedin()
+            yield "db_pool_overflow", (("engine", name),), max(pool.overflow(), 0)
+            yield "db_pool_size", (("engine", name),), pool.size()
+
+    yield "password_hasher_pending", (), password_hasher.pending
+    yield "password_hasher_rejected_total", (), password_hasher.rejected
+
+    stats = principal_cache.stats()
+    yield "principal_cache_hits_total", (), stats["hits"]
+    yield "principal_cache_misses_total", (), stats["misses"]
+    yield "principal_cache_size", (), stats["size"]
+
+    yield "embedding_records_total", (), embedding_worker.records_processed
+    yield "embedding_texts_total", (), embedding_worker.texts_embedded
+
+    yield "jobs_running", (), job_pool.running
+    yield "jobs_finished_total", (("outcome", "succeeded"),), job_pool.succeeded
+    yield "jobs_finished_total", (("outcome", "retried"),), job_pool.retried
+    yield "jobs_finished_total", (("outcome", "failed"),), job_pool.failed
+
+    yield "reminders_scheduled", (), len(reminder_scheduler)
+    yield "reminders_sent_total", (), reminder_scheduler.sent
+    yield "reminder_windows_loaded_total", (), reminder_scheduler.windows_loaded
+
+    stats = calendar_cache.stats()
+    yield "calendar_cache_hits_total", (), stats["hits"]
+    yield "calendar_cache_misses_total", (), stats["misses"]
+    yield "calendar_cache_bytes", (), stats["bytes"]
+
+    stats = dose_schedule_cache.stats()
+    yield "dose_schedule_cache_hits_total", (), stats["hits"]
+    yield "dose_schedule_cache_misses_total", (), stats["misses"]
+    yield "dose_schedule_cache_size", (), stats["size"]
+
+    yield "attachment_blobs_written_total", (), blob_store.written
+    yield "attachment_blobs_deduplicated_total", (), blob_store.deduplicated
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _sort_key(key: Key) -> tuple:
+    name, labels = key
+    # Histogram buckets in ascending order of their bound
+    return name, tuple(
+        (label, float(value)) if label == "le" else (label, value) for label, value in labels
+    )
+
+
+def _family(sample_name: str) -> str:
+    for suffix in ("_bucket", "_sum", "_count"):
+        if sample_name.endswith(suffix) and sample_name[: -len(suffix)] in _HELP:
+            return sample_name[: -len(suffix)]
+    return sample_name
+
+
+# Bucket bounds of each histogram
+_BUCKETS = {
+    "http_request_duration_seconds": LATENCY_BUCKETS,
+    "db_pool_checkout_wait_seconds": CHECKOUT_WAIT_BUCKETS,
+}
+
+
+def _accumulate_buckets(totals: Dict[Key, float]) -> Dict[Key, float]:
+    """Turn per-bucket counts into Prometheus' cumulative ``le`` buckets."""
+    series: DefaultDict[Tuple[str, Labels], Dict[str, float]] = defaultdict(dict)
+    for (name, labels), value in totals.items():
+        if name.endswith("_bucket"):
+            series[(name, labels[:-1])][labels[-1][1]] = value
+    for (name, labels), counts in series.items():
+        running = 0.0
+        for le in [str(b) for b in _BUCKETS[_family(name)]] + ["+Inf"]:
+            running += counts.get(le, 0.0)
+            totals[(name, labels + (("le", le),))] = running
+    return totals
+
+
+def render() -> str:
+    """All metrics in the Prometheus text format; call from the event loop."""
+    totals = _accumulate_buckets(samples.totals())
+    for name, labels, value in _gauges():
+        totals[(name, labels)] = value
+
+    families: DefaultDict[str, List[str]] = defaultdict(list)
+    for key in sorted(totals, key=_sort_key):
+        name, labels = key
+        families[_family(name)].append(f"{name}{_format_labels(labels)} {_format_value(totals[key])}")
+
+    lines = []
+    for family, family_lines in families.items():
+        kind, help_text = _HELP[family]
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        lines.extend(family_lines)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,172 @@
+"""
+Authenticated-principal cache.
+
+``get_current_user`` resolves a bearer token to a ``Principal``: an immutable
+snapshot of the user row, cached per token so repeat requests skip both the
+JWT decode and the database round trip. Entries expire after
+``PRINCIPAL_CACHE_TTL_SECONDS`` or at the token's own expiry, whichever is
+first, and the least recently used entry is evicted beyond
+``PRINCIPAL_CACHE_MAXSIZE``.
+
+Any committed update or delete of a ``User`` (``UserService.update_user``,
+``delete_user``, deactivation, ...) evicts that user's tokens and bumps the
+user's generation. A request that missed reads the generation before loading
+the user and passes it to ``put``, which drops the principal if the user
+changed meanwhile, so a load racing an update cannot cache the old row.
+Invalidation is per process; the TTL bounds staleness across workers.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.models import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable snapshot of an authenticated user."""
+    id: int
+    email: str
+    full_name: Optional[str]
+    phone_number: Optional[str]
+    date_of_birth: Optional[datetime]
+    is_active: bool
+    is_superuser: bool
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """Snapshot a user row."""
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            phone_number=user.phone_number,
+            date_of_birth=user.date_of_birth,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class PrincipalCache:
+    """Bounded TTL/LRU cache of principals keyed by access token."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        # Invalidations of each user so far
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        """Return the cached principal for a token, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return principal
+
+    def generation(self, user_id: int) -> int:
+        """The user's generation; read it before loading the user to ``put``."""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(
+        self, token: str, principal: Principal, generation: int, token_expires_at: Optional[float] = None
+    ) -> None:
+        """
+        Cache a principal loaded at the user's ``generation``, unless the user
+        has been invalidated since; ``token_expires_at`` is the token's UNIX
+        expiry time.
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, time.monotonic() + token_expires_at - time.time())
+        with self._lock:
+            if self._generations.get(principal.id, 0) != generation:
+                return
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (expires_at, principal)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Evict every cached token of a user and bump their generation."""
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self) -> None:
+        """Evict everything and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters and current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def _remove(self, token: str) -> None:
+        _, principal = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+_PENDING_KEY = "principal_cache_invalidations"
+
+
+def _mark_user_changed(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(User, "after_update", _mark_user_changed)
+event.listen(User, "after_delete", _mark_user_changed)
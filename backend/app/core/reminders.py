@@ -0,0 +1,312 @@
+"""
+Appointment reminders.
+
+Reminders fall due ``REMINDER_OFFSETS_MINUTES`` before each scheduled
+appointment. Instead of polling the appointments table, the scheduler loads
+the reminders due in the next ``REMINDER_WINDOW_MINUTES`` with one indexed
+range query per offset into a min-heap, sleeps until the earliest is due and
+loads the next window when half the current one has passed. Appointments
+created, moved or cancelled through the services update the heap when their
+transaction commits; an entry superseded this way stays in the heap and is
+skipped when popped.
+
+Before a batch is handed to the sink the appointments are read again, so a
+change made around the services (or by another process) never sends a
+reminder for a cancelled or moved appointment. ``REMINDER_SINK`` picks the
+sink: ``log``, or ``jobs`` to queue an ``appointment.reminder`` job per
+reminder whose idempotency key keeps processes and restarts from sending it
+twice.
+"""
+import asyncio
+import heapq
+import logging
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
+
+import anyio
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.jobs import job_handler
+from app.db.reminders import SCHEDULED, confirm_statement, window_statement
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Session.info list of appointments written in the transaction, passed to the
+# scheduler on commit
+CHANGES_INFO_KEY = "reminder_changes"
+
+# Seconds to wait before trying again after the database could not be read
+RETRY_SECONDS = 5.0
+
+# (appointment ID, status, appointment date) of a written appointment.
+AppointmentState = Tuple[int, str, datetime]
+
+# Loads ``(appointment ID, appointment date)`` of the scheduled appointments
+# from a start date to before an end date.
+WindowLoader = Callable[[datetime, datetime], Iterable[Tuple[int, datetime]]]
+
+
+@dataclass(frozen=True)
+class Reminder:
+    """A reminder due ``minutes_before`` a scheduled appointment."""
+
+    appointment_id: int
+    appointment_date: datetime
+    minutes_before: int
+    title: str = ""
+    user_id: Optional[int] = None
+
+    @property
+    def due_at(self) -> datetime:
+        return self.appointment_date - timedelta(minutes=self.minutes_before)
+
+
+class ReminderSink(Protocol):
+    """Where due reminders are sent."""
+
+    def deliver(self, reminders: Sequence[Reminder]) -> None:
+        """Send reminders; called off the event loop."""
+        ...
+
+
+class LogSink:
+    """Log each reminder."""
+
+    def deliver(self, reminders: Sequence[Reminder]) -> None:
+        """Send reminders; called off the event loop."""
+        for reminder in reminders:
+            logger.info(
+                "Reminder for user %s: %r at %s",
+                reminder.user_id, reminder.title, reminder.appointment_date.isoformat(),
+            )
+
+
+class JobSink:
+    """Queue an ``appointment.reminder`` job per reminder."""
+
+    def deliver(self, reminders: Sequence[Reminder]) -> None:
+        """Send reminders; called off the event loop."""
+        # Imported here, as the service module imports this one
+        from app.services.job_service import JobService
+
+        with SessionLocal() as db:
+            for reminder in reminders:
+                JobService.enqueue(
+                    db,
+                    "appointment.reminder",
+                    {
+                        "appointment_id": reminder.appointment_id,
+                        "appointment_date": reminder.appointment_date.isoformat(),
+                        "minutes_before": reminder.minutes_before,
+                        "title": reminder.title,
+                        "user_id": reminder.user_id,
+                    },
+                    user_id=reminder.user_id,
+                    idempotency_key=(
+                        f"appointment-reminder:{reminder.appointment_id}:"
+                        f"{reminder.minutes_before}:{reminder.appointment_date.isoformat()}"
+                    ),
+                )
+            db.commit()
+
+
+@job_handler("appointment.reminder")
+def _send_appointment_reminder(payload: dict) -> None:
+    # No notification channel is configured yet; the job is the hook for one
+    logger.info(
+        "Reminder for user %s: %r at %s",
+        payload.get("user_id"), payload.get("title"), payload.get("appointment_date"),
+    )
+
+
+def get_reminder_sink(name: str) -> ReminderSink:
+    """The sink called ``name``."""
+    if name == "log":
+        return LogSink()
+    if name == "jobs":
+        return JobSink()
+    raise ValueError(f"Unknown reminder sink: {name}")
+
+
+def load_window(start: datetime, end: datetime) -> List[Tuple[int, datetime]]:
+    """Scheduled appointments from ``start`` to before ``end``."""
+    with SessionLocal() as db:
+        return [tuple(row) for row in db.execute(window_statement(start, end))]
+
+
+def confirm_reminders(reminders: Sequence[Reminder]) -> List[Reminder]:
+    """The reminders whose appointment is still scheduled at the same time, with title and owner."""
+    with SessionLocal() as db:
+        current = {
+            row.id: row
+            for row in db.execute(confirm_statement([r.appointment_id for r in reminders]))
+        }
+    confirmed = []
+    for reminder in reminders:
+        row = current.get(reminder.appointment_id)
+        if row is not None and row.status == SCHEDULED and row.appointment_date == reminder.appointment_date:
+            confirmed.append(replace(reminder, title=row.title, user_id=row.user_id))
+    return confirmed
+
+
+class ReminderScheduler:
+    """Min-heap of the reminders due in the loaded window."""
+
+    def __init__(
+        self,
+        offsets_minutes: Sequence[int],
+        window: timedelta,
+        catch_up: timedelta,
+        load: WindowLoader = load_window,
+        confirm: Callable[[Sequence[Reminder]], List[Reminder]] = confirm_reminders,
+        sink: Optional[ReminderSink] = None,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ) -> None:
+        self.offsets_minutes = tuple(offsets_minutes)
+        self.window = window
+        self.catch_up = catch_up
+        self.load = load
+        self.confirm = confirm
+        self.sink = sink or LogSink()
+        self.clock = clock
+        self.windows_loaded = 0
+        self.sent = 0
+        # (due at, appointment ID, minutes before); the entry of a key is live
+        # while _due maps the key to its due date
+        self._heap: List[Tuple[datetime, int, int]] = []
+        self._due: Dict[Tuple[int, int], datetime] = {}
+        self._loaded_until: Optional[datetime] = None
+        # Held while loading, so a commit is never overwritten by an older read
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def _push(self, appointment_id: int, minutes: int, due_at: datetime) -> None:
+        key = (appointment_id, minutes)
+        if self._due.get(key) != due_at:
+            self._due[key] = due_at
+            heapq.heappush(self._heap, (due_at, appointment_id, minutes))
+
+    def _load_window(self, now: datetime) -> None:
+        if self._loaded_until is None:
+            start = now - self.catch_up
+        elif now + self.window / 2 >= self._loaded_until:
+            start = self._loaded_until
+        else:
+            return
+        end = now + self.window
+        for minutes in self.offsets_minutes:
+            offset = timedelta(minutes=minutes)
+            for appointment_id, appointment_date in self.load(start + offset, end + offset):
+                self._push(appointment_id, minutes, appointment_date - offset)
+        self._loaded_until = end
+        self.windows_loaded += 1
+
+    def reschedule(self, appointments: Iterable[AppointmentState]) -> None:
+        """Apply committed appointment writes; safe to call from any thread."""
+        with self._lock:
+            if self._loaded_until is None:
+                return
+            now = self.clock()
+            for appointment_id, status, appointment_date in appointments:
+                for minutes in self.offsets_minutes:
+                    self._due.pop((appointment_id, minutes), None)
+                    due_at = appointment_date - timedelta(minutes=minutes)
+                    if status == SCHEDULED and now <= due_at < self._loaded_until:
+                        self._push(appointment_id, minutes, due_at)
+        self.notify()
+
+    def tick(self) -> List[Reminder]:
+        """Load the next window if due and pop the reminders due by now."""
+        with self._lock:
+            now = self.clock()
+            self._load_window(now)
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                due_at, appointment_id, minutes = heapq.heappop(self._heap)
+                key = (appointment_id, minutes)
+                if self._due.get(key) != due_at:
+                    continue
+                del self._due[key]
+                reminder = Reminder(appointment_id, due_at + timedelta(minutes=minutes), minutes)
+                # Too late once the appointment has started, e.g. after downtime
+                if reminder.appointment_date > now:
+                    due.append(reminder)
+            return due
+
+    def next_wakeup(self) -> datetime:
+        """When tick has work next: the earliest reminder or the next window."""
+        with self._lock:
+            if self._loaded_until is None:
+                return self.clock()
+            while self._heap and self._due.get(self._heap[0][1:]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            reload_at = self._loaded_until - self.window / 2
+            return min(self._heap[0][0], reload_at) if self._heap else reload_at
+
+    def deliver(self, reminders: Sequence[Reminder]) -> int:
+        """Send the reminders still valid; returns how many."""
+        confirmed = self.confirm(reminders)
+        if confirmed:
+            self.sink.deliver(confirmed)
+            self.sent += len(confirmed)
+        return len(confirmed)
+
+    def notify(self) -> None:
+        """Wake the scheduler loop; safe to call from any thread."""
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    async def run(self) -> None:
+        """Send reminders as they fall due, until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            self._wake.clear()
+            try:
+                due = await anyio.to_thread.run_sync(self.tick)
+                if due:
+                    await anyio.to_thread.run_sync(self.deliver, due)
+                delay = (self.next_wakeup() - self.clock()).total_seconds()
+            except Exception:
+                logger.exception("Could not send appointment reminders")
+                delay = RETRY_SECONDS
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+
+reminder_scheduler = ReminderScheduler(
+    offsets_minutes=settings.REMINDER_OFFSETS_MINUTES,
+    window=timedelta(minutes=settings.REMINDER_WINDOW_MINUTES),
+    catch_up=timedelta(minutes=settings.REMINDER_CATCH_UP_MINUTES),
+    sink=get_reminder_sink(settings.REMINDER_SINK),
+)
+
+
+def reminders_changed(db: Session, appointments: Iterable[AppointmentState]) -> None:
+    """Reschedule the reminders of appointments written in ``db`` once it commits."""
+    db.info.setdefault(CHANGES_INFO_KEY, []).extend(appointments)
+
+
+@event.listens_for(Session, "after_commit")
+def _reschedule_after_commit(session: Session) -> None:
+    changes = session.info.pop(CHANGES_INFO_KEY, None)
+    if changes:
+        reminder_scheduler.reschedule(changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(CHANGES_INFO_KEY, None)
@@ -1,6 +1,6 @@
 """Database package."""
 
-from .session import SessionLocal, engine
+from .session import AsyncSessionLocal, SessionLocal, async_engine, engine
 from .init_db import init_db
 
-__all__ = ["SessionLocal", "engine", "init_db"]
+__all__ = ["AsyncSessionLocal", "SessionLocal", "async_engine", "engine", "init_db"]
@@ -0,0 +1,136 @@
+"""
+Statements on the attachment blob and storage usage tables.
+
+``blobs.ref_count`` counts the attachments with each content, and
+``storage_usage`` the attachments of each user and their total size. Both
+are changed by ``AttachmentService`` in the transaction that adds or removes
+an attachment; the usage row is updated by one conditional UPDATE, so two
+concurrent uploads cannot both fit in the last of a quota. A user's first
+upload creates their usage row with ``INSERT ... ON CONFLICT DO NOTHING``
+beforehand, so concurrent first uploads do not both insert it.
+
+Blobs whose count dropped to zero are deleted, rows and files, by the
+``attachments.collect`` job. Each file is removed before the deletion of its
+row commits, while the row is locked, so an upload of the same content waits
+for the collection and then stores the content again.
+
+Collection can be run by hand, and the counts rebuilt from the attachments
+after writes that bypassed the services, with::
+
+    python -m app.db.attachments collect
+    python -m app.db.attachments rebuild
+"""
+import sys
+from datetime import datetime
+from typing import TYPE_CHECKING, Tuple
+
+from sqlalchemy import Delete, Insert, Update, delete, func, insert, literal, literal_column, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Dialect, Engine
+from sqlalchemy.orm import Session
+
+from app.models.models import Attachment, Blob, FamilyMember, HealthRecord, StorageUsage
+
+if TYPE_CHECKING:
+    from app.core.blob_store import BlobStore
+
+COLLECT_BATCH_SIZE = 500
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def create_usage_statement(dialect: Dialect, user_id: int, now: datetime) -> Insert:
+    """Create the user's storage usage row with nothing counted, unless it exists."""
+    return _UPSERT_INSERTS[dialect.name](StorageUsage).values(
+        user_id=user_id, attachment_count=0, attachment_bytes=0, updated_at=now
+    ).on_conflict_do_nothing(index_elements=[StorageUsage.user_id])
+
+
+def reserve_statement(user_id: int, size: int, quota: int, now: datetime) -> Update:
+    """Count an attachment of ``size`` bytes against the user's usage, unless it would exceed ``quota``."""
+    return update(StorageUsage).where(
+        StorageUsage.user_id == user_id,
+        StorageUsage.attachment_bytes + size <= quota
+    ).values(
+        attachment_count=StorageUsage.attachment_count + 1,
+        attachment_bytes=StorageUsage.attachment_bytes + size,
+        updated_at=now
+    )
+
+
+def release_statement(user_id: int, count: int, size: int, now: datetime) -> Update:
+    """Take ``count`` attachments of ``size`` bytes in total off the user's usage."""
+    return update(StorageUsage).where(StorageUsage.user_id == user_id).values(
+        attachment_count=StorageUsage.attachment_count - count,
+        attachment_bytes=StorageUsage.attachment_bytes - size,
+        updated_at=now
+    )
+
+
+def unreference_statement(sha256: str, count: int) -> Update:
+    """Drop ``count`` references to a blob, returning how many are left."""
+    return update(Blob).where(Blob.sha256 == sha256).values(
+        ref_count=Blob.ref_count - count
+    ).returning(Blob.ref_count)
+
+
+def collect_statement(limit: int) -> Delete:
+    """Delete up to ``limit`` unreferenced blobs, returning their hashes."""
+    # Zero is inlined, not bound, so the planner matches ix_blobs_unreferenced
+    zero = literal_column("0")
+    unreferenced = select(Blob.sha256).where(Blob.ref_count == zero).limit(limit)
+    return delete(Blob).where(
+        Blob.sha256.in_(unreferenced), Blob.ref_count == zero
+    ).returning(Blob.sha256)
+
+
+def collect_blobs(db: Session, store: "BlobStore", batch_size: int = COLLECT_BATCH_SIZE) -> int:
+    """Delete unreferenced blobs and their files, a batch per transaction; returns how many."""
+    collected = 0
+    while True:
+        hashes = db.execute(collect_statement(batch_size)).scalars().all()
+        for sha256 in hashes:
+            store.remove(sha256)
+        db.commit()
+        collected += len(hashes)
+        if len(hashes) < batch_size:
+            return collected
+
+
+def rebuild_attachment_counts(bind: Engine) -> Tuple[int, int]:
+    """
+    Recompute blob reference counts and storage usage from the attachments in
+    one transaction; returns the number of blobs and of users with usage.
+    """
+    references = select(func.count()).where(Attachment.sha256 == Blob.sha256).scalar_subquery()
+    usage = select(
+        FamilyMember.user_id,
+        func.count(Attachment.id),
+        func.sum(Attachment.size),
+        literal(datetime.utcnow())
+    ).select_from(Attachment).join(HealthRecord).join(FamilyMember).group_by(FamilyMember.user_id)
+    with bind.begin() as conn:
+        blobs = conn.execute(update(Blob).values(ref_count=references)).rowcount
+        conn.execute(delete(StorageUsage))
+        users = conn.execute(insert(StorageUsage).from_select(
+            ["user_id", "attachment_count", "attachment_bytes", "updated_at"], usage
+        )).rowcount
+    return blobs, users
+
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal, engine
+    # Imported here, as app.core.blob_store imports this module
+    from app.core.blob_store import blob_store
+
+    if sys.argv[1:] == ["collect"]:
+        with SessionLocal() as db:
+            collected = collect_blobs(db, blob_store)
+        print(f"Deleted {collected} unreferenced blobs")
+    elif sys.argv[1:] == ["rebuild"]:
+        blobs, users = rebuild_attachment_counts(engine)
+        print(f"Reference counts of {blobs} blobs and storage usage of {users} users rebuilt successfully!")
+    else:
+        print("Usage: python -m app.db.attachments collect|rebuild")
+        sys.exit(1)
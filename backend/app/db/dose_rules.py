@@ -0,0 +1,54 @@
+"""
+Stored medication dose rules.
+
+The services store ``parse_frequency(frequency)`` in ``Medication.dose_rule``
+on every medication write. Medications written around the services, or
+parsed by an older version of the parser, are brought up to date with::
+
+    python -m app.db.dose_rules sync
+"""
+import sys
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.engine import Connection
+
+from app.core.dose_rules import parse_frequency
+from app.models.models import Medication
+
+SYNC_BATCH_SIZE = 5000
+
+
+def sync_dose_rules(conn: Connection, batch_size: int = SYNC_BATCH_SIZE) -> int:
+    """Store the rule of every medication whose stored rule is outdated; returns how many."""
+    stmt = select(Medication.id, Medication.frequency, Medication.dose_rule).order_by(Medication.id)
+    table = Medication.__table__
+    store = update(table).where(table.c.id == bindparam("b_id")).values(
+        dose_rule=bindparam("b_dose_rule")
+    )
+
+    updated = 0
+    after = 0
+    while True:
+        rows = conn.execute(stmt.where(Medication.id > after).limit(batch_size)).all()
+        if not rows:
+            return updated
+        changed = [
+            {"b_id": medication_id, "b_dose_rule": rule}
+            for medication_id, frequency, stored in rows
+            if (rule := parse_frequency(frequency)) != stored
+        ]
+        if changed:
+            conn.execute(store, changed)
+        updated += len(changed)
+        after = rows[-1][0]
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    if sys.argv[1:] != ["sync"]:
+        print("Usage: python -m app.db.dose_rules sync")
+        sys.exit(1)
+    with engine.begin() as conn:
+        updated = sync_dose_rules(conn)
+    print(f"Updated the dose rule of {updated} medications")
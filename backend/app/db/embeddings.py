@@ -0,0 +1,367 @@
+"""
+Stored health record embeddings and the vector index searched with them.
+
+``record_embeddings`` has a row per health record holding the SHA-256 of its
+title, description and notes, and the vector computed from that text. Service
+writes insert the row, or reset its vector to NULL when the hash changes, in
+the same transaction; the embedding worker then fills in pending vectors in
+batches, reusing the vector of any record with the same content. Unchanged
+text is never embedded twice.
+
+``VECTOR_INDEX`` picks where vectors are searched. ``sql`` scores the vectors
+of the user's own records in process, which suits household-sized sets;
+``chroma`` also keeps them in a persistent Chroma collection and queries it
+with the user as a metadata filter.
+
+Records written around the services (bulk loads, raw SQL) are picked up by::
+
+    python -m app.db.embeddings sync
+"""
+import hashlib
+import heapq
+import logging
+import sys
+from array import array
+from datetime import datetime
+from operator import itemgetter, mul
+from typing import Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
+
+from sqlalchemy import Select, Update, bindparam, event, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.embeddings import EmbeddingBackend, get_embedding_backend
+from app.models.models import FamilyMember, HealthRecord, RecordEmbedding
+
+logger = logging.getLogger(__name__)
+
+SYNC_BATCH_SIZE = 5000
+
+# Session.info flag set by writes that queued records, to wake the worker on commit
+QUEUED_INFO_KEY = "embeddings_queued"
+
+# Session.info list of deleted record IDs, dropped from the vector index on commit
+REMOVED_INFO_KEY = "embeddings_removed"
+
+# (record ID, user ID, record type, vector) of an embedded record.
+IndexItem = Tuple[int, int, str, Sequence[float]]
+
+
+def record_text(title: str, description: Optional[str], notes: Optional[str]) -> str:
+    """The text of a health record that is embedded."""
+    return "\n".join(part for part in (title, description, notes) if part)
+
+
+def content_hash(text: str) -> str:
+    """Key of an embedded text."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def pack(vector: Sequence[float]) -> bytes:
+    """Store a vector as float32."""
+    return array("f", vector).tobytes()
+
+
+def unpack(blob: bytes) -> array:
+    """Load a vector stored by pack."""
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector
+
+
+def pending_statement(limit: int) -> Select:
+    """Records whose vector is missing, with their text and owner."""
+    return select(
+        RecordEmbedding.record_id,
+        RecordEmbedding.content_hash,
+        HealthRecord.title,
+        HealthRecord.description,
+        HealthRecord.notes,
+        HealthRecord.record_type,
+        FamilyMember.user_id,
+    ).join(HealthRecord, HealthRecord.id == RecordEmbedding.record_id).join(FamilyMember).where(
+        RecordEmbedding.vector.is_(None)
+    ).order_by(RecordEmbedding.record_id).limit(limit)
+
+
+def cached_vectors_statement(hashes: Iterable[str], model: str) -> Select:
+    """``(content_hash, vector)`` already computed by ``model`` for any of ``hashes``."""
+    return select(RecordEmbedding.content_hash, RecordEmbedding.vector).where(
+        RecordEmbedding.content_hash.in_(list(hashes)),
+        RecordEmbedding.model == model,
+        RecordEmbedding.vector.is_not(None),
+    )
+
+
+def store_vectors_statement() -> Update:
+    """
+    Executemany statement storing vectors; parameters are ``b_record_id``,
+    ``b_content_hash``, ``b_vector``, ``b_model`` and ``b_embedded_at``.
+
+    A row whose text changed since it was read keeps its NULL vector.
+    """
+    table = RecordEmbedding.__table__
+    return update(table).where(
+        table.c.record_id == bindparam("b_record_id"),
+        table.c.content_hash == bindparam("b_content_hash"),
+    ).values(
+        vector=bindparam("b_vector"),
+        model=bindparam("b_model"),
+        embedded_at=bindparam("b_embedded_at"),
+    )
+
+
+def outdated_model_statement(model: str) -> Update:
+    """Mark vectors computed by any other backend as pending."""
+    return update(RecordEmbedding).where(
+        RecordEmbedding.vector.is_not(None),
+        RecordEmbedding.model != model,
+    ).values(vector=None)
+
+
+def embed_batch(db: Session, backend: EmbeddingBackend, limit: int) -> Tuple[List[IndexItem], int]:
+    """
+    Embed up to ``limit`` pending records and store their vectors, leaving
+    the commit to the caller. Returns the index items of the records and how
+    many distinct texts were sent to the backend.
+    """
+    rows = db.execute(pending_statement(limit)).all()
+    if not rows:
+        return [], 0
+    vectors: Dict[str, bytes] = dict(db.execute(
+        cached_vectors_statement({row.content_hash for row in rows}, backend.name)
+    ).all())
+    # Hold no transaction while the backend runs
+    db.commit()
+
+    texts: Dict[str, str] = {}
+    for row in rows:
+        if row.content_hash not in vectors:
+            texts.setdefault(row.content_hash, record_text(row.title, row.description, row.notes))
+    if texts:
+        for digest, vector in zip(texts, backend.embed(list(texts.values()))):
+            vectors[digest] = pack(vector)
+
+    now = datetime.utcnow()
+    db.execute(store_vectors_statement(), [
+        {
+            "b_record_id": row.record_id,
+            "b_content_hash": row.content_hash,
+            "b_vector": vectors[row.content_hash],
+            "b_model": backend.name,
+            "b_embedded_at": now,
+        }
+        for row in rows
+    ])
+    items = [
+        (row.record_id, row.user_id, row.record_type, unpack(vectors[row.content_hash]))
+        for row in rows
+    ]
+    return items, len(texts)
+
+
+def candidates_statement(user_id: int, model: str, record_type: Optional[str] = None) -> Select:
+    """``(record_id, vector)`` of every embedded record of the user's family."""
+    stmt = select(RecordEmbedding.record_id, RecordEmbedding.vector).join(
+        HealthRecord, HealthRecord.id == RecordEmbedding.record_id
+    ).join(FamilyMember).where(
+        FamilyMember.user_id == user_id,
+        RecordEmbedding.model == model,
+        RecordEmbedding.vector.is_not(None),
+    )
+    if record_type:
+        stmt = stmt.where(HealthRecord.record_type == record_type)
+    return stmt
+
+
+def top_matches(
+    query: Sequence[float], rows: Iterable[Tuple[int, bytes]], limit: int
+) -> List[Tuple[int, float]]:
+    """The ``limit`` best ``(record_id, similarity)`` of candidate rows."""
+    query = array("f", query)
+    scored = ((record_id, sum(map(mul, query, unpack(blob)))) for record_id, blob in rows)
+    return heapq.nlargest(limit, scored, key=itemgetter(1))
+
+
+class VectorIndex(Protocol):
+    """External index kept in step with the stored vectors."""
+
+    def add(self, items: Sequence[IndexItem]) -> None:
+        """Insert or replace vectors."""
+        ...
+
+    def remove(self, record_ids: Sequence[int]) -> None:
+        """Drop the vectors of deleted records."""
+        ...
+
+    def search(
+        self, user_id: int, vector: Sequence[float], limit: int, record_type: Optional[str] = None
+    ) -> List[Tuple[int, float]]:
+        """The ``limit`` most similar ``(record_id, similarity)`` of the user's records."""
+        ...
+
+
+class ChromaVectorIndex:
+    """Vectors in a persistent Chroma collection, filtered by user through metadata."""
+
+    def __init__(self, path: str, collection: str = "health_records") -> None:
+        try:
+            import chromadb
+        except ImportError as e:
+            raise RuntimeError("VECTOR_INDEX=chroma needs the chromadb package") from e
+        client = chromadb.PersistentClient(path=path)
+        self._collection = client.get_or_create_collection(
+            collection, metadata={"hnsw:space": "cosine"}
+        )
+
+    def add(self, items: Sequence[IndexItem]) -> None:
+        """Insert or replace vectors."""
+        if not items:
+            return
+        self._collection.upsert(
+            ids=[str(record_id) for record_id, _, _, _ in items],
+            embeddings=[list(vector) for _, _, _, vector in items],
+            metadatas=[
+                {"user_id": user_id, "record_type": record_type}
+                for _, user_id, record_type, _ in items
+            ],
+        )
+
+    def remove(self, record_ids: Sequence[int]) -> None:
+        """Drop the vectors of deleted records."""
+        if record_ids:
+            self._collection.delete(ids=[str(record_id) for record_id in record_ids])
+
+    def search(
+        self, user_id: int, vector: Sequence[float], limit: int, record_type: Optional[str] = None
+    ) -> List[Tuple[int, float]]:
+        """The ``limit`` most similar ``(record_id, similarity)`` of the user's records."""
+        where = {"user_id": user_id}
+        if record_type:
+            where = {"$and": [where, {"record_type": record_type}]}
+        result = self._collection.query(
+            query_embeddings=[list(vector)], n_results=limit, where=where
+        )
+        # Cosine distance is 1 - similarity
+        return [
+            (int(record_id), 1.0 - distance)
+            for record_id, distance in zip(result["ids"][0], result["distances"][0])
+        ]
+
+
+_index: Optional[VectorIndex] = None
+
+
+def get_vector_index() -> Optional[VectorIndex]:
+    """The configured external index, or None when vectors are searched in SQL."""
+    global _index
+    if settings.VECTOR_INDEX == "sql":
+        return None
+    if settings.VECTOR_INDEX != "chroma":
+        raise ValueError(f"Unknown vector index: {settings.VECTOR_INDEX}")
+    if _index is None:
+        _index = ChromaVectorIndex(settings.CHROMA_PATH)
+    return _index
+
+
+@event.listens_for(Session, "after_commit")
+def _remove_after_commit(session: Session) -> None:
+    record_ids = session.info.pop(REMOVED_INFO_KEY, None)
+    index = get_vector_index()
+    if record_ids and index is not None:
+        # The records are gone either way; a stale vector is never returned
+        # by search, which only loads records that still exist
+        try:
+            index.remove(record_ids)
+        except Exception:
+            logger.exception("Removing %d records from the vector index failed", len(record_ids))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_removals(session: Session) -> None:
+    session.info.pop(REMOVED_INFO_KEY, None)
+
+
+def sync_record_embeddings(conn: Connection, batch_size: int = SYNC_BATCH_SIZE) -> int:
+    """
+    Queue every health record without an embedding row, or whose text
+    changed since it was embedded; returns how many were queued.
+    """
+    stmt = select(
+        HealthRecord.id,
+        HealthRecord.title,
+        HealthRecord.description,
+        HealthRecord.notes,
+        RecordEmbedding.content_hash,
+    ).outerjoin(RecordEmbedding, RecordEmbedding.record_id == HealthRecord.id).order_by(HealthRecord.id)
+    table = RecordEmbedding.__table__
+    reset = update(table).where(table.c.record_id == bindparam("b_record_id")).values(
+        content_hash=bindparam("b_content_hash"), vector=None
+    )
+
+    queued = 0
+    after = 0
+    while True:
+        rows = conn.execute(stmt.where(HealthRecord.id > after).limit(batch_size)).all()
+        if not rows:
+            return queued
+        missing, changed = [], []
+        for record_id, title, description, notes, stored_hash in rows:
+            digest = content_hash(record_text(title, description, notes))
+            if stored_hash is None:
+                missing.append({"record_id": record_id, "content_hash": digest})
+            elif stored_hash != digest:
+                changed.append({"b_record_id": record_id, "b_content_hash": digest})
+        if missing:
+            conn.execute(insert(RecordEmbedding), missing)
+        if changed:
+            conn.execute(reset, changed)
+        queued += len(missing) + len(changed)
+        after = rows[-1][0]
+
+
+def export_to_index(
+    conn: Connection, index: VectorIndex, model: str, batch_size: int = SYNC_BATCH_SIZE
+) -> int:
+    """Add every stored vector computed by ``model`` to an external index."""
+    stmt = select(
+        RecordEmbedding.record_id, FamilyMember.user_id, HealthRecord.record_type, RecordEmbedding.vector
+    ).join(HealthRecord, HealthRecord.id == RecordEmbedding.record_id).join(FamilyMember).where(
+        RecordEmbedding.model == model, RecordEmbedding.vector.is_not(None)
+    ).order_by(RecordEmbedding.record_id)
+
+    exported = 0
+    after = 0
+    while True:
+        rows = conn.execute(stmt.where(RecordEmbedding.record_id > after).limit(batch_size)).all()
+        if not rows:
+            return exported
+        index.add([
+            (record_id, user_id, record_type, unpack(vector))
+            for record_id, user_id, record_type, vector in rows
+        ])
+        exported += len(rows)
+        after = rows[-1][0]
+
+
+def sync_embeddings(bind: Engine) -> Tuple[int, int]:
+    """Queue new and changed records and fill the external index, if any."""
+    with bind.begin() as conn:
+        queued = sync_record_embeddings(conn)
+    exported = 0
+    index = get_vector_index()
+    if index is not None:
+        with bind.connect() as conn:
+            exported = export_to_index(conn, index, get_embedding_backend().name)
+    return queued, exported
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    if sys.argv[1:] != ["sync"]:
+        print("Usage: python -m app.db.embeddings sync")
+        sys.exit(1)
+    queued, exported = sync_embeddings(engine)
+    print(f"Queued {queued} health records for embedding, exported {exported} vectors")
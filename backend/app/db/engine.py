@@ -0,0 +1,73 @@
+"""
+Engine factories.
+
+SQLite connections get the ``SQLITE_*`` pragmas from Settings applied as they
+are opened: WAL journaling so readers and the writer stop blocking each other,
+a busy timeout so contending writers wait instead of failing with "database
+is locked", and larger page and mmap caches. Other databases are untouched.
+"""
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Connection, Engine, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import settings
+
+
+def sqlite_pragmas() -> List[Tuple[str, Any]]:
+    """Configured pragmas in the order they are applied; unset ones keep SQLite's default."""
+    pragmas = [
+        # First, so switching the journal mode already waits on locks
+        ("busy_timeout", settings.SQLITE_BUSY_TIMEOUT_MS),
+        ("journal_mode", settings.SQLITE_JOURNAL_MODE),
+        ("synchronous", settings.SQLITE_SYNCHRONOUS),
+        ("cache_size", settings.SQLITE_CACHE_SIZE),
+        ("mmap_size", settings.SQLITE_MMAP_SIZE),
+        ("temp_store", settings.SQLITE_TEMP_STORE),
+        ("foreign_keys", settings.SQLITE_FOREIGN_KEYS),
+    ]
+    return [
+        (name, ("ON" if value else "OFF") if isinstance(value, bool) else value)
+        for name, value in pragmas
+        if value is not None
+    ]
+
+
+def _apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: Optional[str] = None, **kwargs: Any) -> Engine:
+    """Create a sync engine, tuned for SQLite when the URL points at it."""
+    url = url or settings.SQLALCHEMY_DATABASE_URI
+    if url.startswith("sqlite"):
+        kwargs.setdefault("connect_args", {}).setdefault("check_same_thread", False)
+    engine = create_engine(url, **kwargs)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+def create_async_db_engine(url: Optional[str] = None, **kwargs: Any) -> AsyncEngine:
+    """Create an async engine, tuned for SQLite when the URL points at it."""
+    engine = create_async_engine(url or settings.async_database_uri, **kwargs)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+def begin_savepoint_transaction(connection: Connection) -> None:
+    """
+    Make sure the transaction has begun before a savepoint is opened on it.
+
+    The SQLite drivers only emit BEGIN before DML, and a SAVEPOINT issued
+    outside a transaction starts one of its own that RELEASE commits, so a
+    ``begin_nested`` ahead of the first write would commit that write early.
+    """
+    if connection.dialect.name == "sqlite" and not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
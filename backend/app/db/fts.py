@@ -0,0 +1,148 @@
+"""
+SQLite FTS5 full-text index for health records.
+
+The index is an external-content FTS5 table over ``health_records``; triggers
+keep it in sync on insert, update and delete, so every write path (services,
+bulk loads, raw SQL) is covered without application code.
+
+Rebuild from scratch with::
+
+    python -m app.db.fts rebuild
+"""
+import re
+import sys
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+FTS_TABLE = "health_records_fts"
+FTS_COLUMNS = ("title", "description", "doctor_name")
+
+# Column weights for bm25(); lower scores rank higher.
+BM25_WEIGHTS = (10.0, 1.0, 2.0)
+
+_new_values = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+_old_values = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+_columns = ", ".join(FTS_COLUMNS)
+
+CREATE_STATEMENTS: List[str] = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_columns},
+        content='health_records',
+        content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON health_records BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON health_records BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns})
+        VALUES ('delete', old.id, {_old_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF {_columns} ON health_records BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns})
+        VALUES ('delete', old.id, {_old_values});
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+]
+
+DROP_STATEMENTS: List[str] = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+REBUILD_STATEMENT = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Engines known to carry the index; only positive results are cached so that
+# an index created later in the process is picked up.
+_available: set = set()
+
+
+def _table_exists(conn: Connection) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first() is not None
+
+
+def create_search_index(bind: Engine) -> None:
+    """Create the FTS table and sync triggers, populating it if newly created."""
+    if bind.dialect.name != "sqlite":
+        return
+    with bind.begin() as conn:
+        existed = _table_exists(conn)
+        for statement in CREATE_STATEMENTS:
+            conn.execute(text(statement))
+        if not existed:
+            conn.execute(text(REBUILD_STATEMENT))
+
+
+def rebuild_search_index(bind: Engine) -> None:
+    """Recreate the FTS table and triggers and reindex every health record."""
+    with bind.begin() as conn:
+        for statement in DROP_STATEMENTS:
+            conn.execute(text(statement))
+        for statement in CREATE_STATEMENTS:
+            conn.execute(text(statement))
+        conn.execute(text(REBUILD_STATEMENT))
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+
+
+def is_search_index_available(db: Session) -> bool:
+    """Return True if the session's database has the FTS index."""
+    bind = db.get_bind()
+    if bind.dialect.name != "sqlite":
+        return False
+    key = str(bind.url)
+    if key in _available:
+        return True
+    if _table_exists(db.connection()):
+        _available.add(key)
+        return True
+    return False
+
+
+def build_match_query(search_term: str) -> str:
+    """
+    Translate user input into a safe FTS5 MATCH expression.
+
+    ``"quoted text"`` becomes a phrase query; every other word is a prefix
+    query, so ``diab`` finds ``diabetes``. FTS5 operators and punctuation in
+    user input are never passed through. Returns an empty string if the input
+    has no searchable words.
+    """
+    terms = []
+    for phrase, word in _TOKEN_RE.findall(search_term):
+        if phrase:
+            words = _WORD_RE.findall(phrase)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+        else:
+            terms.extend(f'"{w}"*' for w in _WORD_RE.findall(word))
+    return " ".join(terms)
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python -m app.db.fts rebuild")
+        sys.exit(1)
+    rebuild_search_index(engine)
+    print("Health record search index rebuilt successfully!")
@@ -1,18 +1,24 @@
 """Initialize database tables."""
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import inspect
 
-from app.core.config import settings
+from app.db.embeddings import sync_embeddings
+from app.db.fts import create_search_index
+from app.db.member_stats import rebuild_member_stats
+from app.db.session import engine
 from app.models.models import Base
 
-# Create engine
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, connect_args={"check_same_thread": False})
-
 # Create all tables
 def init_db():
     """Initialize database tables."""
+    had_member_stats = inspect(engine).has_table("member_stats")
+    had_embeddings = inspect(engine).has_table("record_embeddings")
     Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+    if not had_member_stats:
+        rebuild_member_stats(engine)
+    if not had_embeddings:
+        sync_embeddings(engine)
     print("Database tables created successfully!")
 
 if __name__ == "__main__":
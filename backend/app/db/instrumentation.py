@@ -0,0 +1,117 @@
+"""
+Per-request SQL statistics.
+
+``instrument_engine`` hooks cursor execution on an engine and charges every
+statement to the request that issued it, tracked through a context variable
+that follows the request into the threadpool and SQLAlchemy's async greenlets.
+``SQLTimingMiddleware`` reports the totals in a ``Server-Timing`` header, e.g.
+``db;desc="7 queries";dur=12.5, total;dur=40.1``, and logs a warning when one
+statement shape repeats often enough in a request to suggest an N+1 pattern.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import Engine, event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists and numeric literals vary between otherwise identical statements
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_NUMBER = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so repeats with different parameters compare equal."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _NUMBER.sub("?", shape)
+    return _PARAMETER_LIST.sub("(?)", shape)
+
+
+class QueryStats:
+    """Statements executed on behalf of one request."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list:
+        """(shape, count) of statements run at least ``threshold`` times."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Statistics of the request being served, if any."""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    started = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Charge statements run on ``engine`` (or an async engine's ``sync_engine``) to requests."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLTimingMiddleware:
+    """Report per-request SQL statistics and warn about repeated statements."""
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int = 10) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Statements of a streamed body run after this and are only logged
+                total = (time.perf_counter() - started) * 1000
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    f'db;desc="{stats.count} queries";dur={stats.duration * 1000:.1f}, '
+                    f"total;dur={total:.1f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            if self.repeat_threshold > 0:
+                for shape, n in stats.repeated(self.repeat_threshold):
+                    logger.warning(
+                        "Possible N+1: %s %s ran the same statement %d times (%d queries in total): %s",
+                        scope["method"], scope["path"], n, stats.count, shape,
+                    )
@@ -0,0 +1,133 @@
+"""
+Statements on the ``jobs`` table behind the background worker pool.
+
+A worker claims a job with one UPDATE that picks the most urgent due job along
+``ix_jobs_ready``, marks it running under the worker's lease and returns it;
+on PostgreSQL the pick skips rows locked by concurrent claims. A result is
+only recorded while the worker still holds the lease, so a job requeued after
+its lease expired is not overwritten by a late finish.
+
+Jobs can be queued and old finished jobs deleted with::
+
+    python -m app.db.jobs enqueue <kind> [payload JSON]
+    python -m app.db.jobs purge [days]
+"""
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import Delete, Update, case, delete, select, update
+
+from app.models.models import Job
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Session.info flag set by writes that queued jobs, to wake the pool on commit
+QUEUED_INFO_KEY = "jobs_queued"
+
+# Longest error message stored on a job.
+MAX_ERROR_LENGTH = 2000
+
+PURGE_AFTER_DAYS = 30
+
+
+def claim_statement(worker: str, now: datetime, lease_until: datetime) -> Update:
+    """Mark the most urgent due job running for ``worker``, returning it."""
+    ready = select(Job.id).where(Job.status == QUEUED, Job.run_at <= now).order_by(
+        Job.priority.desc(), Job.run_at, Job.id
+    ).limit(1).with_for_update(skip_locked=True).scalar_subquery()
+    return update(Job).where(Job.id == ready, Job.status == QUEUED).values(
+        status=RUNNING,
+        attempts=Job.attempts + 1,
+        locked_by=worker,
+        locked_until=lease_until,
+        started_at=now,
+    ).returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+
+
+def _held(job_id: int, worker: str) -> Update:
+    return update(Job).where(Job.id == job_id, Job.status == RUNNING, Job.locked_by == worker)
+
+
+def finish_statement(job_id: int, worker: str, now: datetime, result: Any) -> Update:
+    """Record a job's result."""
+    return _held(job_id, worker).values(
+        status=SUCCEEDED, result=result, error=None, finished_at=now, locked_by=None, locked_until=None
+    )
+
+
+def retry_statement(job_id: int, worker: str, run_at: datetime, error: str) -> Update:
+    """Queue a failed job again for ``run_at``."""
+    return _held(job_id, worker).values(
+        status=QUEUED, run_at=run_at, error=error[:MAX_ERROR_LENGTH], locked_by=None, locked_until=None
+    )
+
+
+def fail_statement(job_id: int, worker: str, now: datetime, error: str) -> Update:
+    """Give up on a job."""
+    return _held(job_id, worker).values(
+        status=FAILED, error=error[:MAX_ERROR_LENGTH], finished_at=now, locked_by=None, locked_until=None
+    )
+
+
+def release_statement(worker: str) -> Update:
+    """Requeue the jobs ``worker`` still runs, without counting the interrupted attempt."""
+    return update(Job).where(Job.status == RUNNING, Job.locked_by == worker).values(
+        status=QUEUED, attempts=Job.attempts - 1, locked_by=None, locked_until=None
+    )
+
+
+def expired_statement(now: datetime) -> Update:
+    """
+    Requeue running jobs whose lease expired, as their worker died; a job
+    that has used all its attempts this way fails instead of looping.
+    """
+    exhausted = Job.attempts >= Job.max_attempts
+    return update(Job).where(Job.status == RUNNING, Job.locked_until < now).values(
+        status=case((exhausted, FAILED), else_=QUEUED),
+        error=case((exhausted, "Lease expired"), else_=Job.error),
+        finished_at=case((exhausted, now), else_=None),
+        locked_by=None,
+        locked_until=None,
+    )
+
+
+def purge_statement(before: datetime) -> Delete:
+    """Delete jobs that finished before ``before``."""
+    return delete(Job).where(Job.status.in_((SUCCEEDED, FAILED)), Job.finished_at < before)
+
+
+def retry_delay(attempts: int, base: float, cap: float) -> float:
+    """Seconds to wait after the ``attempts``-th failure: jittered exponential backoff."""
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+    from app.services.job_service import JobService
+
+    command = sys.argv[1:2]
+    if command == ["enqueue"] and len(sys.argv) in (3, 4):
+        payload: Optional[dict] = json.loads(sys.argv[3]) if len(sys.argv) == 4 else None
+        with SessionLocal() as db:
+            try:
+                job = JobService.enqueue(db, sys.argv[2], payload)
+            except ValueError as e:
+                print(e)
+                sys.exit(1)
+            db.commit()
+            print(f"Queued job {job.id}")
+    elif command == ["purge"] and len(sys.argv) <= 3:
+        days = int(sys.argv[2]) if len(sys.argv) == 3 else PURGE_AFTER_DAYS
+        with SessionLocal() as db:
+            deleted = db.execute(purge_statement(datetime.utcnow() - timedelta(days=days))).rowcount
+            db.commit()
+        print(f"Deleted {deleted} finished jobs")
+    else:
+        print("Usage: python -m app.db.jobs enqueue <kind> [payload JSON] | purge [days]")
+        sys.exit(1)
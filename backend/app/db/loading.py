@@ -0,0 +1,56 @@
+"""
+Per-query relationship loading profiles.
+
+Every relationship in ``app.models`` is lazy. A query that needs related rows
+states how much of the object graph to hydrate by passing a profile, which
+this module turns into loader options for the queried entity::
+
+    db.query(User).options(*loader_options(User, LoadingProfile.PRINCIPAL_ONLY))
+"""
+from enum import Enum
+from typing import Any, List
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.models import Appointment, FamilyMember, HealthRecord, Medication, User
+
+
+class LoadingProfile(str, Enum):
+    """How much of the object graph a query hydrates."""
+
+    # Only the queried rows, e.g. the authenticated user
+    PRINCIPAL_ONLY = "principal_only"
+    # Plus the family member rows they relate to, without their history
+    MEMBER_SUMMARY = "member_summary"
+    # Plus each family member's records, medications and appointments
+    MEMBER_WITH_RECORDS = "member_with_records"
+
+
+def _member_history() -> List[Any]:
+    return [
+        selectinload(FamilyMember.health_records),
+        selectinload(FamilyMember.medications),
+        selectinload(FamilyMember.appointments),
+    ]
+
+
+def loader_options(entity: type, profile: LoadingProfile) -> List[Any]:
+    """Return the loader options implementing ``profile`` for a query on ``entity``."""
+    if profile is LoadingProfile.PRINCIPAL_ONLY:
+        return []
+
+    if entity is User:
+        members = selectinload(User.family_members)
+        if profile is LoadingProfile.MEMBER_WITH_RECORDS:
+            return [members.options(*_member_history())]
+        return [members]
+
+    if entity is FamilyMember:
+        if profile is LoadingProfile.MEMBER_WITH_RECORDS:
+            return _member_history()
+        return []
+
+    if entity in (HealthRecord, Medication, Appointment):
+        return [joinedload(entity.family_member)]
+
+    raise ValueError(f"No loading profile for {entity.__name__}")
@@ -0,0 +1,280 @@
+"""
+Per-member statistics rollup.
+
+``member_stats`` holds one row per family member: record counts by type, the
+latest record date, medication and active medication counts, appointment
+counts by status, the next scheduled appointment and when each collection
+last changed. The services apply each change to the row in the same
+transaction (see ``MemberStatsService``), so reading a member's statistics is
+a single-row lookup however long their history is.
+
+Writes that bypass the services (bulk loads, raw SQL) leave the rollup
+stale. Rebuild it from scratch with::
+
+    python -m app.db.member_stats rebuild
+"""
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Row, Select, case, delete, func, insert, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import aliased
+
+from app.models.models import Appointment, FamilyMember, HealthRecord, Medication, MemberStats
+
+# Fields a change can invalidate; they are recomputed with one index seek.
+LATEST_RECORD = "latest_record_date"
+NEXT_APPOINTMENT = "next_appointment"
+
+# (record_type, date_recorded) of a record added or removed.
+RecordKey = Tuple[str, datetime]
+# (id, status, appointment_date) of an appointment added.
+AppointmentKey = Tuple[int, str, datetime]
+
+
+def _for_members(stmt: Select, column, member_ids: Optional[Sequence[int]]) -> Select:
+    return stmt if member_ids is None else stmt.where(column.in_(member_ids))
+
+
+def next_appointment_id(now: datetime):
+    """Correlated subquery: ID of a member's earliest scheduled appointment from ``now``."""
+    upcoming = aliased(Appointment)
+    return select(upcoming.id).where(
+        upcoming.family_member_id == FamilyMember.id,
+        upcoming.status == "scheduled",
+        upcoming.appointment_date >= now,
+    ).order_by(upcoming.appointment_date, upcoming.id).limit(1).correlate(FamilyMember).scalar_subquery()
+
+
+def stats_statements(
+    member_ids: Optional[Sequence[int]] = None,
+    now: Optional[datetime] = None
+) -> List[Select]:
+    """Statements computing the statistics of some members, or of all, from scratch."""
+    now = now or datetime.utcnow()
+    members = _for_members(select(FamilyMember.id), FamilyMember.id, member_ids)
+    records = _for_members(
+        select(
+            HealthRecord.family_member_id,
+            HealthRecord.record_type,
+            func.count(),
+            func.max(HealthRecord.date_recorded),
+            func.max(HealthRecord.updated_at),
+        ).group_by(HealthRecord.family_member_id, HealthRecord.record_type),
+        HealthRecord.family_member_id, member_ids
+    )
+    medications = _for_members(
+        select(
+            Medication.family_member_id,
+            func.count(),
+            func.sum(case((Medication.is_active.is_(True), 1), else_=0)),
+            func.max(Medication.updated_at),
+        ).group_by(Medication.family_member_id),
+        Medication.family_member_id, member_ids
+    )
+    appointments = _for_members(
+        select(
+            Appointment.family_member_id,
+            Appointment.status,
+            func.count(),
+            func.max(Appointment.updated_at),
+        ).group_by(Appointment.family_member_id, Appointment.status),
+        Appointment.family_member_id, member_ids
+    )
+    next_appointments = _for_members(
+        select(FamilyMember.id, Appointment.id, Appointment.appointment_date).join(
+            Appointment, Appointment.id == next_appointment_id(now)
+        ),
+        FamilyMember.id, member_ids
+    )
+    return [members, records, medications, appointments, next_appointments]
+
+
+def latest_record_statement(member_id: int) -> Select:
+    """A member's latest ``date_recorded``."""
+    return select(func.max(HealthRecord.date_recorded)).where(
+        HealthRecord.family_member_id == member_id
+    )
+
+
+def next_appointment_statement(member_id: int, now: datetime) -> Select:
+    """``(id, appointment_date)`` of a member's next scheduled appointment."""
+    return select(Appointment.id, Appointment.appointment_date).where(
+        Appointment.family_member_id == member_id,
+        Appointment.status == "scheduled",
+        Appointment.appointment_date >= now,
+    ).order_by(Appointment.appointment_date, Appointment.id).limit(1)
+
+
+def empty_stats(member_id: int, now: Optional[datetime] = None) -> dict:
+    """Column values of a member with no records, medications or appointments."""
+    return {
+        "family_member_id": member_id,
+        "record_counts": {},
+        "total_records": 0,
+        "latest_record_date": None,
+        "medication_count": 0,
+        "active_medications": 0,
+        "appointment_counts": {},
+        "next_appointment_id": None,
+        "next_appointment_date": None,
+        "records_updated_at": None,
+        "medications_updated_at": None,
+        "appointments_updated_at": None,
+        "updated_at": now or datetime.utcnow(),
+    }
+
+
+def new_member_stats(member_id: int) -> MemberStats:
+    """Statistics row for a newly created family member."""
+    return MemberStats(**empty_stats(member_id))
+
+
+def _later(current: Optional[datetime], value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return current
+    return value if current is None or value > current else current
+
+
+def build_stats(
+    members: Sequence[Row],
+    records: Sequence[Row],
+    medications: Sequence[Row],
+    appointments: Sequence[Row],
+    next_appointments: Sequence[Row],
+    now: Optional[datetime] = None
+) -> List[dict]:
+    """Assemble ``member_stats`` rows from the results of stats_statements."""
+    now = now or datetime.utcnow()
+    stats: Dict[int, dict] = {member_id: empty_stats(member_id, now) for member_id, in members}
+    for member_id, record_type, count, latest, updated_at in records:
+        row = stats[member_id]
+        row["record_counts"][record_type] = count
+        row["total_records"] += count
+        row["latest_record_date"] = _later(row["latest_record_date"], latest)
+        row["records_updated_at"] = _later(row["records_updated_at"], updated_at)
+    for member_id, count, active, updated_at in medications:
+        stats[member_id].update(
+            medication_count=count, active_medications=active or 0, medications_updated_at=updated_at
+        )
+    for member_id, status, count, updated_at in appointments:
+        row = stats[member_id]
+        row["appointment_counts"][status] = count
+        row["appointments_updated_at"] = _later(row["appointments_updated_at"], updated_at)
+    for member_id, appointment_id, appointment_date in next_appointments:
+        stats[member_id].update(next_appointment_id=appointment_id, next_appointment_date=appointment_date)
+    return list(stats.values())
+
+
+def _bump(counts: Optional[Dict[str, int]], key: str, delta: int) -> Dict[str, int]:
+    # A new dict, so the JSON column is seen as changed
+    counts = dict(counts or {})
+    value = counts.get(key, 0) + delta
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+    return counts
+
+
+def apply_records(
+    stats: MemberStats,
+    now: datetime,
+    removed: Iterable[RecordKey] = (),
+    added: Iterable[RecordKey] = ()
+) -> Set[str]:
+    """Count records removed from and added to a member; an update is both."""
+    stale = set()
+    for record_type, date_recorded in removed:
+        stats.record_counts = _bump(stats.record_counts, record_type, -1)
+        stats.total_records -= 1
+        if stats.latest_record_date is not None and date_recorded >= stats.latest_record_date:
+            stale.add(LATEST_RECORD)
+    for record_type, date_recorded in added:
+        stats.record_counts = _bump(stats.record_counts, record_type, 1)
+        stats.total_records += 1
+        stats.latest_record_date = _later(stats.latest_record_date, date_recorded)
+    stats.records_updated_at = now
+    return stale
+
+
+def apply_medications(
+    stats: MemberStats,
+    now: datetime,
+    active: Iterable[bool] = (),
+    removed: Iterable[bool] = ()
+) -> Set[str]:
+    """
+    Count medications added to and removed from a member, given whether each
+    is active; an update is both.
+    """
+    for is_active in removed:
+        stats.medication_count -= 1
+        stats.active_medications -= bool(is_active)
+    for is_active in active:
+        stats.medication_count += 1
+        stats.active_medications += bool(is_active)
+    stats.medications_updated_at = now
+    return set()
+
+
+def apply_appointments(
+    stats: MemberStats,
+    now: datetime,
+    removed: Iterable[AppointmentKey] = (),
+    added: Iterable[AppointmentKey] = ()
+) -> Set[str]:
+    """
+    Count appointments removed from and added to a member, an update being
+    both, and move the next appointment forward.
+    """
+    stale = set()
+    if stats.next_appointment_date is not None and stats.next_appointment_date < now:
+        stale.add(NEXT_APPOINTMENT)
+    for appointment_id, status, appointment_date in removed:
+        stats.appointment_counts = _bump(stats.appointment_counts, status, -1)
+        if appointment_id == stats.next_appointment_id:
+            stale.add(NEXT_APPOINTMENT)
+    for appointment_id, status, appointment_date in added:
+        stats.appointment_counts = _bump(stats.appointment_counts, status, 1)
+        if status != "scheduled" or appointment_date < now or stale:
+            continue
+        if stats.next_appointment_date is None or (appointment_date, appointment_id) < (
+            stats.next_appointment_date, stats.next_appointment_id
+        ):
+            stats.next_appointment_id = appointment_id
+            stats.next_appointment_date = appointment_date
+    stats.appointments_updated_at = now
+    return stale
+
+
+def set_next_appointment(stats: MemberStats, row: Optional[Row]) -> None:
+    """Store the result of next_appointment_statement."""
+    stats.next_appointment_id, stats.next_appointment_date = row if row is not None else (None, None)
+
+
+def populate_member_stats(conn: Connection, batch_size: int = 5000) -> int:
+    """Insert statistics rows for every family member; returns the number inserted."""
+    now = datetime.utcnow()
+    rows = build_stats(*(conn.execute(stmt).all() for stmt in stats_statements(now=now)), now=now)
+    for start in range(0, len(rows), batch_size):
+        conn.execute(insert(MemberStats), rows[start:start + batch_size])
+    return len(rows)
+
+
+def rebuild_member_stats(bind: Engine) -> int:
+    """Recompute the statistics of every family member in one transaction."""
+    with bind.begin() as conn:
+        conn.execute(delete(MemberStats))
+        return populate_member_stats(conn)
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python -m app.db.member_stats rebuild")
+        sys.exit(1)
+    count = rebuild_member_stats(engine)
+    print(f"Statistics of {count} family members rebuilt successfully!")
@@ -0,0 +1,111 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A page is fetched with ``WHERE (k1, k2) > (:v1, :v2) ORDER BY k1, k2 LIMIT n``
+instead of ``OFFSET``, so every page costs the same as the first. Cursors are
+opaque URL-safe tokens carrying the sort key of the last row on a page.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.orm import Query
+
+Q = TypeVar("Q", Query, Select)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort-key values into an opaque cursor token."""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> List[Any]:
+    """Decode a cursor token back into sort-key values."""
+    try:
+        payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(payload)
+        if not isinstance(values, list):
+            raise ValueError(values)
+        return [_decode_value(v) for v in values]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def keyset(
+    query: Q,
+    keys: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False,
+) -> Q:
+    """
+    Apply the cursor filter, ordering and ``limit + 1`` to a Query or Select.
+
+    ``keys`` must end with a unique column (normally the primary key) so the
+    order is total.
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(keys):
+            raise InvalidCursorError("Invalid pagination cursor")
+        bound = tuple_(*(literal(v, type_=k.type) for k, v in zip(keys, values)))
+        query = query.filter(tuple_(*keys) < bound if descending else tuple_(*keys) > bound)
+
+    query = query.order_by(*(k.desc() if descending else k for k in keys))
+    return query.limit(limit + 1)
+
+
+def page(
+    rows: Sequence[Any],
+    keys: Sequence[Any],
+    limit: int,
+    row_key: Optional[Callable[[Any], Sequence[Any]]] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Trim rows fetched through ``keyset`` to a page and build the next cursor.
+
+    ``row_key`` extracts the key values from a result row and defaults to
+    reading each key's attribute from an entity row.
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    if row_key is None:
+        last = rows[-1]
+        return rows, encode_cursor([getattr(last, k.key) for k in keys])
+    return rows, encode_cursor(row_key(rows[-1]))
+
+
+def paginate(
+    query: Query,
+    keys: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False,
+    row_key: Optional[Callable[[Any], Sequence[Any]]] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """Return one page of ``query`` ordered by ``keys`` and the next page's cursor."""
+    rows = keyset(query, keys, cursor, limit, descending).all()
+    return page(rows, keys, limit, row_key)
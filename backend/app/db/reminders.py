@@ -0,0 +1,36 @@
+"""
+Statements of the appointment reminder scheduler in app.core.reminders.
+
+The scheduler never scans the appointments table: each window of due
+reminders is one range query per reminder offset along
+``ix_appointments_status_appointment_date``, and a batch about to be sent is
+re-read by primary key.
+"""
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import Select, select
+
+from app.models.models import Appointment, FamilyMember
+
+SCHEDULED = "scheduled"
+
+
+def window_statement(start: datetime, end: datetime) -> Select:
+    """``(id, appointment_date)`` of scheduled appointments from ``start`` to before ``end``."""
+    return select(Appointment.id, Appointment.appointment_date).where(
+        Appointment.status == SCHEDULED,
+        Appointment.appointment_date >= start,
+        Appointment.appointment_date < end,
+    )
+
+
+def confirm_statement(appointment_ids: Sequence[int]) -> Select:
+    """Current date, status, title and owner of some appointments."""
+    return select(
+        Appointment.id,
+        Appointment.appointment_date,
+        Appointment.status,
+        Appointment.title,
+        FamilyMember.user_id,
+    ).join(FamilyMember).where(Appointment.id.in_(appointment_ids))
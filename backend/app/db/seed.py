@@ -0,0 +1,264 @@
+"""
+Synthetic data generator for production-scale databases.
+
+Generates users with families of skewed size and, per family member, health
+records, medications and appointments whose counts follow a log-normal
+distribution, so most members have a short history and a few have a very long
+one. The same ``seed`` always produces the same rows (apart from the bcrypt
+salt of the shared password). Every seeded user signs in as
+``user<id>@example.com`` with ``SEED_PASSWORD``.
+
+Rows are written with batched Core inserts and explicit primary keys inside a
+single transaction. On SQLite, fsync is turned off and the full-text index is
+dropped for the duration of the load and rebuilt once at the end. Member
+statistics are rebuilt and the records queued for embedding afterwards, as the
+inserts bypass the services::
+
+    python -m app.db.seed --users 10000 --records-median 100 --seed 42
+"""
+import argparse
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.dose_rules import parse_frequency
+from app.core.security import get_password_hash
+from app.db.embeddings import sync_embeddings
+from app.db.fts import DROP_STATEMENTS, rebuild_search_index
+from app.db.member_stats import rebuild_member_stats
+from app.models.models import Appointment, FamilyMember, HealthRecord, Medication, User
+
+SEED_PASSWORD = "password123"
+SEED_BATCH_SIZE = 5000
+
+# Family sizes and how common they are
+FAMILY_SIZE_WEIGHTS = {1: 25, 2: 30, 3: 20, 4: 15, 5: 7, 6: 3}
+# Spread of the log-normal row counts; the mean is about 1.6x the median
+HISTORY_SIGMA = 1.0
+
+RELATIONSHIPS = ("self", "spouse", "child", "parent", "sibling")
+RECORD_TITLES = {
+    "condition": ("Hypertension", "Type 2 diabetes", "Asthma", "High cholesterol", "Migraine"),
+    "allergy": ("Peanut allergy", "Penicillin allergy", "Pollen allergy", "Latex allergy"),
+    "procedure": ("Chest x-ray", "Appendectomy", "Dental cleaning", "MRI scan", "Colonoscopy"),
+    "lab": ("Blood panel", "Cholesterol screening", "Thyroid panel", "Urinalysis"),
+    "checkup": ("Annual checkup", "Blood pressure reading", "Eye exam", "Flu vaccination"),
+}
+DESCRIPTIONS = (
+    "Routine follow-up, no changes.", "Results within normal range.",
+    "Referred to specialist for further evaluation.", "Symptoms improving with treatment.",
+    "Patient reports mild discomfort.", "Repeat in twelve months.",
+)
+DOCTORS = ("Dr. Patel", "Dr. Smith", "Dr. Garcia", "Dr. Chen", "Dr. Okafor", "Dr. Müller")
+CLINICS = ("City Hospital", "Northside Clinic", "Family Health Center", "Lakeside Medical")
+MEDICATIONS = (
+    ("Lisinopril", "10mg"), ("Metformin", "500mg"), ("Atorvastatin", "20mg"),
+    ("Amoxicillin", "250mg"), ("Ibuprofen", "400mg"), ("Levothyroxine", "50mcg"),
+    ("Salbutamol", "100mcg"), ("Omeprazole", "20mg"),
+)
+FREQUENCIES = ("once daily", "twice daily", "three times daily", "every 8 hours", "as needed")
+APPOINTMENT_TYPES = ("checkup", "follow-up", "consultation", "vaccination", "lab work")
+APPOINTMENT_STATUSES = ("scheduled", "completed", "completed", "completed", "cancelled")
+
+# Seeded data spans these ten years
+EPOCH = datetime(2015, 1, 1)
+SPAN_SECONDS = 10 * 365 * 24 * 3600
+
+
+def seed_email(user_id: int) -> str:
+    """Sign-in email of a seeded user."""
+    return f"user{user_id}@example.com"
+
+
+def _skewed_count(rng: random.Random, median: float) -> int:
+    if median <= 0:
+        return 0
+    return int(rng.lognormvariate(math.log(median), HISTORY_SIGMA))
+
+
+def _moment(rng: random.Random, after: datetime = EPOCH) -> datetime:
+    remaining = SPAN_SECONDS - int((after - EPOCH).total_seconds())
+    return after + timedelta(seconds=rng.randrange(max(remaining, 1)))
+
+
+def _day(rng: random.Random, after: datetime = EPOCH) -> datetime:
+    """Like _moment, at midnight, for columns the API exposes as dates."""
+    return _moment(rng, after).replace(hour=0, minute=0, second=0)
+
+
+class _Batcher:
+    """Buffer rows per table and insert them parents-first in batches."""
+
+    tables = (User, FamilyMember, HealthRecord, Medication, Appointment)
+
+    def __init__(self, conn: Connection, batch_size: int):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.pending: Dict[type, List[dict]] = {model: [] for model in self.tables}
+        self.counts: Dict[str, int] = {model.__tablename__: 0 for model in self.tables}
+        self.size = 0
+
+    def add(self, model: type, row: dict) -> None:
+        self.pending[model].append(row)
+        self.size += 1
+        if self.size >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for model in self.tables:
+            rows = self.pending[model]
+            if rows:
+                self.conn.execute(insert(model.__table__), rows)
+                self.counts[model.__tablename__] += len(rows)
+                self.pending[model] = []
+        self.size = 0
+
+
+def _next_id(conn: Connection, model: type) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _generate(
+    conn: Connection,
+    rng: random.Random,
+    users: int,
+    records_median: float,
+    hashed_password: str,
+) -> Iterator[tuple]:
+    """Yield (model, row) pairs for ``users`` households, parents before children."""
+    ids = {model: _next_id(conn, model) for model in _Batcher.tables}
+
+    def next_id(model: type) -> int:
+        ids[model] += 1
+        return ids[model] - 1
+
+    sizes = list(FAMILY_SIZE_WEIGHTS)
+    weights = list(FAMILY_SIZE_WEIGHTS.values())
+    for _ in range(users):
+        user_id = next_id(User)
+        joined = _moment(rng)
+        yield User, {
+            "id": user_id, "email": seed_email(user_id), "hashed_password": hashed_password,
+            "full_name": f"User {user_id}", "is_active": True, "is_superuser": False,
+            "created_at": joined, "updated_at": joined,
+        }
+
+        for m in range(rng.choices(sizes, weights)[0]):
+            member_id = next_id(FamilyMember)
+            added = _moment(rng, joined)
+            yield FamilyMember, {
+                "id": member_id, "user_id": user_id, "full_name": f"Member {user_id}-{m}",
+                "relation_type": "self" if m == 0 else rng.choice(RELATIONSHIPS[1:]),
+                "date_of_birth": datetime(rng.randint(1940, 2020), rng.randint(1, 12), rng.randint(1, 28)),
+                "emergency_contact": m == 1, "created_at": added, "updated_at": added,
+            }
+
+            for _ in range(_skewed_count(rng, records_median)):
+                record_type = rng.choice(list(RECORD_TITLES))
+                when = _moment(rng, added)
+                yield HealthRecord, {
+                    "id": next_id(HealthRecord), "family_member_id": member_id,
+                    "record_type": record_type, "title": rng.choice(RECORD_TITLES[record_type]),
+                    "description": rng.choice(DESCRIPTIONS), "date_recorded": when,
+                    "doctor_name": rng.choice(DOCTORS), "hospital_clinic": rng.choice(CLINICS),
+                    "created_at": when, "updated_at": when,
+                }
+
+            for _ in range(_skewed_count(rng, records_median / 10)):
+                name, dosage = rng.choice(MEDICATIONS)
+                started = _day(rng, added)
+                ended = _day(rng, started) if rng.random() < 0.6 else None
+                frequency = rng.choice(FREQUENCIES)
+                yield Medication, {
+                    "id": next_id(Medication), "family_member_id": member_id,
+                    "name": name, "dosage": dosage, "frequency": frequency,
+                    "dose_rule": parse_frequency(frequency),
+                    "start_date": started, "end_date": ended, "prescribed_by": rng.choice(DOCTORS),
+                    "is_active": ended is None, "created_at": started, "updated_at": started,
+                }
+
+            for _ in range(_skewed_count(rng, records_median / 5)):
+                when = _moment(rng, added)
+                yield Appointment, {
+                    "id": next_id(Appointment), "family_member_id": member_id,
+                    "title": f"{rng.choice(APPOINTMENT_TYPES).capitalize()} with {rng.choice(DOCTORS)}",
+                    "doctor_name": rng.choice(DOCTORS), "hospital_clinic": rng.choice(CLINICS),
+                    "appointment_date": when, "appointment_type": rng.choice(APPOINTMENT_TYPES),
+                    "status": rng.choice(APPOINTMENT_STATUSES), "created_at": added, "updated_at": added,
+                }
+
+
+def seed_database(
+    engine: Engine,
+    users: int = 1000,
+    records_median: float = 100,
+    seed: int = 42,
+    batch_size: int = SEED_BATCH_SIZE,
+    password: str = SEED_PASSWORD,
+) -> Dict[str, int]:
+    """
+    Append ``users`` synthetic households to the database; return rows added per table.
+
+    Each member gets a log-normal number of health records with median
+    ``records_median``, and a tenth and a fifth as many medications and
+    appointments. Tables must already exist.
+    """
+    rng = random.Random(seed)
+    hashed_password = get_password_hash(password)
+    sqlite = engine.dialect.name == "sqlite"
+
+    with engine.connect() as conn:
+        if sqlite:
+            synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            conn.commit()
+        try:
+            with conn.begin():
+                if sqlite:
+                    # Per-row trigger maintenance is far slower than one rebuild
+                    for statement in DROP_STATEMENTS:
+                        conn.execute(text(statement))
+                batcher = _Batcher(conn, batch_size)
+                for model, row in _generate(conn, rng, users, records_median, hashed_password):
+                    batcher.add(model, row)
+                batcher.flush()
+        finally:
+            if sqlite:
+                conn.exec_driver_sql(f"PRAGMA synchronous={synchronous}")
+                conn.commit()
+
+    if sqlite:
+        rebuild_search_index(engine)
+    rebuild_member_stats(engine)
+    sync_embeddings(engine)
+    return batcher.counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic users, families and records.")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--records-median", type=float, default=100,
+                        help="median health records per family member")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from app.db.session import engine
+    from app.models.models import Base
+
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    counts = seed_database(engine, args.users, args.records_median, args.seed, args.batch_size)
+    elapsed = time.perf_counter() - start
+    for table, count in counts.items():
+        print(f"{table:>15}: {count:>10}")
+    print(f"Seeded {sum(counts.values())} rows in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,30 @@
 """
 Database session management.
 """
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import track_engine
+from app.db.engine import create_async_db_engine, create_db_engine
+from app.db.instrumentation import instrument_engine
 
 # Create engine
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI, 
-    connect_args={"check_same_thread": False}
-)
+engine = create_db_engine()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine and session factory, used when settings.DATABASE_ASYNC is enabled
+async_engine = create_async_db_engine()
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+if settings.SQL_TIMING_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+
+if settings.METRICS_ENABLED:
+    track_engine(engine, "sync")
+    track_engine(async_engine.sync_engine, "async")
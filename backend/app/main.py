@@ -1,16 +1,48 @@
 """FastAPI application initialization."""
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.api.api_v1.api import api_router
 from app.core.config import settings
+from app.core import metrics
+from app.core.embedding_worker import embedding_worker
+from app.core.hashing import PasswordHasherBusy, password_hasher
+from app.core.jobs import job_pool
+from app.core.principal_cache import principal_cache
+from app.core.reminders import reminder_scheduler
+from app.db.instrumentation import SQLTimingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown."""
+    tasks = []
+    if settings.EMBEDDING_WORKER_ENABLED:
+        tasks.append(asyncio.create_task(embedding_worker.run()))
+    if settings.REMINDERS_ENABLED:
+        tasks.append(asyncio.create_task(reminder_scheduler.run()))
+    if settings.JOBS_ENABLED:
+        await job_pool.start()
+    yield
+    await job_pool.stop()
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description="Personal Health Records Manager API",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Set all CORS enabled origins
@@ -23,9 +55,28 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+if settings.SQL_TIMING_ENABLED:
+    app.add_middleware(
+        SQLTimingMiddleware,
+        repeat_threshold=settings.SQL_REPEAT_WARNING_THRESHOLD
+    )
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Shed authentication load instead of queueing it indefinitely."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication is temporarily overloaded, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -40,4 +91,15 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "version": settings.VERSION}
+    return {
+        "status": "healthy",
+        "version": settings.VERSION,
+        "principal_cache": principal_cache.stats()
+    }
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        """Prometheus metrics."""
+        return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,5 +1,11 @@
 """Models package."""
 
-from .models import User, FamilyMember, HealthRecord, Medication, Appointment, Base
+from .models import (
+    User, FamilyMember, HealthRecord, Medication, Appointment, MemberStats, RecordEmbedding, Job,
+    Base
+)
 
-__all__ = ["User", "FamilyMember", "HealthRecord", "Medication", "Appointment", "Base"]
+__all__ = [
+    "User", "FamilyMember", "HealthRecord", "Medication", "Appointment", "MemberStats",
+    "RecordEmbedding", "Job", "Base"
+]
@@ -2,10 +2,16 @@
 Database models for PHRM application.
 """
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import Integer, String, DateTime, Text, Boolean, ForeignKey
-from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship, Mapped, mapped_column, DeclarativeBase
+from typing import Dict, List, Optional
+from sqlalchemy import BigInteger, Integer, String, DateTime, Text, Boolean, ForeignKey, Index, JSON, LargeBinary, text
+from sqlalchemy.orm import relationship, synonym, Mapped, mapped_column, DeclarativeBase
+
+# Relationships load lazily; queries opt in to eager loading through the
+# profiles in app.db.loading.
+#
+# Foreign keys are indexed through composite indexes that lead with the key
+# column and continue with the column each listing sorts or filters by.
+
 
 class Base(DeclarativeBase):
     pass
@@ -23,16 +29,21 @@ class User(Base):
     phone_number: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    # SHA-256 of the token in the URL of the user's calendar feed; None while no feed is issued
+    calendar_token_hash: Mapped[Optional[str]] = mapped_column(String(64), unique=True, index=True, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    family_members: Mapped[List["FamilyMember"]] = relationship("FamilyMember", back_populates="user_ref", lazy="joined")
+    family_members: Mapped[List["FamilyMember"]] = relationship("FamilyMember", back_populates="user_ref")
 
 
 class FamilyMember(Base):
     """Family member model."""
     __tablename__ = "family_members"
+    __table_args__ = (
+        Index("ix_family_members_user_id_created_at", "user_id", "created_at"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
@@ -42,19 +53,25 @@ class FamilyMember(Base):
     phone_number: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     emergency_contact: Mapped[bool] = mapped_column(Boolean, default=False)
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    user_ref: Mapped["User"] = relationship("User", back_populates="family_members", lazy="joined")
-    health_records: Mapped[List["HealthRecord"]] = relationship("HealthRecord", back_populates="family_member", lazy="selectin")
-    medications: Mapped[List["Medication"]] = relationship("Medication", back_populates="family_member", lazy="selectin")
-    appointments: Mapped[List["Appointment"]] = relationship("Appointment", back_populates="family_member", lazy="selectin")
+    user_ref: Mapped["User"] = relationship("User", back_populates="family_members")
+    health_records: Mapped[List["HealthRecord"]] = relationship("HealthRecord", back_populates="family_member")
+    medications: Mapped[List["Medication"]] = relationship("Medication", back_populates="family_member")
+    appointments: Mapped[List["Appointment"]] = relationship("Appointment", back_populates="family_member")
+
+    # The API schemas call this field "relationship"; defined last as it shadows the ORM helper
+    relationship: Mapped[str] = synonym("relation_type")
 
 
 class HealthRecord(Base):
     """Health record model."""
     __tablename__ = "health_records"
+    __table_args__ = (
+        Index("ix_health_records_family_member_id_date_recorded", "family_member_id", "date_recorded"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     family_member_id: Mapped[int] = mapped_column(Integer, ForeignKey("family_members.id"), nullable=False)
@@ -67,22 +84,28 @@ class HealthRecord(Base):
     severity: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     status: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    family_member: Mapped["FamilyMember"] = relationship("FamilyMember", back_populates="health_records", lazy="joined")
+    family_member: Mapped["FamilyMember"] = relationship("FamilyMember", back_populates="health_records")
 
 
 class Medication(Base):
     """Medication model."""
     __tablename__ = "medications"
+    __table_args__ = (
+        Index("ix_medications_family_member_id_created_at", "family_member_id", "created_at"),
+        Index("ix_medications_family_member_id_is_active", "family_member_id", "is_active"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     family_member_id: Mapped[int] = mapped_column(Integer, ForeignKey("family_members.id"), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     dosage: Mapped[str] = mapped_column(String(100), nullable=False)
     frequency: Mapped[str] = mapped_column(String(100), nullable=False)
+    # frequency normalised by app.core.dose_rules.parse_frequency
+    dose_rule: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     start_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     end_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     prescribed_by: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
@@ -90,16 +113,22 @@ class Medication(Base):
     side_effects: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    family_member: Mapped["FamilyMember"] = relationship("FamilyMember", back_populates="medications", lazy="joined")
+    family_member: Mapped["FamilyMember"] = relationship("FamilyMember", back_populates="medications")
 
 
 class Appointment(Base):
     """Appointment model."""
     __tablename__ = "appointments"
+    __table_args__ = (
+        Index("ix_appointments_family_member_id_created_at", "family_member_id", "created_at"),
+        Index("ix_appointments_family_member_id_appointment_date", "family_member_id", "appointment_date"),
+        # Reminder scheduler windows
+        Index("ix_appointments_status_appointment_date", "status", "appointment_date"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     family_member_id: Mapped[int] = mapped_column(Integer, ForeignKey("family_members.id"), nullable=False)
@@ -110,8 +139,119 @@ class Appointment(Base):
     appointment_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     status: Mapped[str] = mapped_column(String(20), default="scheduled")
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    family_member: Mapped["FamilyMember"] = relationship("FamilyMember", back_populates="appointments", lazy="joined")
+    family_member: Mapped["FamilyMember"] = relationship("FamilyMember", back_populates="appointments")
+
+
+class MemberStats(Base):
+    """Rolled-up statistics of a family member, maintained by app.db.member_stats."""
+    __tablename__ = "member_stats"
+
+    family_member_id: Mapped[int] = mapped_column(Integer, ForeignKey("family_members.id"), primary_key=True)
+    record_counts: Mapped[Dict[str, int]] = mapped_column(JSON, default=dict)  # by record_type
+    total_records: Mapped[int] = mapped_column(Integer, default=0)
+    latest_record_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    medication_count: Mapped[int] = mapped_column(Integer, default=0)
+    active_medications: Mapped[int] = mapped_column(Integer, default=0)
+    appointment_counts: Mapped[Dict[str, int]] = mapped_column(JSON, default=dict)  # by status
+    # Earliest upcoming scheduled appointment when last computed; stale once it is past
+    next_appointment_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    next_appointment_date: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    records_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    medications_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    appointments_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class RecordEmbedding(Base):
+    """Embedding of a health record's text for semantic search; vector is NULL until computed."""
+    __tablename__ = "record_embeddings"
+    __table_args__ = (
+        Index("ix_record_embeddings_content_hash", "content_hash"),
+        Index(
+            "ix_record_embeddings_pending", "record_id",
+            sqlite_where=text("vector IS NULL"), postgresql_where=text("vector IS NULL")
+        ),
+    )
+
+    record_id: Mapped[int] = mapped_column(Integer, ForeignKey("health_records.id"), primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # SHA-256 of the embedded text
+    model: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)  # backend that computed vector
+    vector: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)  # float32, unit length
+    embedded_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+class Job(Base):
+    """Background job run by the in-process worker pool in app.core.jobs."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claim order: most urgent first, then oldest due
+        Index("ix_jobs_ready", "status", text("priority DESC"), "run_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    kind: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)
+    status: Mapped[str] = mapped_column(String(20), default="queued")  # queued, running, succeeded, failed
+    priority: Mapped[int] = mapped_column(Integer, default=0)  # higher runs first
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    run_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)  # not claimed before
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String(255), unique=True, nullable=True)
+    user_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"), nullable=True)
+    # Worker holding a running job, until the lease expires and the job is requeued
+    locked_by: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    result: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+class Blob(Base):
+    """Attachment content stored once in app.core.blob_store, named by its SHA-256."""
+    __tablename__ = "blobs"
+    __table_args__ = (
+        # Garbage collection: blobs no attachment refers to any more
+        Index(
+            "ix_blobs_unreferenced", "sha256",
+            sqlite_where=text("ref_count = 0"), postgresql_where=text("ref_count = 0")
+        ),
+    )
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, default=0)  # attachments with this content
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class Attachment(Base):
+    """File attached to a health record; its content is the blob named by sha256."""
+    __tablename__ = "attachments"
+    __table_args__ = (
+        Index("ix_attachments_health_record_id_created_at", "health_record_id", "created_at"),
+        Index("ix_attachments_sha256", "sha256"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    health_record_id: Mapped[int] = mapped_column(Integer, ForeignKey("health_records.id"), nullable=False)
+    sha256: Mapped[str] = mapped_column(String(64), ForeignKey("blobs.sha256"), nullable=False)
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    content_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class StorageUsage(Base):
+    """Attachments of a user and their total size, maintained by AttachmentService."""
+    __tablename__ = "storage_usage"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), primary_key=True)
+    attachment_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Uploaded bytes, counting content shared with other attachments each time
+    attachment_bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -2,9 +2,11 @@
 Pydantic schemas for API request/response validation.
 """
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Any, Dict, Generic, Optional, List, Sequence, TypeVar
 from pydantic import BaseModel, EmailStr, Field
 
+T = TypeVar("T")
+
 
 # User schemas
 class UserBase(BaseModel):
@@ -103,6 +105,36 @@ class FamilyMemberDetailResponse(FamilyMemberResponse):
     appointments: List["AppointmentResponse"] = []
 
 
+# Dashboard summaries
+class AppointmentBrief(BaseModel):
+    """Upcoming appointment shown in a summary."""
+    id: int
+    title: str
+    appointment_date: datetime
+
+
+class FamilyMemberSummary(BaseModel):
+    """Overview of a family member's history; its size does not grow with the history."""
+    family_member_id: int
+    full_name: str
+    relationship: str
+    record_counts: Dict[str, int] = {}
+    total_records: int = 0
+    latest_record_date: Optional[datetime] = None
+    active_medications: int = 0
+    next_appointment: Optional[AppointmentBrief] = None
+
+
+class HouseholdSummary(BaseModel):
+    """Summary of every family member, with household totals."""
+    members: List[FamilyMemberSummary]
+    record_counts: Dict[str, int] = {}
+    total_records: int = 0
+    latest_record_date: Optional[datetime] = None
+    active_medications: int = 0
+    next_appointment: Optional[AppointmentBrief] = None
+
+
 # Health Record schemas
 class HealthRecordBase(BaseModel):
     """Base health record schema."""
@@ -146,6 +178,19 @@ class HealthRecordResponse(HealthRecordBase):
         from_attributes = True
 
 
+class HealthRecordSearchResult(HealthRecordResponse):
+    """Health record search result with highlighted snippet and BM25 rank."""
+    snippet: Optional[str] = Field(
+        None, description="HTML: the matching text escaped, with matches in <mark> tags"
+    )
+    rank: Optional[float] = None
+
+
+class SemanticSearchResult(HealthRecordResponse):
+    """Health record semantic search result with its similarity to the query."""
+    score: float
+
+
 # Medication schemas
 class MedicationBase(BaseModel):
     """Base medication schema."""
@@ -184,6 +229,9 @@ class MedicationResponse(MedicationBase):
     """Medication response schema."""
     id: int
     family_member_id: int
+    dose_rule: Optional[str] = Field(
+        None, description='Normalised frequency: "<doses>/<hours>h", "prn" or null if not understood'
+    )
     created_at: datetime
     updated_at: datetime
     
@@ -191,6 +239,46 @@ class MedicationResponse(MedicationBase):
         from_attributes = True
 
 
+class MedicationWarning(BaseModel):
+    """A conflict of a medication with another one or with an allergy."""
+    kind: str = Field(..., description='"interaction" or "allergy"')
+    severity: str = Field(..., description='"contraindicated", "major", "moderate" or "minor"')
+    description: str
+    medication_id: Optional[int] = Field(None, description="The other medication of an interaction")
+    health_record_id: Optional[int] = Field(None, description="The allergy record of an allergy")
+    conflicting_with: str = Field(..., description="Name of the other medication or title of the allergy record")
+
+
+class MedicationWriteResponse(MedicationResponse):
+    """Medication created or updated, with its conflicts, most severe first."""
+    warnings: List[MedicationWarning] = []
+
+    @classmethod
+    def from_medication(cls, medication: Any, conflicts: Sequence[Any]) -> "MedicationWriteResponse":
+        """Build the response from the medication and its ``Conflict`` tuples."""
+        return cls(
+            **MedicationResponse.model_validate(medication).model_dump(),
+            warnings=[MedicationWarning(**conflict._asdict()) for conflict in conflicts]
+        )
+
+
+class DoseEvent(BaseModel):
+    """A scheduled dose of a medication."""
+    medication_id: int
+    family_member_id: int
+    name: str
+    dosage: str
+    due_at: datetime
+
+
+class DoseSchedule(BaseModel):
+    """Doses of a household's active medications in a date range."""
+    doses: List[DoseEvent]
+    unscheduled: List[int] = Field(
+        ..., description="Active medications taken as needed or whose frequency is not understood"
+    )
+
+
 # Appointment schemas
 class AppointmentBase(BaseModel):
     """Base appointment schema."""
@@ -230,6 +318,33 @@ class AppointmentResponse(AppointmentBase):
         from_attributes = True
 
 
+# Attachment schemas
+class AttachmentResponse(BaseModel):
+    """File attached to a health record; its content is served separately."""
+    id: int
+    health_record_id: int
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class StorageUsageResponse(BaseModel):
+    """The current user's attachments against their storage quota."""
+    attachment_count: int
+    attachment_bytes: int
+    quota_bytes: int
+
+
+class CalendarFeedResponse(BaseModel):
+    """The URL of the current user's calendar feed, authenticated by its token."""
+    url: str
+
+
 # Response schemas
 class StandardResponse(BaseModel):
     """Standard API response."""
@@ -238,6 +353,59 @@ class StandardResponse(BaseModel):
     data: Optional[dict] = None
 
 
+class BulkCreateResult(BaseModel):
+    """Outcome of one item of a bulk create request, in request order."""
+    index: int
+    id: int
+
+
+class BulkCreateResponse(BaseModel):
+    """Bulk create response."""
+    created: int
+    results: List[BulkCreateResult]
+
+    @classmethod
+    def from_ids(cls, ids: List[int]) -> "BulkCreateResponse":
+        """Build the response from the created IDs, in request order."""
+        return cls(
+            created=len(ids),
+            results=[BulkCreateResult(index=i, id=id_) for i, id_ in enumerate(ids)]
+        )
+
+
+class MedicationBulkCreateResult(BulkCreateResult):
+    """Outcome of one medication of a bulk create request, with its conflicts, most severe first."""
+    warnings: List[MedicationWarning] = []
+
+
+class MedicationBulkCreateResponse(BulkCreateResponse):
+    """Bulk medication create response."""
+    results: List[MedicationBulkCreateResult]
+
+    @classmethod
+    def from_conflicts(
+        cls, ids: List[int], conflicts: Sequence[Sequence[Any]]
+    ) -> "MedicationBulkCreateResponse":
+        """Build the response from the created IDs and their ``Conflict`` tuples, in request order."""
+        return cls(
+            created=len(ids),
+            results=[
+                MedicationBulkCreateResult(
+                    index=i,
+                    id=id_,
+                    warnings=[MedicationWarning(**conflict._asdict()) for conflict in found]
+                )
+                for i, (id_, found) in enumerate(zip(ids, conflicts))
+            ]
+        )
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """Keyset-paginated list response; pass next_cursor back to fetch the next page."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
 class PaginatedResponse(BaseModel):
     """Paginated response schema."""
     items: List[dict]
@@ -247,5 +415,23 @@ class PaginatedResponse(BaseModel):
     pages: int
 
 
+class JobResponse(BaseModel):
+    """Background job status; result is set once the job succeeded, error after a failure."""
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 # Update forward references
 FamilyMemberDetailResponse.model_rebuild()
@@ -3,11 +3,35 @@
 from .user_service import UserService
 from .family_member_service import FamilyMemberService
 from .health_record_service import HealthRecordService, MedicationService, AppointmentService
+from .async_user_service import AsyncUserService
+from .async_family_member_service import AsyncFamilyMemberService
+from .async_health_record_service import (
+    AsyncHealthRecordService,
+    AsyncMedicationService,
+    AsyncAppointmentService
+)
+from .export_service import ExportService
+from .freshness_service import FreshnessService
+from .member_stats_service import MemberStatsService
+from .summary_service import SummaryService
+from .semantic_search_service import SemanticSearchService
+from .job_service import JobService
 
 __all__ = [
     "UserService",
     "FamilyMemberService", 
     "HealthRecordService",
     "MedicationService",
-    "AppointmentService"
+    "AppointmentService",
+    "AsyncUserService",
+    "AsyncFamilyMemberService",
+    "AsyncHealthRecordService",
+    "AsyncMedicationService",
+    "AsyncAppointmentService",
+    "ExportService",
+    "FreshnessService",
+    "MemberStatsService",
+    "SummaryService",
+    "SemanticSearchService",
+    "JobService"
 ]
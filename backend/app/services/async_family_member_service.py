@@ -0,0 +1,133 @@
+"""Family member management service for the async database path."""
+
+from typing import Optional, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.loading import LoadingProfile, loader_options
+from app.db.member_stats import new_member_stats
+from app.db.pagination import keyset, page
+from app.models.models import FamilyMember
+from app.schemas.schemas import FamilyMemberCreate, FamilyMemberUpdate
+from app.services.family_member_service import MEMBER_SORT_KEYS
+from app.services.member_stats_service import MemberStatsService
+
+
+class AsyncFamilyMemberService:
+    """Async counterpart of FamilyMemberService."""
+
+    @staticmethod
+    async def get_family_member(
+        db: AsyncSession,
+        member_id: int,
+        profile: LoadingProfile = LoadingProfile.MEMBER_SUMMARY
+    ) -> Optional[FamilyMember]:
+        """Get family member by ID."""
+        result = await db.execute(
+            select(FamilyMember).options(*loader_options(FamilyMember, profile)).where(
+                FamilyMember.id == member_id
+            )
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_owned_family_member(
+        db: AsyncSession,
+        member_id: int,
+        user_id: int,
+        profile: LoadingProfile = LoadingProfile.MEMBER_SUMMARY
+    ) -> Optional[FamilyMember]:
+        """Get family member by ID if it belongs to the user."""
+        result = await db.execute(
+            select(FamilyMember).options(*loader_options(FamilyMember, profile)).where(
+                FamilyMember.id == member_id,
+                FamilyMember.user_id == user_id
+            )
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def create_family_member(
+        db: AsyncSession, member: FamilyMemberCreate, user_id: int
+    ) -> FamilyMember:
+        """Create a new family member."""
+        try:
+            db_member = FamilyMember(
+                user_id=user_id,
+                full_name=member.full_name,
+                relationship=member.relationship,
+                date_of_birth=member.date_of_birth,
+                phone_number=member.phone_number,
+                emergency_contact=member.emergency_contact,
+                notes=member.notes
+            )
+            db.add(db_member)
+            await db.flush()
+            db.add(new_member_stats(db_member.id))
+            await db.commit()
+            await db.refresh(db_member)
+            return db_member
+        except IntegrityError:
+            await db.rollback()
+            raise ValueError("Error creating family member")
+
+    @staticmethod
+    async def update_family_member(
+        db: AsyncSession,
+        member_id: int,
+        member_update: FamilyMemberUpdate,
+        user_id: int
+    ) -> Optional[FamilyMember]:
+        """Update family member information."""
+        db_member = await AsyncFamilyMemberService.get_owned_family_member(db, member_id, user_id)
+        if not db_member:
+            return None
+
+        update_data = member_update.dict(exclude_unset=True)
+
+        for field, value in update_data.items():
+            setattr(db_member, field, value)
+
+        await db.commit()
+        await db.refresh(db_member)
+        return db_member
+
+    @staticmethod
+    async def delete_family_member(db: AsyncSession, member_id: int, user_id: int) -> bool:
+        """Delete family member by ID."""
+        db_member = await AsyncFamilyMemberService.get_owned_family_member(db, member_id, user_id)
+        if not db_member:
+            return False
+
+        await MemberStatsService.member_deleted_async(db, member_id)
+        await db.delete(db_member)
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def get_family_member_with_records(
+        db: AsyncSession, member_id: int, user_id: int
+    ) -> Optional[FamilyMember]:
+        """Get family member with all health records, medications and appointments."""
+        return await AsyncFamilyMemberService.get_owned_family_member(
+            db, member_id, user_id, profile=LoadingProfile.MEMBER_WITH_RECORDS
+        )
+
+    @staticmethod
+    async def search_family_members(
+        db: AsyncSession,
+        user_id: int,
+        search_term: str = "",
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[FamilyMember], Optional[str]]:
+        """Get a page of family members, optionally searching by name or relationship."""
+        stmt = select(FamilyMember).where(FamilyMember.user_id == user_id)
+        if search_term:
+            stmt = stmt.where(
+                FamilyMember.full_name.ilike(f"%{search_term}%") |
+                FamilyMember.relationship.ilike(f"%{search_term}%")
+            )
+        result = await db.execute(keyset(stmt, MEMBER_SORT_KEYS, cursor, limit))
+        return page(result.scalars().all(), MEMBER_SORT_KEYS, limit)
@@ -0,0 +1,524 @@
+"""Health record management service for the async database path."""
+
+from typing import Any, Optional, List, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+
+from app.core.dose_rules import parse_frequency
+from app.core.reminders import reminders_changed
+from app.db.fts import build_match_query, is_search_index_available
+from app.db.loading import LoadingProfile, loader_options
+from app.db.pagination import keyset, page
+from app.models.models import HealthRecord, FamilyMember, Medication, Appointment
+from app.schemas.schemas import (
+    HealthRecordCreate, HealthRecordUpdate,
+    MedicationCreate, MedicationUpdate,
+    AppointmentCreate, AppointmentUpdate
+)
+from app.services.attachment_service import AttachmentService
+from app.services.health_record_service import (
+    APPOINTMENT_SORT_KEYS,
+    CALENDAR_SORT_KEYS,
+    MEDICATION_SORT_KEYS,
+    RECORD_SORT_KEYS,
+    SearchHit,
+    bulk_insert_statement,
+    bulk_rows,
+    fts_hits,
+    fts_row_key,
+    fts_search_statement,
+    health_record_rows,
+    household_appointments_statement,
+    like_search_statement,
+    medication_rows,
+)
+from app.services.medication_conflict_service import Conflict, MedicationConflictService
+from app.services.member_stats_service import MemberStatsService
+from app.services.semantic_search_service import SemanticSearchService
+
+
+async def _owns_member(db: AsyncSession, member_id: int, user_id: int) -> bool:
+    """Return True if the family member belongs to the user."""
+    result = await db.execute(
+        select(FamilyMember.id).where(
+            FamilyMember.id == member_id,
+            FamilyMember.user_id == user_id
+        )
+    )
+    return result.first() is not None
+
+
+async def _get_owned_record(
+    db: AsyncSession, record_id: int, user_id: int
+) -> Optional[HealthRecord]:
+    result = await db.execute(
+        select(HealthRecord).join(FamilyMember).where(
+            HealthRecord.id == record_id,
+            FamilyMember.user_id == user_id
+        )
+    )
+    return result.scalars().first()
+
+
+async def _bulk_create(
+    db: AsyncSession, model: type, rows: List[dict], member_id: int, user_id: int
+) -> List[int]:
+    """Insert rows for a family member in one transaction and return their IDs."""
+    if not await _owns_member(db, member_id, user_id):
+        raise ValueError("Family member not found or access denied")
+
+    try:
+        result = await db.execute(bulk_insert_statement(model), rows)
+        ids = list(result.scalars().all())
+        if model is HealthRecord:
+            await MemberStatsService.records_changed_async(
+                db, member_id, added=[(r["record_type"], r["date_recorded"]) for r in rows]
+            )
+            await SemanticSearchService.records_created_async(db, [
+                (i, r["title"], r["description"], r["notes"]) for i, r in zip(ids, rows)
+            ])
+        elif model is Medication:
+            await MemberStatsService.medications_added_async(db, member_id, [r["is_active"] for r in rows])
+        else:
+            added = [(i, r["status"], r["appointment_date"]) for i, r in zip(ids, rows)]
+            await MemberStatsService.appointments_changed_async(db, member_id, added=added)
+            reminders_changed(db, added)
+        await db.commit()
+        return ids
+    except IntegrityError:
+        await db.rollback()
+        raise ValueError(f"Error creating {model.__tablename__.replace('_', ' ')}")
+
+
+class AsyncHealthRecordService:
+    """Async counterpart of HealthRecordService."""
+
+    @staticmethod
+    async def get_health_record(
+        db: AsyncSession,
+        record_id: int,
+        profile: LoadingProfile = LoadingProfile.PRINCIPAL_ONLY
+    ) -> Optional[HealthRecord]:
+        """Get health record by ID."""
+        result = await db.execute(
+            select(HealthRecord).options(*loader_options(HealthRecord, profile)).where(
+                HealthRecord.id == record_id
+            )
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_health_records_by_member(
+        db: AsyncSession,
+        member_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        columns: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Get a page of health records for a family member, newest first.
+
+        Returns entities, or plain rows of just ``columns`` when given.
+        """
+        stmt = select(*(columns or (HealthRecord,))).where(HealthRecord.family_member_id == member_id)
+        result = await db.execute(
+            keyset(stmt, RECORD_SORT_KEYS, cursor, limit, descending=True)
+        )
+        rows = result.all() if columns else result.scalars().all()
+        return page(rows, RECORD_SORT_KEYS, limit)
+
+    @staticmethod
+    async def create_health_record(
+        db: AsyncSession,
+        record: HealthRecordCreate,
+        member_id: int,
+        user_id: int
+    ) -> HealthRecord:
+        """Create a new health record."""
+        if not await _owns_member(db, member_id, user_id):
+            raise ValueError("Family member not found or access denied")
+
+        try:
+            db_record = HealthRecord(
+                family_member_id=member_id,
+                record_type=record.record_type,
+                title=record.title,
+                description=record.description,
+                date_recorded=record.date_recorded or datetime.utcnow(),
+                doctor_name=record.doctor_name,
+                hospital_clinic=record.hospital_clinic,
+                severity=record.severity,
+                status=record.status,
+                notes=record.notes
+            )
+            db.add(db_record)
+            await db.flush()
+            await MemberStatsService.records_changed_async(
+                db, member_id, added=[(db_record.record_type, db_record.date_recorded)]
+            )
+            await SemanticSearchService.records_created_async(db, [
+                (db_record.id, db_record.title, db_record.description, db_record.notes)
+            ])
+            await db.commit()
+            await db.refresh(db_record)
+            return db_record
+        except IntegrityError:
+            await db.rollback()
+            raise ValueError("Error creating health record")
+
+    @staticmethod
+    async def create_health_records(
+        db: AsyncSession,
+        records: List[HealthRecordCreate],
+        member_id: int,
+        user_id: int
+    ) -> List[int]:
+        """Create many health records for a family member; returns IDs in input order."""
+        rows = health_record_rows(records, member_id)
+        return await _bulk_create(db, HealthRecord, rows, member_id, user_id)
+
+    @staticmethod
+    async def update_health_record(
+        db: AsyncSession,
+        record_id: int,
+        record_update: HealthRecordUpdate,
+        user_id: int
+    ) -> Optional[HealthRecord]:
+        """Update health record information."""
+        db_record = await _get_owned_record(db, record_id, user_id)
+        if not db_record:
+            return None
+
+        update_data = record_update.dict(exclude_unset=True)
+        old = (db_record.record_type, db_record.date_recorded)
+
+        for field, value in update_data.items():
+            setattr(db_record, field, value)
+
+        await db.flush()
+        await MemberStatsService.records_changed_async(
+            db, db_record.family_member_id,
+            removed=[old], added=[(db_record.record_type, db_record.date_recorded)]
+        )
+        if update_data.keys() & {"title", "description", "notes"}:
+            await SemanticSearchService.record_updated_async(
+                db, (db_record.id, db_record.title, db_record.description, db_record.notes)
+            )
+        await db.commit()
+        await db.refresh(db_record)
+        return db_record
+
+    @staticmethod
+    async def delete_health_record(db: AsyncSession, record_id: int, user_id: int) -> bool:
+        """Delete health record by ID."""
+        db_record = await _get_owned_record(db, record_id, user_id)
+        if not db_record:
+            return False
+
+        await SemanticSearchService.records_deleted_async(db, [db_record.id])
+        await AttachmentService.records_deleted_async(db, user_id, [db_record.id])
+        await db.delete(db_record)
+        await db.flush()
+        await MemberStatsService.records_changed_async(
+            db, db_record.family_member_id,
+            removed=[(db_record.record_type, db_record.date_recorded)]
+        )
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def search_health_records(
+        db: AsyncSession,
+        user_id: int,
+        search_term: str,
+        record_type: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[SearchHit], Optional[str]]:
+        """Search health records by various criteria, one page at a time."""
+        if search_term and await db.run_sync(is_search_index_available):
+            match = build_match_query(search_term)
+            if not match:
+                return [], None
+            stmt, keys = fts_search_statement(user_id, match, record_type)
+            result = await db.execute(keyset(stmt, keys, cursor, limit))
+            rows, next_cursor = page(result.all(), keys, limit, row_key=fts_row_key)
+            return fts_hits(rows), next_cursor
+
+        stmt = keyset(
+            like_search_statement(user_id, search_term, record_type),
+            RECORD_SORT_KEYS, cursor, limit, descending=True
+        )
+        result = await db.execute(stmt)
+        records, next_cursor = page(result.scalars().all(), RECORD_SORT_KEYS, limit)
+        return [(record, None, None) for record in records], next_cursor
+
+
+class AsyncMedicationService:
+    """Async counterpart of MedicationService."""
+
+    @staticmethod
+    async def get_medication(db: AsyncSession, medication_id: int) -> Optional[Medication]:
+        """Get medication by ID."""
+        result = await db.execute(select(Medication).where(Medication.id == medication_id))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_medications_by_member(
+        db: AsyncSession,
+        member_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        columns: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Get a page of medications for a family member, newest first.
+
+        Returns entities, or plain rows of just ``columns`` when given.
+        """
+        stmt = select(*(columns or (Medication,))).where(Medication.family_member_id == member_id)
+        result = await db.execute(
+            keyset(stmt, MEDICATION_SORT_KEYS, cursor, limit, descending=True)
+        )
+        rows = result.all() if columns else result.scalars().all()
+        return page(rows, MEDICATION_SORT_KEYS, limit)
+
+    @staticmethod
+    async def create_medication(
+        db: AsyncSession,
+        medication: MedicationCreate,
+        member_id: int,
+        user_id: int
+    ) -> Tuple[Medication, List[Conflict]]:
+        """
+        Create a new medication record; returns it with its conflicts with
+        the member's active medications and allergies.
+        """
+        if not await _owns_member(db, member_id, user_id):
+            raise ValueError("Family member not found or access denied")
+
+        conflicts = (
+            await MedicationConflictService.check_async(db, member_id, medication.name)
+            if medication.is_active else []
+        )
+        try:
+            db_medication = Medication(
+                family_member_id=member_id,
+                name=medication.name,
+                dosage=medication.dosage,
+                frequency=medication.frequency,
+                dose_rule=parse_frequency(medication.frequency),
+                start_date=medication.start_date,
+                end_date=medication.end_date,
+                prescribed_by=medication.prescribed_by,
+                purpose=medication.purpose,
+                side_effects=medication.side_effects,
+                is_active=medication.is_active,
+                notes=medication.notes
+            )
+            db.add(db_medication)
+            await db.flush()
+            await MemberStatsService.medications_added_async(db, member_id, [db_medication.is_active])
+            await db.commit()
+            await db.refresh(db_medication)
+            return db_medication, conflicts
+        except IntegrityError:
+            await db.rollback()
+            raise ValueError("Error creating medication record")
+
+    @staticmethod
+    async def update_medication(
+        db: AsyncSession,
+        medication_id: int,
+        medication_update: MedicationUpdate,
+        user_id: int
+    ) -> Optional[Tuple[Medication, List[Conflict]]]:
+        """
+        Update a medication; returns it with its conflicts with the member's
+        other active medications and allergies, or None if not found.
+        """
+        result = await db.execute(
+            select(Medication).join(FamilyMember).where(
+                Medication.id == medication_id,
+                FamilyMember.user_id == user_id
+            )
+        )
+        db_medication = result.scalars().first()
+        if not db_medication:
+            return None
+
+        update_data = medication_update.dict(exclude_unset=True)
+        was_active = db_medication.is_active
+
+        for field, value in update_data.items():
+            setattr(db_medication, field, value)
+        if update_data.get("frequency"):
+            db_medication.dose_rule = parse_frequency(update_data["frequency"])
+
+        await db.flush()
+        conflicts = (
+            await MedicationConflictService.check_async(
+                db, db_medication.family_member_id, db_medication.name, exclude_id=medication_id
+            )
+            if db_medication.is_active else []
+        )
+        await MemberStatsService.medication_updated_async(
+            db, db_medication.family_member_id, was_active, db_medication.is_active
+        )
+        await db.commit()
+        await db.refresh(db_medication)
+        return db_medication, conflicts
+
+    @staticmethod
+    async def create_medications(
+        db: AsyncSession,
+        medications: List[MedicationCreate],
+        member_id: int,
+        user_id: int
+    ) -> Tuple[List[int], List[List[Conflict]]]:
+        """
+        Create many medications for a family member; returns their IDs and
+        their conflicts with the member's active medications, the earlier ones
+        of the batch and allergies, in input order.
+        """
+        rows = medication_rows(medications, member_id)
+        ids = await _bulk_create(db, Medication, rows, member_id, user_id)
+        conflicts = await MedicationConflictService.check_batch_async(
+            db, member_id, [(i, r["name"], r["is_active"]) for i, r in zip(ids, rows)]
+        )
+        return ids, conflicts
+
+
+class AsyncAppointmentService:
+    """Async counterpart of AppointmentService."""
+
+    @staticmethod
+    async def get_appointment(db: AsyncSession, appointment_id: int) -> Optional[Appointment]:
+        """Get appointment by ID."""
+        result = await db.execute(select(Appointment).where(Appointment.id == appointment_id))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_appointments_by_member(
+        db: AsyncSession,
+        member_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        columns: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Get a page of appointments for a family member, newest first.
+
+        Returns entities, or plain rows of just ``columns`` when given.
+        """
+        stmt = select(*(columns or (Appointment,))).where(Appointment.family_member_id == member_id)
+        result = await db.execute(
+            keyset(stmt, APPOINTMENT_SORT_KEYS, cursor, limit, descending=True)
+        )
+        rows = result.all() if columns else result.scalars().all()
+        return page(rows, APPOINTMENT_SORT_KEYS, limit)
+
+    @staticmethod
+    async def get_household_appointments(
+        db: AsyncSession,
+        user_id: int,
+        start: datetime,
+        end: datetime,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        columns: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Get a page of the appointments of the user's whole family in a date
+        range, earliest first.
+
+        Returns entities, or plain rows of just ``columns`` when given.
+        """
+        stmt = keyset(
+            household_appointments_statement(user_id, start, end, columns),
+            CALENDAR_SORT_KEYS, cursor, limit
+        )
+        result = await db.execute(stmt)
+        rows = result.all() if columns else result.scalars().all()
+        return page(rows, CALENDAR_SORT_KEYS, limit)
+
+    @staticmethod
+    async def create_appointment(
+        db: AsyncSession,
+        appointment: AppointmentCreate,
+        member_id: int,
+        user_id: int
+    ) -> Appointment:
+        """Create a new appointment."""
+        if not await _owns_member(db, member_id, user_id):
+            raise ValueError("Family member not found or access denied")
+
+        try:
+            db_appointment = Appointment(
+                family_member_id=member_id,
+                title=appointment.title,
+                doctor_name=appointment.doctor_name,
+                hospital_clinic=appointment.hospital_clinic,
+                appointment_date=appointment.appointment_date,
+                appointment_type=appointment.appointment_type,
+                status=appointment.status,
+                notes=appointment.notes
+            )
+            db.add(db_appointment)
+            await db.flush()
+            added = [(db_appointment.id, db_appointment.status, db_appointment.appointment_date)]
+            await MemberStatsService.appointments_changed_async(db, member_id, added=added)
+            reminders_changed(db, added)
+            await db.commit()
+            await db.refresh(db_appointment)
+            return db_appointment
+        except IntegrityError:
+            await db.rollback()
+            raise ValueError("Error creating appointment")
+
+    @staticmethod
+    async def update_appointment(
+        db: AsyncSession,
+        appointment_id: int,
+        appointment_update: AppointmentUpdate,
+        user_id: int
+    ) -> Optional[Appointment]:
+        """Update an appointment; setting its status to "cancelled" cancels it."""
+        result = await db.execute(
+            select(Appointment).join(FamilyMember).where(
+                Appointment.id == appointment_id,
+                FamilyMember.user_id == user_id
+            )
+        )
+        db_appointment = result.scalars().first()
+        if not db_appointment:
+            return None
+
+        update_data = appointment_update.dict(exclude_unset=True)
+        old = (db_appointment.id, db_appointment.status, db_appointment.appointment_date)
+
+        for field, value in update_data.items():
+            setattr(db_appointment, field, value)
+
+        await db.flush()
+        new = (db_appointment.id, db_appointment.status, db_appointment.appointment_date)
+        await MemberStatsService.appointments_changed_async(
+            db, db_appointment.family_member_id, removed=[old], added=[new]
+        )
+        reminders_changed(db, [new])
+        await db.commit()
+        await db.refresh(db_appointment)
+        return db_appointment
+
+    @staticmethod
+    async def create_appointments(
+        db: AsyncSession,
+        appointments: List[AppointmentCreate],
+        member_id: int,
+        user_id: int
+    ) -> List[int]:
+        """Create many appointments for a family member; returns IDs in input order."""
+        rows = bulk_rows(appointments, member_id)
+        return await _bulk_create(db, Appointment, rows, member_id, user_id)
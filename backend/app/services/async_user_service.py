@@ -0,0 +1,112 @@
+"""User management service for the async database path."""
+
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.hashing import password_hasher
+from app.db.loading import LoadingProfile, loader_options
+from app.models.models import User
+from app.schemas.schemas import UserCreate, UserUpdate
+
+
+class AsyncUserService:
+    """Async counterpart of UserService."""
+
+    @staticmethod
+    async def get_user(
+        db: AsyncSession,
+        user_id: int,
+        profile: LoadingProfile = LoadingProfile.PRINCIPAL_ONLY
+    ) -> Optional[User]:
+        """Get user by ID."""
+        result = await db.execute(
+            select(User).options(*loader_options(User, profile)).where(User.id == user_id)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_user_by_email(
+        db: AsyncSession,
+        email: str,
+        profile: LoadingProfile = LoadingProfile.PRINCIPAL_ONLY
+    ) -> Optional[User]:
+        """Get user by email."""
+        result = await db.execute(
+            select(User).options(*loader_options(User, profile)).where(User.email == email)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def create_user(db: AsyncSession, user: UserCreate) -> User:
+        """Create a new user."""
+        try:
+            # Hand the connection back to the pool while bcrypt runs
+            await db.close()
+            hashed_password = await password_hasher.hash(user.password)
+            db_user = User(
+                email=user.email,
+                full_name=user.full_name,
+                hashed_password=hashed_password,
+                date_of_birth=user.date_of_birth,
+                phone_number=user.phone_number
+            )
+            db.add(db_user)
+            await db.commit()
+            await db.refresh(db_user)
+            return db_user
+        except IntegrityError:
+            await db.rollback()
+            raise ValueError("User with this email already exists")
+
+    @staticmethod
+    async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+        """Authenticate user with email and password."""
+        user = await AsyncUserService.get_user_by_email(db, email)
+        if not user:
+            return None
+        # Hand the connection back to the pool while bcrypt runs
+        await db.close()
+        if not await password_hasher.verify(password, user.hashed_password):
+            return None
+        return user
+
+    @staticmethod
+    async def update_user(
+        db: AsyncSession, user_id: int, user_update: UserUpdate
+    ) -> Optional[User]:
+        """Update user information."""
+        update_data = user_update.dict(exclude_unset=True)
+        if "password" in update_data:
+            # Hand the connection back to the pool while bcrypt runs
+            await db.close()
+            update_data["hashed_password"] = await password_hasher.hash(update_data.pop("password"))
+
+        db_user = await AsyncUserService.get_user(db, user_id)
+        if not db_user:
+            return None
+
+        for field, value in update_data.items():
+            setattr(db_user, field, value)
+
+        await db.commit()
+        await db.refresh(db_user)
+        return db_user
+
+    @staticmethod
+    async def get_all_users(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[User]:
+        """Get all users with pagination."""
+        result = await db.execute(select(User).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def delete_user(db: AsyncSession, user_id: int) -> bool:
+        """Delete user by ID."""
+        db_user = await AsyncUserService.get_user(db, user_id)
+        if not db_user:
+            return False
+
+        await db.delete(db_user)
+        await db.commit()
+        return True
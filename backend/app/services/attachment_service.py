@@ -0,0 +1,282 @@
+"""
+Health record attachments.
+
+Uploads arrive staged in the blob store (see ``app.api.files``). Adding
+one counts it against the user's quota, references its blob (recording the
+blob if its content is new) and moves the staged file into place, all in the
+transaction that adds the attachment. Removing attachments, directly or with
+their record, releases the quota and the references and queues the
+``attachments.collect`` job for blobs no longer referenced.
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+import anyio
+from sqlalchemy import Select, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.blob_store import COLLECT_JOB, BlobStore, StagedBlob, blob_store
+from app.core.config import settings
+from app.db.attachments import (
+    create_usage_statement,
+    release_statement,
+    reserve_statement,
+    unreference_statement,
+)
+from app.models.models import Attachment, Blob, FamilyMember, HealthRecord, StorageUsage
+from app.services.job_service import JobService
+
+# (blob hash, attachments, bytes) of attachments being removed.
+Reference = Tuple[str, int, int]
+
+
+class QuotaExceededError(ValueError):
+    """Raised when an attachment would take a user over their storage quota."""
+
+
+def owned_record_statement(record_id: int, user_id: int) -> Select:
+    """The ID of the health record, if it belongs to the user."""
+    return select(HealthRecord.id).join(FamilyMember).where(
+        HealthRecord.id == record_id, FamilyMember.user_id == user_id
+    )
+
+
+def attachments_statement(record_id: int) -> Select:
+    """The attachments of a health record, oldest first."""
+    return select(Attachment).where(Attachment.health_record_id == record_id).order_by(
+        Attachment.created_at, Attachment.id
+    )
+
+
+def attachment_statement(record_id: int, attachment_id: int, user_id: int) -> Select:
+    """One attachment of one of the user's health records."""
+    return select(Attachment).join(HealthRecord).join(FamilyMember).where(
+        Attachment.id == attachment_id,
+        Attachment.health_record_id == record_id,
+        FamilyMember.user_id == user_id
+    )
+
+
+def usage_statement(user_id: int) -> Select:
+    """The user's attachment count and bytes."""
+    return select(StorageUsage.attachment_count, StorageUsage.attachment_bytes).where(
+        StorageUsage.user_id == user_id
+    )
+
+
+def references_statement(record_ids: Sequence[int]) -> Select:
+    """``Reference`` rows of the attachments of health records."""
+    return select(Attachment.sha256, func.count(), func.sum(Attachment.size)).where(
+        Attachment.health_record_id.in_(record_ids)
+    ).group_by(Attachment.sha256)
+
+
+def quota_error(used: int, size: int, quota: int) -> QuotaExceededError:
+    return QuotaExceededError(
+        f"Storage quota exceeded: {size} more bytes would exceed {quota} ({used} used)"
+    )
+
+
+def collect_job_options(now: datetime) -> dict:
+    """
+    ``JobService.enqueue`` options of the collection job; the releases of a
+    minute share one job, run at the start of the next.
+    """
+    run_at = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    return {"run_at": run_at, "idempotency_key": f"{COLLECT_JOB}:{run_at:%Y-%m-%dT%H:%M}"}
+
+
+def new_attachment(record_id: int, filename: str, content_type: str, staged: StagedBlob) -> Attachment:
+    return Attachment(
+        health_record_id=record_id,
+        sha256=staged.sha256,
+        filename=filename,
+        content_type=content_type,
+        size=staged.size
+    )
+
+
+class AttachmentService:
+    """Service for health record attachments."""
+
+    @staticmethod
+    def create_attachment(
+        db: Session,
+        record_id: int,
+        user_id: int,
+        filename: str,
+        content_type: str,
+        staged: StagedBlob,
+        store: BlobStore = blob_store
+    ) -> Attachment:
+        """
+        Attach a staged upload to one of the user's health records. Its file is
+        moved into the store, or dropped if the content is already stored; it
+        is left staged if the attachment is refused.
+        """
+        if db.execute(owned_record_statement(record_id, user_id)).first() is None:
+            raise ValueError("Health record not found or access denied")
+        now = datetime.utcnow()
+        quota = settings.ATTACHMENT_QUOTA_BYTES
+        db.execute(create_usage_statement(db.get_bind().dialect, user_id, now))
+        if not db.execute(reserve_statement(user_id, staged.size, quota, now)).rowcount:
+            usage = db.execute(usage_statement(user_id)).one()
+            raise quota_error(usage[1], staged.size, quota)
+
+        blob = db.get(Blob, staged.sha256, with_for_update=True)
+        if blob is None:
+            db.add(Blob(sha256=staged.sha256, size=staged.size, ref_count=1))
+        else:
+            blob.ref_count += 1
+        # Flushed first: no relationship tells the unit of work the attachment depends on it
+        db.flush()
+        attachment = new_attachment(record_id, filename, content_type, staged)
+        db.add(attachment)
+        db.flush()
+        # The blob's row stays locked until commit, so collection cannot remove the file meanwhile
+        store.place(staged)
+        db.commit()
+        db.refresh(attachment)
+        return attachment
+
+    @staticmethod
+    def get_attachments(db: Session, record_id: int, user_id: int) -> Optional[List[Attachment]]:
+        """The attachments of one of the user's health records, or None if it is not theirs."""
+        if db.execute(owned_record_statement(record_id, user_id)).first() is None:
+            return None
+        return list(db.execute(attachments_statement(record_id)).scalars())
+
+    @staticmethod
+    def get_attachment(db: Session, record_id: int, attachment_id: int, user_id: int) -> Optional[Attachment]:
+        """Get an attachment of one of the user's health records."""
+        return db.execute(attachment_statement(record_id, attachment_id, user_id)).scalar_one_or_none()
+
+    @staticmethod
+    def delete_attachment(db: Session, record_id: int, attachment_id: int, user_id: int) -> bool:
+        """Delete an attachment of one of the user's health records."""
+        attachment = AttachmentService.get_attachment(db, record_id, attachment_id, user_id)
+        if attachment is None:
+            return False
+        db.delete(attachment)
+        db.flush()
+        AttachmentService._release(db, user_id, [(attachment.sha256, 1, attachment.size)])
+        db.commit()
+        return True
+
+    @staticmethod
+    def records_deleted(db: Session, user_id: int, record_ids: Sequence[int]) -> None:
+        """Delete the attachments of the user's records about to be deleted."""
+        references = db.execute(references_statement(record_ids)).all()
+        if references:
+            db.execute(delete(Attachment).where(Attachment.health_record_id.in_(record_ids)))
+            AttachmentService._release(db, user_id, references)
+
+    @staticmethod
+    def get_usage(db: Session, user_id: int) -> Tuple[int, int]:
+        """The number and total size of the user's attachments."""
+        usage = db.execute(usage_statement(user_id)).first()
+        return tuple(usage) if usage is not None else (0, 0)
+
+    @staticmethod
+    def _release(db: Session, user_id: int, references: Sequence[Reference]) -> None:
+        now = datetime.utcnow()
+        count = sum(attachments for _, attachments, _ in references)
+        size = sum(size for _, _, size in references)
+        db.execute(release_statement(user_id, count, size, now))
+        unreferenced = [
+            sha256 for sha256, attachments, _ in references
+            if db.execute(unreference_statement(sha256, attachments)).scalar_one() == 0
+        ]
+        if unreferenced:
+            JobService.enqueue(db, COLLECT_JOB, **collect_job_options(now))
+
+    @staticmethod
+    async def create_attachment_async(
+        db: AsyncSession,
+        record_id: int,
+        user_id: int,
+        filename: str,
+        content_type: str,
+        staged: StagedBlob,
+        store: BlobStore = blob_store
+    ) -> Attachment:
+        """Async counterpart of create_attachment."""
+        if (await db.execute(owned_record_statement(record_id, user_id))).first() is None:
+            raise ValueError("Health record not found or access denied")
+        now = datetime.utcnow()
+        quota = settings.ATTACHMENT_QUOTA_BYTES
+        await db.execute(create_usage_statement(db.get_bind().dialect, user_id, now))
+        if not (await db.execute(reserve_statement(user_id, staged.size, quota, now))).rowcount:
+            usage = (await db.execute(usage_statement(user_id))).one()
+            raise quota_error(usage[1], staged.size, quota)
+
+        blob = await db.get(Blob, staged.sha256, with_for_update=True)
+        if blob is None:
+            db.add(Blob(sha256=staged.sha256, size=staged.size, ref_count=1))
+        else:
+            blob.ref_count += 1
+        # Flushed first: no relationship tells the unit of work the attachment depends on it
+        await db.flush()
+        attachment = new_attachment(record_id, filename, content_type, staged)
+        db.add(attachment)
+        await db.flush()
+        # The blob's row stays locked until commit, so collection cannot remove the file meanwhile
+        await anyio.to_thread.run_sync(store.place, staged)
+        await db.commit()
+        await db.refresh(attachment)
+        return attachment
+
+    @staticmethod
+    async def get_attachments_async(db: AsyncSession, record_id: int, user_id: int) -> Optional[List[Attachment]]:
+        """Async counterpart of get_attachments."""
+        if (await db.execute(owned_record_statement(record_id, user_id))).first() is None:
+            return None
+        return list((await db.execute(attachments_statement(record_id))).scalars())
+
+    @staticmethod
+    async def get_attachment_async(
+        db: AsyncSession, record_id: int, attachment_id: int, user_id: int
+    ) -> Optional[Attachment]:
+        """Async counterpart of get_attachment."""
+        result = await db.execute(attachment_statement(record_id, attachment_id, user_id))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def delete_attachment_async(db: AsyncSession, record_id: int, attachment_id: int, user_id: int) -> bool:
+        """Async counterpart of delete_attachment."""
+        attachment = await AttachmentService.get_attachment_async(db, record_id, attachment_id, user_id)
+        if attachment is None:
+            return False
+        await db.delete(attachment)
+        await db.flush()
+        await AttachmentService._release_async(db, user_id, [(attachment.sha256, 1, attachment.size)])
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def records_deleted_async(db: AsyncSession, user_id: int, record_ids: Sequence[int]) -> None:
+        """Async counterpart of records_deleted."""
+        references = (await db.execute(references_statement(record_ids))).all()
+        if references:
+            await db.execute(delete(Attachment).where(Attachment.health_record_id.in_(record_ids)))
+            await AttachmentService._release_async(db, user_id, references)
+
+    @staticmethod
+    async def get_usage_async(db: AsyncSession, user_id: int) -> Tuple[int, int]:
+        """Async counterpart of get_usage."""
+        usage = (await db.execute(usage_statement(user_id))).first()
+        return tuple(usage) if usage is not None else (0, 0)
+
+    @staticmethod
+    async def _release_async(db: AsyncSession, user_id: int, references: Sequence[Reference]) -> None:
+        now = datetime.utcnow()
+        count = sum(attachments for _, attachments, _ in references)
+        size = sum(size for _, _, size in references)
+        await db.execute(release_statement(user_id, count, size, now))
+        unreferenced = [
+            sha256 for sha256, attachments, _ in references
+            if (await db.execute(unreference_statement(sha256, attachments))).scalar_one() == 0
+        ]
+        if unreferenced:
+            await JobService.enqueue_async(db, COLLECT_JOB, **collect_job_options(now))
@@ -0,0 +1,221 @@
+"""
+iCalendar (RFC 5545) feed of a household's appointments.
+
+The feed holds the appointments of every family member from
+``CALENDAR_FEED_PAST_DAYS`` ago onwards, one ``VEVENT`` per appointment with
+a stable UID, so calendar clients update events in place when an appointment
+is moved and show cancelled ones as such.
+
+Calendar clients cannot send an Authorization header, so the feed they
+subscribe to is authenticated by a random token in its URL. Each user has at
+most one: issuing a new token revokes the previous URL, and only a hash of
+the token is stored.
+"""
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Iterable, Iterator, List, Mapping, Optional
+
+from sqlalchemy import Select, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import Appointment, FamilyMember, User
+
+CALENDAR_MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+# Rows fetched from the server-side cursor at a time; each batch becomes one chunk.
+CALENDAR_BATCH_SIZE = 500
+
+# Appointments have no end time
+EVENT_DURATION = "PT1H"
+
+# Random bytes in a feed token
+FEED_TOKEN_BYTES = 32
+
+# Right-hand side of event UIDs, which must stay stable across releases
+UID_DOMAIN = "phrm"
+
+_HEADER = (
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    f"PRODID:-//{settings.PROJECT_NAME}//{settings.VERSION}//EN",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH",
+    "X-WR-CALNAME:Family appointments",
+)
+_FOOTER = ("END:VCALENDAR",)
+
+
+def feed_start(now: Optional[datetime] = None) -> datetime:
+    """Earliest appointment date in the feed: midnight ``CALENDAR_FEED_PAST_DAYS`` ago."""
+    start = (now or datetime.utcnow()) - timedelta(days=settings.CALENDAR_FEED_PAST_DAYS)
+    return datetime.combine(start.date(), datetime.min.time())
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _set_token_statement(user_id: int, token_hash: Optional[str]):
+    return update(User).where(User.id == user_id).values(calendar_token_hash=token_hash)
+
+
+def _feed_user_statement(token: str) -> Select:
+    return select(User.id).where(
+        User.calendar_token_hash == _token_hash(token),
+        User.is_active.is_(True),
+    )
+
+
+def calendar_statement(user_id: int, since: datetime) -> Select:
+    """The household's appointments from ``since`` with their member's name, earliest first."""
+    return select(
+        Appointment.id,
+        Appointment.title,
+        Appointment.doctor_name,
+        Appointment.hospital_clinic,
+        Appointment.appointment_date,
+        Appointment.appointment_type,
+        Appointment.status,
+        Appointment.notes,
+        Appointment.updated_at,
+        FamilyMember.full_name,
+    ).join(FamilyMember).where(
+        FamilyMember.user_id == user_id,
+        Appointment.appointment_date >= since,
+    ).order_by(Appointment.appointment_date, Appointment.id).execution_options(
+        yield_per=CALENDAR_BATCH_SIZE
+    )
+
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Split a content line into lines of at most 75 octets."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    start = 0
+    limit = 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split inside a UTF-8 sequence
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+        # Continuation lines start with a space
+        limit = 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _timestamp(value: datetime) -> str:
+    # Stored datetimes are naive UTC
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _event(row: Mapping) -> List[str]:
+    summary = f"{row['title']} ({row['full_name']})"
+    details = [
+        f"{label}: {row[key]}"
+        for label, key in (("Doctor", "doctor_name"), ("Type", "appointment_type"))
+        if row[key]
+    ]
+    if row["notes"]:
+        details.append(row["notes"])
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:appointment-{row['id']}@{UID_DOMAIN}",
+        f"DTSTAMP:{_timestamp(row['updated_at'])}",
+        f"LAST-MODIFIED:{_timestamp(row['updated_at'])}",
+        f"DTSTART:{_timestamp(row['appointment_date'])}",
+        f"DURATION:{EVENT_DURATION}",
+        f"SUMMARY:{_escape(summary)}",
+        f"STATUS:{'CANCELLED' if row['status'] == 'cancelled' else 'CONFIRMED'}",
+    ]
+    if row["hospital_clinic"]:
+        lines.append(f"LOCATION:{_escape(row['hospital_clinic'])}")
+    if details:
+        lines.append("DESCRIPTION:" + _escape("\n".join(details)))
+    lines.append("END:VEVENT")
+    return lines
+
+
+def _lines(lines: Iterable[str]) -> str:
+    return "".join(_fold(line) for line in lines)
+
+
+def _events(rows: Iterable[Mapping]) -> str:
+    return "".join(_lines(_event(row)) for row in rows)
+
+
+class CalendarService:
+    """Service for the household appointment calendar feed."""
+
+    @staticmethod
+    def issue_feed_token(db: Session, user_id: int) -> str:
+        """Give the user a new feed token, revoking the previous one."""
+        token = secrets.token_urlsafe(FEED_TOKEN_BYTES)
+        db.execute(_set_token_statement(user_id, _token_hash(token)))
+        db.commit()
+        return token
+
+    @staticmethod
+    def revoke_feed_token(db: Session, user_id: int) -> None:
+        """Revoke the user's feed token, if any."""
+        db.execute(_set_token_statement(user_id, None))
+        db.commit()
+
+    @staticmethod
+    def get_feed_user(db: Session, token: str) -> Optional[int]:
+        """Id of the active user whose feed token this is, or None."""
+        return db.execute(_feed_user_statement(token)).scalar()
+
+    @staticmethod
+    async def issue_feed_token_async(db: AsyncSession, user_id: int) -> str:
+        """Async counterpart of issue_feed_token."""
+        token = secrets.token_urlsafe(FEED_TOKEN_BYTES)
+        await db.execute(_set_token_statement(user_id, _token_hash(token)))
+        await db.commit()
+        return token
+
+    @staticmethod
+    async def revoke_feed_token_async(db: AsyncSession, user_id: int) -> None:
+        """Async counterpart of revoke_feed_token."""
+        await db.execute(_set_token_statement(user_id, None))
+        await db.commit()
+
+    @staticmethod
+    async def get_feed_user_async(db: AsyncSession, token: str) -> Optional[int]:
+        """Async counterpart of get_feed_user."""
+        return (await db.execute(_feed_user_statement(token))).scalar()
+
+    @staticmethod
+    def stream_calendar(db: Session, user_id: int, since: datetime) -> Iterator[str]:
+        """
+        Yield the household's calendar as text chunks, reading appointments
+        through a server-side cursor ``CALENDAR_BATCH_SIZE`` at a time.
+        """
+        yield _lines(_HEADER)
+        for batch in db.execute(calendar_statement(user_id, since)).mappings().partitions():
+            yield _events(batch)
+        yield _lines(_FOOTER)
+
+    @staticmethod
+    async def stream_calendar_async(
+        db: AsyncSession, user_id: int, since: datetime
+    ) -> AsyncIterator[str]:
+        """Async counterpart of stream_calendar."""
+        yield _lines(_HEADER)
+        stream = await db.stream(calendar_statement(user_id, since))
+        async for batch in stream.mappings().partitions():
+            yield _events(batch)
+        yield _lines(_FOOTER)
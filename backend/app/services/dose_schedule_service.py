@@ -0,0 +1,137 @@
+"""
+Dose schedules of a household's medications.
+
+The active medications of the whole family that overlap a date range are
+read in one query along ``ix_medications_family_member_id_is_active``, and
+each stored dose rule is expanded arithmetically (see
+``app.core.dose_rules.expand``). Schedules are cached per household and
+range until the next medication write; see ``app.core.dose_schedule_cache``.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Select, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.dose_rules import expand, rule_parts
+from app.core.dose_schedule_cache import dose_schedule_cache
+from app.models.models import FamilyMember, Medication
+from app.services.freshness_service import household_medications_state
+
+
+class Dose(NamedTuple):
+    """A scheduled dose of a medication."""
+    medication_id: int
+    family_member_id: int
+    name: str
+    dosage: str
+    due_at: datetime
+
+
+# Doses in the range, then the IDs of active medications without a schedule.
+Schedule = Tuple[List[Dose], List[int]]
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def schedule_range(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+    """
+    Check a schedule range and return it in naive UTC, as the medication
+    dates are stored; raises ValueError if it is empty or too long.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    if end <= start:
+        raise ValueError("The end of the range must be after its start")
+    if end - start > timedelta(days=settings.DOSE_SCHEDULE_MAX_DAYS):
+        raise ValueError(f"The range can span at most {settings.DOSE_SCHEDULE_MAX_DAYS} days")
+    return start, end
+
+
+def active_medications_statement(user_id: int, start: datetime, end: datetime) -> Select:
+    """The family's active medications taken at some point from ``start`` to before ``end``."""
+    first_day = datetime.combine(start.date(), datetime.min.time())
+    return select(
+        Medication.id,
+        Medication.family_member_id,
+        Medication.name,
+        Medication.dosage,
+        Medication.dose_rule,
+        Medication.start_date,
+        Medication.end_date,
+    ).join(FamilyMember).where(
+        FamilyMember.user_id == user_id,
+        Medication.is_active.is_(True),
+        Medication.start_date < end,
+        or_(Medication.end_date.is_(None), Medication.end_date >= first_day),
+    ).order_by(Medication.id)
+
+
+def expand_schedule(rows: Iterable, start: datetime, end: datetime) -> Schedule:
+    """Expand the dose rules of medication rows over a range, earliest dose first."""
+    doses: List[Dose] = []
+    unscheduled: List[int] = []
+    for medication_id, member_id, name, dosage, dose_rule, start_date, end_date in rows:
+        rule = rule_parts(dose_rule)
+        if rule is None:
+            unscheduled.append(medication_id)
+            continue
+        doses.extend(
+            Dose(medication_id, member_id, name, dosage, due_at)
+            for due_at in expand(rule, start_date, end_date, start, end)
+        )
+    doses.sort(key=lambda dose: (dose.due_at, dose.medication_id))
+    return doses, unscheduled
+
+
+class DoseScheduleService:
+    """Service for household dose schedules."""
+
+    @staticmethod
+    def get_household_schedule(
+        db: Session,
+        user_id: int,
+        start: datetime,
+        end: datetime,
+        state: Optional[tuple] = None
+    ) -> Schedule:
+        """
+        Get the doses of the family's active medications from ``start`` to
+        before ``end``. ``state`` is the household's medication state when
+        the caller has already read it.
+        """
+        start, end = schedule_range(start, end)
+        if state is None:
+            state = tuple(db.execute(household_medications_state(user_id)).one())
+        key = (user_id, start, end)
+        schedule = dose_schedule_cache.get(key, state)
+        if schedule is None:
+            rows = db.execute(active_medications_statement(user_id, start, end)).all()
+            schedule = expand_schedule(rows, start, end)
+            dose_schedule_cache.put(key, state, schedule)
+        return schedule
+
+    @staticmethod
+    async def get_household_schedule_async(
+        db: AsyncSession,
+        user_id: int,
+        start: datetime,
+        end: datetime,
+        state: Optional[tuple] = None
+    ) -> Schedule:
+        """Async counterpart of get_household_schedule."""
+        start, end = schedule_range(start, end)
+        if state is None:
+            state = tuple((await db.execute(household_medications_state(user_id))).one())
+        key = (user_id, start, end)
+        schedule = dose_schedule_cache.get(key, state)
+        if schedule is None:
+            rows = (await db.execute(active_medications_statement(user_id, start, end))).all()
+            schedule = expand_schedule(rows, start, end)
+            dose_schedule_cache.put(key, state, schedule)
+        return schedule
@@ -0,0 +1,162 @@
+"""Streaming export of a user's household health history."""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Iterator, List, Mapping, Sequence, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.models import Appointment, FamilyMember, HealthRecord, Medication, User
+
+# Rows fetched from the server-side cursor at a time; each batch becomes one chunk.
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    """Export file formats."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+_USER_COLUMNS = [
+    c for c in User.__table__.c if c.name not in ("hashed_password", "calendar_token_hash")
+]
+
+# Exported sections of each family member, ordered along their indexes
+_MEMBER_SECTIONS = (
+    ("health_record", HealthRecord, (HealthRecord.date_recorded, HealthRecord.id)),
+    ("medication", Medication, (Medication.created_at, Medication.id)),
+    ("appointment", Appointment, (Appointment.appointment_date, Appointment.id)),
+)
+
+
+def _user_statement(user_id: int) -> Select:
+    return select(*_USER_COLUMNS).where(User.id == user_id)
+
+
+def _member_ids_statement(user_id: int) -> Select:
+    return select(FamilyMember.id).where(FamilyMember.user_id == user_id).order_by(
+        FamilyMember.created_at, FamilyMember.id
+    )
+
+
+def _member_statements(member_id: int) -> List[Tuple[str, Select]]:
+    """The statements exporting one family member, in output order."""
+    statements = [
+        ("family_member", select(*FamilyMember.__table__.c).where(FamilyMember.id == member_id))
+    ]
+    for section, model, order in _MEMBER_SECTIONS:
+        statements.append((
+            section,
+            select(*model.__table__.c).where(model.family_member_id == member_id).order_by(*order)
+        ))
+    return [
+        (section, stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for section, stmt in statements
+    ]
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class _NdjsonWriter:
+    """One JSON object per line, tagged with its section."""
+
+    def header(self) -> str:
+        return ""
+
+    def rows(self, section: str, rows: Sequence[Mapping[str, Any]]) -> str:
+        return "".join(
+            json.dumps({"type": section, **{k: _plain(v) for k, v in row.items()}}) + "\n"
+            for row in rows
+        )
+
+
+class _CsvWriter:
+    """One CSV table over the union of all section columns."""
+
+    columns = ["type"] + list(dict.fromkeys(
+        column.name
+        for table_columns in (
+            _USER_COLUMNS, FamilyMember.__table__.c,
+            *(model.__table__.c for _, model, _ in _MEMBER_SECTIONS)
+        )
+        for column in table_columns
+    ))
+
+    def header(self) -> str:
+        return self._write([dict(zip(self.columns, self.columns))])
+
+    def rows(self, section: str, rows: Sequence[Mapping[str, Any]]) -> str:
+        return self._write(
+            {"type": section, **{k: _plain(v) for k, v in row.items()}} for row in rows
+        )
+
+    def _write(self, rows: Any) -> str:
+        buffer = io.StringIO()
+        csv.DictWriter(buffer, fieldnames=self.columns, restval="").writerows(rows)
+        return buffer.getvalue()
+
+
+def _writer(export_format: ExportFormat) -> Any:
+    return _CsvWriter() if export_format is ExportFormat.CSV else _NdjsonWriter()
+
+
+class ExportService:
+    """Service for exporting a user's data."""
+
+    @staticmethod
+    def stream_export(
+        db: Session,
+        user_id: int,
+        export_format: ExportFormat = ExportFormat.NDJSON
+    ) -> Iterator[str]:
+        """
+        Yield the user's profile, family members, records, medications and
+        appointments as text chunks.
+
+        Rows are read through server-side cursors ``EXPORT_BATCH_SIZE`` at a
+        time, so memory use does not grow with the size of the household.
+        """
+        writer = _writer(export_format)
+        yield writer.header()
+        yield writer.rows("user", db.execute(_user_statement(user_id)).mappings().all())
+
+        member_ids = db.execute(_member_ids_statement(user_id)).scalars().all()
+        for member_id in member_ids:
+            for section, stmt in _member_statements(member_id):
+                for batch in db.execute(stmt).mappings().partitions():
+                    yield writer.rows(section, batch)
+
+    @staticmethod
+    async def stream_export_async(
+        db: AsyncSession,
+        user_id: int,
+        export_format: ExportFormat = ExportFormat.NDJSON
+    ) -> AsyncIterator[str]:
+        """Async counterpart of stream_export."""
+        writer = _writer(export_format)
+        yield writer.header()
+        result = await db.execute(_user_statement(user_id))
+        yield writer.rows("user", result.mappings().all())
+
+        result = await db.execute(_member_ids_statement(user_id))
+        for member_id in result.scalars().all():
+            for section, stmt in _member_statements(member_id):
+                stream = await db.stream(stmt)
+                async for batch in stream.mappings().partitions():
+                    yield writer.rows(section, batch)
@@ -1,20 +1,33 @@
 """Family member management service."""
 
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
+from app.db.loading import LoadingProfile, loader_options
+from app.db.member_stats import new_member_stats
+from app.db.pagination import paginate
 from app.models.models import FamilyMember, User
 from app.schemas.schemas import FamilyMemberCreate, FamilyMemberUpdate
+from app.services.member_stats_service import MemberStatsService
+
+# Sort keys of the family member listing (oldest first).
+MEMBER_SORT_KEYS = (FamilyMember.created_at, FamilyMember.id)
 
 
 class FamilyMemberService:
     """Service for family member management operations."""
 
     @staticmethod
-    def get_family_member(db: Session, member_id: int) -> Optional[FamilyMember]:
+    def get_family_member(
+        db: Session,
+        member_id: int,
+        profile: LoadingProfile = LoadingProfile.MEMBER_SUMMARY
+    ) -> Optional[FamilyMember]:
         """Get family member by ID."""
-        return db.query(FamilyMember).filter(FamilyMember.id == member_id).first()
+        return db.query(FamilyMember).options(*loader_options(FamilyMember, profile)).filter(
+            FamilyMember.id == member_id
+        ).first()
 
     @staticmethod
     def get_family_members_by_user(db: Session, user_id: int) -> List[FamilyMember]:
@@ -35,6 +48,8 @@ class FamilyMemberService:
                 notes=member.notes
             )
             db.add(db_member)
+            db.flush()
+            db.add(new_member_stats(db_member.id))
             db.commit()
             db.refresh(db_member)
             return db_member
@@ -78,14 +93,17 @@ class FamilyMemberService:
         if not db_member:
             return False
         
+        MemberStatsService.member_deleted(db, member_id)
         db.delete(db_member)
         db.commit()
         return True
 
     @staticmethod
     def get_family_member_with_records(db: Session, member_id: int, user_id: int) -> Optional[FamilyMember]:
-        """Get family member with all health records."""
-        return db.query(FamilyMember).filter(
+        """Get family member with all health records, medications and appointments."""
+        return db.query(FamilyMember).options(
+            *loader_options(FamilyMember, LoadingProfile.MEMBER_WITH_RECORDS)
+        ).filter(
             FamilyMember.id == member_id,
             FamilyMember.user_id == user_id
         ).first()
@@ -94,13 +112,15 @@ class FamilyMemberService:
     def search_family_members(
         db: Session, 
         user_id: int, 
-        search_term: str,
-        skip: int = 0,
+        search_term: str = "",
+        cursor: Optional[str] = None,
         limit: int = 100
-    ) -> List[FamilyMember]:
-        """Search family members by name or relationship."""
-        return db.query(FamilyMember).filter(
-            FamilyMember.user_id == user_id,
-            (FamilyMember.full_name.ilike(f"%{search_term}%") |
-             FamilyMember.relationship.ilike(f"%{search_term}%"))
-        ).offset(skip).limit(limit).all()
+    ) -> Tuple[List[FamilyMember], Optional[str]]:
+        """Get a page of family members, optionally searching by name or relationship."""
+        query = db.query(FamilyMember).filter(FamilyMember.user_id == user_id)
+        if search_term:
+            query = query.filter(
+                FamilyMember.full_name.ilike(f"%{search_term}%") |
+                FamilyMember.relationship.ilike(f"%{search_term}%")
+            )
+        return paginate(query, MEMBER_SORT_KEYS, cursor, limit)
@@ -0,0 +1,107 @@
+"""
+Cheap state of read resources, for conditional GET.
+
+Each statement returns a single row of values that changes whenever the
+corresponding response would: a row's ``(id, updated_at)``, or the latest
+``updated_at`` and the row count of a collection. Statements scoped to one
+family member or record also check that it belongs to the user, and return
+no row otherwise.
+"""
+from typing import Optional
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.models import Appointment, FamilyMember, HealthRecord, Medication
+
+
+def _collection_columns(model: type) -> list:
+    """Latest update and row count of a member's children, correlated to FamilyMember."""
+    criteria = model.family_member_id == FamilyMember.id
+    return [
+        select(func.max(model.updated_at)).where(criteria).scalar_subquery(),
+        select(func.count()).select_from(model).where(criteria).scalar_subquery(),
+    ]
+
+
+def _member_state(member_id: int, user_id: int, *models: type) -> Select:
+    columns = [FamilyMember.id, FamilyMember.updated_at]
+    for model in models:
+        columns.extend(_collection_columns(model))
+    return select(*columns).where(FamilyMember.id == member_id, FamilyMember.user_id == user_id)
+
+
+def family_members_state(user_id: int) -> Select:
+    """State of the user's family member list."""
+    return select(func.max(FamilyMember.updated_at), func.count()).where(
+        FamilyMember.user_id == user_id
+    )
+
+
+def family_member_state(member_id: int, user_id: int) -> Select:
+    """State of a family member with all of their records, medications and appointments."""
+    return _member_state(member_id, user_id, HealthRecord, Medication, Appointment)
+
+
+def member_records_state(member_id: int, user_id: int) -> Select:
+    """State of a family member's health record list."""
+    return _member_state(member_id, user_id, HealthRecord)
+
+
+def member_medications_state(member_id: int, user_id: int) -> Select:
+    """State of a family member's medication list."""
+    return _member_state(member_id, user_id, Medication)
+
+
+def member_appointments_state(member_id: int, user_id: int) -> Select:
+    """State of a family member's appointment list."""
+    return _member_state(member_id, user_id, Appointment)
+
+
+def household_records_state(user_id: int) -> Select:
+    """State of the health records of the user's whole family."""
+    return select(func.max(HealthRecord.updated_at), func.count()).join(FamilyMember).where(
+        FamilyMember.user_id == user_id
+    )
+
+
+def household_appointments_state(user_id: int) -> Select:
+    """
+    State of the appointments of the user's whole family, including the
+    names of the members they belong to.
+    """
+    return select(
+        func.max(Appointment.updated_at), func.count(), func.max(FamilyMember.updated_at)
+    ).select_from(Appointment).join(FamilyMember).where(FamilyMember.user_id == user_id)
+
+
+def household_medications_state(user_id: int) -> Select:
+    """State of the medications of the user's whole family."""
+    return select(func.max(Medication.updated_at), func.count()).join(FamilyMember).where(
+        FamilyMember.user_id == user_id
+    )
+
+
+def health_record_state(record_id: int, user_id: int) -> Select:
+    """State of one health record."""
+    return select(HealthRecord.id, HealthRecord.updated_at).join(FamilyMember).where(
+        HealthRecord.id == record_id,
+        FamilyMember.user_id == user_id
+    )
+
+
+class FreshnessService:
+    """Service for reading resource state ahead of loading the resource."""
+
+    @staticmethod
+    def get_state(db: Session, stmt: Select) -> Optional[tuple]:
+        """Run a state statement; None if the resource is not the user's."""
+        row = db.execute(stmt).first()
+        return tuple(row) if row is not None else None
+
+    @staticmethod
+    async def get_state_async(db: AsyncSession, stmt: Select) -> Optional[tuple]:
+        """Async counterpart of get_state."""
+        row = (await db.execute(stmt)).first()
+        return tuple(row) if row is not None else None
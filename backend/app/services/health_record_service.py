@@ -1,30 +1,226 @@
 """Health record management service."""
 
-from typing import Optional, List
+import html
+from typing import Any, Optional, List, Sequence, Tuple
+from pydantic import BaseModel
+from sqlalchemy import Insert, Row, Select, column, func, insert, literal_column, select, table
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
+from app.core.dose_rules import parse_frequency
+from app.core.reminders import reminders_changed
+from app.db.fts import BM25_WEIGHTS, FTS_TABLE, build_match_query, is_search_index_available
+from app.db.loading import LoadingProfile, loader_options
+from app.db.pagination import keyset, page, paginate
 from app.models.models import HealthRecord, FamilyMember, Medication, Appointment
 from app.schemas.schemas import (
     HealthRecordCreate, HealthRecordUpdate,
     MedicationCreate, MedicationUpdate,
     AppointmentCreate, AppointmentUpdate
 )
+from app.services.attachment_service import AttachmentService
+from app.services.medication_conflict_service import Conflict, MedicationConflictService
+from app.services.member_stats_service import MemberStatsService
+from app.services.semantic_search_service import SemanticSearchService
+
+# A search result: the record, its highlighted snippet and its BM25 rank.
+SearchHit = Tuple[HealthRecord, Optional[str], Optional[float]]
+
+# Sort keys of the record, medication and appointment listings (newest first).
+RECORD_SORT_KEYS = (HealthRecord.date_recorded, HealthRecord.id)
+MEDICATION_SORT_KEYS = (Medication.created_at, Medication.id)
+APPOINTMENT_SORT_KEYS = (Appointment.created_at, Appointment.id)
+CALENDAR_SORT_KEYS = (Appointment.appointment_date, Appointment.id)
+
+# Most items accepted by one bulk create request.
+BULK_CREATE_LIMIT = 1000
+
+# Private-use characters marking matches in FTS snippets, replaced by <mark>
+# tags once the record text around them has been HTML-escaped
+MATCH_START = "\ue000"
+MATCH_END = "\ue001"
+
+
+def fts_search_statement(
+    user_id: int,
+    match: str,
+    record_type: Optional[str] = None
+) -> Tuple[Select, tuple]:
+    """
+    Build the FTS5 search statement and its keyset sort keys.
+
+    Rows are ``(HealthRecord, snippet, rank)`` ordered by BM25 rank, best first.
+    """
+    fts = table(FTS_TABLE, column("rowid"))
+    fts_ref = literal_column(FTS_TABLE)
+    bm25 = func.bm25(fts_ref, *BM25_WEIGHTS)
+    snippet = func.snippet(fts_ref, -1, MATCH_START, MATCH_END, "…", 12)
+
+    stmt = select(HealthRecord, snippet.label("snippet"), bm25.label("rank")).join(
+        fts, fts.c.rowid == HealthRecord.id
+    ).join(FamilyMember).where(
+        fts_ref.op("MATCH")(match),
+        FamilyMember.user_id == user_id
+    )
+
+    if record_type:
+        stmt = stmt.where(HealthRecord.record_type == record_type)
+
+    return stmt, (bm25, HealthRecord.id)
+
+
+def like_search_statement(
+    user_id: int,
+    search_term: str,
+    record_type: Optional[str] = None
+) -> Select:
+    """Build the substring (ILIKE) search statement used when no FTS index exists."""
+    stmt = select(HealthRecord).join(FamilyMember).where(FamilyMember.user_id == user_id)
+
+    if search_term:
+        stmt = stmt.where(
+            HealthRecord.title.ilike(f"%{search_term}%") |
+            HealthRecord.description.ilike(f"%{search_term}%") |
+            HealthRecord.doctor_name.ilike(f"%{search_term}%")
+        )
+
+    if record_type:
+        stmt = stmt.where(HealthRecord.record_type == record_type)
+
+    return stmt
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """An FTS snippet as HTML: the record text escaped, matches in <mark> tags."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
+
+
+def fts_hits(rows: Sequence[Row]) -> List[SearchHit]:
+    """Search hits of FTS search rows, with their snippets highlighted."""
+    return [(record, highlight(snippet), rank) for record, snippet, rank in rows]
+
+
+def fts_row_key(row: Row) -> tuple:
+    """Keyset values of an FTS search row."""
+    return row.rank, row.HealthRecord.id
+
+
+def bulk_rows(items: Sequence[BaseModel], member_id: int) -> List[dict]:
+    """Turn validated create schemas into insert parameter rows for one family member."""
+    if not items:
+        raise ValueError("No items to create")
+    if len(items) > BULK_CREATE_LIMIT:
+        raise ValueError(f"At most {BULK_CREATE_LIMIT} items can be created at once")
+    return [{**item.model_dump(), "family_member_id": member_id} for item in items]
+
+
+def health_record_rows(records: Sequence[HealthRecordCreate], member_id: int) -> List[dict]:
+    """Insert parameter rows for health records, defaulting date_recorded to now."""
+    rows = bulk_rows(records, member_id)
+    now = datetime.utcnow()
+    for row in rows:
+        row["date_recorded"] = row["date_recorded"] or now
+    return rows
+
+
+def medication_rows(medications: Sequence[MedicationCreate], member_id: int) -> List[dict]:
+    """Insert parameter rows for medications, with their parsed dose rules."""
+    rows = bulk_rows(medications, member_id)
+    for row in rows:
+        row["dose_rule"] = parse_frequency(row["frequency"])
+    return rows
+
+
+def bulk_insert_statement(model: type) -> Insert:
+    """Multi-row INSERT returning the new IDs in parameter order."""
+    return insert(model).returning(model.id, sort_by_parameter_order=True)
+
+
+def household_appointments_statement(
+    user_id: int, start: datetime, end: datetime, columns: Optional[Sequence[Any]] = None
+) -> Select:
+    """
+    Appointments of the user's whole family from ``start`` to before ``end``,
+    read per member along ``ix_appointments_family_member_id_appointment_date``.
+    """
+    if end <= start:
+        raise ValueError("The end of the range must be after its start")
+    return select(*(columns or (Appointment,))).join(FamilyMember).where(
+        FamilyMember.user_id == user_id,
+        Appointment.appointment_date >= start,
+        Appointment.appointment_date < end,
+    )
+
+
+def _owns_member(db: Session, member_id: int, user_id: int) -> bool:
+    """Return True if the family member belongs to the user."""
+    return db.query(FamilyMember.id).filter(
+        FamilyMember.id == member_id,
+        FamilyMember.user_id == user_id
+    ).first() is not None
+
+
+def _bulk_create(
+    db: Session, model: type, rows: List[dict], member_id: int, user_id: int
+) -> List[int]:
+    """Insert rows for a family member in one transaction and return their IDs."""
+    if not _owns_member(db, member_id, user_id):
+        raise ValueError("Family member not found or access denied")
+
+    try:
+        ids = db.execute(bulk_insert_statement(model), rows).scalars().all()
+        if model is HealthRecord:
+            MemberStatsService.records_changed(
+                db, member_id, added=[(r["record_type"], r["date_recorded"]) for r in rows]
+            )
+            SemanticSearchService.records_created(db, [
+                (i, r["title"], r["description"], r["notes"]) for i, r in zip(ids, rows)
+            ])
+        elif model is Medication:
+            MemberStatsService.medications_added(db, member_id, [r["is_active"] for r in rows])
+        else:
+            added = [(i, r["status"], r["appointment_date"]) for i, r in zip(ids, rows)]
+            MemberStatsService.appointments_changed(db, member_id, added=added)
+            reminders_changed(db, added)
+        db.commit()
+        return list(ids)
+    except IntegrityError:
+        db.rollback()
+        raise ValueError(f"Error creating {model.__tablename__.replace('_', ' ')}")
 
 
 class HealthRecordService:
     """Service for health record management operations."""
 
     @staticmethod
-    def get_health_record(db: Session, record_id: int) -> Optional[HealthRecord]:
+    def get_health_record(
+        db: Session,
+        record_id: int,
+        profile: LoadingProfile = LoadingProfile.PRINCIPAL_ONLY
+    ) -> Optional[HealthRecord]:
         """Get health record by ID."""
-        return db.query(HealthRecord).filter(HealthRecord.id == record_id).first()
+        return db.query(HealthRecord).options(*loader_options(HealthRecord, profile)).filter(
+            HealthRecord.id == record_id
+        ).first()
 
     @staticmethod
-    def get_health_records_by_member(db: Session, member_id: int) -> List[HealthRecord]:
-        """Get all health records for a family member."""
-        return db.query(HealthRecord).filter(HealthRecord.family_member_id == member_id).all()
+    def get_health_records_by_member(
+        db: Session,
+        member_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        columns: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Get a page of health records for a family member, newest first.
+
+        Returns entities, or plain rows of just ``columns`` when given.
+        """
+        query = db.query(*(columns or (HealthRecord,))).filter(HealthRecord.family_member_id == member_id)
+        return paginate(query, RECORD_SORT_KEYS, cursor, limit, descending=True)
 
     @staticmethod
     def create_health_record(
@@ -57,6 +253,13 @@ class HealthRecordService:
                 notes=record.notes
             )
             db.add(db_record)
+            db.flush()
+            MemberStatsService.records_changed(
+                db, member_id, added=[(db_record.record_type, db_record.date_recorded)]
+            )
+            SemanticSearchService.records_created(db, [
+                (db_record.id, db_record.title, db_record.description, db_record.notes)
+            ])
             db.commit()
             db.refresh(db_record)
             return db_record
@@ -64,6 +267,17 @@ class HealthRecordService:
             db.rollback()
             raise ValueError("Error creating health record")
 
+    @staticmethod
+    def create_health_records(
+        db: Session,
+        records: List[HealthRecordCreate],
+        member_id: int,
+        user_id: int
+    ) -> List[int]:
+        """Create many health records for a family member; returns IDs in input order."""
+        rows = health_record_rows(records, member_id)
+        return _bulk_create(db, HealthRecord, rows, member_id, user_id)
+
     @staticmethod
     def update_health_record(
         db: Session, 
@@ -82,10 +296,20 @@ class HealthRecordService:
             return None
         
         update_data = record_update.dict(exclude_unset=True)
+        old = (db_record.record_type, db_record.date_recorded)
         
         for field, value in update_data.items():
             setattr(db_record, field, value)
         
+        db.flush()
+        MemberStatsService.records_changed(
+            db, db_record.family_member_id,
+            removed=[old], added=[(db_record.record_type, db_record.date_recorded)]
+        )
+        if update_data.keys() & {"title", "description", "notes"}:
+            SemanticSearchService.record_updated(
+                db, (db_record.id, db_record.title, db_record.description, db_record.notes)
+            )
         db.commit()
         db.refresh(db_record)
         return db_record
@@ -101,7 +325,14 @@ class HealthRecordService:
         if not db_record:
             return False
         
+        SemanticSearchService.records_deleted(db, [db_record.id])
+        AttachmentService.records_deleted(db, user_id, [db_record.id])
         db.delete(db_record)
+        db.flush()
+        MemberStatsService.records_changed(
+            db, db_record.family_member_id,
+            removed=[(db_record.record_type, db_record.date_recorded)]
+        )
         db.commit()
         return True
 
@@ -111,25 +342,59 @@ class HealthRecordService:
         user_id: int,
         search_term: str,
         record_type: Optional[str] = None,
-        skip: int = 0,
+        cursor: Optional[str] = None,
         limit: int = 100
-    ) -> List[HealthRecord]:
-        """Search health records by various criteria."""
-        query = db.query(HealthRecord).join(FamilyMember).filter(
-            FamilyMember.user_id == user_id
-        )
-        
-        if search_term:
-            query = query.filter(
-                (HealthRecord.title.ilike(f"%{search_term}%") |
-                 HealthRecord.description.ilike(f"%{search_term}%") |
-                 HealthRecord.doctor_name.ilike(f"%{search_term}%"))
+    ) -> Tuple[List[SearchHit], Optional[str]]:
+        """
+        Search health records by various criteria, one page at a time.
+
+        Uses the FTS5 index when available, ranked by BM25 with a highlighted
+        snippet; otherwise falls back to substring matching, newest first.
+        """
+        if search_term and is_search_index_available(db):
+            return HealthRecordService._search_fts(
+                db, user_id, search_term, record_type, cursor, limit
             )
-        
-        if record_type:
-            query = query.filter(HealthRecord.record_type == record_type)
-        
-        return query.offset(skip).limit(limit).all()
+        return HealthRecordService._search_like(
+            db, user_id, search_term, record_type, cursor, limit
+        )
+
+    @staticmethod
+    def _search_fts(
+        db: Session,
+        user_id: int,
+        search_term: str,
+        record_type: Optional[str],
+        cursor: Optional[str],
+        limit: int
+    ) -> Tuple[List[SearchHit], Optional[str]]:
+        """Full-text search through the FTS5 index."""
+        match = build_match_query(search_term)
+        if not match:
+            return [], None
+
+        stmt, keys = fts_search_statement(user_id, match, record_type)
+        rows = db.execute(keyset(stmt, keys, cursor, limit)).all()
+        rows, next_cursor = page(rows, keys, limit, row_key=fts_row_key)
+        return fts_hits(rows), next_cursor
+
+    @staticmethod
+    def _search_like(
+        db: Session,
+        user_id: int,
+        search_term: str,
+        record_type: Optional[str],
+        cursor: Optional[str],
+        limit: int
+    ) -> Tuple[List[SearchHit], Optional[str]]:
+        """Substring search with ILIKE, used when no FTS index exists."""
+        stmt = keyset(
+            like_search_statement(user_id, search_term, record_type),
+            RECORD_SORT_KEYS, cursor, limit, descending=True
+        )
+        records = db.execute(stmt).scalars().all()
+        records, next_cursor = page(records, RECORD_SORT_KEYS, limit)
+        return [(record, None, None) for record in records], next_cursor
 
 
 class MedicationService:
@@ -141,9 +406,20 @@ class MedicationService:
         return db.query(Medication).filter(Medication.id == medication_id).first()
 
     @staticmethod
-    def get_medications_by_member(db: Session, member_id: int) -> List[Medication]:
-        """Get all medications for a family member."""
-        return db.query(Medication).filter(Medication.family_member_id == member_id).all()
+    def get_medications_by_member(
+        db: Session,
+        member_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        columns: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Get a page of medications for a family member, newest first.
+
+        Returns entities, or plain rows of just ``columns`` when given.
+        """
+        query = db.query(*(columns or (Medication,))).filter(Medication.family_member_id == member_id)
+        return paginate(query, MEDICATION_SORT_KEYS, cursor, limit, descending=True)
 
     @staticmethod
     def create_medication(
@@ -151,8 +427,11 @@ class MedicationService:
         medication: MedicationCreate, 
         member_id: int,
         user_id: int
-    ) -> Medication:
-        """Create a new medication record."""
+    ) -> Tuple[Medication, List[Conflict]]:
+        """
+        Create a new medication record; returns it with its conflicts with
+        the member's active medications and allergies.
+        """
         # Verify the family member belongs to the user
         member = db.query(FamilyMember).filter(
             FamilyMember.id == member_id,
@@ -162,12 +441,17 @@ class MedicationService:
         if not member:
             raise ValueError("Family member not found or access denied")
 
+        conflicts = (
+            MedicationConflictService.check(db, member_id, medication.name)
+            if medication.is_active else []
+        )
         try:
             db_medication = Medication(
                 family_member_id=member_id,
                 name=medication.name,
                 dosage=medication.dosage,
                 frequency=medication.frequency,
+                dose_rule=parse_frequency(medication.frequency),
                 start_date=medication.start_date,
                 end_date=medication.end_date,
                 prescribed_by=medication.prescribed_by,
@@ -177,13 +461,74 @@ class MedicationService:
                 notes=medication.notes
             )
             db.add(db_medication)
+            db.flush()
+            MemberStatsService.medications_added(db, member_id, [db_medication.is_active])
             db.commit()
             db.refresh(db_medication)
-            return db_medication
+            return db_medication, conflicts
         except IntegrityError:
             db.rollback()
             raise ValueError("Error creating medication record")
 
+    @staticmethod
+    def update_medication(
+        db: Session,
+        medication_id: int,
+        medication_update: MedicationUpdate,
+        user_id: int
+    ) -> Optional[Tuple[Medication, List[Conflict]]]:
+        """
+        Update a medication; returns it with its conflicts with the member's
+        other active medications and allergies, or None if not found.
+        """
+        db_medication = db.query(Medication).join(FamilyMember).filter(
+            Medication.id == medication_id,
+            FamilyMember.user_id == user_id
+        ).first()
+        if not db_medication:
+            return None
+
+        update_data = medication_update.dict(exclude_unset=True)
+        was_active = db_medication.is_active
+
+        for field, value in update_data.items():
+            setattr(db_medication, field, value)
+        if update_data.get("frequency"):
+            db_medication.dose_rule = parse_frequency(update_data["frequency"])
+
+        db.flush()
+        conflicts = (
+            MedicationConflictService.check(
+                db, db_medication.family_member_id, db_medication.name, exclude_id=medication_id
+            )
+            if db_medication.is_active else []
+        )
+        MemberStatsService.medication_updated(
+            db, db_medication.family_member_id, was_active, db_medication.is_active
+        )
+        db.commit()
+        db.refresh(db_medication)
+        return db_medication, conflicts
+
+    @staticmethod
+    def create_medications(
+        db: Session,
+        medications: List[MedicationCreate],
+        member_id: int,
+        user_id: int
+    ) -> Tuple[List[int], List[List[Conflict]]]:
+        """
+        Create many medications for a family member; returns their IDs and
+        their conflicts with the member's active medications, the earlier ones
+        of the batch and allergies, in input order.
+        """
+        rows = medication_rows(medications, member_id)
+        ids = _bulk_create(db, Medication, rows, member_id, user_id)
+        conflicts = MedicationConflictService.check_batch(
+            db, member_id, [(i, r["name"], r["is_active"]) for i, r in zip(ids, rows)]
+        )
+        return ids, conflicts
+
 
 class AppointmentService:
     """Service for appointment management operations."""
@@ -194,9 +539,44 @@ class AppointmentService:
         return db.query(Appointment).filter(Appointment.id == appointment_id).first()
 
     @staticmethod
-    def get_appointments_by_member(db: Session, member_id: int) -> List[Appointment]:
-        """Get all appointments for a family member."""
-        return db.query(Appointment).filter(Appointment.family_member_id == member_id).all()
+    def get_appointments_by_member(
+        db: Session,
+        member_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        columns: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Get a page of appointments for a family member, newest first.
+
+        Returns entities, or plain rows of just ``columns`` when given.
+        """
+        query = db.query(*(columns or (Appointment,))).filter(Appointment.family_member_id == member_id)
+        return paginate(query, APPOINTMENT_SORT_KEYS, cursor, limit, descending=True)
+
+    @staticmethod
+    def get_household_appointments(
+        db: Session,
+        user_id: int,
+        start: datetime,
+        end: datetime,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        columns: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Get a page of the appointments of the user's whole family in a date
+        range, earliest first.
+
+        Returns entities, or plain rows of just ``columns`` when given.
+        """
+        stmt = keyset(
+            household_appointments_statement(user_id, start, end, columns),
+            CALENDAR_SORT_KEYS, cursor, limit
+        )
+        result = db.execute(stmt)
+        rows = result.all() if columns else result.scalars().all()
+        return page(rows, CALENDAR_SORT_KEYS, limit)
 
     @staticmethod
     def create_appointment(
@@ -227,9 +607,55 @@ class AppointmentService:
                 notes=appointment.notes
             )
             db.add(db_appointment)
+            db.flush()
+            added = [(db_appointment.id, db_appointment.status, db_appointment.appointment_date)]
+            MemberStatsService.appointments_changed(db, member_id, added=added)
+            reminders_changed(db, added)
             db.commit()
             db.refresh(db_appointment)
             return db_appointment
         except IntegrityError:
             db.rollback()
             raise ValueError("Error creating appointment")
+
+    @staticmethod
+    def update_appointment(
+        db: Session,
+        appointment_id: int,
+        appointment_update: AppointmentUpdate,
+        user_id: int
+    ) -> Optional[Appointment]:
+        """Update an appointment; setting its status to "cancelled" cancels it."""
+        db_appointment = db.query(Appointment).join(FamilyMember).filter(
+            Appointment.id == appointment_id,
+            FamilyMember.user_id == user_id
+        ).first()
+        if not db_appointment:
+            return None
+
+        update_data = appointment_update.dict(exclude_unset=True)
+        old = (db_appointment.id, db_appointment.status, db_appointment.appointment_date)
+
+        for field, value in update_data.items():
+            setattr(db_appointment, field, value)
+
+        db.flush()
+        new = (db_appointment.id, db_appointment.status, db_appointment.appointment_date)
+        MemberStatsService.appointments_changed(
+            db, db_appointment.family_member_id, removed=[old], added=[new]
+        )
+        reminders_changed(db, [new])
+        db.commit()
+        db.refresh(db_appointment)
+        return db_appointment
+
+    @staticmethod
+    def create_appointments(
+        db: Session,
+        appointments: List[AppointmentCreate],
+        member_id: int,
+        user_id: int
+    ) -> List[int]:
+        """Create many appointments for a family member; returns IDs in input order."""
+        rows = bulk_rows(appointments, member_id)
+        return _bulk_create(db, Appointment, rows, member_id, user_id)
@@ -0,0 +1,146 @@
+"""
+Queueing of background jobs and their status.
+
+Jobs are queued in the caller's transaction: enqueue adds the row and the
+worker pool sees it once the caller commits, so a job is never run for a
+write that rolled back. See app.core.jobs for the handlers and workers.
+
+The row is inserted in a savepoint, so when a concurrent caller commits the
+same idempotency key first, the unique violation only rolls back the insert
+and the caller gets the job queued by the other one.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Select, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.jobs import get_job_handler
+from app.db.engine import begin_savepoint_transaction
+from app.db.jobs import QUEUED, QUEUED_INFO_KEY
+from app.models.models import Job
+
+
+def new_job(
+    kind: str,
+    payload: Optional[dict],
+    user_id: Optional[int],
+    priority: int,
+    idempotency_key: Optional[str],
+    run_at: Optional[datetime],
+    max_attempts: Optional[int],
+) -> Job:
+    """Validate and build a queued job."""
+    if get_job_handler(kind) is None:
+        raise ValueError(f"Unknown job kind: {kind}")
+    if max_attempts is not None and max_attempts < 1:
+        raise ValueError("A job needs at least one attempt")
+    return Job(
+        kind=kind,
+        payload=payload or {},
+        status=QUEUED,
+        priority=priority,
+        attempts=0,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_at=run_at or datetime.utcnow(),
+        idempotency_key=idempotency_key,
+        user_id=user_id,
+    )
+
+
+def _by_key(idempotency_key: str) -> Select:
+    return select(Job).where(Job.idempotency_key == idempotency_key)
+
+
+def _reuse(job: Job, user_id: Optional[int]) -> Job:
+    """The job already queued under an idempotency key, if the caller owns it."""
+    if job.user_id != user_id:
+        raise ValueError("Idempotency key already used")
+    return job
+
+
+class JobService:
+    """Service for background jobs."""
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        kind: str,
+        payload: Optional[dict] = None,
+        *,
+        user_id: Optional[int] = None,
+        priority: int = 0,
+        idempotency_key: Optional[str] = None,
+        run_at: Optional[datetime] = None,
+        max_attempts: Optional[int] = None,
+    ) -> Job:
+        """
+        Queue a job, to run once the caller commits. With an idempotency key
+        that was used before, the job queued then is returned instead.
+        """
+        if idempotency_key is not None:
+            existing = db.execute(_by_key(idempotency_key)).scalar_one_or_none()
+            if existing is not None:
+                return _reuse(existing, user_id)
+        job = new_job(kind, payload, user_id, priority, idempotency_key, run_at, max_attempts)
+        begin_savepoint_transaction(db.connection())
+        try:
+            with db.begin_nested():
+                db.add(job)
+        except IntegrityError:
+            existing = None
+            if idempotency_key is not None:
+                existing = db.execute(_by_key(idempotency_key)).scalar_one_or_none()
+            if existing is None:
+                raise
+            return _reuse(existing, user_id)
+        db.info[QUEUED_INFO_KEY] = True
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: int, user_id: int) -> Optional[Job]:
+        """Get one of the user's jobs."""
+        return db.execute(
+            select(Job).where(Job.id == job_id, Job.user_id == user_id)
+        ).scalar_one_or_none()
+
+    @staticmethod
+    async def enqueue_async(
+        db: AsyncSession,
+        kind: str,
+        payload: Optional[dict] = None,
+        *,
+        user_id: Optional[int] = None,
+        priority: int = 0,
+        idempotency_key: Optional[str] = None,
+        run_at: Optional[datetime] = None,
+        max_attempts: Optional[int] = None,
+    ) -> Job:
+        """Async counterpart of enqueue."""
+        if idempotency_key is not None:
+            existing = (await db.execute(_by_key(idempotency_key))).scalar_one_or_none()
+            if existing is not None:
+                return _reuse(existing, user_id)
+        job = new_job(kind, payload, user_id, priority, idempotency_key, run_at, max_attempts)
+        await (await db.connection()).run_sync(begin_savepoint_transaction)
+        try:
+            async with db.begin_nested():
+                db.add(job)
+        except IntegrityError:
+            existing = None
+            if idempotency_key is not None:
+                existing = (await db.execute(_by_key(idempotency_key))).scalar_one_or_none()
+            if existing is None:
+                raise
+            return _reuse(existing, user_id)
+        db.info[QUEUED_INFO_KEY] = True
+        return job
+
+    @staticmethod
+    async def get_job_async(db: AsyncSession, job_id: int, user_id: int) -> Optional[Job]:
+        """Async counterpart of get_job."""
+        result = await db.execute(select(Job).where(Job.id == job_id, Job.user_id == user_id))
+        return result.scalar_one_or_none()
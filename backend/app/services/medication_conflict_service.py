@@ -0,0 +1,180 @@
+"""
+Conflicts of a medication with the rest of a family member's treatment.
+
+A medication being created or updated is checked against the member's other
+active medications and their ``allergy`` health records, read in two indexed
+queries; each check is a few lookups in the interaction index (see
+``app.core.drug_interactions``), so the cost grows with the member's active
+medications and allergies, not with the dataset. A bulk create reads them
+once for the whole batch and checks each medication against them and the
+active medications before it in the batch. Conflicts are warnings returned
+with the medication; they never block the write.
+"""
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.drug_interactions import InteractionIndex, get_interaction_index
+from app.models.models import HealthRecord, Medication
+
+INTERACTION = "interaction"
+ALLERGY = "allergy"
+
+# Health records of this type name something the member is allergic to
+ALLERGY_RECORD_TYPE = "allergy"
+
+# Severity of a medication the member is allergic to, and of one in a
+# cross-reactive class of an allergen
+DIRECT_ALLERGY_SEVERITY = "contraindicated"
+CROSS_REACTIVE_ALLERGY_SEVERITY = "major"
+
+
+class Conflict(NamedTuple):
+    """A medication's conflict with another medication or an allergy."""
+    kind: str
+    severity: str
+    description: str
+    medication_id: Optional[int]
+    health_record_id: Optional[int]
+    conflicting_with: str
+
+
+def active_medications_statement(member_id: int, exclude_id: Optional[int] = None) -> Select:
+    """ID and name of the member's active medications, other than ``exclude_id``."""
+    stmt = select(Medication.id, Medication.name).where(
+        Medication.family_member_id == member_id,
+        Medication.is_active.is_(True)
+    )
+    if exclude_id is not None:
+        stmt = stmt.where(Medication.id != exclude_id)
+    return stmt
+
+
+def allergies_statement(member_id: int) -> Select:
+    """ID and title of the member's allergy records."""
+    return select(HealthRecord.id, HealthRecord.title).where(
+        HealthRecord.family_member_id == member_id,
+        HealthRecord.record_type == ALLERGY_RECORD_TYPE
+    )
+
+
+def find_conflicts(
+    name: str,
+    medications: Iterable[Tuple[int, str]],
+    allergies: Iterable[Tuple[int, str]],
+    index: Optional[InteractionIndex] = None
+) -> List[Conflict]:
+    """
+    Conflicts of a medication called ``name`` with ``(id, name)`` medications
+    and ``(id, title)`` allergy records, most severe first.
+    """
+    index = index or get_interaction_index()
+    drugs = index.drugs_in(name)
+    if not drugs:
+        return []
+
+    conflicts = []
+    for record_id, title in allergies:
+        found = index.allergy(drugs, index.allergens_in(title))
+        if found is None:
+            continue
+        drug, allergen = found
+        if drug == allergen:
+            severity, description = DIRECT_ALLERGY_SEVERITY, f'Allergy recorded as "{title}".'
+        else:
+            severity = CROSS_REACTIVE_ALLERGY_SEVERITY
+            description = f'Allergy recorded as "{title}"; {drug} is one of the {allergen}.'
+        conflicts.append(Conflict(ALLERGY, severity, description, None, record_id, title))
+    for medication_id, other in medications:
+        interaction = index.interaction(drugs, index.drugs_in(other))
+        if interaction is not None:
+            conflicts.append(Conflict(
+                INTERACTION, interaction.severity, interaction.description, medication_id, None, other
+            ))
+
+    rank = {severity: i for i, severity in enumerate(index.severities)}
+    conflicts.sort(key=lambda conflict: rank.get(conflict.severity, len(rank)))
+    return conflicts
+
+
+def find_batch_conflicts(
+    medications: Sequence[Tuple[int, str, bool]],
+    active: Iterable[Tuple[int, str]],
+    allergies: Iterable[Tuple[int, str]],
+    index: Optional[InteractionIndex] = None
+) -> List[List[Conflict]]:
+    """
+    Conflicts of each of a batch of created ``(id, name, is_active)``
+    medications with the member's ``active`` medications, the active ones
+    before it in the batch and the allergies; none for inactive ones.
+    ``active`` may include the batch itself.
+    """
+    index = index or get_interaction_index()
+    batch_ids = {medication_id for medication_id, _, _ in medications}
+    others = [(medication_id, name) for medication_id, name in active if medication_id not in batch_ids]
+    allergies = list(allergies)
+    conflicts = []
+    for medication_id, name, is_active in medications:
+        if not is_active:
+            conflicts.append([])
+            continue
+        conflicts.append(find_conflicts(name, others, allergies, index))
+        others.append((medication_id, name))
+    return conflicts
+
+
+class MedicationConflictService:
+    """Service for checking medications against a family member's treatment."""
+
+    @staticmethod
+    def check(
+        db: Session, member_id: int, name: str, exclude_id: Optional[int] = None
+    ) -> List[Conflict]:
+        """
+        Conflicts of a medication called ``name`` with the member's active
+        medications (other than ``exclude_id``, the one being updated) and
+        allergies.
+        """
+        if not get_interaction_index().drugs_in(name):
+            return []
+        medications = db.execute(active_medications_statement(member_id, exclude_id)).all()
+        allergies = db.execute(allergies_statement(member_id)).all()
+        return find_conflicts(name, medications, allergies)
+
+    @staticmethod
+    async def check_async(
+        db: AsyncSession, member_id: int, name: str, exclude_id: Optional[int] = None
+    ) -> List[Conflict]:
+        """Async counterpart of check."""
+        if not get_interaction_index().drugs_in(name):
+            return []
+        medications = (await db.execute(active_medications_statement(member_id, exclude_id))).all()
+        allergies = (await db.execute(allergies_statement(member_id))).all()
+        return find_conflicts(name, medications, allergies)
+
+    @staticmethod
+    def check_batch(
+        db: Session, member_id: int, medications: Sequence[Tuple[int, str, bool]]
+    ) -> List[List[Conflict]]:
+        """
+        Conflicts of each of a batch of medications just created for the
+        member, as ``(id, name, is_active)``, in batch order.
+        """
+        if not any(is_active and get_interaction_index().drugs_in(name) for _, name, is_active in medications):
+            return [[] for _ in medications]
+        active = db.execute(active_medications_statement(member_id)).all()
+        allergies = db.execute(allergies_statement(member_id)).all()
+        return find_batch_conflicts(medications, active, allergies)
+
+    @staticmethod
+    async def check_batch_async(
+        db: AsyncSession, member_id: int, medications: Sequence[Tuple[int, str, bool]]
+    ) -> List[List[Conflict]]:
+        """Async counterpart of check_batch."""
+        if not any(is_active and get_interaction_index().drugs_in(name) for _, name, is_active in medications):
+            return [[] for _ in medications]
+        active = (await db.execute(active_medications_statement(member_id))).all()
+        allergies = (await db.execute(allergies_statement(member_id))).all()
+        return find_batch_conflicts(medications, active, allergies)
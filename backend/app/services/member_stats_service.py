@@ -0,0 +1,156 @@
+"""
+Transactional maintenance of the member_stats rollup.
+
+The record, medication, appointment and family member services call these
+after flushing a change and before committing it, so the rollup commits or
+rolls back together with the change. The member's row is locked while it is
+updated; a member with no row yet gets one computed from scratch.
+"""
+from datetime import datetime
+from functools import partial
+from typing import Callable, Iterable, Set
+
+from sqlalchemy import Select, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.member_stats import (
+    LATEST_RECORD,
+    NEXT_APPOINTMENT,
+    AppointmentKey,
+    RecordKey,
+    apply_appointments,
+    apply_medications,
+    apply_records,
+    build_stats,
+    latest_record_statement,
+    next_appointment_statement,
+    set_next_appointment,
+    stats_statements,
+)
+from app.models.models import MemberStats
+
+# Applies a change to a member's statistics and names the fields it made stale.
+Change = Callable[[MemberStats, datetime], Set[str]]
+
+
+def _locked_stats(member_id: int) -> Select:
+    return select(MemberStats).where(MemberStats.family_member_id == member_id).with_for_update()
+
+
+class MemberStatsService:
+    """Service keeping member statistics in step with record changes."""
+
+    @staticmethod
+    def _update(db: Session, member_id: int, change: Change) -> None:
+        now = datetime.utcnow()
+        stats = db.execute(_locked_stats(member_id)).scalar_one_or_none()
+        if stats is None:
+            # Already includes the flushed change
+            results = [db.execute(stmt).all() for stmt in stats_statements([member_id], now)]
+            db.add(MemberStats(**build_stats(*results, now=now)[0]))
+            return
+
+        stale = change(stats, now)
+        if LATEST_RECORD in stale:
+            stats.latest_record_date = db.execute(latest_record_statement(member_id)).scalar()
+        if NEXT_APPOINTMENT in stale:
+            set_next_appointment(stats, db.execute(next_appointment_statement(member_id, now)).first())
+
+    @staticmethod
+    def records_changed(
+        db: Session,
+        member_id: int,
+        removed: Iterable[RecordKey] = (),
+        added: Iterable[RecordKey] = ()
+    ) -> None:
+        """Apply health records removed from and added to a family member."""
+        MemberStatsService._update(db, member_id, partial(apply_records, removed=removed, added=added))
+
+    @staticmethod
+    def medications_added(db: Session, member_id: int, active: Iterable[bool]) -> None:
+        """Apply medications added to a family member, given whether each is active."""
+        MemberStatsService._update(db, member_id, partial(apply_medications, active=active))
+
+    @staticmethod
+    def medication_updated(db: Session, member_id: int, was_active: bool, is_active: bool) -> None:
+        """Apply a medication update that may have started or stopped it."""
+        MemberStatsService._update(
+            db, member_id, partial(apply_medications, active=[is_active], removed=[was_active])
+        )
+
+    @staticmethod
+    def appointments_changed(
+        db: Session,
+        member_id: int,
+        removed: Iterable[AppointmentKey] = (),
+        added: Iterable[AppointmentKey] = ()
+    ) -> None:
+        """Apply appointments removed from and added to a family member."""
+        MemberStatsService._update(
+            db, member_id, partial(apply_appointments, removed=removed, added=added)
+        )
+
+    @staticmethod
+    def member_deleted(db: Session, member_id: int) -> None:
+        """Drop the statistics of a family member about to be deleted."""
+        db.execute(delete(MemberStats).where(MemberStats.family_member_id == member_id))
+
+    @staticmethod
+    async def _update_async(db: AsyncSession, member_id: int, change: Change) -> None:
+        now = datetime.utcnow()
+        stats = (await db.execute(_locked_stats(member_id))).scalar_one_or_none()
+        if stats is None:
+            results = [(await db.execute(stmt)).all() for stmt in stats_statements([member_id], now)]
+            db.add(MemberStats(**build_stats(*results, now=now)[0]))
+            return
+
+        stale = change(stats, now)
+        if LATEST_RECORD in stale:
+            stats.latest_record_date = (await db.execute(latest_record_statement(member_id))).scalar()
+        if NEXT_APPOINTMENT in stale:
+            row = (await db.execute(next_appointment_statement(member_id, now))).first()
+            set_next_appointment(stats, row)
+
+    @staticmethod
+    async def records_changed_async(
+        db: AsyncSession,
+        member_id: int,
+        removed: Iterable[RecordKey] = (),
+        added: Iterable[RecordKey] = ()
+    ) -> None:
+        """Async counterpart of records_changed."""
+        await MemberStatsService._update_async(
+            db, member_id, partial(apply_records, removed=removed, added=added)
+        )
+
+    @staticmethod
+    async def medications_added_async(db: AsyncSession, member_id: int, active: Iterable[bool]) -> None:
+        """Async counterpart of medications_added."""
+        await MemberStatsService._update_async(db, member_id, partial(apply_medications, active=active))
+
+    @staticmethod
+    async def medication_updated_async(
+        db: AsyncSession, member_id: int, was_active: bool, is_active: bool
+    ) -> None:
+        """Async counterpart of medication_updated."""
+        await MemberStatsService._update_async(
+            db, member_id, partial(apply_medications, active=[is_active], removed=[was_active])
+        )
+
+    @staticmethod
+    async def appointments_changed_async(
+        db: AsyncSession,
+        member_id: int,
+        removed: Iterable[AppointmentKey] = (),
+        added: Iterable[AppointmentKey] = ()
+    ) -> None:
+        """Async counterpart of appointments_changed."""
+        await MemberStatsService._update_async(
+            db, member_id, partial(apply_appointments, removed=removed, added=added)
+        )
+
+    @staticmethod
+    async def member_deleted_async(db: AsyncSession, member_id: int) -> None:
+        """Async counterpart of member_deleted."""
+        await db.execute(delete(MemberStats).where(MemberStats.family_member_id == member_id))
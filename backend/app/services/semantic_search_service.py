@@ -0,0 +1,177 @@
+"""
+Semantic search over health records.
+
+Record writes queue the embedding worker through the records_created,
+record_updated and records_deleted hooks; search embeds the query and ranks the user's embedded records
+by cosine similarity, in SQL or through the configured vector index.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import anyio
+from sqlalchemy import Select, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.embeddings import get_embedding_backend
+from app.db.embeddings import (
+    QUEUED_INFO_KEY,
+    REMOVED_INFO_KEY,
+    candidates_statement,
+    content_hash,
+    get_vector_index,
+    record_text,
+    top_matches,
+)
+from app.models.models import FamilyMember, HealthRecord, RecordEmbedding
+
+# (record ID, title, description, notes) of a written health record.
+RecordContent = Tuple[int, str, Optional[str], Optional[str]]
+
+# A search result: the record and its cosine similarity to the query.
+SemanticHit = Tuple[HealthRecord, float]
+
+
+def queue_rows(records: Sequence[RecordContent]) -> List[dict]:
+    """record_embeddings rows queueing records for the worker."""
+    return [
+        {"record_id": record_id, "content_hash": content_hash(record_text(title, description, notes))}
+        for record_id, title, description, notes in records
+    ]
+
+
+def records_statement(record_ids: Sequence[int], user_id: int) -> Select:
+    """The user's health records among ``record_ids``."""
+    return select(HealthRecord).join(FamilyMember).where(
+        HealthRecord.id.in_(record_ids), FamilyMember.user_id == user_id
+    )
+
+
+def embed_query(query: str) -> Tuple[str, List[float]]:
+    """The backend name and the query vector."""
+    backend = get_embedding_backend()
+    return backend.name, backend.embed([query])[0]
+
+
+def requeue(row: Optional[RecordEmbedding], record: RecordContent) -> Optional[RecordEmbedding]:
+    """
+    Queue a record whose text may have changed; returns a new row to add, or
+    None when the existing row was reset or is still current.
+    """
+    digest = queue_rows([record])[0]["content_hash"]
+    if row is None:
+        return RecordEmbedding(record_id=record[0], content_hash=digest)
+    if row.content_hash != digest:
+        row.content_hash = digest
+        row.vector = None
+    return None
+
+
+def ranked(records: Sequence[HealthRecord], matches: Sequence[Tuple[int, float]]) -> List[SemanticHit]:
+    """Pair loaded records with their scores, best first."""
+    by_id: Dict[int, HealthRecord] = {record.id: record for record in records}
+    return [(by_id[record_id], score) for record_id, score in matches if record_id in by_id]
+
+
+class SemanticSearchService:
+    """Service for semantic health record search."""
+
+    @staticmethod
+    def records_created(db: Session, records: Sequence[RecordContent]) -> None:
+        """Queue new records for embedding; call after flush, before commit."""
+        if records:
+            db.execute(insert(RecordEmbedding), queue_rows(records))
+            db.info[QUEUED_INFO_KEY] = True
+
+    @staticmethod
+    def record_updated(db: Session, record: RecordContent) -> None:
+        """Queue an updated record again if its text changed."""
+        row = db.get(RecordEmbedding, record[0])
+        new_row = requeue(row, record)
+        if new_row is not None:
+            db.add(new_row)
+        if new_row is not None or row.vector is None:
+            db.info[QUEUED_INFO_KEY] = True
+
+    @staticmethod
+    def records_deleted(db: Session, record_ids: Sequence[int]) -> None:
+        """
+        Drop the embeddings of records about to be deleted; their vectors
+        leave the vector index once the transaction commits.
+        """
+        db.execute(delete(RecordEmbedding).where(RecordEmbedding.record_id.in_(record_ids)))
+        if get_vector_index() is not None:
+            db.info.setdefault(REMOVED_INFO_KEY, []).extend(record_ids)
+
+    @staticmethod
+    def search(
+        db: Session,
+        user_id: int,
+        query: str,
+        limit: int = 10,
+        record_type: Optional[str] = None
+    ) -> List[SemanticHit]:
+        """The user's records most similar in meaning to the query, best first."""
+        model, vector = embed_query(query)
+        if not any(vector):
+            return []
+
+        index = get_vector_index()
+        if index is None:
+            rows = db.execute(candidates_statement(user_id, model, record_type))
+            matches = top_matches(vector, rows, limit)
+        else:
+            matches = index.search(user_id, vector, limit, record_type)
+        if not matches:
+            return []
+
+        records = db.execute(records_statement([m[0] for m in matches], user_id)).scalars().all()
+        return ranked(records, matches)
+
+    @staticmethod
+    async def records_created_async(db: AsyncSession, records: Sequence[RecordContent]) -> None:
+        """Async counterpart of records_created."""
+        if records:
+            await db.execute(insert(RecordEmbedding), queue_rows(records))
+            db.info[QUEUED_INFO_KEY] = True
+
+    @staticmethod
+    async def record_updated_async(db: AsyncSession, record: RecordContent) -> None:
+        """Async counterpart of record_updated."""
+        row = await db.get(RecordEmbedding, record[0])
+        new_row = requeue(row, record)
+        if new_row is not None:
+            db.add(new_row)
+        if new_row is not None or row.vector is None:
+            db.info[QUEUED_INFO_KEY] = True
+
+    @staticmethod
+    async def records_deleted_async(db: AsyncSession, record_ids: Sequence[int]) -> None:
+        """Async counterpart of records_deleted."""
+        await db.execute(delete(RecordEmbedding).where(RecordEmbedding.record_id.in_(record_ids)))
+        if get_vector_index() is not None:
+            db.info.setdefault(REMOVED_INFO_KEY, []).extend(record_ids)
+
+    @staticmethod
+    async def search_async(
+        db: AsyncSession,
+        user_id: int,
+        query: str,
+        limit: int = 10,
+        record_type: Optional[str] = None
+    ) -> List[SemanticHit]:
+        """Async counterpart of search; embedding and scoring run on a worker thread."""
+        model, vector = await anyio.to_thread.run_sync(embed_query, query)
+        if not any(vector):
+            return []
+
+        index = get_vector_index()
+        if index is None:
+            rows = (await db.execute(candidates_statement(user_id, model, record_type))).all()
+            matches = await anyio.to_thread.run_sync(top_matches, vector, rows, limit)
+        else:
+            matches = await anyio.to_thread.run_sync(index.search, user_id, vector, limit, record_type)
+        if not matches:
+            return []
+
+        result = await db.execute(records_statement([m[0] for m in matches], user_id))
+        return ranked(result.scalars().all(), matches)
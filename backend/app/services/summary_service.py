@@ -0,0 +1,182 @@
+"""
+Dashboard summaries of family members, read from the member_stats rollup.
+
+A member's summary is their ``member_stats`` row joined to the member and to
+the next appointment by primary key, so its cost does not depend on the size
+of the history. Members without a row yet, and next appointments that have
+since passed, are computed on the spot for just those members.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.member_stats import build_stats, next_appointment_id, stats_statements
+from app.models.models import Appointment, FamilyMember, MemberStats
+from app.schemas.schemas import AppointmentBrief, FamilyMemberSummary, HouseholdSummary
+
+
+def summary_statement(user_id: int, member_id: Optional[int] = None) -> Select:
+    """Members of a household, or one member, with their statistics row."""
+    stmt = select(
+        FamilyMember.id,
+        FamilyMember.full_name,
+        FamilyMember.relation_type,
+        MemberStats.family_member_id,
+        MemberStats.record_counts,
+        MemberStats.total_records,
+        MemberStats.latest_record_date,
+        MemberStats.active_medications,
+        MemberStats.next_appointment_id,
+        Appointment.title,
+        MemberStats.next_appointment_date,
+    ).outerjoin(MemberStats, MemberStats.family_member_id == FamilyMember.id).outerjoin(
+        Appointment, Appointment.id == MemberStats.next_appointment_id
+    ).where(FamilyMember.user_id == user_id)
+    if member_id is not None:
+        stmt = stmt.where(FamilyMember.id == member_id)
+    return stmt.order_by(FamilyMember.created_at, FamilyMember.id)
+
+
+def upcoming_statement(member_ids: Sequence[int], now: datetime) -> Select:
+    """``(member ID, appointment ID, title, date)`` of some members' next appointments."""
+    return select(
+        FamilyMember.id, Appointment.id, Appointment.title, Appointment.appointment_date
+    ).join(Appointment, Appointment.id == next_appointment_id(now)).where(
+        FamilyMember.id.in_(member_ids)
+    )
+
+
+def build_summaries(
+    rows: Sequence[Row], now: datetime
+) -> Tuple[Dict[int, FamilyMemberSummary], List[int], List[int]]:
+    """
+    Summaries from the rows of summary_statement, with the IDs of members
+    that have no statistics row and of those whose next appointment is past.
+    """
+    summaries: Dict[int, FamilyMemberSummary] = {}
+    missing, stale = [], []
+    for (member_id, full_name, relationship, stats_id, record_counts, total_records,
+         latest_record_date, active_medications, appointment_id, title, appointment_date) in rows:
+        summary = summaries[member_id] = FamilyMemberSummary(
+            family_member_id=member_id, full_name=full_name, relationship=relationship
+        )
+        if stats_id is None:
+            missing.append(member_id)
+            continue
+        summary.record_counts = dict(record_counts or {})
+        summary.total_records = total_records
+        summary.latest_record_date = latest_record_date
+        summary.active_medications = active_medications
+        if appointment_date is None:
+            continue
+        if appointment_date < now or title is None:
+            stale.append(member_id)
+        else:
+            summary.next_appointment = AppointmentBrief(
+                id=appointment_id, title=title, appointment_date=appointment_date
+            )
+    return summaries, missing, stale
+
+
+def fill_counts(summaries: Dict[int, FamilyMemberSummary], stats: Sequence[dict]) -> None:
+    """Copy statistics computed by build_stats into summaries."""
+    for row in stats:
+        summary = summaries[row["family_member_id"]]
+        summary.record_counts = row["record_counts"]
+        summary.total_records = row["total_records"]
+        summary.latest_record_date = row["latest_record_date"]
+        summary.active_medications = row["active_medications"]
+
+
+def fill_next_appointments(summaries: Dict[int, FamilyMemberSummary], rows: Sequence[Row]) -> None:
+    """Set next appointments from the rows of upcoming_statement."""
+    for member_id, appointment_id, title, appointment_date in rows:
+        summaries[member_id].next_appointment = AppointmentBrief(
+            id=appointment_id, title=title, appointment_date=appointment_date
+        )
+
+
+def household_summary(members: List[FamilyMemberSummary]) -> HouseholdSummary:
+    """Combine member summaries into household totals."""
+    household = HouseholdSummary(members=members)
+    for member in members:
+        for record_type, count in member.record_counts.items():
+            totals = household.record_counts
+            totals[record_type] = totals.get(record_type, 0) + count
+        household.total_records += member.total_records
+        household.active_medications += member.active_medications
+        if member.latest_record_date is not None and (
+            household.latest_record_date is None
+            or member.latest_record_date > household.latest_record_date
+        ):
+            household.latest_record_date = member.latest_record_date
+        upcoming = member.next_appointment
+        if upcoming is not None and (
+            household.next_appointment is None
+            or upcoming.appointment_date < household.next_appointment.appointment_date
+        ):
+            household.next_appointment = upcoming
+    return household
+
+
+class SummaryService:
+    """Service for family member dashboard summaries."""
+
+    @staticmethod
+    def _summaries(
+        db: Session, user_id: int, member_id: Optional[int] = None
+    ) -> List[FamilyMemberSummary]:
+        now = datetime.utcnow()
+        rows = db.execute(summary_statement(user_id, member_id)).all()
+        summaries, missing, stale = build_summaries(rows, now)
+        if missing:
+            results = [db.execute(stmt).all() for stmt in stats_statements(missing, now)]
+            fill_counts(summaries, build_stats(*results, now=now))
+        if missing or stale:
+            upcoming = db.execute(upcoming_statement(missing + stale, now)).all()
+            fill_next_appointments(summaries, upcoming)
+        return list(summaries.values())
+
+    @staticmethod
+    def get_member_summary(
+        db: Session, member_id: int, user_id: int
+    ) -> Optional[FamilyMemberSummary]:
+        """Summary of one family member, or None if it is not the user's."""
+        summaries = SummaryService._summaries(db, user_id, member_id)
+        return summaries[0] if summaries else None
+
+    @staticmethod
+    def get_household_summary(db: Session, user_id: int) -> HouseholdSummary:
+        """Summaries of all the user's family members with household totals."""
+        return household_summary(SummaryService._summaries(db, user_id))
+
+    @staticmethod
+    async def _summaries_async(
+        db: AsyncSession, user_id: int, member_id: Optional[int] = None
+    ) -> List[FamilyMemberSummary]:
+        now = datetime.utcnow()
+        rows = (await db.execute(summary_statement(user_id, member_id))).all()
+        summaries, missing, stale = build_summaries(rows, now)
+        if missing:
+            results = [(await db.execute(stmt)).all() for stmt in stats_statements(missing, now)]
+            fill_counts(summaries, build_stats(*results, now=now))
+        if missing or stale:
+            upcoming = (await db.execute(upcoming_statement(missing + stale, now))).all()
+            fill_next_appointments(summaries, upcoming)
+        return list(summaries.values())
+
+    @staticmethod
+    async def get_member_summary_async(
+        db: AsyncSession, member_id: int, user_id: int
+    ) -> Optional[FamilyMemberSummary]:
+        """Async counterpart of get_member_summary."""
+        summaries = await SummaryService._summaries_async(db, user_id, member_id)
+        return summaries[0] if summaries else None
+
+    @staticmethod
+    async def get_household_summary_async(db: AsyncSession, user_id: int) -> HouseholdSummary:
+        """Async counterpart of get_household_summary."""
+        return household_summary(await SummaryService._summaries_async(db, user_id))
@@ -4,31 +4,60 @@ from datetime import timedelta
 from typing import Optional
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.hashing import password_hasher
+from app.core.security import create_access_token
+from app.db.loading import LoadingProfile, loader_options
 from app.models.models import User
 from app.schemas.schemas import UserCreate, UserUpdate
 from app.core.config import settings
 
 
+def _release_connection(db: Session) -> None:
+    """Return the session's connection to the pool before waiting on bcrypt.
+
+    Loaded objects stay usable (closing detaches without expiring them) and
+    the session reconnects on next use.
+    """
+    db.close()
+
+
 class UserService:
     """Service for user management operations."""
 
     @staticmethod
-    def get_user(db: Session, user_id: int) -> Optional[User]:
+    def get_user(
+        db: Session,
+        user_id: int,
+        profile: LoadingProfile = LoadingProfile.PRINCIPAL_ONLY
+    ) -> Optional[User]:
         """Get user by ID."""
-        return db.query(User).filter(User.id == user_id).first()
+        return db.query(User).options(*loader_options(User, profile)).filter(
+            User.id == user_id
+        ).first()
 
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    def get_user_by_email(
+        db: Session,
+        email: str,
+        profile: LoadingProfile = LoadingProfile.PRINCIPAL_ONLY
+    ) -> Optional[User]:
         """Get user by email."""
-        return db.query(User).filter(User.email == email).first()
+        return db.query(User).options(*loader_options(User, profile)).filter(
+            User.email == email
+        ).first()
 
     @staticmethod
-    def create_user(db: Session, user: UserCreate) -> User:
+    async def create_user(db: Session, user: UserCreate) -> User:
         """Create a new user."""
+        _release_connection(db)
+        hashed_password = await password_hasher.hash(user.password)
+        return await run_in_threadpool(UserService._insert_user, db, user, hashed_password)
+
+    @staticmethod
+    def _insert_user(db: Session, user: UserCreate, hashed_password: str) -> User:
         try:
-            hashed_password = get_password_hash(user.password)
             db_user = User(
                 email=user.email,
                 full_name=user.full_name,
@@ -45,26 +74,32 @@ class UserService:
             raise ValueError("User with this email already exists")
 
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password."""
-        user = UserService.get_user_by_email(db, email)
+        user = await run_in_threadpool(UserService.get_user_by_email, db, email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        _release_connection(db)
+        if not await password_hasher.verify(password, user.hashed_password):
             return None
         return user
 
     @staticmethod
-    def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[User]:
+    async def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[User]:
         """Update user information."""
+        update_data = user_update.dict(exclude_unset=True)
+        if "password" in update_data:
+            _release_connection(db)
+            update_data["hashed_password"] = await password_hasher.hash(update_data.pop("password"))
+
+        return await run_in_threadpool(UserService._apply_update, db, user_id, update_data)
+
+    @staticmethod
+    def _apply_update(db: Session, user_id: int, update_data: dict) -> Optional[User]:
         db_user = UserService.get_user(db, user_id)
         if not db_user:
             return None
         
-        update_data = user_update.dict(exclude_unset=True)
-        if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
-        
         for field, value in update_data.items():
             setattr(db_user, field, value)
         
@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the PHRM backend.
+
+Run from the ``backend`` directory, e.g. ``python -m benchmarks.fts_search``.
+"""
@@ -0,0 +1,88 @@
+"""
+Compare bulk and single-item create throughput.
+
+Imports ``--rows`` health records, medications and appointments for one family
+member through the in-process app, once with one POST per item and once with
+the bulk endpoints in batches of ``--batch``, and reports rows/sec::
+
+    python -m benchmarks.bulk_create --rows 2000 --batch 500
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+KINDS = ("records", "medications", "appointments")
+
+
+def payload(kind: str, i: int) -> dict:
+    """A create body for the given kind."""
+    when = datetime(2024, 1, 1) + timedelta(hours=i)
+    if kind == "records":
+        return {"record_type": "lab", "title": f"Blood panel {i}", "date_recorded": when.isoformat()}
+    if kind == "medications":
+        return {"name": f"Drug {i}", "dosage": "10mg", "frequency": "daily",
+                "start_date": when.date().isoformat()}
+    return {"title": f"Visit {i}", "appointment_date": when.isoformat()}
+
+
+async def run(rows: int, batch: int) -> None:
+    """Import the rows both ways and print rows/sec per kind."""
+    import httpx
+
+    from app.db.init_db import init_db
+    from app.main import app
+
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        credentials = {"email": "bulk@example.com", "password": "benchmark"}
+        (await client.post("/api/v1/auth/register", json=credentials)).raise_for_status()
+        response = await client.post("/api/v1/auth/login/json", json=credentials)
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        response = await client.post(
+            "/api/v1/family-members/", headers=headers,
+            json={"full_name": "Bulk Member", "relationship": "child"},
+        )
+        base = f"/api/v1/health-records/family-members/{response.json()['id']}"
+
+        for kind in KINDS:
+            items = [payload(kind, i) for i in range(rows)]
+
+            start = time.perf_counter()
+            for item in items:
+                (await client.post(f"{base}/{kind}", headers=headers, json=item)).raise_for_status()
+            single = rows / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for offset in range(0, rows, batch):
+                r = await client.post(
+                    f"{base}/{kind}/bulk", headers=headers, json=items[offset:offset + batch]
+                )
+                r.raise_for_status()
+            bulk = rows / (time.perf_counter() - start)
+
+            print(f"{kind:>12}: single {single:9.0f} rows/s  bulk {bulk:9.0f} rows/s  "
+                  f"({bulk / single:.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000, help="rows per kind")
+    parser.add_argument("--batch", type=int, default=500, help="items per bulk request")
+    parser.add_argument("--async-db", action="store_true", help="use the async database path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings are read at import time, so configure them before the app loads
+        os.environ.update(
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            DATABASE_ASYNC="1" if args.async_db else "0",
+        )
+        asyncio.run(run(args.rows, args.batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark the sync and async database paths under concurrent load.
+
+Seeds a throwaway SQLite database, then runs the API once per mode in a
+separate process (``DATABASE_ASYNC`` is read at import time) and drives it
+through httpx's ASGI transport with ``--concurrency`` simulated clients::
+
+    python -m benchmarks.db_modes --concurrency 64 --requests 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROUTES = (
+    "/api/v1/auth/me",
+    "/api/v1/family-members/",
+    "/api/v1/health-records/?limit=50",
+    "/api/v1/health-records/?search=checkup&limit=20",
+)
+EMAIL = "bench@example.com"
+PASSWORD = "benchmark"
+
+
+def seed(database_uri: str, members: int, records: int) -> None:
+    """Create one user with ``members`` family members and ``records`` records each."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.core.security import get_password_hash
+    from app.db.fts import create_search_index
+    from app.models.models import Base, FamilyMember, HealthRecord, User
+
+    engine = create_engine(database_uri)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        user = User(email=EMAIL, hashed_password=get_password_hash(PASSWORD))
+        db.add(user)
+        db.flush()
+        start = datetime(2024, 1, 1)
+        for m in range(members):
+            member = FamilyMember(user_id=user.id, full_name=f"Member {m}", relation_type="child")
+            db.add(member)
+            db.flush()
+            db.add_all(
+                HealthRecord(
+                    family_member_id=member.id,
+                    record_type="checkup" if i % 3 else "condition",
+                    title=f"Annual checkup {i}" if i % 3 else f"Condition {i}",
+                    description="Routine visit with blood work",
+                    date_recorded=start + timedelta(days=i),
+                )
+                for i in range(records)
+            )
+        db.commit()
+    create_search_index(engine)
+    engine.dispose()
+
+
+async def drive(concurrency: int, requests: int) -> dict:
+    """Run the load against the in-process app and return per-mode statistics."""
+    import httpx
+
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post(
+            "/api/v1/auth/login/json", json={"email": EMAIL, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        latencies = []
+        errors = 0
+
+        async def user(n: int) -> None:
+            nonlocal errors
+            for i in range(requests):
+                route = ROUTES[(n + i) % len(ROUTES)]
+                start = time.perf_counter()
+                r = await client.get(route, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if r.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--members", type=int, default=5)
+    parser.add_argument("--records", type=int, default=200, help="records per member")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(drive(args.concurrency, args.requests))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(database_uri, args.members, args.records)
+
+        for mode, flag in (("sync", "0"), ("async", "1")):
+            env = dict(os.environ, SQLALCHEMY_DATABASE_URI=database_uri, DATABASE_ASYNC=flag)
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.db_modes", "--worker",
+                 "--concurrency", str(args.concurrency), "--requests", str(args.requests)],
+                env=env, check=True, capture_output=True, text=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{mode:>5}: {result['rps']:8.1f} req/s  p50 {result['p50_ms']:7.1f} ms  "
+                f"p99 {result['p99_ms']:7.1f} ms  ({result['requests']} requests, "
+                f"{result['errors']} errors)"
+            )
+
+
+if __name__ == "__main__":
+    main()
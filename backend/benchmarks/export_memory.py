@@ -0,0 +1,145 @@
+"""
+Benchmark the streaming export's time and memory at scale.
+
+Seeds a small and a large household in a throwaway SQLite database, drains
+the NDJSON and CSV exports of each through the sync and async services and
+reports the traced Python heap peak. Exits non-zero if any export of the
+large household peaks above ``--ceiling-mb``::
+
+    python -m benchmarks.export_memory --rows 1000000 --ceiling-mb 16
+
+``tests/test_export_memory.py`` checks the same at a size the test suite runs.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+
+def seed(database_uri: str, email: str, members: int, rows: int) -> int:
+    """Create a household of ``rows`` records, medications and appointments; return its user ID."""
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import Session
+
+    from app.models.models import Appointment, Base, FamilyMember, HealthRecord, Medication, User
+
+    engine = create_engine(database_uri)
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2020, 1, 1)
+    now = datetime.utcnow()
+    with Session(engine) as db:
+        user = User(email=email, hashed_password="x")
+        db.add(user)
+        db.flush()
+        member_ids = []
+        for m in range(members):
+            member = FamilyMember(user_id=user.id, full_name=f"Member {m}", relation_type="child")
+            db.add(member)
+            db.flush()
+            member_ids.append(member.id)
+
+        batch = []
+        for i in range(rows):
+            member_id = member_ids[i % members]
+            when = start + timedelta(minutes=i)
+            kind = i % 3
+            batch.append((kind, {
+                "family_member_id": member_id, "created_at": now, "updated_at": now,
+                **(
+                    {"record_type": "lab", "title": f"Panel {i}", "description": "Routine blood work",
+                     "date_recorded": when} if kind == 0 else
+                    {"name": f"Drug {i}", "dosage": "10mg", "frequency": "daily",
+                     "start_date": when, "is_active": True} if kind == 1 else
+                    {"title": f"Visit {i}", "appointment_date": when, "status": "scheduled"}
+                ),
+            }))
+            if len(batch) == 10000 or i == rows - 1:
+                for kind, model in enumerate((HealthRecord, Medication, Appointment)):
+                    params = [row for k, row in batch if k == kind]
+                    if params:
+                        db.execute(insert(model.__table__), params)
+                batch = []
+        db.commit()
+        user_id = user.id
+    engine.dispose()
+    return user_id
+
+
+def measure_sync(user_id: int, export_format) -> tuple:
+    """Drain a sync export; return (bytes, seconds, peak MB)."""
+    from app.db.session import SessionLocal
+    from app.services.export_service import ExportService
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = 0
+    with SessionLocal() as db:
+        for chunk in ExportService.stream_export(db, user_id, export_format):
+            size += len(chunk)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def measure_async(user_id: int, export_format) -> tuple:
+    """Drain an async export; return (bytes, seconds, peak MB)."""
+    from app.db.session import AsyncSessionLocal, async_engine
+    from app.services.export_service import ExportService
+
+    async def drain() -> int:
+        size = 0
+        async with AsyncSessionLocal() as db:
+            async for chunk in ExportService.stream_export_async(db, user_id, export_format):
+                size += len(chunk)
+        await async_engine.dispose()
+        return size
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = asyncio.run(drain())
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000, help="rows in the large household")
+    parser.add_argument("--small-rows", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=4)
+    parser.add_argument("--ceiling-mb", type=float, default=16.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # Settings are read at import time, so configure them before the app loads
+        os.environ["SQLALCHEMY_DATABASE_URI"] = database_uri
+        households = {
+            "small": (args.small_rows, seed(database_uri, "small@example.com", args.members, args.small_rows)),
+            "large": (args.rows, seed(database_uri, "large@example.com", args.members, args.rows)),
+        }
+
+        from app.services.export_service import ExportFormat
+
+        over = False
+        for name, (rows, user_id) in households.items():
+            for export_format in ExportFormat:
+                for mode, measure in (("sync", measure_sync), ("async", measure_async)):
+                    size, elapsed, peak = measure(user_id, export_format)
+                    print(f"{name:>5} {rows:>8} rows {export_format.value:>6} {mode:>5}: "
+                          f"{size / 2**20:8.1f} MB in {elapsed:6.2f}s, peak heap {peak:6.2f} MB")
+                    over |= name == "large" and peak > args.ceiling_mb
+
+    if over:
+        print(f"export exceeded the {args.ceiling_mb} MB ceiling", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
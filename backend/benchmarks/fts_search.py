@@ -0,0 +1,136 @@
+"""
+Benchmark FTS5 search against the ILIKE fallback.
+
+Seeds a throwaway SQLite database with ``--rows`` health records spread over
+``--users`` households, using a Zipf-distributed vocabulary so that common and
+rare terms both occur, and times ``HealthRecordService`` search for the first
+household through both paths::
+
+    python -m benchmarks.fts_search --rows 100000
+    python -m benchmarks.fts_search --rows 1000000 --queries 20
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.fts import create_search_index
+from app.models.models import Base
+from app.services.health_record_service import HealthRecordService
+
+MEDICAL_TERMS = (
+    "checkup follow-up blood test prescription vaccination screening referral therapy "
+    "asthma allergy diabetes hypertension fracture migraine influenza bronchitis "
+    "cholesterol thyroid eczema arthritis anemia infection surgery ultrasound biopsy "
+    "pneumonia sinusitis dermatitis tonsillitis gastritis insomnia scoliosis glaucoma"
+).split()
+# Common medical terms first, then a long tail of rarer tokens.
+VOCABULARY = MEDICAL_TERMS + [f"term{i:04d}" for i in range(3000)]
+CUM_WEIGHTS = list(itertools.accumulate(1.0 / rank for rank in range(1, len(VOCABULARY) + 1)))
+DOCTORS = [f"Dr. {name}" for name in (
+    "Smith Patel Garcia Chen Okafor Novak Müller Rossi Tanaka Silva Kowalski Haddad".split()
+)]
+QUERIES = ["diabetes", "asthma follow", "thyro", '"blood test"', "Patel", "glaucoma", "term0420"]
+
+
+def seed(engine, rows: int, users: int, rng: random.Random) -> None:
+    """Insert ``users`` households of four members sharing ``rows`` health records."""
+    now = "2025-01-01 00:00:00"
+    members = users * 4
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.executemany(
+            "INSERT INTO users (id, email, hashed_password, is_active, is_superuser, "
+            "created_at, updated_at) VALUES (?, ?, 'x', 1, 0, ?, ?)",
+            [(i, f"bench{i}@example.com", now, now) for i in range(1, users + 1)],
+        )
+        cur.executemany(
+            "INSERT INTO family_members (id, user_id, full_name, relation_type, "
+            "emergency_contact, created_at, updated_at) VALUES (?, ?, ?, 'child', 0, ?, ?)",
+            [(i, (i - 1) // 4 + 1, f"Member {i}", now, now) for i in range(1, members + 1)],
+        )
+        batch = []
+        for i in range(1, rows + 1):
+            words = rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=8)
+            day = datetime(2025, 1, 1) - timedelta(days=rng.randint(0, 3650))
+            batch.append((
+                i, rng.randint(1, members), "condition",
+                " ".join(words[:3]).title(), " ".join(words) + ".",
+                day.isoformat(" "), rng.choice(DOCTORS), now, now,
+            ))
+            if len(batch) == 10_000:
+                _insert_records(cur, batch)
+                batch.clear()
+        _insert_records(cur, batch)
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def _insert_records(cur, batch) -> None:
+    cur.executemany(
+        "INSERT INTO health_records (id, family_member_id, record_type, title, description, "
+        "date_recorded, doctor_name, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        batch,
+    )
+
+
+def time_queries(search, db, queries: int) -> list:
+    """Return per-call latencies in milliseconds."""
+    samples = []
+    for i in range(queries):
+        term = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        search(db, 1, term, None, None, 50)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+
+        start = time.perf_counter()
+        seed(engine, args.rows, args.users, random.Random(args.seed))
+        print(f"Seeded {args.rows:,} records in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        create_search_index(engine)
+        print(f"Built FTS index in {time.perf_counter() - start:.1f}s\n")
+
+        db = sessionmaker(bind=engine)()
+        try:
+            for name, search in (
+                ("ilike", HealthRecordService._search_like),
+                ("fts5", HealthRecordService._search_fts),
+            ):
+                search(db, 1, QUERIES[0], None, None, 50)  # warm up
+                samples = sorted(time_queries(search, db, args.queries))
+                p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+                print(
+                    f"{name:>6}: mean {statistics.mean(samples):8.2f} ms  "
+                    f"p50 {statistics.median(samples):8.2f} ms  p95 {p95:8.2f} ms"
+                )
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+In-process HTTP load test of the API.
+
+Seeds a throwaway database with one synthetic household (see ``app.db.seed``)
+per simulated user, then drives
+``app.main.app`` through httpx's ASGI transport. Every simulated user logs in
+and repeatedly opens the family list, a member's detail page and record list,
+searches their records and files a new record. Reports requests/sec and
+p50/p95/p99 latency per route, optionally as JSON to diff between commits::
+
+    python -m benchmarks.http_load --users 50 --iterations 20 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+SEARCH_TERMS = ("checkup", "blood", "allergy", "x-ray", "cholesterol", "vaccination", "\"blood pressure\"")
+
+
+def seed(database_uri: str, users: int, records_median: float, seed: int) -> None:
+    """Create the tables and ``users`` synthetic households."""
+    from sqlalchemy import create_engine
+
+    from app.db.seed import seed_database
+    from app.models.models import Base
+
+    engine = create_engine(database_uri)
+    Base.metadata.create_all(bind=engine)
+    seed_database(engine, users=users, records_median=records_median, seed=seed)
+    engine.dispose()
+
+
+async def drive(users: int, iterations: int, rng: random.Random) -> dict:
+    """Run every simulated user to completion and return per-route statistics."""
+    import httpx
+
+    from app.db.seed import RECORD_TITLES, SEED_PASSWORD, seed_email
+    from app.main import app
+
+    titles = [title for group in RECORD_TITLES.values() for title in group]
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench/api/v1"
+    ) as client:
+
+        async def call(route: str, method: str, url: str, **kwargs) -> httpx.Response:
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies[route].append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors[route] += 1
+            return response
+
+        async def simulated_user(n: int) -> None:
+            user_rng = random.Random(rng.random())
+            r = await call("POST /auth/login/json", "POST", "/auth/login/json",
+                           json={"email": seed_email(n), "password": SEED_PASSWORD})
+            headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+            for i in range(iterations):
+                r = await call("GET /family-members/", "GET", "/family-members/", headers=headers)
+                member_id = user_rng.choice(r.json()["items"])["id"]
+                await call("GET /family-members/{id}", "GET", f"/family-members/{member_id}",
+                           headers=headers)
+                await call("GET /health-records/family-members/{id}/records", "GET",
+                           f"/health-records/family-members/{member_id}/records",
+                           params={"limit": 20}, headers=headers)
+                await call("GET /health-records/?search=", "GET", "/health-records/",
+                           params={"search": user_rng.choice(SEARCH_TERMS), "limit": 20},
+                           headers=headers)
+                await call("POST /health-records/family-members/{id}/records", "POST",
+                           f"/health-records/family-members/{member_id}/records",
+                           json={"record_type": "checkup", "title": user_rng.choice(titles)},
+                           headers=headers)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(simulated_user(n) for n in range(1, users + 1)))
+        elapsed = time.perf_counter() - start
+
+    def percentile(values: List[float], fraction: float) -> float:
+        return round(values[min(len(values) - 1, int(len(values) * fraction))] * 1000, 2)
+
+    routes = {}
+    for route, values in latencies.items():
+        values.sort()
+        routes[route] = {
+            "requests": len(values),
+            "errors": errors[route],
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+            "p99_ms": percentile(values, 0.99),
+        }
+    total = sum(len(values) for values in latencies.values())
+    return {"elapsed_s": round(elapsed, 2), "rps": round(total / elapsed, 1), "routes": routes}
+
+
+def git_revision() -> str:
+    """The commit being benchmarked, or "unknown" outside a checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50, help="concurrent simulated users")
+    parser.add_argument("--iterations", type=int, default=10, help="page-view loops per user")
+    parser.add_argument("--records-median", type=float, default=50,
+                        help="median health records per family member")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--async-db", action="store_true", help="use the async database path")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # Settings are read at import time, so configure them before the app loads
+        os.environ.update(
+            SQLALCHEMY_DATABASE_URI=database_uri,
+            DATABASE_ASYNC="1" if args.async_db else "0",
+        )
+        seed(database_uri, args.users, args.records_median, args.seed)
+        results = asyncio.run(drive(args.users, args.iterations, rng))
+
+    results = {
+        "revision": git_revision(),
+        "parameters": {k: v for k, v in vars(args).items() if k != "output"},
+        **results,
+    }
+    for route, stats in sorted(results["routes"].items()):
+        print(
+            f"{route:<50} {stats['requests']:>6} req {stats['rps']:>8.1f}/s  "
+            f"p50 {stats['p50_ms']:>8.1f}  p95 {stats['p95_ms']:>8.1f}  "
+            f"p99 {stats['p99_ms']:>8.1f} ms  {stats['errors']} errors"
+        )
+    print(f"{'total':<50} {results['rps']:>19.1f}/s in {results['elapsed_s']}s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Compare the ORM/response_model list path with the fast row serializer.
+
+Seeds one family member with ``--rows`` health records, medications and
+appointments, then builds a single ``--rows``-item page of each the way the
+list endpoints used to (ORM entities validated and encoded through the
+route's ``response_model``) and the way they do now (selected columns encoded
+by ``app.schemas.serialization``). Reports the best of ``--repeat`` runs and
+checks that both produce the same bytes::
+
+    python -m benchmarks.list_serialization --rows 10000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def seed(database_uri: str, rows: int) -> int:
+    """Create one family member with ``rows`` of each kind; return its ID."""
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import Session
+
+    from app.models.models import Appointment, Base, FamilyMember, HealthRecord, Medication, User
+
+    engine = create_engine(database_uri)
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2020, 1, 1)
+    with Session(engine) as db:
+        user = User(email="lists@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        member = FamilyMember(user_id=user.id, full_name="Member", relation_type="child")
+        db.add(member)
+        db.flush()
+        common = {"family_member_id": member.id, "created_at": start, "updated_at": start}
+        db.execute(insert(HealthRecord.__table__), [
+            {**common, "record_type": "lab", "title": f"Blood panel {i}",
+             "description": "Routine blood work, results within normal range",
+             "date_recorded": start + timedelta(hours=i), "doctor_name": "Dr. Patel"}
+            for i in range(rows)
+        ])
+        db.execute(insert(Medication.__table__), [
+            {**common, "name": f"Drug {i}", "dosage": "10mg", "frequency": "daily",
+             "start_date": start + timedelta(days=i % 1000), "is_active": True}
+            for i in range(rows)
+        ])
+        db.execute(insert(Appointment.__table__), [
+            {**common, "title": f"Visit {i}", "appointment_date": start + timedelta(hours=i),
+             "status": "scheduled"}
+            for i in range(rows)
+        ])
+        db.commit()
+        member_id = member.id
+    engine.dispose()
+    return member_id
+
+
+def best_of(repeat: int, fn) -> tuple:
+    """Run ``fn`` ``repeat`` times; return (fastest seconds, last result)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # Settings are read at import time, so configure them before the app loads
+        os.environ["SQLALCHEMY_DATABASE_URI"] = database_uri
+        member_id = seed(database_uri, args.rows)
+
+        from fastapi.responses import JSONResponse
+        from fastapi.routing import serialize_response
+
+        from app.api.api_v1.endpoints.health_records import router
+        from app.db.session import SessionLocal
+        from app.schemas import serialization
+        from app.services.health_record_service import (
+            AppointmentService, HealthRecordService, MedicationService
+        )
+
+        cases = (
+            ("records", HealthRecordService.get_health_records_by_member, serialization.health_record_rows),
+            ("medications", MedicationService.get_medications_by_member, serialization.medication_rows),
+            ("appointments", AppointmentService.get_appointments_by_member, serialization.appointment_rows),
+        )
+        mismatch = False
+        for kind, fetch, serializer in cases:
+            route = next(
+                r for r in router.routes
+                if r.path == f"/family-members/{{member_id}}/{kind}" and "GET" in r.methods
+            )
+
+            def orm_path() -> bytes:
+                with SessionLocal() as db:
+                    items, next_cursor = fetch(db, member_id, limit=args.rows)
+                    content = asyncio.run(serialize_response(
+                        field=route.response_field,
+                        response_content={"items": items, "next_cursor": next_cursor},
+                    ))
+                return JSONResponse(content).body
+
+            def fast_path() -> bytes:
+                with SessionLocal() as db:
+                    rows, next_cursor = fetch(db, member_id, limit=args.rows, columns=serializer.columns)
+                return serializer.page_response(rows, next_cursor).body
+
+            orm_time, orm_body = best_of(args.repeat, orm_path)
+            fast_time, fast_body = best_of(args.repeat, fast_path)
+            same = orm_body == fast_body
+            mismatch |= not same
+            print(
+                f"{kind:>12} x{args.rows}: response_model {orm_time * 1000:8.1f} ms  "
+                f"fast path {fast_time * 1000:7.1f} ms  "
+                f"{orm_time / fast_time:4.1f}x  identical output: {same}"
+            )
+
+    if mismatch:
+        print("fast path output differs from response_model output", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Measure how a login storm affects unrelated reads.
+
+Seeds a throwaway SQLite database and drives the in-process app with
+``--readers`` clients listing family members, first alone and then while
+``--logins`` clients hammer ``/auth/login/json``. Read latency should barely
+move because bcrypt runs in the bounded password hashing pool; logins beyond
+its queue are shed with 503::
+
+    python -m benchmarks.login_storm --readers 16 --logins 64 --executor process
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.db_modes import EMAIL, PASSWORD, seed
+
+READ_ROUTE = "/api/v1/family-members/"
+
+
+def percentile(latencies: list, fraction: float) -> float:
+    """Return the given percentile in milliseconds."""
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+
+
+async def run(readers: int, logins: int, duration: float) -> None:
+    """Run the idle and storm phases and print read latency for each."""
+    import httpx
+
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        credentials = {"email": EMAIL, "password": PASSWORD}
+        response = await client.post("/api/v1/auth/login/json", json=credentials)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        async def reader(deadline: float, latencies: list) -> None:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                r = await client.get(READ_ROUTE, headers=headers)
+                r.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        async def login(deadline: float, statuses: Counter) -> None:
+            while time.perf_counter() < deadline:
+                r = await client.post("/api/v1/auth/login/json", json=credentials)
+                statuses[r.status_code] += 1
+                if r.status_code == 503:
+                    await asyncio.sleep(float(r.headers.get("Retry-After", 1)))
+
+        for phase, stormers in (("idle", 0), ("storm", logins)):
+            latencies: list = []
+            statuses: Counter = Counter()
+            deadline = time.perf_counter() + duration
+            await asyncio.gather(
+                *(reader(deadline, latencies) for _ in range(readers)),
+                *(login(deadline, statuses) for _ in range(stormers)),
+            )
+            latencies.sort()
+            line = (
+                f"{phase:>5}: reads {len(latencies) / duration:8.1f} req/s  "
+                f"p50 {percentile(latencies, 0.5):7.1f} ms  p99 {percentile(latencies, 0.99):7.1f} ms"
+            )
+            if stormers:
+                line += "  logins " + ", ".join(
+                    f"{status}: {count}" for status, count in sorted(statuses.items())
+                )
+            print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=64, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per phase")
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--async-db", action="store_true", help="use the async database path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings are read at import time, so configure them before the app loads
+        os.environ.update(
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            DATABASE_ASYNC="1" if args.async_db else "0",
+            PASSWORD_HASH_EXECUTOR=args.executor,
+            PASSWORD_HASH_WORKERS=str(args.workers),
+        )
+        seed(os.environ["SQLALCHEMY_DATABASE_URI"], members=5, records=20)
+        asyncio.run(run(args.readers, args.logins, args.duration))
+
+        from app.core.hashing import password_hasher
+        password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark the medication conflict check against a scan of the dataset.
+
+Builds households of ``--sizes`` active medications drawn from the bundled
+interaction dataset (with strengths and brand names, as users type them) and
+a few allergy records, then times checking one more medication against each
+household through the hash indexes of ``app.core.drug_interactions`` and
+through a baseline that scans every alias and interaction of the dataset for
+each pair. Both must find the same conflicts; exits with status 1 if not::
+
+    python -m benchmarks.medication_conflicts --sizes 12 24 48 96
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, Optional, Sequence, Set, Tuple
+
+from app.core.drug_interactions import BUNDLED_DATASET, InteractionIndex, normalize
+from app.services.medication_conflict_service import find_conflicts
+
+STRENGTHS = ("5mg", "10 mg", "20mg", "250mg", "500 mg", "81mg", "100mcg", "1 g")
+ALLERGIES = ("Penicillin allergy", "Sulfa drugs", "NSAID allergy", "Peanut allergy", "Latex allergy")
+
+
+class ScanChecker:
+    """Conflict check without indexes: every lookup scans the dataset."""
+
+    def __init__(self, dataset: dict) -> None:
+        self.dataset = dataset
+        self.rank = {severity: i for i, severity in enumerate(dataset["severities"])}
+
+    def drugs_in(self, name: str) -> Set[str]:
+        text = " " + " ".join(normalize(name)) + " "
+        found = set()
+        for drug, entry in self.dataset["drugs"].items():
+            for alias in (drug, *entry["aliases"]):
+                if " " + " ".join(normalize(alias)) + " " in text:
+                    found.add(drug)
+        return found
+
+    def concepts(self, drug: str) -> Set[str]:
+        return {drug, *self.dataset["drugs"][drug]["classes"]}
+
+    def interaction(self, drugs: Set[str], others: Set[str]) -> Optional[str]:
+        worst = None
+        for entry in self.dataset["interactions"]:
+            a, b = entry["between"]
+            for drug in drugs:
+                for other in others:
+                    mine, theirs = self.concepts(drug), self.concepts(other)
+                    if (a in mine and b in theirs) or (b in mine and a in theirs):
+                        if worst is None or self.rank[entry["severity"]] < self.rank[worst]:
+                            worst = entry["severity"]
+        return worst
+
+    def check(self, name: str, medications: Sequence[Tuple[int, str]]) -> Dict[int, str]:
+        drugs = self.drugs_in(name)
+        found = {}
+        for medication_id, other in medications:
+            severity = self.interaction(drugs, self.drugs_in(other)) if drugs else None
+            if severity is not None:
+                found[medication_id] = severity
+        return found
+
+
+def medication_name(rng: random.Random, dataset: dict) -> str:
+    """A drug of the dataset as a user might type it."""
+    drug, entry = rng.choice(list(dataset["drugs"].items()))
+    # Leave out abbreviations such as "asa", which users seldom type as a name
+    names = [drug] + [alias for alias in entry["aliases"] if len(alias) > 3]
+    name = rng.choice(names)
+    return f"{name.title()} {rng.choice(STRENGTHS)}"
+
+
+def cold_check(index: InteractionIndex, name: str, medications, allergies) -> list:
+    """Check with an empty name cache; a running process has most names cached."""
+    index.drugs_in.cache_clear()
+    return find_conflicts(name, medications, allergies, index)
+
+
+def timed(fn, repeat: int) -> Tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(args: argparse.Namespace) -> int:
+    with open(BUNDLED_DATASET, encoding="utf-8") as f:
+        dataset = json.load(f)
+    start = time.perf_counter()
+    index = InteractionIndex(dataset)
+    print(f"indexed {len(dataset['drugs'])} drugs, {len(dataset['classes'])} classes and "
+          f"{len(dataset['interactions'])} interactions in {(time.perf_counter() - start) * 1000:.1f} ms")
+    scan = ScanChecker(dataset)
+    rng = random.Random(args.seed)
+    mismatches = 0
+
+    print(f"{'active':>7} {'index':>10} {'scan':>10} {'speedup':>8} {'conflicts':>10}")
+    for size in args.sizes:
+        index_total = scan_total = 0.0
+        conflicts = 0
+        for _ in range(args.households):
+            medications = [(i, medication_name(rng, dataset)) for i in range(1, size + 1)]
+            allergies = [(i, title) for i, title in enumerate(rng.sample(ALLERGIES, 2), start=1)]
+            name = medication_name(rng, dataset)
+            elapsed, found = timed(lambda: cold_check(index, name, medications, allergies), args.repeat)
+            index_total += elapsed
+            scan_elapsed, expected = timed(lambda: scan.check(name, medications), 1)
+            scan_total += scan_elapsed
+            interactions = {c.medication_id: c.severity for c in found if c.medication_id is not None}
+            if interactions != expected:
+                mismatches += 1
+                print(f"  mismatch for {name!r}: {interactions} != {expected}")
+            conflicts += len(found)
+        n = args.households
+        print(f"{size:>7} {index_total / n * 1e6:>8.1f}us {scan_total / n * 1e6:>8.0f}us "
+              f"{scan_total / max(index_total, 1e-9):>7.0f}x {conflicts / n:>10.1f}")
+    print(f"{mismatches} mismatches")
+    return 1 if mismatches else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 24, 48, 96],
+                        help="active medications per household")
+    parser.add_argument("--households", type=int, default=200, help="households per size")
+    parser.add_argument("--repeat", type=int, default=5, help="best of this many checks")
+    parser.add_argument("--seed", type=int, default=0)
+    sys.exit(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compare mixed read/write throughput with default and tuned SQLite settings.
+
+Seeds one throwaway database per mode, then runs ``--readers`` threads listing
+health records and ``--writers`` threads creating them through the service
+layer, one session per operation like a request would. "default" is the
+engine the app used to create (rollback journal, no pragmas); "tuned" comes
+from ``app.db.engine.create_db_engine`` with the pragmas in Settings::
+
+    python -m benchmarks.sqlite_pragmas --readers 8 --writers 4 --duration 5
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from benchmarks.db_modes import seed
+
+
+def run(engine, duration: float, readers: int, writers: int) -> Counter:
+    """Hammer the database from reader and writer threads; return operation counts."""
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models.models import FamilyMember
+    from app.schemas.schemas import HealthRecordCreate
+    from app.services.health_record_service import HealthRecordService
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with SessionLocal() as db:
+        member_id, user_id = db.query(FamilyMember.id, FamilyMember.user_id).first()
+
+    counts: Counter = Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def work(kind: str) -> None:
+        done = Counter()
+        while time.perf_counter() < deadline:
+            try:
+                with SessionLocal() as db:
+                    if kind == "read":
+                        HealthRecordService.get_health_records_by_member(db, member_id, limit=50)
+                    else:
+                        HealthRecordService.create_health_record(
+                            db, HealthRecordCreate(record_type="lab", title="Blood panel"),
+                            member_id, user_id,
+                        )
+                done[kind] += 1
+            except OperationalError as e:
+                done["locked" if "locked" in str(e) else "error"] += 1
+        with lock:
+            counts.update(done)
+
+    threads = [threading.Thread(target=work, args=("read",)) for _ in range(readers)]
+    threads += [threading.Thread(target=work, args=("write",)) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--records", type=int, default=200, help="seeded records per member")
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+
+    from app.db.engine import create_db_engine, sqlite_pragmas
+
+    print("tuned pragmas: " + ", ".join(f"{name}={value}" for name, value in sqlite_pragmas()))
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("default", "tuned"):
+            url = f"sqlite:///{os.path.join(tmp, mode + '.db')}"
+            seed(url, members=5, records=args.records)
+            if mode == "default":
+                engine = create_engine(url, connect_args={"check_same_thread": False})
+            else:
+                engine = create_db_engine(url)
+            counts = run(engine, args.duration, args.readers, args.writers)
+            engine.dispose()
+            print(
+                f"{mode:>7}: reads {counts['read'] / args.duration:8.1f}/s  "
+                f"writes {counts['write'] / args.duration:7.1f}/s  "
+                f"locked {counts['locked']}  other errors {counts['error']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
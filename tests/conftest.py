@@ -0,0 +1,63 @@
+"""
+Test configuration.
+
+The settings are read when ``app`` is first imported, so the database,
+attachment store and background workers are pointed away from the
+development setup here, before any test module imports the app.
+"""
+import itertools
+import os
+import tempfile
+
+import pytest
+
+_scratch = tempfile.mkdtemp(prefix="phrm-tests-")
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_scratch, 'app.db')}")
+os.environ.setdefault("ATTACHMENT_STORAGE_DIR", os.path.join(_scratch, "attachments"))
+for worker in ("EMBEDDING_WORKER_ENABLED", "JOBS_ENABLED", "REMINDERS_ENABLED"):
+    os.environ.setdefault(worker, "0")
+
+API = "/api/v1"
+
+_emails = itertools.count()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """A test client of the app, over tables created in the scratch database."""
+    from fastapi.testclient import TestClient
+
+    from app.db.init_db import init_db
+    from app.main import app
+
+    init_db()
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def login(client):
+    """Register a new user and return their Authorization headers."""
+    def login() -> dict:
+        email = f"user{next(_emails)}@example.com"
+        credentials = {"email": email, "password": "secret1"}
+        client.post(API + "/auth/register", json={**credentials, "full_name": "Test User"})
+        token = client.post(API + "/auth/login/json", json=credentials).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+    return login
+
+
+@pytest.fixture
+def headers(login):
+    """Authorization headers of a new user."""
+    return login()
+
+
+@pytest.fixture
+def member(client, headers):
+    """ID of a family member of the ``headers`` user."""
+    response = client.post(API + "/family-members/", headers=headers, json={
+        "full_name": "Test Member", "relationship": "child"
+    })
+    return response.json()["id"]
@@ -0,0 +1,149 @@
+"""Tests of health record attachments."""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.core.blob_store import COLLECT_JOB, blob_store
+from app.core.config import settings
+from app.db.attachments import collect_blobs, create_usage_statement
+from app.db.session import SessionLocal
+from app.models.models import Blob, Job
+from conftest import API
+
+
+@pytest.fixture
+def record(client, headers, member):
+    """ID of a health record of the ``member``."""
+    response = client.post(API + f"/health-records/family-members/{member}/records", headers=headers, json={
+        "record_type": "lab_result", "title": "Blood panel", "date_recorded": "2024-01-01T00:00:00"
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def upload(client, headers, record, content, filename="report.pdf"):
+    return client.post(
+        API + f"/health-records/{record}/attachments", headers=headers,
+        files={"file": (filename, content, "application/pdf")}
+    )
+
+
+def usage(client, headers):
+    response = client.get(API + "/health-records/attachments/usage", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    return body["attachment_count"], body["attachment_bytes"]
+
+
+def test_first_upload_creates_the_usage_row(client, headers, record):
+    assert usage(client, headers) == (0, 0)
+    assert upload(client, headers, record, b"first").status_code == 201
+    assert upload(client, headers, record, b"second!").status_code == 201
+    assert usage(client, headers) == (2, 12)
+
+
+def test_creating_the_usage_row_again_keeps_it(client, headers, record):
+    assert upload(client, headers, record, b"counted").status_code == 201
+    user_id = client.get(API + "/auth/me", headers=headers).json()["id"]
+    with SessionLocal() as db:
+        statement = create_usage_statement(db.get_bind().dialect, user_id, datetime.utcnow())
+        assert db.execute(statement).rowcount == 0
+        db.commit()
+    assert usage(client, headers) == (1, 7)
+
+
+def test_first_upload_over_the_quota_is_refused(client, headers, record, monkeypatch):
+    monkeypatch.setattr(settings, "ATTACHMENT_QUOTA_BYTES", 10)
+    response = upload(client, headers, record, b"x" * 11)
+    assert response.status_code == 413
+    assert usage(client, headers) == (0, 0)
+    assert upload(client, headers, record, b"x" * 10).status_code == 201
+    assert upload(client, headers, record, b"y").status_code == 413
+    assert usage(client, headers) == (1, 10)
+
+
+def unique_content(size=64):
+    return (uuid.uuid4().hex * (size // 32 + 1)).encode()[:size]
+
+
+def ref_count(sha256):
+    with SessionLocal() as db:
+        return db.execute(select(Blob.ref_count).where(Blob.sha256 == sha256)).scalar()
+
+
+def test_same_content_is_stored_once(client, headers, record):
+    content = unique_content()
+    first = upload(client, headers, record, content).json()
+    second = upload(client, headers, record, content, filename="copy.pdf").json()
+    assert first["sha256"] == second["sha256"] and first["id"] != second["id"]
+    assert ref_count(first["sha256"]) == 2
+    assert blob_store.path(first["sha256"]).read_bytes() == content
+    # Deduplicated content still counts against the quota of each upload
+    assert usage(client, headers) == (2, 2 * len(content))
+
+
+def test_unreferenced_content_is_collected(client, headers, record):
+    content = unique_content()
+    first = upload(client, headers, record, content).json()
+    second = upload(client, headers, record, content).json()
+    path = blob_store.path(first["sha256"])
+
+    url = API + f"/health-records/{record}/attachments/"
+    assert client.delete(url + str(first["id"]), headers=headers).status_code == 200
+    with SessionLocal() as db:
+        collect_blobs(db, blob_store)
+    assert path.exists() and ref_count(first["sha256"]) == 1
+
+    assert client.delete(url + str(second["id"]), headers=headers).status_code == 200
+    assert usage(client, headers) == (0, 0)
+    with SessionLocal() as db:
+        assert db.execute(select(Job).where(Job.kind == COLLECT_JOB)).first() is not None
+        collect_blobs(db, blob_store)
+    assert not path.exists() and ref_count(first["sha256"]) is None
+
+
+def test_deleting_the_record_releases_its_attachments(client, headers, record):
+    attachment = upload(client, headers, record, unique_content()).json()
+    assert client.delete(API + f"/health-records/{record}", headers=headers).status_code == 200
+    assert usage(client, headers) == (0, 0)
+    assert ref_count(attachment["sha256"]) == 0
+
+
+def test_download_ranges_and_validators(client, headers, record):
+    content = unique_content(100)
+    attachment = upload(client, headers, record, content).json()
+    url = API + f"/health-records/{record}/attachments/{attachment['id']}"
+
+    full = client.get(url, headers=headers)
+    assert full.status_code == 200 and full.content == content
+    etag = full.headers["ETag"]
+    assert etag == f'"{attachment["sha256"]}"'
+    assert full.headers["accept-ranges"] == "bytes"
+    assert "report.pdf" in full.headers["content-disposition"]
+
+    part = client.get(url, headers={**headers, "Range": "bytes=10-19"})
+    assert part.status_code == 206 and part.content == content[10:20]
+    assert part.headers["content-range"] == "bytes 10-19/100"
+
+    assert client.get(url, headers={**headers, "Range": "bytes=10-19", "If-Range": etag}).status_code == 206
+    stale = client.get(url, headers={**headers, "Range": "bytes=10-19", "If-Range": '"stale"'})
+    assert stale.status_code == 200 and stale.content == content
+    assert client.get(url, headers={**headers, "Range": "bytes=200-300"}).status_code == 416
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_other_users_attachments_are_not_found(client, login, headers, record):
+    attachment = upload(client, headers, record, unique_content()).json()
+    other = login()
+    url = API + f"/health-records/{record}/attachments"
+    assert client.get(f"{url}/{attachment['id']}", headers=other).status_code == 404
+    assert client.get(url, headers=other).status_code == 404
+    assert upload(client, other, record, unique_content()).status_code == 400
+
+
+def test_upload_over_the_size_limit_is_refused(client, headers, record, monkeypatch):
+    monkeypatch.setattr(settings, "ATTACHMENT_MAX_BYTES", 50)
+    assert upload(client, headers, record, unique_content(51)).status_code == 413
+    assert usage(client, headers) == (0, 0)
@@ -0,0 +1,66 @@
+"""Tests of the bulk create endpoints."""
+import pytest
+
+from conftest import API
+
+ITEMS = {
+    "records": [
+        {"record_type": "lab_result", "title": f"Panel {i}", "date_recorded": f"2024-01-0{i + 1}T00:00:00"}
+        for i in range(3)
+    ],
+    "medications": [
+        {"name": name, "dosage": "1 tab", "frequency": "daily", "start_date": "2024-01-01"}
+        for name in ("Metformin", "Lisinopril", "Atorvastatin")
+    ],
+    "appointments": [
+        {"title": f"Visit {i}", "appointment_date": f"2100-01-0{i + 1}T09:00:00"}
+        for i in range(3)
+    ],
+}
+NAME = {"records": "title", "medications": "name", "appointments": "title"}
+
+
+def bulk(client, headers, member, kind, items):
+    return client.post(API + f"/health-records/family-members/{member}/{kind}/bulk", headers=headers, json=items)
+
+
+def listed(client, headers, member, kind):
+    response = client.get(API + f"/health-records/family-members/{member}/{kind}", headers=headers)
+    assert response.status_code == 200, response.text
+    return {item["id"]: item[NAME[kind]] for item in response.json()["items"]}
+
+
+@pytest.mark.parametrize("kind", ITEMS)
+def test_results_are_in_request_order(client, headers, member, kind):
+    response = bulk(client, headers, member, kind, ITEMS[kind])
+    assert response.status_code == 201, response.text
+    body = response.json()
+    assert body["created"] == 3
+    assert [result["index"] for result in body["results"]] == [0, 1, 2]
+
+    names = listed(client, headers, member, kind)
+    assert [names[result["id"]] for result in body["results"]] == [item[NAME[kind]] for item in ITEMS[kind]]
+
+
+@pytest.mark.parametrize("kind", ITEMS)
+def test_other_users_member_is_refused(client, login, headers, member, kind):
+    response = bulk(client, login(), member, kind, ITEMS[kind])
+    assert response.status_code == 400
+    assert listed(client, headers, member, kind) == {}
+
+
+@pytest.mark.parametrize("kind", ITEMS)
+def test_one_invalid_item_creates_nothing(client, headers, member, kind):
+    items = ITEMS[kind] + [{}]
+    assert bulk(client, headers, member, kind, items).status_code == 422
+    assert listed(client, headers, member, kind) == {}
+
+
+def test_bulk_records_update_the_member_summary(client, headers, member):
+    assert bulk(client, headers, member, "records", ITEMS["records"]).status_code == 201
+    response = client.get(API + f"/family-members/{member}/summary", headers=headers)
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    assert summary["total_records"] == 3
+    assert summary["record_counts"] == {"lab_result": 3}
+    assert summary["latest_record_date"] == "2024-01-03T00:00:00"
@@ -0,0 +1,71 @@
+"""Tests of the token-authenticated calendar feed."""
+from urllib.parse import urlsplit
+
+from conftest import API
+
+
+def feed_path(client, headers):
+    response = client.post(API + "/appointments/calendar/token", headers=headers)
+    assert response.status_code == 200, response.text
+    return urlsplit(response.json()["url"]).path
+
+
+def add_appointment(client, headers, member, title):
+    response = client.post(API + f"/health-records/family-members/{member}/appointments", headers=headers, json={
+        "title": title, "appointment_date": "2100-01-01T09:00:00"
+    })
+    assert response.status_code == 201, response.text
+
+
+def test_feed_is_served_without_authorization(client, headers, member):
+    add_appointment(client, headers, member, "Dentist")
+    path = feed_path(client, headers)
+    assert path.startswith(API + "/appointments/calendar/") and path.endswith(".ics")
+
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/calendar")
+    assert "SUMMARY:Dentist" in response.text
+    assert response.text == client.get(API + "/appointments/calendar.ics", headers=headers).text
+
+
+def test_feed_revalidates(client, headers, member):
+    add_appointment(client, headers, member, "Dentist")
+    path = feed_path(client, headers)
+    etag = client.get(path).headers["ETag"]
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    add_appointment(client, headers, member, "Optician")
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "SUMMARY:Optician" in response.text
+
+
+def test_feed_is_the_owners(client, login, member, headers):
+    add_appointment(client, headers, member, "Dentist")
+    other = login()
+    path = feed_path(client, other)
+    assert "Dentist" not in client.get(path).text
+
+
+def test_new_token_revokes_the_previous_one(client, headers):
+    old = feed_path(client, headers)
+    new = feed_path(client, headers)
+    assert old != new
+    assert client.get(old).status_code == 404
+    assert client.get(new).status_code == 200
+
+
+def test_revoked_feed_is_not_found(client, headers):
+    path = feed_path(client, headers)
+    response = client.delete(API + "/appointments/calendar/token", headers=headers)
+    assert response.status_code == 200
+    assert client.get(path).status_code == 404
+
+
+def test_unknown_token_is_not_found(client):
+    assert client.get(API + "/appointments/calendar/not-a-token.ics").status_code == 404
+
+
+def test_issuing_a_token_needs_authorization(client):
+    assert client.post(API + "/appointments/calendar/token").status_code == 401
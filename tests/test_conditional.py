@@ -0,0 +1,115 @@
+"""Tests of conditional GET: ETag, Last-Modified and 304 responses."""
+from datetime import datetime
+
+import pytest
+from fastapi import Request, Response
+
+from app.api.conditional import make_etag, not_modified
+from conftest import API
+
+STATE = (1, datetime(2024, 1, 2, 3, 4, 5, 600000))
+LAST_MODIFIED = "Tue, 02 Jan 2024 03:04:05 GMT"
+
+
+def request(**headers):
+    return Request({
+        "type": "http", "method": "GET", "path": "/",
+        "headers": [(k.replace("_", "-").lower().encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+def test_etag_is_weak_and_follows_the_state():
+    assert make_etag(*STATE).startswith('W/"')
+    assert make_etag(*STATE) == make_etag(*STATE)
+    assert make_etag(*STATE) != make_etag(2, STATE[1])
+
+
+def test_headers_are_set():
+    response = Response()
+    assert not_modified(request(), response, STATE, last_modified=STATE[1]) is None
+    assert response.headers["ETag"] == make_etag(*STATE)
+    assert response.headers["Last-Modified"] == LAST_MODIFIED
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert response.headers["Vary"] == "Authorization"
+
+
+@pytest.mark.parametrize("if_none_match, fresh", [
+    (make_etag(*STATE), True),
+    (make_etag(*STATE)[2:], True),
+    ('W/"other", ' + make_etag(*STATE), True),
+    ("*", True),
+    ('W/"other"', False),
+])
+def test_if_none_match(if_none_match, fresh):
+    cached = not_modified(request(if_none_match=if_none_match), Response(), STATE)
+    assert (cached is not None) == fresh
+    if fresh:
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == make_etag(*STATE)
+
+
+@pytest.mark.parametrize("if_modified_since, fresh", [
+    (LAST_MODIFIED, True),
+    ("Wed, 03 Jan 2024 00:00:00 GMT", True),
+    ("Tue, 02 Jan 2024 03:04:04 GMT", False),
+    ("yesterday", False),
+])
+def test_if_modified_since(if_modified_since, fresh):
+    cached = not_modified(request(if_modified_since=if_modified_since), Response(), STATE, last_modified=STATE[1])
+    assert (cached is not None) == fresh
+
+
+def test_if_none_match_takes_precedence():
+    cached = not_modified(
+        request(if_none_match='W/"other"', if_modified_since=LAST_MODIFIED), Response(), STATE, last_modified=STATE[1]
+    )
+    assert cached is None
+
+
+def test_if_modified_since_needs_last_modified():
+    assert not_modified(request(if_modified_since=LAST_MODIFIED), Response(), STATE) is None
+
+
+def add_record(client, headers, member, title="Blood panel"):
+    response = client.post(API + f"/health-records/family-members/{member}/records", headers=headers, json={
+        "record_type": "lab_result", "title": title, "date_recorded": "2024-01-01T00:00:00"
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_record_revalidates_until_updated(client, headers, member):
+    record = add_record(client, headers, member)
+    url = API + f"/health-records/{record}"
+    first = client.get(url, headers=headers)
+    etag, last_modified = first.headers["ETag"], first.headers["Last-Modified"]
+
+    cached = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert client.get(url, headers={**headers, "If-Modified-Since": last_modified}).status_code == 304
+
+    assert client.put(url, headers=headers, json={"title": "Lipid panel"}).status_code == 200
+    changed = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "Lipid panel"
+    assert changed.headers["ETag"] != etag
+
+
+def test_collection_changes_when_a_row_is_deleted(client, headers, member):
+    add_record(client, headers, member)
+    record = add_record(client, headers, member, "Lipid panel")
+    url = API + "/health-records/"
+    etag = client.get(url, headers=headers).headers["ETag"]
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    assert client.delete(API + f"/health-records/{record}", headers=headers).status_code == 200
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 1
+
+
+def test_etag_does_not_reveal_other_users_records(client, login, headers, member):
+    record = add_record(client, headers, member)
+    url = API + f"/health-records/{record}"
+    etag = client.get(url, headers=headers).headers["ETag"]
+    assert client.get(url, headers={**login(), "If-None-Match": etag}).status_code == 403
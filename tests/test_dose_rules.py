@@ -0,0 +1,90 @@
+"""Tests of dose rule parsing and expansion."""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.dose_rules import AS_NEEDED, dose_offsets, expand, parse_frequency, rule_parts
+
+
+@pytest.mark.parametrize("frequency, rule", [
+    ("once daily", "1/24h"),
+    ("Twice a day", "2/24h"),
+    ("3 times per day", "3/24h"),
+    ("3x a day", "3/24h"),
+    ("BID", "2/24h"),
+    ("t.i.d.", "3/24h"),
+    ("q8h", "1/8h"),
+    ("every 6 hours", "1/6h"),
+    ("every other day", "1/48h"),
+    ("every 2 weeks", "1/336h"),
+    ("weekly", "1/168h"),
+    ("3 times a week", "3/168h"),
+    ("once a month", "1/720h"),
+    ("at bedtime", "1/24h"),
+    ("morning and evening", "2/24h"),
+    ("as needed", AS_NEEDED),
+    ("PRN for pain", AS_NEEDED),
+    ("whenever", None),
+])
+def test_parse_frequency(frequency, rule):
+    assert parse_frequency(frequency) == rule
+
+
+@pytest.mark.parametrize("frequency, rule", [
+    ("daily for 1 week", "1/24h"),
+    ("bid x 1 week", "2/24h"),
+    ("2x daily x7 days", "2/24h"),
+    ("at bedtime for one month", "1/24h"),
+    ("twice daily for 10 days", "2/24h"),
+    ("for a week, once daily", "1/24h"),
+    ("q8h x 5 days", "1/8h"),
+    ("every 2 weeks for 3 months", "1/336h"),
+])
+def test_course_length_is_not_the_dosing_period(frequency, rule):
+    assert parse_frequency(frequency) == rule
+
+
+@pytest.mark.parametrize("frequency, rule", [
+    ("1 hour before breakfast", None),
+    ("daily, 1 hour before breakfast", "1/24h"),
+    ("tid 30 minutes before meals", "3/24h"),
+    ("once daily, 2 hours after dinner", "1/24h"),
+    ("half an hour before bed, nightly", "1/24h"),
+])
+def test_timing_around_meals_is_not_the_dosing_period(frequency, rule):
+    assert parse_frequency(frequency) == rule
+
+
+def test_rule_parts():
+    assert rule_parts("2/24h") == (2, 24)
+    assert rule_parts(AS_NEEDED) is None
+    assert rule_parts(None) is None
+
+
+def test_expand_spreads_daily_doses_over_the_waking_day():
+    doses = expand((3, 24), date(2024, 1, 1), None, datetime(2024, 1, 2), datetime(2024, 1, 3))
+    assert doses == [datetime(2024, 1, 2, 8), datetime(2024, 1, 2, 14), datetime(2024, 1, 2, 20)]
+
+
+def test_expand_counts_periods_from_the_start_date():
+    doses = expand((1, 48), date(2024, 1, 1), None, datetime(2024, 1, 2), datetime(2024, 1, 8))
+    assert doses == [datetime(2024, 1, d, 8) for d in (3, 5, 7)]
+
+
+def test_expand_stops_at_the_end_of_the_course():
+    doses = expand((1, 24), date(2024, 1, 1), date(2024, 1, 3), datetime(2024, 1, 1), datetime(2024, 2, 1))
+    assert doses == [datetime(2024, 1, d, 8) for d in (1, 2, 3)]
+
+
+@pytest.mark.parametrize("rule", [(1, 8), (4, 24), (6, 24), (1, 168), (2, 72)])
+def test_expand_matches_stepping_through_the_course(rule):
+    doses, hours = rule
+    start = datetime(2023, 12, 30)
+    window_start, window_end = datetime(2024, 1, 5, 13), datetime(2024, 1, 19, 2)
+    every = [
+        start + period * timedelta(hours=hours) + offset
+        for period in range(24 * 60 // hours)
+        for offset in dose_offsets(doses, hours)
+    ]
+    expected = sorted(t for t in every if window_start <= t < window_end)
+    assert expand(rule, start, None, window_start, window_end) == expected
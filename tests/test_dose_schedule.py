@@ -0,0 +1,52 @@
+"""Tests of the household dose schedule endpoint."""
+from conftest import API
+
+
+def add_medication(client, headers, member, frequency, **fields):
+    response = client.post(API + f"/health-records/family-members/{member}/medications", headers=headers, json={
+        "name": "Metformin", "dosage": "500mg", "frequency": frequency, "start_date": "2024-01-01", **fields
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def doses(client, headers, start, end, **request_headers):
+    return client.get(
+        API + "/health-records/medications/doses",
+        headers={**headers, **request_headers}, params={"from": start, "to": end}
+    )
+
+
+def test_course_length_does_not_thin_the_schedule(client, headers, member):
+    medication = add_medication(client, headers, member, "daily for 1 week", end_date="2024-01-07")
+    assert medication["dose_rule"] == "1/24h"
+
+    response = doses(client, headers, "2024-01-01T00:00:00", "2024-01-15T00:00:00")
+    assert response.status_code == 200
+    assert [d["due_at"] for d in response.json()["doses"]] == [f"2024-01-0{d}T08:00:00" for d in range(1, 8)]
+
+
+def test_unscheduled_medications_are_listed(client, headers, member):
+    scheduled = add_medication(client, headers, member, "bid")
+    as_needed = add_medication(client, headers, member, "as needed")
+    body = doses(client, headers, "2024-01-02T00:00:00", "2024-01-03T00:00:00").json()
+    assert [d["medication_id"] for d in body["doses"]] == [scheduled["id"]] * 2
+    assert body["unscheduled"] == [as_needed["id"]]
+
+
+def test_aware_range_is_read_as_utc(client, headers, member):
+    add_medication(client, headers, member, "once daily")
+    naive = doses(client, headers, "2024-01-02T00:00:00", "2024-01-03T00:00:00")
+    utc = doses(client, headers, "2024-01-02T00:00:00Z", "2024-01-03T00:00:00Z")
+    offset = doses(client, headers, "2024-01-02T02:00:00+02:00", "2024-01-03T02:00:00+02:00")
+    assert naive.status_code == utc.status_code == offset.status_code == 200
+    assert naive.json() == utc.json() == offset.json()
+    assert [d["due_at"] for d in utc.json()["doses"]] == ["2024-01-02T08:00:00"]
+
+
+def test_invalid_range_is_rejected_before_revalidation(client, headers, member):
+    add_medication(client, headers, member, "once daily")
+    etag = doses(client, headers, "2024-01-02T00:00:00", "2024-01-03T00:00:00").headers["ETag"]
+    assert doses(client, headers, "2024-01-02T00:00:00", "2024-01-03T00:00:00", **{"If-None-Match": etag}).status_code == 304
+    assert doses(client, headers, "2024-01-03T00:00:00", "2024-01-02T00:00:00", **{"If-None-Match": etag}).status_code == 400
+    assert doses(client, headers, "2024-01-01T00:00:00", "2025-01-01T00:00:00").status_code == 400
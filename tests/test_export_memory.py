@@ -0,0 +1,69 @@
+"""
+Memory regression test for the streaming export.
+
+Seeds a large household in a scratch SQLite database and drains its NDJSON
+and CSV exports, sync and async, under ``tracemalloc``. The traced heap peak
+must stay under a fixed ceiling, well below what holding the export or its
+rows in memory would take. ``benchmarks/export_memory.py`` measures the same
+at larger sizes.
+"""
+import asyncio
+import tracemalloc
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.services.export_service import ExportFormat, ExportService
+from benchmarks.export_memory import seed
+
+# Records, medications and appointments of the household's one member, so
+# that each section spans several cursor batches
+ROWS = 15000
+CEILING_MB = 4.0
+
+
+@pytest.fixture(scope="module")
+def household(tmp_path_factory):
+    """The database URI and user ID of a seeded household."""
+    database_uri = f"sqlite:///{tmp_path_factory.mktemp('export') / 'export.db'}"
+    return database_uri, seed(database_uri, "large@example.com", 1, ROWS)
+
+
+def drain_sync(database_uri: str, user_id: int, export_format: ExportFormat) -> int:
+    engine = create_engine(database_uri)
+    size = 0
+    with Session(engine) as db:
+        for chunk in ExportService.stream_export(db, user_id, export_format):
+            size += len(chunk)
+    engine.dispose()
+    return size
+
+
+def drain_async(database_uri: str, user_id: int, export_format: ExportFormat) -> int:
+    async def drain() -> int:
+        engine = create_async_engine(database_uri.replace("sqlite://", "sqlite+aiosqlite://", 1))
+        size = 0
+        async with engine.connect() as conn:
+            async with AsyncSession(bind=conn) as db:
+                async for chunk in ExportService.stream_export_async(db, user_id, export_format):
+                    size += len(chunk)
+        await engine.dispose()
+        return size
+
+    return asyncio.run(drain())
+
+
+@pytest.mark.parametrize("drain", [drain_sync, drain_async], ids=["sync", "async"])
+@pytest.mark.parametrize("export_format", list(ExportFormat), ids=[f.value for f in ExportFormat])
+def test_export_peak_stays_flat(household, export_format, drain):
+    database_uri, user_id = household
+    tracemalloc.start()
+    try:
+        size = drain(database_uri, user_id, export_format)
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+    assert size
+    assert peak < CEILING_MB, f"{size} byte {export_format.value} export peaked at {peak:.2f} MB"
@@ -0,0 +1,86 @@
+"""Tests of queueing jobs under an idempotency key."""
+import asyncio
+
+import pytest
+from sqlalchemy import false, select
+
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.models.models import Job
+from app.services import job_service
+from app.services.job_service import JobService
+
+KIND = "member_stats.rebuild"
+
+
+@pytest.fixture
+def racing(monkeypatch):
+    """Arm a miss of the next key lookup, as if another caller had not committed the key yet."""
+    by_key = job_service._by_key
+    misses = []
+
+    def lookup(idempotency_key):
+        if misses:
+            misses.pop()
+            return select(Job).where(false())
+        return by_key(idempotency_key)
+
+    monkeypatch.setattr(job_service, "_by_key", lookup)
+    return lambda: misses.append(True)
+
+
+def committed_job(key):
+    with SessionLocal() as db:
+        job = JobService.enqueue(db, KIND, idempotency_key=key)
+        db.commit()
+        return job.id
+
+
+def jobs_with_key(key):
+    with SessionLocal() as db:
+        return db.execute(select(Job.id).where(Job.idempotency_key == key)).scalars().all()
+
+
+def test_key_is_reused(client):
+    first = committed_job("reused")
+    with SessionLocal() as db:
+        assert JobService.enqueue(db, KIND, idempotency_key="reused").id == first
+
+
+def test_racing_key_returns_the_committed_job(client, racing):
+    first = committed_job("race")
+    racing()
+    with SessionLocal() as db:
+        job = JobService.enqueue(db, KIND, idempotency_key="race")
+        assert job.id == first
+        db.commit()
+    assert jobs_with_key("race") == [first]
+
+
+def test_racing_key_keeps_the_callers_earlier_writes(client, racing):
+    first = committed_job("race-other")
+    with SessionLocal() as db:
+        other = JobService.enqueue(db, KIND, idempotency_key="earlier").id
+        racing()
+        assert JobService.enqueue(db, KIND, idempotency_key="race-other").id == first
+        db.commit()
+    assert jobs_with_key("earlier") == [other]
+
+
+def test_racing_key_async(client, racing):
+    async def enqueue():
+        async with AsyncSessionLocal() as db:
+            job = await JobService.enqueue_async(db, KIND, idempotency_key="race-async")
+            await db.commit()
+            return job.id
+
+    first = committed_job("race-async")
+    racing()
+    assert asyncio.run(enqueue()) == first
+
+
+def test_job_is_not_committed_before_the_caller(client):
+    with SessionLocal() as db:
+        JobService.enqueue(db, KIND, idempotency_key="rolled-back")
+        assert jobs_with_key("rolled-back") == []
+        db.rollback()
+    assert jobs_with_key("rolled-back") == []
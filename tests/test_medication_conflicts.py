@@ -0,0 +1,96 @@
+"""Tests of medication interaction and allergy warnings."""
+from app.services.medication_conflict_service import (
+    ALLERGY,
+    INTERACTION,
+    find_batch_conflicts,
+    find_conflicts,
+)
+from conftest import API
+
+
+def test_interaction_with_another_medication():
+    [conflict] = find_conflicts("Ibuprofen 400mg", [(1, "Warfarin"), (2, "Metformin")], [])
+    assert (conflict.kind, conflict.severity, conflict.medication_id) == (INTERACTION, "major", 1)
+    assert conflict.conflicting_with == "Warfarin"
+
+
+def test_direct_and_cross_reactive_allergies():
+    [direct] = find_conflicts("Amoxicillin", [], [(7, "Amoxicillin allergy")])
+    assert (direct.kind, direct.severity, direct.health_record_id) == (ALLERGY, "contraindicated", 7)
+    [cross] = find_conflicts("Amoxil", [], [(8, "Penicillin allergy")])
+    assert (cross.kind, cross.severity, cross.health_record_id) == (ALLERGY, "major", 8)
+
+
+def test_most_severe_first():
+    conflicts = find_conflicts("Aspirin", [(1, "Warfarin")], [(2, "Aspirin allergy")])
+    assert [c.severity for c in conflicts] == ["contraindicated", "major"]
+
+
+def test_unknown_medication_has_no_conflicts():
+    assert find_conflicts("Vitamin D", [(1, "Warfarin")], [(2, "Aspirin allergy")]) == []
+
+
+def test_batch_checks_earlier_active_items_only():
+    conflicts = find_batch_conflicts(
+        [(10, "Warfarin", True), (11, "Ibuprofen", False), (12, "Naproxen", True)], [], []
+    )
+    assert conflicts[0] == [] and conflicts[1] == []
+    assert [c.medication_id for c in conflicts[2]] == [10]
+
+
+def add_medication(client, headers, member, name, **fields):
+    response = client.post(API + f"/health-records/family-members/{member}/medications", headers=headers, json={
+        "name": name, "dosage": "1 tab", "frequency": "daily", "start_date": "2024-01-01", **fields
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_create_warns_about_active_medications(client, headers, member):
+    warfarin = add_medication(client, headers, member, "Warfarin")
+    add_medication(client, headers, member, "Apixaban", is_active=False)
+    [warning] = add_medication(client, headers, member, "Ibuprofen")["warnings"]
+    assert warning["kind"] == INTERACTION
+    assert warning["medication_id"] == warfarin["id"]
+
+
+def test_other_members_medications_do_not_conflict(client, headers, member):
+    other = client.post(API + "/family-members/", headers=headers, json={
+        "full_name": "Other Member", "relationship": "spouse"
+    }).json()["id"]
+    add_medication(client, headers, other, "Warfarin")
+    assert add_medication(client, headers, member, "Ibuprofen")["warnings"] == []
+
+
+def test_create_warns_about_allergies(client, headers, member):
+    record = client.post(API + f"/health-records/family-members/{member}/records", headers=headers, json={
+        "record_type": "allergy", "title": "Penicillin allergy"
+    }).json()
+    [warning] = add_medication(client, headers, member, "Amoxicillin")["warnings"]
+    assert (warning["kind"], warning["health_record_id"]) == (ALLERGY, record["id"])
+
+
+def test_update_checks_the_new_name_against_the_others(client, headers, member):
+    add_medication(client, headers, member, "Warfarin")
+    medication = add_medication(client, headers, member, "Metformin")
+    response = client.put(API + f"/health-records/medications/{medication['id']}", headers=headers, json={
+        "name": "Naproxen"
+    })
+    assert response.status_code == 200, response.text
+    assert [w["conflicting_with"] for w in response.json()["warnings"]] == ["Warfarin"]
+
+
+def test_bulk_create_checks_earlier_items(client, headers, member):
+    allergy = client.post(API + f"/health-records/family-members/{member}/records", headers=headers, json={
+        "record_type": "allergy", "title": "NSAID allergy"
+    }).json()
+    response = client.post(API + f"/health-records/family-members/{member}/medications/bulk", headers=headers, json=[
+        {"name": name, "dosage": "1 tab", "frequency": "daily", "start_date": "2024-01-01"}
+        for name in ("Warfarin", "Metformin", "Ibuprofen")
+    ])
+    assert response.status_code == 201, response.text
+    results = response.json()["results"]
+    assert [r["warnings"] for r in results[:2]] == [[], []]
+    assert {(w["kind"], w["medication_id"], w["health_record_id"]) for w in results[2]["warnings"]} == {
+        (ALLERGY, None, allergy["id"]), (INTERACTION, results[0]["id"], None)
+    }
@@ -0,0 +1,108 @@
+"""Tests of the member_stats rollup: maintained by the services, equal to a rebuild."""
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from app.db.member_stats import build_stats, rebuild_member_stats, stats_statements
+from app.db.session import SessionLocal, engine
+from app.models.models import MemberStats
+from conftest import API
+
+# The rollup's timestamps record when it changed, which a rebuild cannot know
+COMPARED = (
+    "record_counts", "total_records", "latest_record_date", "medication_count", "active_medications",
+    "appointment_counts", "next_appointment_id", "next_appointment_date",
+)
+
+
+def stored(member):
+    with SessionLocal() as db:
+        row = db.get(MemberStats, member)
+        return {field: getattr(row, field) for field in COMPARED}
+
+
+def recomputed(member):
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        [row] = build_stats(*(db.execute(stmt).all() for stmt in stats_statements([member], now)), now=now)
+    return {field: row[field] for field in COMPARED}
+
+
+def post(client, headers, path, json):
+    response = client.post(API + path, headers=headers, json=json)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def put(client, headers, path, json):
+    response = client.put(API + path, headers=headers, json=json)
+    assert response.status_code == 200, response.text
+
+
+def test_new_member_has_empty_stats(client, member):
+    assert stored(member) == recomputed(member) == {
+        "record_counts": {}, "total_records": 0, "latest_record_date": None, "medication_count": 0,
+        "active_medications": 0, "appointment_counts": {}, "next_appointment_id": None,
+        "next_appointment_date": None,
+    }
+
+
+def test_records_are_maintained(client, headers, member):
+    base = f"/health-records/family-members/{member}/records"
+    first = post(client, headers, base, {"record_type": "lab_result", "title": "A", "date_recorded": "2024-03-01T00:00:00"})
+    post(client, headers, base + "/bulk", [
+        {"record_type": "lab_result", "title": "B", "date_recorded": "2024-01-01T00:00:00"},
+        {"record_type": "checkup", "title": "C", "date_recorded": "2024-02-01T00:00:00"},
+    ])
+    put(client, headers, f"/health-records/{first['id']}", {"record_type": "imaging", "date_recorded": "2023-12-01T00:00:00"})
+    assert stored(member)["latest_record_date"] == datetime(2024, 2, 1)
+
+    latest = post(client, headers, base, {"record_type": "checkup", "title": "D", "date_recorded": "2024-05-01T00:00:00"})
+    assert client.delete(API + f"/health-records/{latest['id']}", headers=headers).status_code == 200
+    assert stored(member) == recomputed(member)
+    assert stored(member)["record_counts"] == {"lab_result": 1, "checkup": 1, "imaging": 1}
+
+
+def test_medications_are_maintained(client, headers, member):
+    base = f"/health-records/family-members/{member}/medications"
+    medication = {"dosage": "1 tab", "frequency": "daily", "start_date": "2024-01-01"}
+    first = post(client, headers, base, {"name": "Metformin", **medication})
+    post(client, headers, base + "/bulk", [
+        {"name": "Lisinopril", **medication}, {"name": "Atorvastatin", "is_active": False, **medication},
+    ])
+    put(client, headers, f"/health-records/medications/{first['id']}", {"is_active": False})
+    assert stored(member) == recomputed(member)
+    assert (stored(member)["medication_count"], stored(member)["active_medications"]) == (3, 1)
+
+
+def test_appointments_are_maintained(client, headers, member):
+    base = f"/health-records/family-members/{member}/appointments"
+    soon = post(client, headers, base, {"title": "Soon", "appointment_date": "2100-01-01T09:00:00"})
+    later, _ = post(client, headers, base + "/bulk", [
+        {"title": "Later", "appointment_date": "2100-02-01T09:00:00"},
+        {"title": "Past", "appointment_date": "2020-01-01T09:00:00", "status": "completed"},
+    ])["results"]
+    assert stored(member)["next_appointment_id"] == soon["id"]
+
+    put(client, headers, f"/health-records/appointments/{soon['id']}", {"status": "cancelled"})
+    assert stored(member)["next_appointment_id"] == later["id"]
+    put(client, headers, f"/health-records/appointments/{later['id']}", {"appointment_date": "2100-03-01T09:00:00"})
+    assert stored(member) == recomputed(member)
+    assert stored(member)["appointment_counts"] == {"scheduled": 1, "cancelled": 1, "completed": 1}
+
+
+def test_rebuild_repairs_a_stale_rollup(client, headers, member):
+    post(client, headers, f"/health-records/family-members/{member}/records",
+         {"record_type": "lab_result", "title": "A", "date_recorded": "2024-03-01T00:00:00"})
+    expected = stored(member)
+    with SessionLocal() as db:
+        db.execute(update(MemberStats).where(MemberStats.family_member_id == member).values(
+            total_records=99, record_counts={}, latest_record_date=None
+        ))
+        db.commit()
+
+    assert rebuild_member_stats(engine) >= 1
+    assert stored(member) == expected
+    with SessionLocal() as db:
+        members = db.execute(select(MemberStats.family_member_id)).scalars().all()
+    assert member in members
@@ -0,0 +1,35 @@
+"""Tests of the principal cache's invalidation."""
+from datetime import datetime
+
+from app.core.principal_cache import Principal, PrincipalCache
+
+
+def principal(user_id: int = 1, is_active: bool = True) -> Principal:
+    now = datetime(2025, 1, 1)
+    return Principal(
+        id=user_id, email=f"user{user_id}@example.com", full_name=None, phone_number=None,
+        date_of_birth=None, is_active=is_active, is_superuser=False, created_at=now, updated_at=now,
+    )
+
+
+def test_invalidate_user_evicts_their_tokens():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.put("a", principal(1), cache.generation(1))
+    cache.put("b", principal(1), cache.generation(1))
+    cache.put("c", principal(2), cache.generation(2))
+    cache.invalidate_user(1)
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("c") == principal(2)
+
+
+def test_load_racing_an_invalidation_is_not_cached():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    generation = cache.generation(1)
+    stale = principal(1, is_active=True)
+    # The user is deactivated and committed while the old row is being loaded
+    cache.invalidate_user(1)
+    cache.put("a", stale, generation)
+    assert cache.get("a") is None
+
+    cache.put("a", principal(1, is_active=False), cache.generation(1))
+    assert cache.get("a").is_active is False
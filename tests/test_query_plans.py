@@ -0,0 +1,361 @@
+"""
+Query-plan regression test for the service layer.
+
+Runs every service query against a scratch SQLite database, records the SQL
+it emits and asks ``EXPLAIN QUERY PLAN`` how each statement is executed. Any
+full scan of a table that is not explicitly allowed fails the case.
+"""
+import re
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.blob_store import BlobStore
+from app.core.embeddings import get_embedding_backend
+from app.db.embeddings import embed_batch, sync_record_embeddings
+from app.db.fts import create_search_index
+from app.db import attachments, jobs, reminders
+from app.db.loading import LoadingProfile
+from app.db.member_stats import rebuild_member_stats, stats_statements
+from app.models.models import (
+    Appointment, Attachment, Base, Blob, FamilyMember, HealthRecord, Job, Medication, User
+)
+from app.schemas.schemas import (
+    AppointmentCreate, AppointmentUpdate, FamilyMemberCreate, FamilyMemberUpdate, HealthRecordCreate,
+    HealthRecordUpdate, MedicationCreate, MedicationUpdate
+)
+from app.services import freshness_service as freshness
+from app.services.attachment_service import AttachmentService
+from app.services.calendar_service import CalendarService
+from app.services.dose_schedule_service import DoseScheduleService
+from app.services.family_member_service import FamilyMemberService
+from app.services.health_record_service import (
+    AppointmentService, HealthRecordService, MedicationService
+)
+from app.services.job_service import JobService
+from app.services.medication_conflict_service import MedicationConflictService
+from app.services.semantic_search_service import SemanticSearchService
+from app.services.summary_service import SummaryService
+from app.services.user_service import UserService
+
+# Tables a case may scan in full, with the reason.
+ALLOWED_SCANS: Dict[str, Set[str]] = {
+    # Pages through every account with OFFSET; admin-only listing
+    "UserService.get_all_users": {"users"},
+    # Walks the partial index, which holds only the records still to embed
+    "embeddings.embed_batch": {"record_embeddings"},
+    # Walks the partial index, which holds only the unreferenced blobs
+    "attachments.collect_statement": {"blobs"},
+}
+
+# Full scans of ordinary tables; FTS5 virtual tables and SQLite's own schema
+# tables are searched through their own machinery
+_SCAN = re.compile(r"^SCAN (?!sqlite_)(\w+)\b(?! VIRTUAL TABLE)")
+
+Case = Tuple[str, Callable[[Session, Dict[str, Any]], Any]]
+
+
+def _two_pages(fetch: Callable[[Any], Tuple[list, Any]]) -> None:
+    """Fetch a first page and, through its cursor, a second one."""
+    _, next_cursor = fetch(None)
+    if next_cursor:
+        fetch(next_cursor)
+
+
+def _create_attachment(db: Session, ids: Dict[str, int]) -> None:
+    """Attach a small upload, staged in a scratch blob store."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BlobStore(tmp)
+        writer = store.writer(1024)
+        writer.write(b"plans")
+        AttachmentService.create_attachment(
+            db, ids["record"], ids["user"], "plans.txt", "text/plain", writer.finish(), store
+        )
+
+
+# A moment after every seeded job is due
+_LATER = datetime(2100, 1, 1)
+
+CASES: List[Case] = [
+    ("UserService.get_user", lambda db, ids: UserService.get_user(db, ids["user"])),
+    ("UserService.get_user_by_email",
+     lambda db, ids: UserService.get_user_by_email(db, "plans0@example.com")),
+    ("UserService.get_all_users", lambda db, ids: UserService.get_all_users(db)),
+    ("UserService.get_user (member summary)",
+     lambda db, ids: UserService.get_user(db, ids["user"], LoadingProfile.MEMBER_SUMMARY)),
+    ("FamilyMemberService.get_family_member",
+     lambda db, ids: FamilyMemberService.get_family_member(db, ids["member"])),
+    ("FamilyMemberService.get_family_members_by_user",
+     lambda db, ids: FamilyMemberService.get_family_members_by_user(db, ids["user"])),
+    ("FamilyMemberService.get_family_member_with_records",
+     lambda db, ids: FamilyMemberService.get_family_member_with_records(
+         db, ids["member"], ids["user"])),
+    ("FamilyMemberService.search_family_members",
+     lambda db, ids: _two_pages(lambda cursor: FamilyMemberService.search_family_members(
+         db, ids["user"], "member", cursor=cursor, limit=2))),
+    ("FamilyMemberService.create_family_member",
+     lambda db, ids: FamilyMemberService.create_family_member(
+         db, FamilyMemberCreate(full_name="New Member", relationship="child"), ids["user"])),
+    ("FamilyMemberService.update_family_member",
+     lambda db, ids: FamilyMemberService.update_family_member(
+         db, ids["member"], FamilyMemberUpdate(notes="checked"), ids["user"])),
+    ("HealthRecordService.get_health_record",
+     lambda db, ids: HealthRecordService.get_health_record(
+         db, ids["record"], LoadingProfile.MEMBER_SUMMARY)),
+    ("HealthRecordService.get_health_records_by_member",
+     lambda db, ids: _two_pages(lambda cursor: HealthRecordService.get_health_records_by_member(
+         db, ids["member"], cursor=cursor, limit=10))),
+    ("HealthRecordService.search_health_records (fts)",
+     lambda db, ids: _two_pages(lambda cursor: HealthRecordService.search_health_records(
+         db, ids["user"], "checkup", "checkup", cursor=cursor, limit=10))),
+    ("HealthRecordService.search_health_records (like)",
+     lambda db, ids: _two_pages(lambda cursor: HealthRecordService._search_like(
+         db, ids["user"], "checkup", None, cursor, 10))),
+    ("HealthRecordService.search_health_records (no term)",
+     lambda db, ids: _two_pages(lambda cursor: HealthRecordService.search_health_records(
+         db, ids["user"], "", cursor=cursor, limit=10))),
+    ("HealthRecordService.create_health_records",
+     lambda db, ids: HealthRecordService.create_health_records(
+         db, [HealthRecordCreate(record_type="lab", title="Panel")] * 3, ids["member"], ids["user"])),
+    ("HealthRecordService.update_health_record",
+     lambda db, ids: HealthRecordService.update_health_record(
+         db, ids["record"], HealthRecordUpdate(notes="checked"), ids["user"])),
+    ("AttachmentService.get_attachments",
+     lambda db, ids: AttachmentService.get_attachments(db, ids["record"], ids["user"])),
+    ("AttachmentService.get_attachment",
+     lambda db, ids: AttachmentService.get_attachment(db, ids["record"], ids["attachment"], ids["user"])),
+    ("AttachmentService.get_usage", lambda db, ids: AttachmentService.get_usage(db, ids["user"])),
+    ("AttachmentService.create_attachment", _create_attachment),
+    ("AttachmentService.delete_attachment",
+     lambda db, ids: AttachmentService.delete_attachment(db, ids["record"], ids["attachment"], ids["user"])),
+    ("attachments.collect_statement",
+     lambda db, ids: db.execute(attachments.collect_statement(attachments.COLLECT_BATCH_SIZE)).all()),
+    ("HealthRecordService.delete_health_record",
+     lambda db, ids: HealthRecordService.delete_health_record(db, ids["record"], ids["user"])),
+    ("MedicationService.get_medication",
+     lambda db, ids: MedicationService.get_medication(db, ids["medication"])),
+    ("MedicationService.get_medications_by_member",
+     lambda db, ids: _two_pages(lambda cursor: MedicationService.get_medications_by_member(
+         db, ids["member"], cursor=cursor, limit=10))),
+    ("MedicationService.create_medication",
+     lambda db, ids: MedicationService.create_medication(
+         db, MedicationCreate(name="Ibuprofen", dosage="200mg", frequency="daily",
+                              start_date=datetime(2024, 1, 1)),
+         ids["member"], ids["user"])),
+    ("MedicationService.create_medications",
+     lambda db, ids: MedicationService.create_medications(
+         db, [MedicationCreate(name=name, dosage="1 tab", frequency="daily", start_date=datetime(2024, 1, 1))
+              for name in ("Warfarin", "Aspirin", "Vitamin D")],
+         ids["member"], ids["user"])),
+    ("MedicationService.update_medication",
+     lambda db, ids: MedicationService.update_medication(
+         db, ids["medication"], MedicationUpdate(name="Warfarin", is_active=True), ids["user"])),
+    ("MedicationConflictService.check",
+     lambda db, ids: MedicationConflictService.check(db, ids["member"], "Warfarin", ids["medication"])),
+    ("DoseScheduleService.get_household_schedule",
+     lambda db, ids: DoseScheduleService.get_household_schedule(
+         db, ids["user"], datetime(2024, 1, 5), datetime(2024, 2, 1))),
+    ("FreshnessService.get_state (household medications)",
+     lambda db, ids: freshness.FreshnessService.get_state(
+         db, freshness.household_medications_state(ids["user"]))),
+    ("AppointmentService.get_appointment",
+     lambda db, ids: AppointmentService.get_appointment(db, ids["appointment"])),
+    ("AppointmentService.get_appointments_by_member",
+     lambda db, ids: _two_pages(lambda cursor: AppointmentService.get_appointments_by_member(
+         db, ids["member"], cursor=cursor, limit=10))),
+    ("AppointmentService.create_appointment",
+     lambda db, ids: AppointmentService.create_appointment(
+         db, AppointmentCreate(title="Follow-up", appointment_date=datetime(2024, 6, 1)),
+         ids["member"], ids["user"])),
+    ("AppointmentService.create_appointment (upcoming)",
+     lambda db, ids: AppointmentService.create_appointment(
+         db, AppointmentCreate(title="Follow-up", appointment_date=datetime(2100, 1, 1)),
+         ids["member"], ids["user"])),
+    ("AppointmentService.update_appointment (reschedule)",
+     lambda db, ids: AppointmentService.update_appointment(
+         db, ids["appointment"], AppointmentUpdate(appointment_date=datetime(2100, 1, 2)), ids["user"])),
+    ("AppointmentService.update_appointment (cancel)",
+     lambda db, ids: AppointmentService.update_appointment(
+         db, ids["appointment"], AppointmentUpdate(status="cancelled"), ids["user"])),
+    ("AppointmentService.get_household_appointments",
+     lambda db, ids: _two_pages(lambda cursor: AppointmentService.get_household_appointments(
+         db, ids["user"], datetime(2024, 1, 5), datetime(2024, 2, 1), cursor, 20))),
+    ("FreshnessService.get_state (household appointments)",
+     lambda db, ids: freshness.FreshnessService.get_state(
+         db, freshness.household_appointments_state(ids["user"]))),
+    ("CalendarService.stream_calendar",
+     lambda db, ids: list(CalendarService.stream_calendar(db, ids["user"], datetime(2024, 1, 10)))),
+    ("CalendarService.get_feed_user",
+     lambda db, ids: CalendarService.get_feed_user(db, "plans")),
+    ("reminders.window_statement",
+     lambda db, ids: db.execute(
+         reminders.window_statement(datetime(2024, 1, 5), datetime(2024, 1, 6))).all()),
+    ("reminders.confirm_statement",
+     lambda db, ids: db.execute(reminders.confirm_statement([ids["appointment"]])).all()),
+    ("FreshnessService.get_state (family members)",
+     lambda db, ids: freshness.FreshnessService.get_state(
+         db, freshness.family_members_state(ids["user"]))),
+    ("FreshnessService.get_state (family member)",
+     lambda db, ids: freshness.FreshnessService.get_state(
+         db, freshness.family_member_state(ids["member"], ids["user"]))),
+    ("FreshnessService.get_state (household records)",
+     lambda db, ids: freshness.FreshnessService.get_state(
+         db, freshness.household_records_state(ids["user"]))),
+    ("FreshnessService.get_state (health record)",
+     lambda db, ids: freshness.FreshnessService.get_state(
+         db, freshness.health_record_state(ids["record"], ids["user"]))),
+    ("SummaryService.get_member_summary",
+     lambda db, ids: SummaryService.get_member_summary(db, ids["member"], ids["user"])),
+    ("SummaryService.get_household_summary",
+     lambda db, ids: SummaryService.get_household_summary(db, ids["user"])),
+    ("member_stats.stats_statements (one member)",
+     lambda db, ids: [db.execute(stmt).all() for stmt in stats_statements([ids["member"]])]),
+    ("SemanticSearchService.search",
+     lambda db, ids: SemanticSearchService.search(db, ids["user"], "yearly checkup")),
+    ("SemanticSearchService.search (record type)",
+     lambda db, ids: SemanticSearchService.search(db, ids["user"], "yearly checkup", 5, "checkup")),
+    ("embeddings.embed_batch",
+     lambda db, ids: embed_batch(db, get_embedding_backend(), 10)),
+    ("JobService.enqueue (idempotency key)",
+     lambda db, ids: [JobService.enqueue(
+         db, "member_stats.rebuild", user_id=ids["user"], idempotency_key="plans") for _ in range(2)]),
+    ("JobService.get_job", lambda db, ids: JobService.get_job(db, ids["job"], ids["user"])),
+    ("jobs.claim_statement",
+     lambda db, ids: db.execute(jobs.claim_statement("plans", _LATER, _LATER)).all()),
+    ("jobs.expired_statement", lambda db, ids: db.execute(jobs.expired_statement(_LATER))),
+    ("jobs.release_statement", lambda db, ids: db.execute(jobs.release_statement("plans"))),
+    ("jobs.purge_statement", lambda db, ids: db.execute(jobs.purge_statement(_LATER))),
+]
+
+
+def seed(engine: Engine, users: int = 3, members: int = 4, rows: int = 30) -> Dict[str, int]:
+    """Create a small household per user and return IDs to query with."""
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2024, 1, 1)
+    with Session(engine) as db:
+        for u in range(users):
+            user = User(email=f"plans{u}@example.com", hashed_password="x")
+            db.add(user)
+            db.flush()
+            for m in range(members):
+                member = FamilyMember(
+                    user_id=user.id, full_name=f"Member {m}", relation_type="child"
+                )
+                db.add(member)
+                db.flush()
+                for i in range(rows):
+                    when = start + timedelta(days=i)
+                    db.add_all([
+                        HealthRecord(
+                            family_member_id=member.id, record_type="checkup",
+                            title=f"Annual checkup {i}", date_recorded=when,
+                        ),
+                        Medication(
+                            family_member_id=member.id, name=f"Drug {i}", dosage="1 tab",
+                            frequency="daily", dose_rule="1/24h", start_date=when, is_active=i % 2 == 0,
+                        ),
+                        Appointment(
+                            family_member_id=member.id, title=f"Visit {i}",
+                            appointment_date=when,
+                        ),
+                    ])
+            for i, status in enumerate((jobs.QUEUED, jobs.RUNNING, jobs.SUCCEEDED, jobs.FAILED) * rows):
+                db.add(Job(
+                    kind="member_stats.rebuild", status=status, priority=i % 3, max_attempts=3,
+                    run_at=start + timedelta(hours=i), user_id=user.id,
+                    locked_by="plans" if status == jobs.RUNNING else None,
+                    locked_until=start if status == jobs.RUNNING else None,
+                    finished_at=start if status in (jobs.SUCCEEDED, jobs.FAILED) else None,
+                ))
+        # Two attachments on each member's first records, sharing contents, and
+        # blobs no attachment refers to
+        for n in range(12):
+            db.add(Blob(sha256=f"{n:064x}", size=1024))
+        first_records = db.query(HealthRecord.id).filter(HealthRecord.date_recorded < start + timedelta(days=2))
+        for (record_id,) in first_records.all():
+            db.add_all([
+                Attachment(
+                    health_record_id=record_id, sha256=f"{(record_id + k) % 8:064x}",
+                    filename="scan.pdf", content_type="application/pdf", size=1024,
+                )
+                for k in range(2)
+            ])
+        db.commit()
+        ids = {
+            "user": db.query(User.id).order_by(User.id).limit(1).scalar(),
+            "member": db.query(FamilyMember.id).order_by(FamilyMember.id).limit(1).scalar(),
+            "record": db.query(HealthRecord.id).order_by(HealthRecord.id).limit(1).scalar(),
+            "medication": db.query(Medication.id).order_by(Medication.id).limit(1).scalar(),
+            "appointment": db.query(Appointment.id).order_by(Appointment.id).limit(1).scalar(),
+            "job": db.query(Job.id).order_by(Job.id).limit(1).scalar(),
+            "attachment": db.query(Attachment.id).order_by(Attachment.id).limit(1).scalar(),
+        }
+    create_search_index(engine)
+    rebuild_member_stats(engine)
+    attachments.rebuild_attachment_counts(engine)
+    with engine.begin() as conn:
+        sync_record_embeddings(conn)
+    # Leave some records pending for the worker case
+    with Session(engine) as db:
+        embed_batch(db, get_embedding_backend(), users * members * rows - 20)
+        db.commit()
+    return ids
+
+
+def capture(engine: Engine, db: Session, ids: Dict[str, int], case: Case) -> List[Tuple[str, Any]]:
+    """Run a case and return the statements it executed."""
+    statements: List[Tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        case[1](db, ids)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def explain(engine: Engine, statement: str, parameters: Any) -> List[str]:
+    """Return the ``EXPLAIN QUERY PLAN`` detail lines of a statement."""
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [row[-1] for row in rows]
+
+
+@pytest.fixture(scope="module")
+def plans_db(tmp_path_factory):
+    """A seeded scratch database, shared by the cases in their listed order."""
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    ids = seed(engine)
+    yield engine, ids
+    engine.dispose()
+
+
+@pytest.mark.parametrize("case", CASES, ids=[name for name, _ in CASES])
+def test_no_full_scans(plans_db, case):
+    engine, ids = plans_db
+    name = case[0]
+    with Session(engine) as db:
+        statements = capture(engine, db, ids, case)
+    assert statements, f"{name} executed no queries"
+
+    failures = []
+    for statement, parameters in statements:
+        plan = explain(engine, statement, parameters)
+        scans = {
+            match.group(1) for match in map(_SCAN.match, plan) if match
+        } - ALLOWED_SCANS.get(name, set())
+        if scans:
+            failures.append(
+                f"full scan of {', '.join(sorted(scans))}\n"
+                f"  {' '.join(statement.split())}\n  " + "\n  ".join(plan)
+            )
+    assert not failures, "\n".join(failures)
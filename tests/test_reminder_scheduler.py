@@ -0,0 +1,232 @@
+"""
+Tests of the appointment reminder scheduler.
+
+``ReminderScheduler`` is driven by a fake clock, jumping from one wakeup or
+write to the next as the lifespan task would sleep. The appointments live in
+memory and the reminders go to an in-memory sink; the reminders sent are
+compared with the set computed by brute force from the full write history.
+"""
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import pytest
+
+from app.core.reminders import Reminder, ReminderScheduler
+from app.db.reminders import SCHEDULED
+
+START = datetime(2025, 1, 1)
+OFFSETS = (1440, 60)
+WINDOW = timedelta(minutes=60)
+CATCH_UP = timedelta(minutes=15)
+
+# (since, status, appointment date) of each version of an appointment; since is
+# None for appointments written before the scheduler started
+Version = Tuple[Optional[datetime], str, datetime]
+Expected = Tuple[int, int, datetime]
+
+
+class Clock:
+    """The simulated time."""
+
+    def __init__(self, now: datetime) -> None:
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class Appointments:
+    """In-memory appointments table counting the scheduler's queries."""
+
+    def __init__(self) -> None:
+        self.rows: Dict[int, Tuple[str, datetime]] = {}
+        self.history: Dict[int, List[Version]] = {}
+        self.window_queries = 0
+
+    def write(self, appointment_id: int, status: str, when: datetime, since: Optional[datetime]) -> None:
+        self.rows[appointment_id] = (status, when)
+        self.history.setdefault(appointment_id, []).append((since, status, when))
+
+    def load(self, start: datetime, end: datetime) -> List[Tuple[int, datetime]]:
+        self.window_queries += 1
+        return [
+            (appointment_id, when) for appointment_id, (status, when) in self.rows.items()
+            if status == SCHEDULED and start <= when < end
+        ]
+
+    def confirm(self, reminders: Sequence[Reminder]) -> List[Reminder]:
+        return [r for r in reminders if self.rows.get(r.appointment_id) == (SCHEDULED, r.appointment_date)]
+
+
+class Collector:
+    """Sink keeping every reminder sent, with the time it was sent."""
+
+    def __init__(self, clock: Clock) -> None:
+        self.clock = clock
+        self.sent: List[Tuple[datetime, Reminder]] = []
+
+    def deliver(self, reminders: Sequence[Reminder]) -> None:
+        self.sent.extend((self.clock.now, r) for r in reminders)
+
+
+class Simulation:
+    """A scheduler over an in-memory table, with its clock and sink."""
+
+    def __init__(self, offsets: Sequence[int] = OFFSETS, catch_up: timedelta = CATCH_UP) -> None:
+        self.offsets = offsets
+        self.catch_up = catch_up
+        self.clock = Clock(START)
+        self.store = Appointments()
+        self.sink = Collector(self.clock)
+        self.scheduler = ReminderScheduler(
+            offsets, WINDOW, catch_up,
+            load=self.store.load, confirm=self.store.confirm, sink=self.sink, clock=self.clock,
+        )
+
+    def write(self, appointment_id: int, status: str, when: datetime) -> None:
+        """Write an appointment now, as the services do."""
+        self.store.write(appointment_id, status, when, self.clock.now)
+        # What the after_commit listener does
+        self.scheduler.reschedule([(appointment_id, status, when)])
+
+    def run_until(self, end: datetime) -> None:
+        """Tick at each wakeup up to ``end``."""
+        while True:
+            wake = max(self.scheduler.next_wakeup(), self.clock.now)
+            self.clock.now = min(wake, end)
+            due = self.scheduler.tick()
+            if due:
+                self.scheduler.deliver(due)
+            if wake >= end:
+                return
+
+    def sent(self) -> List[Tuple[datetime, int, int]]:
+        """(sent at, appointment ID, minutes before) of each reminder sent."""
+        return [(at, r.appointment_id, r.minutes_before) for at, r in self.sink.sent]
+
+
+def expected_reminders(
+    history: Dict[int, List[Version]], offsets: Sequence[int], catch_up: timedelta, end: datetime
+) -> Set[Expected]:
+    """
+    Reminders due while their appointment version was current: written no
+    later than the due time, or before startup and due within the catch-up.
+    """
+    expected = set()
+    for appointment_id, versions in history.items():
+        for k, (since, status, when) in enumerate(versions):
+            if status != SCHEDULED:
+                continue
+            until = versions[k + 1][0] if k + 1 < len(versions) else datetime.max
+            lower = since if since is not None else START - catch_up
+            for minutes in offsets:
+                due = when - timedelta(minutes=minutes)
+                if lower <= due < until and due <= end and when > max(due, START):
+                    expected.add((appointment_id, minutes, when))
+    return expected
+
+
+def test_create_sends_each_offset_when_due():
+    sim = Simulation()
+    sim.run_until(START + timedelta(minutes=10))
+    when = START + timedelta(days=2)
+    sim.write(1, SCHEDULED, when)
+    sim.run_until(when)
+    assert sim.sent() == [(when - timedelta(days=1), 1, 1440), (when - timedelta(hours=1), 1, 60)]
+
+
+def test_reschedule_sends_for_the_new_time_only():
+    sim = Simulation()
+    sim.store.write(1, SCHEDULED, START + timedelta(hours=3), None)
+    sim.run_until(START + timedelta(minutes=30))
+    moved = START + timedelta(hours=5)
+    sim.write(1, SCHEDULED, moved)
+    sim.run_until(moved)
+    assert sim.sent() == [(moved - timedelta(hours=1), 1, 60)]
+
+
+def test_cancel_sends_nothing():
+    sim = Simulation()
+    when = START + timedelta(minutes=90)
+    sim.store.write(1, SCHEDULED, when, None)
+    sim.run_until(START + timedelta(minutes=10))
+    assert len(sim.scheduler) == 1
+    sim.write(1, "cancelled", when)
+    sim.run_until(when)
+    assert sim.sent() == []
+    assert len(sim.scheduler) == 0
+
+
+def test_change_around_the_services_is_confirmed_away():
+    sim = Simulation()
+    when = START + timedelta(minutes=90)
+    sim.store.write(1, SCHEDULED, when, None)
+    sim.run_until(START + timedelta(minutes=10))
+    # Written by another process: the heap still holds the reminder
+    sim.store.write(1, SCHEDULED, when + timedelta(days=3), START + timedelta(minutes=10))
+    sim.run_until(when)
+    assert sim.sent() == []
+
+
+def test_catch_up_sends_reminders_missed_during_downtime():
+    sim = Simulation()
+    # Due 10 minutes before startup, within the catch-up
+    sim.store.write(1, SCHEDULED, START + timedelta(minutes=50), None)
+    # Due 20 minutes before startup, past the catch-up
+    sim.store.write(2, SCHEDULED, START + timedelta(minutes=40), None)
+    sim.run_until(START)
+    assert sim.sent() == [(START, 1, 60)]
+
+
+def test_catch_up_skips_appointments_already_started():
+    sim = Simulation(offsets=(10,))
+    # Due 12 minutes before startup, but the appointment started 2 minutes before
+    sim.store.write(1, SCHEDULED, START - timedelta(minutes=2), None)
+    sim.store.write(2, SCHEDULED, START + timedelta(minutes=5), None)
+    sim.run_until(START)
+    assert sim.sent() == [(START, 2, 10)]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_random_writes_match_brute_force(seed):
+    rng = random.Random(seed)
+    hours = 48
+    end = START + timedelta(hours=hours)
+    horizon = timedelta(minutes=max(OFFSETS), hours=hours)
+    sim = Simulation()
+
+    def random_date(after: datetime) -> datetime:
+        return after + timedelta(seconds=rng.uniform(0, horizon.total_seconds()))
+
+    appointments = 500
+    for appointment_id in range(1, appointments + 1):
+        sim.store.write(appointment_id, SCHEDULED, random_date(START - timedelta(hours=1)), None)
+    writes = sorted(START + timedelta(seconds=rng.uniform(0, hours * 3600)) for _ in range(1500))
+
+    next_id = appointments + 1
+    for at in writes:
+        sim.run_until(at)
+        kind = rng.choice(("create", "reschedule", "cancel"))
+        if kind == "create":
+            appointment_id, next_id = next_id, next_id + 1
+            status, when = SCHEDULED, random_date(at)
+        else:
+            appointment_id = rng.randrange(1, next_id)
+            status, when = sim.store.rows[appointment_id]
+            if kind == "reschedule":
+                status, when = SCHEDULED, random_date(at)
+            else:
+                status = "cancelled"
+        sim.write(appointment_id, status, when)
+    sim.run_until(end)
+
+    sent = Counter((r.appointment_id, r.minutes_before, r.appointment_date) for _, r in sim.sink.sent)
+    expected = expected_reminders(sim.store.history, OFFSETS, CATCH_UP, end)
+    assert set(sent) - expected == set(), "unexpected reminders"
+    assert expected - set(sent) == set(), "missing reminders"
+    assert [key for key, n in sent.items() if n > 1] == [], "duplicate reminders"
+    assert [r for at, r in sim.sink.sent if at != r.due_at and r.due_at >= START] == [], "late reminders"
+    # Polling every minute would take one range query per minute
+    assert sim.store.window_queries < hours * 60 / 10
@@ -0,0 +1,75 @@
+"""Tests of full-text health record search."""
+import pytest
+
+from app.db.fts import build_match_query
+from app.services.health_record_service import MATCH_END, MATCH_START, highlight
+from conftest import API
+
+
+@pytest.mark.parametrize("search_term, expected", [
+    ("diab", '"diab"*'),
+    ("blood sugar", '"blood"* "sugar"*'),
+    ('"blood sugar" test', '"blood sugar" "test"*'),
+    ("diabetes OR NOT NEAR(x)", '"diabetes"* "OR"* "NOT"* "NEAR"* "x"*'),
+    ('title:x* ^"a', '"title"* "x"* "a"*'),
+    ("-- *) \"\"", ""),
+])
+def test_build_match_query(search_term, expected):
+    assert build_match_query(search_term) == expected
+
+
+def test_highlight_escapes_the_record_text():
+    snippet = f"<b>{MATCH_START}sugar{MATCH_END}</b> & co"
+    assert highlight(snippet) == "&lt;b&gt;<mark>sugar</mark>&lt;/b&gt; &amp; co"
+    assert highlight(None) is None
+
+
+def add_record(client, headers, member, title, **fields):
+    response = client.post(API + f"/health-records/family-members/{member}/records", headers=headers, json={
+        "record_type": "checkup", "title": title, "date_recorded": "2024-01-01T00:00:00", **fields
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def search(client, headers, term):
+    response = client.get(API + "/health-records/", headers=headers, params={"search": term})
+    assert response.status_code == 200, response.text
+    return response.json()["items"]
+
+
+def test_search_matches_prefixes_and_ranks_titles_first(client, headers, member):
+    in_description = add_record(client, headers, member, "Yearly checkup", description="Diabetes screening")
+    in_title = add_record(client, headers, member, "Diabetes review")
+    add_record(client, headers, member, "Dental cleaning")
+    assert [hit["id"] for hit in search(client, headers, "diab")] == [in_title, in_description]
+
+
+def test_index_follows_updates_and_deletes(client, headers, member):
+    record = add_record(client, headers, member, "Asthma review")
+    response = client.put(API + f"/health-records/{record}", headers=headers, json={"title": "Eczema review"})
+    assert response.status_code == 200, response.text
+    assert search(client, headers, "asthma") == []
+    assert [hit["id"] for hit in search(client, headers, "eczema")] == [record]
+
+    assert client.delete(API + f"/health-records/{record}", headers=headers).status_code == 200
+    assert search(client, headers, "eczema") == []
+
+
+def test_snippet_is_escaped_html(client, headers, member):
+    add_record(client, headers, member, "Allergy test", description="<script>alert(1)</script> pollen & dust")
+    [hit] = search(client, headers, "pollen")
+    assert "<script>" not in hit["snippet"]
+    assert "&lt;script&gt;" in hit["snippet"]
+    assert "<mark>pollen</mark> &amp; dust" in hit["snippet"]
+
+
+def test_search_is_limited_to_the_users_records(client, login, headers, member):
+    add_record(client, headers, member, "Thyroid panel")
+    assert search(client, login(), "thyroid") == []
+
+
+def test_fts_syntax_in_the_search_is_harmless(client, headers, member):
+    record = add_record(client, headers, member, "Migraine OR headache")
+    assert [hit["id"] for hit in search(client, headers, 'migraine OR (')] == [record]
+    assert search(client, headers, "*") == []
@@ -0,0 +1,57 @@
+"""Tests of dropping deleted records from the external vector index."""
+import pytest
+
+from app.core.config import settings
+from app.db import embeddings
+from app.db.session import SessionLocal
+from app.services.semantic_search_service import SemanticSearchService
+from conftest import API
+
+
+class FakeIndex:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.removed = []
+
+    def remove(self, record_ids):
+        if self.fail:
+            raise RuntimeError("index unavailable")
+        self.removed.append(list(record_ids))
+
+
+@pytest.fixture
+def index(monkeypatch):
+    fake = FakeIndex()
+    monkeypatch.setattr(settings, "VECTOR_INDEX", "chroma")
+    monkeypatch.setattr(embeddings, "_index", fake)
+    return fake
+
+
+def add_record(client, headers, member):
+    response = client.post(API + f"/health-records/family-members/{member}/records", headers=headers, json={
+        "record_type": "checkup", "title": "Annual checkup", "date_recorded": "2024-01-01T00:00:00"
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_deleted_record_leaves_the_index(client, headers, member, index):
+    record = add_record(client, headers, member)
+    assert client.delete(API + f"/health-records/{record}", headers=headers).status_code == 200
+    assert index.removed == [[record]]
+
+
+def test_rolled_back_delete_keeps_the_vectors(index):
+    with SessionLocal() as db:
+        SemanticSearchService.records_deleted(db, [1, 2])
+        assert index.removed == []
+        db.rollback()
+        db.commit()
+    assert index.removed == []
+
+
+def test_index_failure_does_not_fail_the_delete(client, headers, member, index):
+    index.fail = True
+    record = add_record(client, headers, member)
+    assert client.delete(API + f"/health-records/{record}", headers=headers).status_code == 200
+    assert client.get(API + f"/health-records/{record}", headers=headers).status_code == 404